@@ -0,0 +1,48 @@
+"""add schedule_artifacts
+
+Revision ID: a9b0c1d2e3f4
+Revises: f8a9b0c1d2e3
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9b0c1d2e3f4"
+down_revision: str | Sequence[str] | None = "f8a9b0c1d2e3"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("schedules", sa.Column("published_version", sa.Integer(), nullable=True))
+    op.add_column("schedules", sa.Column("published_at", sa.DateTime(), nullable=True))
+    op.create_table(
+        "schedule_artifacts",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("schedule_id", sa.Integer(), nullable=False),
+        sa.Column("kind", sa.Enum("ward_pdf", "summary", name="artifactkind"), nullable=False),
+        sa.Column("member_id", sa.Integer(), nullable=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("media_type", sa.String(length=100), nullable=False),
+        sa.Column("etag", sa.String(length=100), nullable=False),
+        sa.Column("content", sa.LargeBinary(length=2**32 - 1), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["member_id"], ["members.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["schedule_id"], ["schedules.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("schedule_id", "kind", "member_id", name="uq_schedule_artifacts_schedule_kind_member"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("schedule_artifacts")
+    op.drop_column("schedules", "published_at")
+    op.drop_column("schedules", "published_version")
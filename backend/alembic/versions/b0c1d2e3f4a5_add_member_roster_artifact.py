@@ -0,0 +1,28 @@
+"""add member_roster artifact kind
+
+Revision ID: b0c1d2e3f4a5
+Revises: a9b0c1d2e3f4
+Create Date: 2026-10-19 16:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b0c1d2e3f4a5"
+down_revision: str | Sequence[str] | None = "a9b0c1d2e3f4"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("ALTER TABLE schedule_artifacts MODIFY COLUMN kind ENUM('ward_pdf','member_roster','summary') NOT NULL")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM schedule_artifacts WHERE kind = 'member_roster'")
+    op.execute("ALTER TABLE schedule_artifacts MODIFY COLUMN kind ENUM('ward_pdf','summary') NOT NULL")
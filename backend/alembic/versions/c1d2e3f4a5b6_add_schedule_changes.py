@@ -0,0 +1,47 @@
+"""add schedule_changes
+
+Revision ID: c1d2e3f4a5b6
+Revises: b0c1d2e3f4a5
+Create Date: 2026-10-19 17:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c1d2e3f4a5b6"
+down_revision: str | Sequence[str] | None = "b0c1d2e3f4a5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("schedules", sa.Column("resync_version", sa.Integer(), server_default="1", nullable=False))
+    # 既存のスケジュールには変更の記録がないため、今の version より前からの差分は返せない
+    op.execute("UPDATE schedules SET resync_version = version")
+    op.create_table(
+        "schedule_changes",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("schedule_id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("assignment_id", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), server_default="0", nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["schedule_id"], ["schedules.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_schedule_changes_schedule_version"), "schedule_changes", ["schedule_id", "version"], unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_schedule_changes_schedule_version"), table_name="schedule_changes")
+    op.drop_table("schedule_changes")
+    op.drop_column("schedules", "resync_version")
@@ -0,0 +1,31 @@
+"""add export artifact kinds
+
+Revision ID: d2e3f4a5b6c7
+Revises: c1d2e3f4a5b6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d2e3f4a5b6c7"
+down_revision: str | Sequence[str] | None = "c1d2e3f4a5b6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute(
+        "ALTER TABLE schedule_artifacts MODIFY COLUMN kind "
+        "ENUM('ward_pdf','member_roster','summary','csv_grid','csv_long','xlsx','ical') NOT NULL"
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("DELETE FROM schedule_artifacts WHERE kind IN ('csv_grid','csv_long','xlsx','ical')")
+    op.execute("ALTER TABLE schedule_artifacts MODIFY COLUMN kind ENUM('ward_pdf','member_roster','summary') NOT NULL")
@@ -0,0 +1,41 @@
+"""add schedule_proposals
+
+Revision ID: d6e7f8a9b0c1
+Revises: c5d6e7f8a9b0
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d6e7f8a9b0c1"
+down_revision: str | Sequence[str] | None = "c5d6e7f8a9b0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "schedule_proposals",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("year_month", sa.String(length=7), nullable=False),
+        sa.Column("rank", sa.Integer(), nullable=False),
+        sa.Column("assignments", sa.JSON(), nullable=False),
+        sa.Column("unfulfilled_requests", sa.JSON(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("year_month", "rank", name="uq_schedule_proposals_year_month_rank"),
+    )
+    op.create_index(op.f("ix_schedule_proposals_year_month"), "schedule_proposals", ["year_month"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_schedule_proposals_year_month"), table_name="schedule_proposals")
+    op.drop_table("schedule_proposals")
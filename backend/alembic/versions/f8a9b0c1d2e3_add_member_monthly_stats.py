@@ -0,0 +1,51 @@
+"""add member_monthly_stats
+
+Revision ID: f8a9b0c1d2e3
+Revises: e7f8a9b0c1d2
+Create Date: 2026-10-19 14:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f8a9b0c1d2e3"
+down_revision: str | Sequence[str] | None = "e7f8a9b0c1d2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "member_monthly_stats",
+        sa.Column("id", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("member_id", sa.Integer(), nullable=False),
+        sa.Column("schedule_id", sa.Integer(), nullable=False),
+        sa.Column("year_month", sa.String(length=7), nullable=False),
+        sa.Column("working_days", sa.Integer(), nullable=False),
+        sa.Column("day_off_count", sa.Integer(), nullable=False),
+        sa.Column("paid_leave_count", sa.Integer(), nullable=False),
+        sa.Column("night_shift_count", sa.Integer(), nullable=False),
+        sa.Column("external_night_count", sa.Integer(), nullable=False),
+        sa.Column("early_shift_count", sa.Integer(), nullable=False),
+        sa.Column("holiday_work_count", sa.Integer(), nullable=False),
+        sa.Column("request_total", sa.Integer(), nullable=False),
+        sa.Column("request_fulfilled", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["member_id"], ["members.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["schedule_id"], ["schedules.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("member_id", "year_month", name="uq_member_monthly_stats_member_month"),
+    )
+    op.create_index(op.f("ix_member_monthly_stats_year_month"), "member_monthly_stats", ["year_month"], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f("ix_member_monthly_stats_year_month"), table_name="member_monthly_stats")
+    op.drop_table("member_monthly_stats")
@@ -1,9 +1,13 @@
 from entity.base import Base
 from entity.member import Member
 from entity.member_capability import MemberCapability
+from entity.member_monthly_stat import MemberMonthlyStat
 from entity.ng_pair import NgPair
 from entity.pediatric_doctor_schedule import PediatricDoctorSchedule
 from entity.schedule import Schedule
+from entity.schedule_artifact import ScheduleArtifact
+from entity.schedule_change import ScheduleChange
+from entity.schedule_proposal import ScheduleProposal
 from entity.shift_assignment import ShiftAssignment
 from entity.shift_request import ShiftRequest
 
@@ -11,9 +15,13 @@ __all__ = [
     "Base",
     "Member",
     "MemberCapability",
+    "MemberMonthlyStat",
     "NgPair",
     "PediatricDoctorSchedule",
     "Schedule",
+    "ScheduleArtifact",
+    "ScheduleChange",
+    "ScheduleProposal",
     "ShiftAssignment",
     "ShiftRequest",
 ]
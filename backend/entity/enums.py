@@ -105,3 +105,36 @@ class RequestType(str, enum.Enum):
     paid_leave = "paid_leave"
     day_shift_request = "day_shift_request"
     night_shift_request = "night_shift_request"
+
+
+class ObjectiveMode(str, enum.Enum):
+    weighted = "weighted"
+    lexicographic = "lexicographic"
+
+    @property
+    def label(self) -> str:
+        labels = {"weighted": "重み付き和", "lexicographic": "優先順位順"}
+        return labels[self.value]
+
+
+class ArtifactKind(str, enum.Enum):
+    ward_pdf = "ward_pdf"
+    member_roster = "member_roster"
+    summary = "summary"
+    csv_grid = "csv_grid"
+    csv_long = "csv_long"
+    xlsx = "xlsx"
+    ical = "ical"
+
+    @property
+    def label(self) -> str:
+        labels = {
+            "ward_pdf": "シフト表PDF",
+            "member_roster": "個人勤務表PDF",
+            "summary": "集計",
+            "csv_grid": "CSV（表）",
+            "csv_long": "CSV（一覧）",
+            "xlsx": "XLSX",
+            "ical": "iCalendar",
+        }
+        return labels[self.value]
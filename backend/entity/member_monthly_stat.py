@@ -0,0 +1,28 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, UniqueConstraint
+
+from entity.base import Base
+
+
+class MemberMonthlyStat(Base):
+    """メンバー × 月の集計値。確定済みの割当が変わるたびに同じトランザクションで更新する。"""
+
+    __tablename__ = "member_monthly_stats"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    member_id = Column(Integer, ForeignKey("members.id", ondelete="CASCADE"), nullable=False)
+    schedule_id = Column(Integer, ForeignKey("schedules.id", ondelete="CASCADE"), nullable=False)
+    year_month = Column(String(7), nullable=False, index=True)
+    working_days = Column(Integer, nullable=False, default=0)
+    day_off_count = Column(Integer, nullable=False, default=0)
+    paid_leave_count = Column(Integer, nullable=False, default=0)
+    night_shift_count = Column(Integer, nullable=False, default=0)
+    external_night_count = Column(Integer, nullable=False, default=0)
+    early_shift_count = Column(Integer, nullable=False, default=0)
+    holiday_work_count = Column(Integer, nullable=False, default=0)
+    request_total = Column(Integer, nullable=False, default=0)
+    request_fulfilled = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
+
+    __table_args__ = (UniqueConstraint("member_id", "year_month", name="uq_member_monthly_stats_member_month"),)
@@ -13,6 +13,13 @@ class Schedule(Base):
     id = Column(Integer, primary_key=True, autoincrement=True)
     year_month = Column(String(7), nullable=False, unique=True)
     status = Column(Enum(ScheduleStatus), nullable=False, default=ScheduleStatus.draft)
+    # 割当を書き換えるたびに1増やす（メモリ上の検証状態などのキャッシュの鍵）
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+    # 割当を一括で書き換えた version。これより前の version からの差分は返せない（全体を読み直させる）
+    resync_version = Column(Integer, nullable=False, default=1, server_default="1")
+    # 公開した時点の version（成果物はこの version の内容で生成する）
+    published_version = Column(Integer, nullable=True)
+    published_at = Column(DateTime, nullable=True)
     created_at = Column(DateTime, default=lambda: datetime.now(UTC))
     updated_at = Column(DateTime, default=lambda: datetime.now(UTC), onupdate=lambda: datetime.now(UTC))
 
@@ -0,0 +1,27 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Column, DateTime, Enum, ForeignKey, Integer, LargeBinary, String, UniqueConstraint
+
+from entity.base import Base
+from entity.enums import ArtifactKind
+
+
+class ScheduleArtifact(Base):
+    """公開時に生成した成果物（PDF・集計など）。公開した version の内容をバイト列のまま保持する。"""
+
+    __tablename__ = "schedule_artifacts"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    schedule_id = Column(Integer, ForeignKey("schedules.id", ondelete="CASCADE"), nullable=False)
+    kind = Column(Enum(ArtifactKind), nullable=False)
+    # メンバーごとの成果物のみ設定する
+    member_id = Column(Integer, ForeignKey("members.id", ondelete="CASCADE"), nullable=True)
+    version = Column(Integer, nullable=False)
+    media_type = Column(String(100), nullable=False)
+    etag = Column(String(100), nullable=False)
+    content = Column(LargeBinary(length=2**32 - 1), nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "kind", "member_id", name="uq_schedule_artifacts_schedule_kind_member"),
+    )
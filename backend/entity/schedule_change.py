@@ -0,0 +1,22 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Index, Integer
+
+from entity.base import Base
+
+
+class ScheduleChange(Base):
+    """割当の作成・更新・削除の記録（差分の同期用）。割当1件の書き換えごとに1行。"""
+
+    __tablename__ = "schedule_changes"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    schedule_id = Column(Integer, ForeignKey("schedules.id", ondelete="CASCADE"), nullable=False)
+    # 書き換えた後のスケジュールの version
+    version = Column(Integer, nullable=False)
+    # 削除された割当も指すため外部キーにしない
+    assignment_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False, server_default="0")
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (Index("ix_schedule_changes_schedule_version", "schedule_id", "version"),)
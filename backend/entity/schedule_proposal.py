@@ -0,0 +1,20 @@
+from datetime import UTC, datetime
+
+from sqlalchemy import JSON, Column, DateTime, Integer, String, UniqueConstraint
+
+from entity.base import Base
+
+
+class ScheduleProposal(Base):
+    """生成されたシフト案。確定するまでは割当を JSON のまま保持する。"""
+
+    __tablename__ = "schedule_proposals"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    year_month = Column(String(7), nullable=False, index=True)
+    rank = Column(Integer, nullable=False)
+    assignments = Column(JSON, nullable=False)
+    unfulfilled_requests = Column(JSON, nullable=False)
+    created_at = Column(DateTime, default=lambda: datetime.now(UTC))
+
+    __table_args__ = (UniqueConstraint("year_month", "rank", name="uq_schedule_proposals_year_month_rank"),)
@@ -0,0 +1,107 @@
+"""スケジュールの変更の配信（WebSocket 向けの pub/sub）。
+
+エンドポイントは割当の書き換えをコミットした後にスケジュールのチャンネルへ publish し、WebSocket の接続は
+そのチャンネルを subscribe して受け取ったメッセージをそのまま送る。
+既定はプロセス内のブローカー。複数プロセスで動かす場合は Broker を実装した外部のブローカー（Redis の pub/sub など）を
+set_broker で差し替える。
+"""
+
+import asyncio
+import threading
+from collections.abc import Callable
+from typing import Any, Protocol
+
+type Message = dict[str, Any]
+
+# 接続ごとに溜めておくメッセージ数。溢れた接続には resync を送り、全体を読み直させる
+SUBSCRIBER_QUEUE_SIZE = 256
+
+
+def schedule_channel(schedule_id: int) -> str:
+    return f"schedule:{schedule_id}"
+
+
+class Subscription(Protocol):
+    async def get(self) -> Message: ...
+
+    def close(self) -> None: ...
+
+
+class Broker(Protocol):
+    def publish(self, channel: str, message: Message) -> None:
+        """message を channel の購読者に送る。スレッドプールで動く同期のエンドポイントから呼ばれる。"""
+        ...
+
+    def subscribe(self, channel: str) -> Subscription:
+        """channel を購読する。イベントループの中（WebSocket のハンドラー）から呼ぶ。"""
+        ...
+
+
+class _QueueSubscription:
+    def __init__(self, loop: asyncio.AbstractEventLoop, on_close: Callable[[_QueueSubscription], None]) -> None:
+        self.loop = loop
+        self._queue: asyncio.Queue[Message] = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._on_close = on_close
+
+    async def get(self) -> Message:
+        return await self._queue.get()
+
+    def deliver(self, message: Message) -> None:
+        """イベントループのスレッドで呼ばれる。"""
+        try:
+            self._queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            self._queue.put_nowait({"event": "resync"})
+
+    def close(self) -> None:
+        self._on_close(self)
+
+
+class InProcessBroker:
+    """同じプロセスの購読者だけに配信するブローカー。"""
+
+    def __init__(self) -> None:
+        self._subscribers: dict[str, set[_QueueSubscription]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, channel: str, message: Message) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, message)
+            except RuntimeError:
+                # イベントループが既に閉じている（接続の後片付けの前にサーバーが止まった）
+                sub.close()
+
+    def subscribe(self, channel: str) -> Subscription:
+        def unsubscribe(sub: _QueueSubscription) -> None:
+            with self._lock:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(sub)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+        sub = _QueueSubscription(asyncio.get_running_loop(), unsubscribe)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(sub)
+        return sub
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+
+_broker: Broker = InProcessBroker()
+
+
+def get_broker() -> Broker:
+    return _broker
+
+
+def set_broker(broker: Broker) -> None:
+    global _broker
+    _broker = broker
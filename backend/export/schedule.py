@@ -0,0 +1,309 @@
+"""スケジュールの書き出し（CSV・iCalendar・XLSX）。
+
+割当は必要なカラムだけのクエリを yield_per で少しずつ読み、ORM のオブジェクトを作らずに1行ずつ書き出す。
+ファイル全体をメモリ上に作らないため、使うメモリはスケジュールの大きさによらない。
+公開時の成果物は DB を読まず、スナップショットの行列（matrix_*_rows）から同じ行を作る。
+"""
+
+import codecs
+import csv
+import datetime
+import io
+import itertools
+import zipfile
+from collections.abc import Iterable, Iterator, Sequence
+from xml.sax.saxutils import escape
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.member import Member
+from entity.schedule import Schedule
+from entity.shift_assignment import ShiftAssignment
+from export.stream import ChunkWriter, zip_entry
+from solver.config import get_month_dates
+from solver.matrix import SHIFT_CODES, UNASSIGNED, ScheduleMatrix
+
+# DB から一度に読む行数と、書き出しをまとめる行数
+EXPORT_BATCH_ROWS = 1000
+
+WEEKDAY_JP = ["月", "火", "水", "木", "金", "土", "日"]
+GRID_HEADER_NAME = "氏名"
+LONG_HEADER = ["日付", "曜日", "メンバーID", "氏名", "シフト", "シフト名", "早番"]
+GRID_SHEET_NAME = "勤務表"
+CSV_MEDIA_TYPE = "text/csv; charset=utf-8"
+ICAL_MEDIA_TYPE = "text/calendar; charset=utf-8"
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+LONG_SHEET_NAME = "一覧"
+
+type Cell = str | int
+
+
+def _cell_label(shift_type: ShiftType, is_early: bool) -> str:
+    return f"★{shift_type.label}" if is_early else shift_type.label
+
+
+def grid_rows(db: Session, schedule: Schedule) -> Iterator[list[Cell]]:
+    """メンバー × 日付 の表の行（氏名, 1日, 2日, …）。割当のないメンバーも含め、メンバーの並び順に返す。"""
+    dates = get_month_dates(schedule.year_month)
+    date_index = {d: j for j, d in enumerate(dates)}
+    rows = (
+        db.query(Member.id, Member.name, ShiftAssignment.date, ShiftAssignment.shift_type, ShiftAssignment.is_early)
+        .outerjoin(
+            ShiftAssignment,
+            and_(ShiftAssignment.member_id == Member.id, ShiftAssignment.schedule_id == schedule.id),
+        )
+        .order_by(Member.position, Member.id, ShiftAssignment.date)
+        .yield_per(EXPORT_BATCH_ROWS)
+    )
+    for (_, name), cells in itertools.groupby(rows, key=lambda row: (row.id, row.name)):
+        labels: list[Cell] = [""] * len(dates)
+        for _, _, d, shift_type, is_early in cells:
+            j = date_index.get(d)
+            if j is not None and shift_type is not None:
+                labels[j] = _cell_label(shift_type, is_early)
+        yield [name, *labels]
+
+
+def grid_header(year_month: str) -> list[Cell]:
+    return [GRID_HEADER_NAME, *(f"{d.day}({WEEKDAY_JP[d.weekday()]})" for d in get_month_dates(year_month))]
+
+
+def _long_row(d: datetime.date, member_id: int, name: str, shift_type: ShiftType, is_early: bool) -> list[Cell]:
+    return [d.isoformat(), WEEKDAY_JP[d.weekday()], member_id, name, shift_type.value, shift_type.label, int(is_early)]
+
+
+def long_rows(db: Session, schedule: Schedule) -> Iterator[list[Cell]]:
+    """割当1件を1行にした行（日付順、同じ日はメンバーの並び順）。"""
+    rows = (
+        db.query(ShiftAssignment.date, Member.id, Member.name, ShiftAssignment.shift_type, ShiftAssignment.is_early)
+        .join(Member, Member.id == ShiftAssignment.member_id)
+        .filter(ShiftAssignment.schedule_id == schedule.id)
+        .order_by(ShiftAssignment.date, Member.position, Member.id)
+        .yield_per(EXPORT_BATCH_ROWS)
+    )
+    for d, member_id, name, shift_type, is_early in rows:
+        yield _long_row(d, member_id, name, shift_type, is_early)
+
+
+def _matrix_shifts(matrix: ScheduleMatrix, i: int) -> Iterator[tuple[datetime.date, ShiftType, bool]]:
+    for j, d in enumerate(matrix.dates):
+        if (code := matrix.codes[i, j]) != UNASSIGNED:
+            yield d, SHIFT_CODES[code], bool(matrix.early[i, j])
+
+
+def matrix_grid_rows(matrix: ScheduleMatrix, member_names: dict[int, str]) -> Iterator[list[Cell]]:
+    """grid_rows と同じ行を行列から作る。"""
+    for i, m in enumerate(matrix.member_ids):
+        labels: list[Cell] = [""] * len(matrix.dates)
+        for d, shift_type, is_early in _matrix_shifts(matrix, i):
+            labels[matrix.date_index[d]] = _cell_label(shift_type, is_early)
+        yield [member_names[m], *labels]
+
+
+def matrix_long_rows(matrix: ScheduleMatrix, member_names: dict[int, str]) -> Iterator[list[Cell]]:
+    """long_rows と同じ行を行列から作る。"""
+    for j, d in enumerate(matrix.dates):
+        for i, m in enumerate(matrix.member_ids):
+            if (code := matrix.codes[i, j]) != UNASSIGNED:
+                yield _long_row(d, m, member_names[m], SHIFT_CODES[code], bool(matrix.early[i, j]))
+
+
+def stream_csv(header: Sequence[Cell], rows: Iterable[Sequence[Cell]]) -> Iterator[bytes]:
+    """UTF-8（BOM 付き、Excel で文字化けしないように）の CSV を EXPORT_BATCH_ROWS 行ごとに返す。"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\r\n")
+
+    def take() -> bytes:
+        data = buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+        return data
+
+    writer.writerow(header)
+    yield codecs.BOM_UTF8 + take()
+    for k, row in enumerate(rows, start=1):
+        writer.writerow(row)
+        if k % EXPORT_BATCH_ROWS == 0:
+            yield take()
+    yield take()
+
+
+def _ical_text(value: str) -> str:
+    return value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+def _ical_line(line: str) -> bytes:
+    """75 オクテットを超える行は折り返す（RFC 5545 3.1）。マルチバイト文字の途中では切らない。"""
+    data = line.encode()
+    if len(data) <= 75:
+        return data + b"\r\n"
+    parts: list[bytes] = []
+    current = b""
+    for char in line:
+        encoded = char.encode()
+        if len(current) + len(encoded) > (75 if not parts else 74):
+            parts.append(current)
+            current = b""
+        current += encoded
+    parts.append(current)
+    return b"\r\n ".join(parts) + b"\r\n"
+
+
+def ical_feed(
+    schedule_id: int,
+    year_month: str,
+    member_id: int,
+    member_name: str,
+    shifts: Iterable[tuple[datetime.date, ShiftType, bool]],
+) -> Iterator[bytes]:
+    """メンバー1人分の勤務 (日付, シフト, 早番) を終日の予定にした iCalendar。公休は含めない。"""
+    stamp = datetime.datetime.now(datetime.UTC).strftime("%Y%m%dT%H%M%SZ")
+    year, month = year_month.split("-")
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        "PRODID:-//josan//shift schedule//JA",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_ical_text(f'{year}年{month}月 勤務 {member_name}')}",
+    ]
+    yield b"".join(_ical_line(line) for line in header)
+
+    for d, shift_type, is_early in shifts:
+        if shift_type == ShiftType.day_off:
+            continue
+        event = [
+            "BEGIN:VEVENT",
+            f"UID:{schedule_id}-{member_id}-{d:%Y%m%d}@josan",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{d:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{d + datetime.timedelta(days=1):%Y%m%d}",
+            f"SUMMARY:{_ical_text(_cell_label(shift_type, is_early))}",
+            "TRANSP:TRANSPARENT" if shift_type == ShiftType.paid_leave else "TRANSP:OPAQUE",
+            "END:VEVENT",
+        ]
+        yield b"".join(_ical_line(line) for line in event)
+    yield _ical_line("END:VCALENDAR")
+
+
+def member_ical(db: Session, schedule: Schedule, member_id: int, member_name: str) -> Iterator[bytes]:
+    rows = (
+        db.query(ShiftAssignment.date, ShiftAssignment.shift_type, ShiftAssignment.is_early)
+        .filter(
+            ShiftAssignment.schedule_id == schedule.id,
+            ShiftAssignment.member_id == member_id,
+            ShiftAssignment.shift_type != ShiftType.day_off,
+        )
+        .order_by(ShiftAssignment.date)
+        .yield_per(EXPORT_BATCH_ROWS)
+    )
+    return ical_feed(schedule.id, schedule.year_month, member_id, member_name, rows)
+
+
+def matrix_member_ical(
+    schedule_id: int, year_month: str, matrix: ScheduleMatrix, member_id: int, member_name: str
+) -> Iterator[bytes]:
+    """member_ical と同じ内容を行列から作る。"""
+    shifts = _matrix_shifts(matrix, matrix.member_index[member_id])
+    return ical_feed(schedule_id, year_month, member_id, member_name, shifts)
+
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    "{sheets}</Types>"
+)
+_XLSX_SHEET_CONTENT_TYPE = (
+    '<Override PartName="/xl/worksheets/sheet{n}.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/></Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><sheets>{sheets}</sheets></workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">{sheets}</Relationships>'
+)
+_XLSX_SHEET_REL = (
+    '<Relationship Id="rId{n}" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet{n}.xml"/>'
+)
+_XLSX_SHEET_OPEN = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+_XLSX_SHEET_CLOSE = "</sheetData></worksheet>"
+
+
+def _xlsx_row(row: Sequence[Cell]) -> str:
+    cells = "".join(
+        f"<c><v>{value}</v></c>"
+        if isinstance(value, int)
+        else f'<c t="inlineStr"><is><t xml:space="preserve">{escape(value)}</t></is></c>'
+        for value in row
+    )
+    return f"<row>{cells}</row>"
+
+
+def stream_xlsx(sheets: Sequence[tuple[str, Sequence[Cell], Iterable[Sequence[Cell]]]]) -> Iterator[bytes]:
+    """(シート名, ヘッダー, 行) のシートを持つ XLSX を返す。
+
+    シートの XML は ZIP のエントリに行ごとに書き込み、EXPORT_BATCH_ROWS 行ごとに圧縮済みのバイト列を返す。
+    文字列はインライン文字列で書き、共有文字列の表は作らない（表を作るには全行を先に読む必要がある）。
+    """
+    numbers = range(1, len(sheets) + 1)
+    writer = ChunkWriter()
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr(
+            zip_entry("[Content_Types].xml"),
+            _XLSX_CONTENT_TYPES.format(sheets="".join(_XLSX_SHEET_CONTENT_TYPE.format(n=n) for n in numbers)),
+        )
+        archive.writestr(zip_entry("_rels/.rels"), _XLSX_ROOT_RELS)
+        archive.writestr(
+            zip_entry("xl/workbook.xml"),
+            _XLSX_WORKBOOK.format(
+                sheets="".join(
+                    f'<sheet name="{escape(name, {'"': "&quot;"})}" sheetId="{n}" r:id="rId{n}"/>'
+                    for n, (name, _, _) in zip(numbers, sheets, strict=True)
+                )
+            ),
+        )
+        archive.writestr(
+            zip_entry("xl/_rels/workbook.xml.rels"),
+            _XLSX_WORKBOOK_RELS.format(sheets="".join(_XLSX_SHEET_REL.format(n=n) for n in numbers)),
+        )
+        yield writer.take()
+
+        for n, (_, header, rows) in zip(numbers, sheets, strict=True):
+            entry = zip_entry(f"xl/worksheets/sheet{n}.xml")
+            entry.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(entry, "w") as sheet:
+                sheet.write((_XLSX_SHEET_OPEN + _xlsx_row(header)).encode())
+                for k, row in enumerate(rows, start=1):
+                    sheet.write(_xlsx_row(row).encode())
+                    if k % EXPORT_BATCH_ROWS == 0:
+                        yield writer.take()
+                sheet.write(_XLSX_SHEET_CLOSE.encode())
+            yield writer.take()
+    yield writer.take()
+
+
+def schedule_xlsx(year_month: str, grid: Iterable[Sequence[Cell]], long: Iterable[Sequence[Cell]]) -> Iterator[bytes]:
+    """メンバー × 日付 の表と、割当1件を1行にした一覧の2シートの XLSX。"""
+    return stream_xlsx([(GRID_SHEET_NAME, grid_header(year_month), grid), (LONG_SHEET_NAME, LONG_HEADER, long)])
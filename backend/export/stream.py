@@ -0,0 +1,46 @@
+"""書き出しのストリーミング用の部品。
+
+ファイル全体をメモリ上に作らず、書いた分だけをバイト列として順に返すためのもの。
+"""
+
+import datetime
+import io
+import zipfile
+from collections.abc import Buffer, Iterable, Iterator
+
+
+class ChunkWriter(io.RawIOBase):
+    """書き込まれたバイト列を溜め、take で取り出す（シークできないストリーム）。"""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data: Buffer) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        return len(chunk)
+
+    def take(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def zip_entry(name: str) -> zipfile.ZipInfo:
+    return zipfile.ZipInfo(name, date_time=datetime.datetime.now().timetuple()[:6])
+
+
+def stream_zip(files: Iterable[tuple[str, bytes]]) -> Iterator[bytes]:
+    """(ファイル名, 内容) を ZIP にして、ファイルごとに書き出したバイト列を返す。
+
+    PDF は圧縮済みのため無圧縮で格納する。
+    """
+    writer = ChunkWriter()
+    with zipfile.ZipFile(writer, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, content in files:
+            archive.writestr(zip_entry(name), content)
+            yield writer.take()
+    yield writer.take()
@@ -5,14 +5,21 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.exc import IntegrityError
 
+from response.compression import TextGZipMiddleware
 from routers.member import router as member_router
 from routers.ng_pair import router as ng_pair_router
 from routers.pediatric_doctor_schedule import router as pediatric_doctor_schedule_router
 from routers.schedule import router as schedule_router
 from routers.shift_request import router as shift_request_router
+from routers.stats import router as stats_router
+from routers.workspace import router as workspace_router
 
 logger = logging.getLogger(__name__)
 
+# これより大きい JSON・テキストのレスポンスは gzip で圧縮する（クライアントが Accept-Encoding: gzip を送った場合）
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 6
+
 app = FastAPI()
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +28,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(TextGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
 
 
 @app.exception_handler(IntegrityError)
@@ -46,3 +54,5 @@ app.include_router(ng_pair_router)
 app.include_router(shift_request_router)
 app.include_router(pediatric_doctor_schedule_router)
 app.include_router(schedule_router)
+app.include_router(stats_router)
+app.include_router(workspace_router)
@@ -1,6 +1,8 @@
-from pydantic import BaseModel
+import datetime as dt
 
-from entity.enums import ShiftType
+from pydantic import BaseModel, Field, model_validator
+
+from entity.enums import ObjectiveMode, ShiftType
 
 
 class ShiftAssignmentCreateParams(BaseModel):
@@ -14,5 +16,82 @@ class ShiftAssignmentUpdateParams(BaseModel):
     member_id: int
 
 
+# 一括生成で扱える最大月数と、均等化で遡れる最大月数
+MAX_BATCH_MONTHS = 12
+MAX_FAIRNESS_LOOKBACK_MONTHS = 12
+
+
 class ScheduleGenerateParams(BaseModel):
     year_month: str
+    objective_mode: ObjectiveMode = ObjectiveMode.weighted
+    fairness_lookback_months: int = Field(
+        ge=0, le=MAX_FAIRNESS_LOOKBACK_MONTHS, default=0, title="均等化に含める過去の月数"
+    )
+
+
+class ScheduleBatchGenerateParams(BaseModel):
+    start_month: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$", title="開始年月")
+    end_month: str = Field(pattern=r"^\d{4}-(0[1-9]|1[0-2])$", title="終了年月")
+    rolling: bool = Field(default=False, title="ローリングホライズンで生成")
+    objective_mode: ObjectiveMode = Field(default=ObjectiveMode.weighted, title="目的関数の扱い")
+    fairness_lookback_months: int = Field(
+        ge=0, le=MAX_FAIRNESS_LOOKBACK_MONTHS, default=0, title="均等化に含める過去の月数"
+    )
+
+    @model_validator(mode="after")
+    def check_range(self) -> ScheduleBatchGenerateParams:
+        if self.start_month > self.end_month:
+            msg = "開始年月は終了年月以前にしてください"
+            raise ValueError(msg)
+        start_year, start_month = map(int, self.start_month.split("-"))
+        end_year, end_month = map(int, self.end_month.split("-"))
+        if (end_year - start_year) * 12 + end_month - start_month + 1 > MAX_BATCH_MONTHS:
+            msg = f"一括生成できるのは{MAX_BATCH_MONTHS}か月までです"
+            raise ValueError(msg)
+        return self
+
+
+class ScheduleProposalGenerateParams(BaseModel):
+    year_month: str = Field(title="年月")
+    count: int = Field(ge=2, le=5, default=3, title="案の数")
+    objective_mode: ObjectiveMode = Field(default=ObjectiveMode.weighted, title="目的関数の扱い")
+    fairness_lookback_months: int = Field(
+        ge=0, le=MAX_FAIRNESS_LOOKBACK_MONTHS, default=0, title="均等化に含める過去の月数"
+    )
+
+
+class ObjectiveWeightsParams(BaseModel):
+    requests: int = Field(ge=0, default=100, title="希望休")
+    night_minimum_shortfall: int = Field(ge=0, default=50, title="夜勤確定回数の不足")
+    night_diff: int = Field(ge=0, default=10, title="夜勤回数の偏り")
+    holiday_diff: int = Field(ge=0, default=5, title="日祝出勤の偏り")
+    early_diff: int = Field(ge=0, default=3, title="早番回数の偏り")
+    day_shift_requests: int = Field(ge=0, default=2, title="日勤希望")
+
+
+class ScheduleParetoParams(BaseModel):
+    year_month: str = Field(title="年月")
+    weights: list[ObjectiveWeightsParams] | None = Field(
+        default=None, min_length=1, max_length=16, title="重みの組（省略時は既定の組）"
+    )
+
+
+class RepairCellParams(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    date: dt.date = Field(title="日付")
+    shift_type: ShiftType = Field(title="シフト種別")
+
+
+class ScheduleRepairParams(BaseModel):
+    fixed: list[RepairCellParams] = Field(default_factory=list, title="固定するシフト（欠勤など）")
+    dates: list[dt.date] = Field(default_factory=list, title="修復対象の日付")
+    member_ids: list[int] = Field(default_factory=list, title="修復対象のメンバー")
+    radius_days: int = Field(ge=0, le=8, default=2, title="前後に動かしてよい日数")
+    dry_run: bool = Field(default=False, title="変更を保存しない")
+
+    @model_validator(mode="after")
+    def check_target(self) -> ScheduleRepairParams:
+        if not self.fixed and not self.dates and not self.member_ids:
+            msg = "固定するシフト・日付・メンバーのいずれかを指定してください"
+            raise ValueError(msg)
+        return self
@@ -0,0 +1,82 @@
+"""生成済みPDFのメモリ上のキャッシュ。
+
+キーにはスケジュールIDと内容のバージョン（割当の version とメンバー名の並び）を含めるため、
+内容が変わったPDFは別のキーになり、古いものは使われないまま容量の上限に従って捨てられる。
+同じキーの生成が同時に要求された場合は、最初の1件だけが生成し、残りはその結果を待つ。
+"""
+
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+
+# 保持するPDFの合計バイト数
+PDF_CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class PdfCache:
+    """合計サイズで上限を決めるLRUキャッシュ。"""
+
+    def __init__(self, max_bytes: int = PDF_CACHE_MAX_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[Hashable, bytes] = OrderedDict()
+        self._size = 0
+        self._pending: dict[Hashable, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> bytes | None:
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+            return data
+
+    def get_or_render(self, key: Hashable, render: Callable[[], bytes]) -> bytes:
+        """key のPDFを返す。無ければ render で生成して保持する。同じ key の生成は同時に1件だけ行う。"""
+        while True:
+            with self._lock:
+                data = self._entries.get(key)
+                if data is not None:
+                    self._entries.move_to_end(key)
+                    return data
+                pending = self._pending.get(key)
+                if pending is None:
+                    pending = self._pending[key] = threading.Event()
+                    break
+            # 生成中の結果を待つ。生成に失敗していれば次の周回で自分が生成する
+            pending.wait()
+
+        try:
+            data = render()
+            with self._lock:
+                self._store(key, data)
+        finally:
+            with self._lock:
+                del self._pending[key]
+            pending.set()
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def invalidate(self, schedule_id: int) -> None:
+        """キーの先頭がスケジュールIDのPDFをすべて捨てる（スケジュールの削除時に使う）。"""
+        with self._lock:
+            for key in [k for k in self._entries if isinstance(k, tuple) and k and k[0] == schedule_id]:
+                self._size -= len(self._entries.pop(key))
+
+    def _store(self, key: Hashable, data: bytes) -> None:
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._entries[key] = data
+        self._size += len(data)
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+
+schedule_pdfs = PdfCache()
@@ -2,7 +2,7 @@ import datetime
 from io import BytesIO
 
 from reportlab.lib import colors
-from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.pagesizes import A4, landscape, portrait
 from reportlab.lib.styles import getSampleStyleSheet
 from reportlab.lib.units import mm
 from reportlab.pdfbase import pdfmetrics
@@ -10,6 +10,8 @@ from reportlab.pdfbase.cidfonts import UnicodeCIDFont
 from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
 
 from entity.enums import ShiftType
+from solver.config import NIGHT_SHIFT_TYPES, OFF_DAY_TYPES
+from solver.matrix import SHIFT_CODE_OF, ScheduleMatrix
 
 SHIFT_TYPE_LABELS: dict[ShiftType, str] = {
     ShiftType.outpatient_leader: "外来L",
@@ -44,6 +46,8 @@ DISPLAY_SHIFT_TYPES = [
 ]
 
 WEEKDAY_JP = ["月", "火", "水", "木", "金", "土", "日"]
+SATURDAY_COLOR = colors.HexColor("#CCE5FF")
+SUNDAY_COLOR = colors.HexColor("#FFCCCC")
 
 pdfmetrics.registerFont(UnicodeCIDFont("HeiseiKakuGo-W5"))
 FONT_NAME = "HeiseiKakuGo-W5"
@@ -51,11 +55,12 @@ FONT_NAME = "HeiseiKakuGo-W5"
 
 def generate_schedule_pdf(
     year_month: str,
-    assignments: list[dict[str, object]],
+    matrix: ScheduleMatrix,
+    member_names: dict[int, str],
 ) -> BytesIO:
     """シフト表をPDFとして生成する。
 
-    assignments: [{"member_name": str, "date": date, "shift_type": ShiftType}, ...]
+    matrix の日付が表の行になる。各マスのメンバーは matrix のメンバー順に並べる。
     """
     buffer = BytesIO()
     doc = SimpleDocTemplate(
@@ -75,37 +80,25 @@ def generate_schedule_pdf(
     year, month = year_month.split("-")
     title = Paragraph(f"{year}年{month}月 シフト表", title_style)
 
-    # 日付→シフト種別→メンバー名のマッピングを作成
-    date_shift_map: dict[str, dict[ShiftType, list[str]]] = {}
-    for a in assignments:
-        ds = str(a["date"])
-        st = a["shift_type"]
-        name = str(a["member_name"])
-        is_early = bool(a.get("is_early", False))
-        if st in (ShiftType.day_off, ShiftType.paid_leave):
-            continue
-        display_name = f"★{name}" if is_early else name
-        date_shift_map.setdefault(ds, {}).setdefault(st, []).append(display_name)
-
-    # 日付リストを作成
-    import calendar
-
-    y, m = int(year), int(month)
-    _, last_day = calendar.monthrange(y, m)
-    all_dates = [datetime.date(y, m, d) for d in range(1, last_day + 1)]
+    # (日付, シフト種別) → メンバー名。日付 × メンバーの向きにして日付順・メンバー順に取り出す
+    all_dates = matrix.dates
+    codes, early = matrix.codes.T, matrix.early.T
+    cell_names: dict[tuple[int, ShiftType], list[str]] = {}
+    for st in DISPLAY_SHIFT_TYPES:
+        for j, i in zip(*(codes == SHIFT_CODE_OF[st]).nonzero(), strict=True):
+            name = member_names.get(matrix.member_ids[i], "")
+            cell_names.setdefault((int(j), st), []).append(f"★{name}" if early[j, i] else name)
 
     # テーブルヘッダー
     header = ["日付", "曜日"] + [SHIFT_TYPE_LABELS[s] for s in DISPLAY_SHIFT_TYPES]
 
     # テーブルデータ
     table_data = [header]
-    for d in all_dates:
-        ds = str(d)
+    for j, d in enumerate(all_dates):
         weekday = WEEKDAY_JP[d.weekday()]
         row = [f"{d.day}", weekday]
         for st in DISPLAY_SHIFT_TYPES:
-            names = date_shift_map.get(ds, {}).get(st, [])
-            row.append("\n".join(names))
+            row.append("\n".join(cell_names.get((j, st), [])))
         table_data.append(row)
 
     # カラム幅（ページ幅に収まるように動的計算）
@@ -116,30 +109,89 @@ def generate_schedule_pdf(
     shift_col_width = (available_width - date_col_width - weekday_col_width) / len(DISPLAY_SHIFT_TYPES)
     col_widths = [date_col_width, weekday_col_width] + [shift_col_width] * len(DISPLAY_SHIFT_TYPES)
 
-    table = Table(table_data, colWidths=col_widths, repeatRows=1)
-    table.setStyle(
-        TableStyle(
-            [
-                ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
-                ("FONTSIZE", (0, 0), (-1, -1), 7),
-                ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
-                ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4472C4")),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("ALIGN", (0, 0), (-1, -1), "CENTER"),
-                ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
-                ("LEADING", (0, 0), (-1, -1), 9),
-            ]
-        )
-    )
-
-    # 土曜・日祝の行に背景色
+    style = [
+        ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+        ("FONTSIZE", (0, 0), (-1, -1), 7),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4472C4")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+        ("LEADING", (0, 0), (-1, -1), 9),
+    ]
+    # 土曜・日祝の行に背景色（スタイルはまとめて1回で設定する）
     for i, d in enumerate(all_dates, start=1):
         if d.weekday() == 5:
-            table.setStyle(TableStyle([("BACKGROUND", (1, i), (1, i), colors.HexColor("#CCE5FF"))]))
+            style.append(("BACKGROUND", (1, i), (1, i), SATURDAY_COLOR))
         elif d.weekday() == 6:
-            table.setStyle(TableStyle([("BACKGROUND", (1, i), (1, i), colors.HexColor("#FFCCCC"))]))
+            style.append(("BACKGROUND", (1, i), (1, i), SUNDAY_COLOR))
+
+    table = Table(table_data, colWidths=col_widths, repeatRows=1)
+    table.setStyle(TableStyle(style))
 
     elements = [title, Spacer(1, 5 * mm), table]
     doc.build(elements)
     buffer.seek(0)
     return buffer
+
+
+def generate_member_roster_pdf(
+    year_month: str,
+    member_name: str,
+    dates: list[datetime.date],
+    shifts: list[ShiftType | None],
+    early: list[bool],
+) -> bytes:
+    """メンバー1人分の月間勤務表（A4縦1ページ）を生成する。shifts・early は dates と同じ並び。"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer,
+        pagesize=portrait(A4),
+        leftMargin=15 * mm,
+        rightMargin=15 * mm,
+        topMargin=12 * mm,
+        bottomMargin=12 * mm,
+    )
+
+    styles = getSampleStyleSheet()
+    title_style = styles["Title"]
+    title_style.fontName = FONT_NAME
+    title_style.fontSize = 14
+    body_style = styles["Normal"]
+    body_style.fontName = FONT_NAME
+    body_style.fontSize = 9
+
+    year, month = year_month.split("-")
+    title = Paragraph(f"{year}年{month}月 勤務表　{member_name}", title_style)
+
+    table_data = [["日付", "曜日", "勤務"]]
+    style = [
+        ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+        ("FONTSIZE", (0, 0), (-1, -1), 9),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#4472C4")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+    for i, (d, s, is_early) in enumerate(zip(dates, shifts, early, strict=True), start=1):
+        label = "" if s is None else s.label
+        table_data.append([f"{d.month}/{d.day}", WEEKDAY_JP[d.weekday()], f"★{label}" if is_early else label])
+        if d.weekday() == 5:
+            style.append(("BACKGROUND", (0, i), (1, i), SATURDAY_COLOR))
+        elif d.weekday() == 6:
+            style.append(("BACKGROUND", (0, i), (1, i), SUNDAY_COLOR))
+
+    table = Table(table_data, colWidths=[25 * mm, 15 * mm, 40 * mm], rowHeights=7 * mm, repeatRows=1)
+    table.setStyle(TableStyle(style))
+
+    working = sum(1 for s in shifts if s is not None and s not in OFF_DAY_TYPES)
+    nights = sum(1 for s in shifts if s in NIGHT_SHIFT_TYPES)
+    day_offs = sum(1 for s in shifts if s == ShiftType.day_off)
+    paid_leaves = sum(1 for s in shifts if s == ShiftType.paid_leave)
+    totals = Paragraph(
+        f"勤務 {working}日　夜勤 {nights}回　公休 {day_offs}日　有給 {paid_leaves}日　（★は早番）", body_style
+    )
+
+    doc.build([title, Spacer(1, 4 * mm), table, Spacer(1, 4 * mm), totals])
+    return buffer.getvalue()
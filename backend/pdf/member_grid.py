@@ -0,0 +1,249 @@
+"""メンバー × 日付 のシフト表PDF（行がメンバー、列が日付）。
+
+platypus の Table はマスごとに文字列の幅と高さを測って配置を決めるため、100人 × 31日のような表では遅く、メモリも使う。
+マスの数が MEMBER_GRID_CANVAS_MIN_CELLS 以上の表は、列の位置・行の高さ・ラベルの幅を先に求めておき、
+canvas に直接描く。小さい表はこれまでどおり Table で組む。
+
+    python -m pdf.member_grid --members 100     # 2つの描画方法の時間とメモリを比べる
+"""
+
+import argparse
+import datetime
+import functools
+import time
+import tracemalloc
+from collections.abc import Callable
+from dataclasses import dataclass
+from io import BytesIO
+
+import numpy as np
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4, landscape
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.lib.units import mm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+from entity.enums import ShiftType
+from pdf.generator import FONT_NAME, SATURDAY_COLOR, SHIFT_TYPE_LABELS, SUNDAY_COLOR, WEEKDAY_JP
+from solver.matrix import SHIFT_CODES, UNASSIGNED, ScheduleMatrix
+
+# これ以上のマス（メンバー数 × 日数）の表は canvas に直接描く
+MEMBER_GRID_CANVAS_MIN_CELLS = 600
+
+GRID_LABELS: dict[ShiftType, str] = {**SHIFT_TYPE_LABELS, ShiftType.day_off: "休", ShiftType.paid_leave: "有"}
+# シフト番号 → マスの表示（早番は ★ を付ける）。[早番か, シフト番号]
+_CELL_LABELS = [
+    [GRID_LABELS[s] for s in SHIFT_CODES],
+    [f"★{GRID_LABELS[s]}" for s in SHIFT_CODES],
+]
+
+PAGE_SIZE = landscape(A4)
+MARGIN = 8 * mm
+TITLE_HEIGHT = 10 * mm
+HEADER_HEIGHT = 7 * mm
+ROW_HEIGHT = 4.6 * mm
+NAME_COL_WIDTH = 26 * mm
+FONT_SIZE = 5.0
+HEADER_COLOR = colors.HexColor("#4472C4")
+
+
+@dataclass(frozen=True)
+class GridGeometry:
+    """表の配置。日数ごとに1回だけ求める。"""
+
+    col_x: list[float]  # 列の左端（最後は表の右端）
+    col_width: float  # 日付の列の幅
+    top: float  # 表の上端（ヘッダーの上）
+    rows_per_page: int
+
+
+@functools.cache
+def grid_geometry(day_count: int) -> GridGeometry:
+    width, height = PAGE_SIZE
+    col_width = (width - 2 * MARGIN - NAME_COL_WIDTH) / day_count
+    col_x = [MARGIN] + [MARGIN + NAME_COL_WIDTH + col_width * j for j in range(day_count + 1)]
+    top = height - MARGIN - TITLE_HEIGHT
+    rows_per_page = int((top - HEADER_HEIGHT - MARGIN) // ROW_HEIGHT)
+    return GridGeometry(col_x, col_width, top, rows_per_page)
+
+
+@functools.cache
+def _fitted(label: str, max_width: float) -> tuple[float, float]:
+    """列の幅に収まるフォントサイズと、そのときのラベルの幅。"""
+    width = stringWidth(label, FONT_NAME, FONT_SIZE)
+    size = FONT_SIZE if width <= max_width else FONT_SIZE * max_width / width
+    return size, width * size / FONT_SIZE
+
+
+def _title(year_month: str) -> str:
+    year, month = year_month.split("-")
+    return f"{year}年{month}月 シフト表（メンバー別）"
+
+
+def _cell_labels(matrix: ScheduleMatrix) -> list[list[str]]:
+    labels = np.array(_CELL_LABELS[0] + _CELL_LABELS[1] + [""], dtype=object)
+    index = np.where(matrix.codes == UNASSIGNED, len(labels) - 1, matrix.codes + matrix.early * len(SHIFT_CODES))
+    return labels[index].tolist()
+
+
+def render_member_grid_canvas(year_month: str, matrix: ScheduleMatrix, member_names: dict[int, str]) -> bytes:
+    """canvas に直接描く。列の位置とラベルの幅は先に求めたものを使い、マスごとに測らない。"""
+    buffer = BytesIO()
+    geometry = grid_geometry(len(matrix.dates))
+    col_x, col_width, top = geometry.col_x, geometry.col_width, geometry.top
+    day_centers = [x + col_width / 2 for x in col_x[1:-1]]
+    weekend_cols = [
+        (col_x[j + 1], SATURDAY_COLOR if d.weekday() == 5 else SUNDAY_COLOR)
+        for j, d in enumerate(matrix.dates)
+        if d.weekday() >= 5
+    ]
+    headers = [(f"{d.day}", WEEKDAY_JP[d.weekday()]) for d in matrix.dates]
+    rows = _cell_labels(matrix)
+    names = [member_names.get(m, "") for m in matrix.member_ids]
+    title = _title(year_month)
+
+    c = canvas.Canvas(buffer, pagesize=PAGE_SIZE)
+    c.setLineWidth(0.5)
+    per_page = geometry.rows_per_page
+    for start in range(0, max(len(rows), 1), per_page):
+        page_rows = rows[start : start + per_page]
+        bottom = top - HEADER_HEIGHT - ROW_HEIGHT * len(page_rows)
+
+        c.setFont(FONT_NAME, 12)
+        c.drawString(MARGIN, top + 3 * mm, title)
+
+        # 背景（ヘッダーと土日の列）
+        c.setFillColor(HEADER_COLOR)
+        c.rect(col_x[0], top - HEADER_HEIGHT, col_x[-1] - col_x[0], HEADER_HEIGHT, stroke=0, fill=1)
+        for x, color in weekend_cols:
+            c.setFillColor(color)
+            c.rect(x, bottom, col_width, top - HEADER_HEIGHT - bottom, stroke=0, fill=1)
+
+        # ヘッダー
+        c.setFillColor(colors.white)
+        c.setFont(FONT_NAME, FONT_SIZE + 1)
+        c.drawString(col_x[0] + 1 * mm, top - HEADER_HEIGHT / 2 - 2, "氏名")
+        for center, (day, weekday) in zip(day_centers, headers, strict=True):
+            c.drawCentredString(center, top - 3 * mm, day)
+            c.drawCentredString(center, top - 6 * mm, weekday)
+
+        # マス。ページ全体を1つのテキストオブジェクトで書き、フォントはサイズが変わるときだけ設定する
+        c.setFillColor(colors.black)
+        text = c.beginText()
+        current_size = FONT_SIZE + 1
+        text.setFont(FONT_NAME, current_size)
+        for k, labels in enumerate(page_rows):
+            baseline = top - HEADER_HEIGHT - ROW_HEIGHT * (k + 1) + (ROW_HEIGHT - FONT_SIZE) / 2 + 0.5
+            if current_size != FONT_SIZE + 1:
+                current_size = FONT_SIZE + 1
+                text.setFont(FONT_NAME, current_size)
+            text.setTextOrigin(col_x[0] + 1 * mm, baseline)
+            text.textOut(names[start + k])
+            for center, label in zip(day_centers, labels, strict=True):
+                if not label:
+                    continue
+                size, width = _fitted(label, col_width - 1)
+                if size != current_size:
+                    current_size = size
+                    text.setFont(FONT_NAME, size)
+                text.setTextOrigin(center - width / 2, baseline)
+                text.textOut(label)
+        c.drawText(text)
+
+        c.grid(col_x, [top - HEADER_HEIGHT - ROW_HEIGHT * k for k in range(len(page_rows) + 1)] + [top])
+        c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def render_member_grid_platypus(year_month: str, matrix: ScheduleMatrix, member_names: dict[int, str]) -> bytes:
+    """platypus の Table で組む。ページをまたぐとヘッダー行を繰り返す。"""
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(
+        buffer, pagesize=PAGE_SIZE, leftMargin=MARGIN, rightMargin=MARGIN, topMargin=MARGIN, bottomMargin=MARGIN
+    )
+    geometry = grid_geometry(len(matrix.dates))
+
+    header = ["氏名"] + [f"{d.day}\n{WEEKDAY_JP[d.weekday()]}" for d in matrix.dates]
+    names = [member_names.get(m, "") for m in matrix.member_ids]
+    table_data = [header] + [[name, *labels] for name, labels in zip(names, _cell_labels(matrix), strict=True)]
+    style = [
+        ("FONTNAME", (0, 0), (-1, -1), FONT_NAME),
+        ("FONTSIZE", (0, 0), (-1, -1), FONT_SIZE),
+        ("LEADING", (0, 0), (-1, -1), FONT_SIZE + 1),
+        ("GRID", (0, 0), (-1, -1), 0.5, colors.black),
+        ("BACKGROUND", (0, 0), (-1, 0), HEADER_COLOR),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("ALIGN", (1, 0), (-1, -1), "CENTER"),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]
+    for j, d in enumerate(matrix.dates, start=1):
+        if d.weekday() == 5:
+            style.append(("BACKGROUND", (j, 1), (j, -1), SATURDAY_COLOR))
+        elif d.weekday() == 6:
+            style.append(("BACKGROUND", (j, 1), (j, -1), SUNDAY_COLOR))
+
+    col_widths = [NAME_COL_WIDTH] + [geometry.col_width] * len(matrix.dates)
+    table = Table(
+        table_data, colWidths=col_widths, rowHeights=[HEADER_HEIGHT] + [ROW_HEIGHT] * len(names), repeatRows=1
+    )
+    table.setStyle(TableStyle(style))
+
+    title_style = getSampleStyleSheet()["Title"]
+    title_style.fontName = FONT_NAME
+    title_style.fontSize = 12
+    doc.build([Paragraph(_title(year_month), title_style), Spacer(1, 2 * mm), table])
+    return buffer.getvalue()
+
+
+def generate_member_grid_pdf(year_month: str, matrix: ScheduleMatrix, member_names: dict[int, str]) -> bytes:
+    """メンバー × 日付 のシフト表PDF。表の大きさで描画方法を選ぶ。"""
+    if matrix.codes.size >= MEMBER_GRID_CANVAS_MIN_CELLS:
+        return render_member_grid_canvas(year_month, matrix, member_names)
+    return render_member_grid_platypus(year_month, matrix, member_names)
+
+
+def _benchmark(render: Callable[[], bytes], repeat: int) -> tuple[float, float, int]:
+    """(1回あたりの秒数, ピークのメモリ MiB, PDFのバイト数)。メモリは時間とは別の1回で測る。"""
+    data = render()  # フォントの読み込みなどを除く
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    elapsed = (time.perf_counter() - started) / repeat
+    tracemalloc.start()
+    render()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024, len(data)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="メンバー × 日付 のシフト表PDFの描画方法を比べる")
+    parser.add_argument("--members", type=int, default=100, help="メンバー数")
+    parser.add_argument("--year-month", default="2025-01", help="対象の年月")
+    parser.add_argument("--repeat", type=int, default=3, help="計測の回数")
+    args = parser.parse_args(argv)
+
+    from solver.config import get_month_dates
+
+    dates: list[datetime.date] = get_month_dates(args.year_month)
+    member_ids = list(range(1, args.members + 1))
+    rng = np.random.default_rng(0)
+    matrix = ScheduleMatrix(
+        member_ids,
+        dates,
+        rng.integers(0, len(SHIFT_CODES), size=(len(member_ids), len(dates))).astype(np.int8),
+        rng.random((len(member_ids), len(dates))) < 0.05,
+    )
+    names = {m: f"メンバー{m:03d}" for m in member_ids}
+
+    print(f"{args.members}人 × {len(dates)}日（{args.repeat}回の平均）")
+    for label, render in (("platypus", render_member_grid_platypus), ("canvas", render_member_grid_canvas)):
+        elapsed, peak, size = _benchmark(lambda r=render: r(args.year_month, matrix, names), args.repeat)
+        print(f"{label:>8}: {elapsed * 1000:8.1f} ms  ピーク {peak:6.1f} MiB  {size / 1024:7.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""メンバーごとの勤務表PDFの一括生成。
+
+ReportLab の生成は CPU を使い GIL を持ったままのため、メンバーごとの生成はプロセスプールで並列に行う。
+プールはリクエストごとに作らず、最初に使うときに1つだけ作ってプロセス内で使い回す。
+ZIP へのまとめは export.stream.stream_zip で行う。
+"""
+
+import datetime
+import multiprocessing
+import os
+import threading
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from entity.enums import ShiftType
+from solver.matrix import SHIFT_CODES, UNASSIGNED, ScheduleMatrix
+
+# これより少ない人数はプロセスを使わずに順に生成する
+ROSTER_PARALLEL_MIN_MEMBERS = 4
+# 共有するプロセスプールの大きさ
+ROSTER_PROCESSES = os.cpu_count() or 1
+
+type RosterTask = tuple[str, str, list[datetime.date], list[ShiftType | None], list[bool]]
+
+
+def roster_tasks(year_month: str, matrix: ScheduleMatrix, member_names: dict[int, str]) -> list[RosterTask]:
+    """matrix のメンバー順に、勤務表1枚分の入力（プロセス間で受け渡しできる値のみ）を作る。"""
+    return [
+        (
+            year_month,
+            member_names.get(m, ""),
+            matrix.dates,
+            [None if code == UNASSIGNED else SHIFT_CODES[code] for code in matrix.codes[i]],
+            matrix.early[i].tolist(),
+        )
+        for i, m in enumerate(matrix.member_ids)
+    ]
+
+
+def _render_roster(task: RosterTask) -> bytes:
+    from pdf.generator import generate_member_roster_pdf
+
+    return generate_member_roster_pdf(*task)
+
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # サーバーはスレッドを使うため fork せず、forkserver から子プロセスを作る
+            _pool = ProcessPoolExecutor(
+                max_workers=ROSTER_PROCESSES, mp_context=multiprocessing.get_context("forkserver")
+            )
+        return _pool
+
+
+def _discard_pool(pool: ProcessPoolExecutor) -> None:
+    """子プロセスが異常終了して使えなくなったプールを捨て、次の呼び出しで作り直させる。"""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def render_member_rosters(
+    year_month: str,
+    matrix: ScheduleMatrix,
+    member_names: dict[int, str],
+    *,
+    max_processes: int | None = None,
+) -> Iterator[tuple[int, bytes]]:
+    """メンバーごとの勤務表PDFを matrix のメンバー順に (member_id, PDF) で返す。
+
+    max_processes は1回の生成で見込む並列数（タスクの分け方に使う）。1 なら共有のプールを使わずに順に生成する。
+    """
+    tasks = roster_tasks(year_month, matrix, member_names)
+    processes = max(1, min(len(tasks), max_processes or ROSTER_PROCESSES))
+    if len(tasks) < ROSTER_PARALLEL_MIN_MEMBERS or processes == 1:
+        for m, task in zip(matrix.member_ids, tasks, strict=True):
+            yield m, _render_roster(task)
+        return
+
+    pool = _get_pool()
+    chunksize = max(1, len(tasks) // (processes * 4))
+    try:
+        # 途中で打ち切られた場合（クライアントの切断など）は map が残りのタスクを取り消す
+        yield from zip(matrix.member_ids, pool.map(_render_roster, tasks, chunksize=chunksize), strict=True)
+    except BrokenProcessPool:
+        _discard_pool(pool)
+        raise
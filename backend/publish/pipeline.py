@@ -0,0 +1,224 @@
+"""スケジュールの公開と成果物の事前生成。
+
+公開した時点の割当・メンバー名・集計をスナップショットとして固定し、成果物ごとの生成をワーカープールで並列に行う。
+生成した成果物は schedule_artifacts に保存し、読み出しのエンドポイントは保存済みのバイト列をそのまま返す。
+重い生成は公開ごとに1回だけになる。
+"""
+
+import hashlib
+import logging
+import threading
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+
+from sqlalchemy.orm import Session
+
+from entity.enums import ArtifactKind
+from entity.schedule import Schedule
+from entity.schedule_artifact import ScheduleArtifact
+from solver.matrix import ScheduleMatrix
+
+logger = logging.getLogger(__name__)
+
+# 成果物を生成するワーカー数
+PUBLISH_WORKERS = 4
+
+
+@dataclass(frozen=True)
+class ScheduleSnapshot:
+    """公開した時点の内容。生成はこれだけから行い、DBを読まない。"""
+
+    schedule_id: int
+    version: int
+    year_month: str
+    matrix: ScheduleMatrix
+    member_names: dict[int, str]  # メンバーの並び順
+    members_digest: str
+    summary_json: bytes
+
+
+@dataclass(frozen=True)
+class RenderedArtifact:
+    kind: ArtifactKind
+    media_type: str
+    content: bytes
+    member_id: int | None = None
+
+
+def members_digest(members: Iterable[tuple[int, str]]) -> str:
+    """メンバーの並びと名前の要約。PDFなどの内容のバージョンに含める。"""
+    return hashlib.sha256(repr([(m, name) for m, name in members]).encode()).hexdigest()[:16]
+
+
+def content_etag(schedule_id: int, version: int, digest: str, kind: str) -> str:
+    """内容のバージョンと形式から作る ETag。形式（成果物の種類）を含め、同じ内容の別形式と区別する。"""
+    return f'"{schedule_id}-{version}-{kind}-{digest}"'
+
+
+def _render_ward_pdf(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    from pdf.generator import generate_schedule_pdf
+
+    pdf = generate_schedule_pdf(snapshot.year_month, snapshot.matrix, snapshot.member_names)
+    return [RenderedArtifact(ArtifactKind.ward_pdf, "application/pdf", pdf.getvalue())]
+
+
+def _render_member_rosters(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    from pdf.roster import render_member_rosters
+
+    return [
+        RenderedArtifact(ArtifactKind.member_roster, "application/pdf", pdf, member_id=m)
+        for m, pdf in render_member_rosters(snapshot.year_month, snapshot.matrix, snapshot.member_names)
+    ]
+
+
+def _render_summary(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    return [RenderedArtifact(ArtifactKind.summary, "application/json", snapshot.summary_json)]
+
+
+def _render_csv(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    from export.schedule import (
+        CSV_MEDIA_TYPE,
+        LONG_HEADER,
+        grid_header,
+        matrix_grid_rows,
+        matrix_long_rows,
+        stream_csv,
+    )
+
+    grid = stream_csv(grid_header(snapshot.year_month), matrix_grid_rows(snapshot.matrix, snapshot.member_names))
+    long = stream_csv(LONG_HEADER, matrix_long_rows(snapshot.matrix, snapshot.member_names))
+    return [
+        RenderedArtifact(ArtifactKind.csv_grid, CSV_MEDIA_TYPE, b"".join(grid)),
+        RenderedArtifact(ArtifactKind.csv_long, CSV_MEDIA_TYPE, b"".join(long)),
+    ]
+
+
+def _render_xlsx(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    from export.schedule import XLSX_MEDIA_TYPE, matrix_grid_rows, matrix_long_rows, schedule_xlsx
+
+    workbook = schedule_xlsx(
+        snapshot.year_month,
+        matrix_grid_rows(snapshot.matrix, snapshot.member_names),
+        matrix_long_rows(snapshot.matrix, snapshot.member_names),
+    )
+    return [RenderedArtifact(ArtifactKind.xlsx, XLSX_MEDIA_TYPE, b"".join(workbook))]
+
+
+def _render_ical(snapshot: ScheduleSnapshot) -> list[RenderedArtifact]:
+    from export.schedule import ICAL_MEDIA_TYPE, matrix_member_ical
+
+    return [
+        RenderedArtifact(
+            ArtifactKind.ical,
+            ICAL_MEDIA_TYPE,
+            b"".join(matrix_member_ical(snapshot.schedule_id, snapshot.year_month, snapshot.matrix, m, name)),
+            member_id=m,
+        )
+        for m, name in snapshot.member_names.items()
+    ]
+
+
+# 公開時に生成する成果物（1つの関数が同じ種類の成果物をまとめて返す）
+ARTIFACT_RENDERERS: list[Callable[[ScheduleSnapshot], list[RenderedArtifact]]] = [
+    _render_ward_pdf,
+    _render_member_rosters,
+    _render_summary,
+    _render_csv,
+    _render_xlsx,
+    _render_ical,
+]
+
+_executor = ThreadPoolExecutor(max_workers=PUBLISH_WORKERS, thread_name_prefix="publish")
+# スケジュールID → 最後に公開したスナップショットと、その生成処理
+_jobs: dict[int, tuple[ScheduleSnapshot, list[Future[None]]]] = {}
+_jobs_lock = threading.Lock()
+# 保存は短いため直列に行う（生成だけを並列にする）
+_store_lock = threading.Lock()
+
+
+def _render_and_store(
+    snapshot: ScheduleSnapshot,
+    render: Callable[[ScheduleSnapshot], list[RenderedArtifact]],
+    session_factory: Callable[[], Session],
+) -> None:
+    artifacts = render(snapshot)
+    with _store_lock, session_factory() as db:
+        # 生成中に再公開された場合は保存しない（同じ version でもメンバー名が変わっていれば内容が違う）
+        with _jobs_lock:
+            job = _jobs.get(snapshot.schedule_id)
+        if job is None or job[0] is not snapshot:
+            return
+        schedule = db.query(Schedule).filter(Schedule.id == snapshot.schedule_id).first()
+        # 削除された場合や、公開済みの version より古い場合も保存しない
+        if schedule is None or schedule.published_version != snapshot.version:
+            return
+        for kind in {a.kind for a in artifacts}:
+            db.query(ScheduleArtifact).filter(
+                ScheduleArtifact.schedule_id == snapshot.schedule_id, ScheduleArtifact.kind == kind
+            ).delete(synchronize_session=False)
+        for a in artifacts:
+            db.add(
+                ScheduleArtifact(
+                    schedule_id=snapshot.schedule_id,
+                    kind=a.kind,
+                    member_id=a.member_id,
+                    version=snapshot.version,
+                    media_type=a.media_type,
+                    etag=content_etag(snapshot.schedule_id, snapshot.version, snapshot.members_digest, a.kind.value),
+                    content=a.content,
+                )
+            )
+        db.commit()
+
+
+def _log_failure(future: Future[None]) -> None:
+    if not future.cancelled() and (e := future.exception()) is not None:
+        logger.error("Artifact rendering failed: %s", e, exc_info=e)
+
+
+def start_publication(snapshot: ScheduleSnapshot, session_factory: Callable[[], Session]) -> None:
+    """成果物の生成をワーカープールに投入する。保存は成果物の種類ごとに別のセッションで行う。
+
+    同じスケジュールの前回の生成がまだ終わっていなければ、始まっていないものは取り消し、生成中のものは保存させない。
+    """
+    with _jobs_lock:
+        if (previous := _jobs.get(snapshot.schedule_id)) is not None:
+            for f in previous[1]:
+                f.cancel()
+        # ロックを持ったまま登録するため、新しい処理が保存時に見るのは必ずこのスナップショットになる
+        futures = [
+            _executor.submit(_render_and_store, snapshot, render, session_factory) for render in ARTIFACT_RENDERERS
+        ]
+        _jobs[snapshot.schedule_id] = (snapshot, futures)
+    for f in futures:
+        f.add_done_callback(_log_failure)
+
+
+def is_publishing(schedule_id: int) -> bool:
+    with _jobs_lock:
+        _, futures = _jobs.get(schedule_id, (None, []))
+    return any(not f.done() for f in futures)
+
+
+def wait_for_publication(schedule_id: int, timeout: float | None = None) -> None:
+    """生成の完了を待つ。生成に失敗した成果物があれば例外を送出する。"""
+    with _jobs_lock:
+        _, futures = _jobs.get(schedule_id, (None, []))
+    wait(futures, timeout=timeout)
+    for f in futures:
+        if not f.cancelled():
+            f.result(timeout=0)
+
+
+def load_artifact(
+    db: Session, schedule_id: int, kind: ArtifactKind, member_id: int | None = None
+) -> ScheduleArtifact | None:
+    query = db.query(ScheduleArtifact).filter(
+        ScheduleArtifact.schedule_id == schedule_id, ScheduleArtifact.kind == kind
+    )
+    if member_id is None:
+        query = query.filter(ScheduleArtifact.member_id.is_(None))
+    else:
+        query = query.filter(ScheduleArtifact.member_id == member_id)
+    return query.first()
@@ -0,0 +1,111 @@
+"""レスポンスの gzip 圧縮。
+
+JSON とテキスト（CSV・iCalendar を含む）だけを圧縮する。PDF・ZIP・XLSX はすでに圧縮された形式で、
+もう一度圧縮してもほとんど小さくならず CPU を使うだけのため、そのまま返す。
+"""
+
+import gzip
+import io
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# text/* のほかに圧縮するメディアタイプ
+COMPRESSIBLE_MEDIA_TYPES = {"application/json"}
+# text/* のうち圧縮しないもの（少しずつ届くことに意味があるため）
+UNCOMPRESSED_TEXT_MEDIA_TYPES = {"text/event-stream"}
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.partition(";")[0].strip().lower()
+    if media_type.startswith("text/"):
+        return media_type not in UNCOMPRESSED_TEXT_MEDIA_TYPES
+    return media_type in COMPRESSIBLE_MEDIA_TYPES
+
+
+class TextGZipMiddleware:
+    """JSON・テキストのレスポンスのうち minimum_size バイト以上のものを gzip で圧縮する。
+
+    クライアントが Accept-Encoding: gzip を送った場合だけ圧縮する。少しずつ返すレスポンスは届いた分ごとに圧縮して返す。
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 500, compresslevel: int = 9) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("Accept-Encoding", ""):
+            await self.app(scope, receive, send)
+            return
+        responder = _GZipResponder(self.app, self.minimum_size, self.compresslevel)
+        await responder(scope, receive, send)
+
+
+class _GZipResponder:
+    def __init__(self, app: ASGIApp, minimum_size: int, compresslevel: int) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+        self.send: Send | None = None
+        # 圧縮するかどうかは本文の最初の部分を見て決めるため、それまで送らずに持つ
+        self.start: Message | None = None
+        self.buffer = io.BytesIO()
+        self.file: gzip.GzipFile | None = None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.app(scope, receive, self.send_with_compression)
+
+    def _compress(self, body: bytes, more_body: bool) -> bytes:
+        assert self.file is not None
+        self.file.write(body)
+        if not more_body:
+            self.file.close()
+        data = self.buffer.getvalue()
+        self.buffer.seek(0)
+        self.buffer.truncate()
+        return data
+
+    async def send_with_compression(self, message: Message) -> None:
+        assert self.send is not None
+        if message["type"] == "http.response.start":
+            headers = Headers(raw=message["headers"])
+            if is_compressible(headers.get("Content-Type", "")) and "Content-Encoding" not in headers:
+                self.start = message
+            else:
+                await self.send(message)
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body: bytes = message.get("body", b"")
+        more_body: bool = message.get("more_body", False)
+        if self.start is not None:
+            start, self.start = self.start, None
+            if not more_body and len(body) < self.minimum_size:
+                await self.send(start)
+                await self.send(message)
+                return
+            self.file = gzip.GzipFile(mode="wb", fileobj=self.buffer, compresslevel=self.compresslevel)
+            data = self._compress(body, more_body)
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = "gzip"
+            headers.add_vary_header("Accept-Encoding")
+            # 圧縮後のバイト列は元と違うため、強い ETag は弱い ETag にする
+            if (etag := headers.get("ETag")) and not etag.startswith("W/"):
+                headers["ETag"] = f"W/{etag}"
+            if more_body:
+                del headers["Content-Length"]
+            else:
+                headers["Content-Length"] = str(len(data))
+            await self.send(start)
+            await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
+            return
+
+        if self.file is None:
+            await self.send(message)
+            return
+        data = self._compress(body, more_body)
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
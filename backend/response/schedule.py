@@ -2,7 +2,7 @@ import datetime as dt
 
 from pydantic import BaseModel, Field
 
-from entity.enums import EmploymentType, ScheduleStatus, ShiftType
+from entity.enums import ArtifactKind, EmploymentType, ScheduleStatus, ShiftType
 
 
 class ShiftAssignmentResponse(BaseModel):
@@ -27,6 +27,7 @@ class ScheduleResponse(BaseModel):
     id: int
     year_month: str = Field(title="年月")
     status: ScheduleStatus = Field(title="ステータス")
+    version: int = Field(title="割当のバージョン")
     assignments: list[ShiftAssignmentResponse] = Field(title="シフト割当")
     created_at: dt.datetime
     updated_at: dt.datetime
@@ -34,6 +35,36 @@ class ScheduleResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class ScheduleChangesResponse(BaseModel):
+    schedule_id: int = Field(title="スケジュールID")
+    since: int = Field(title="差分の起点のバージョン")
+    version: int = Field(title="現在の割当のバージョン")
+    resync: bool = Field(title="差分を返せないため全体を読み直す必要があるか")
+    upserted: list[ShiftAssignmentResponse] = Field(title="作成・更新された割当")
+    deleted: list[int] = Field(title="削除された割当のID")
+
+
+class ScheduleMemberEntry(BaseModel):
+    id: int = Field(title="メンバーID")
+    name: str = Field(title="メンバー名")
+
+
+class ScheduleCompactResponse(BaseModel):
+    """割当をメンバーごとの配列にまとめた形式（GET /schedules?format=compact）"""
+
+    id: int
+    year_month: str = Field(title="年月")
+    status: ScheduleStatus = Field(title="ステータス")
+    version: int = Field(title="割当のバージョン")
+    dates: list[dt.date] = Field(title="日付（配列の添字）")
+    shift_types: list[ShiftType] = Field(title="シフト番号 → シフト種別")
+    members: list[ScheduleMemberEntry] = Field(title="メンバー（行）")
+    shifts: list[list[int]] = Field(title="シフト番号（メンバー × 日付、未割当は -1）")
+    early: list[list[int]] = Field(title="早番（メンバー × 日付、早番は 1）")
+    created_at: dt.datetime
+    updated_at: dt.datetime
+
+
 class MemberSummary(BaseModel):
     member_id: int = Field(title="メンバーID")
     member_name: str = Field(title="メンバー名")
@@ -67,3 +98,121 @@ class UnfulfilledRequest(BaseModel):
 class GenerateResponse(BaseModel):
     schedule: ScheduleResponse = Field(title="スケジュール")
     unfulfilled_requests: list[UnfulfilledRequest] = Field(title="未充足希望休")
+
+
+class BatchGenerateResponse(BaseModel):
+    results: list[GenerateResponse] = Field(title="月ごとの生成結果")
+
+
+class ProposalAssignment(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    member_name: str = Field(title="メンバー名")
+    date: dt.date = Field(title="日付")
+    shift_type: ShiftType = Field(title="シフト種別")
+    is_early: bool = Field(default=False, title="早番")
+
+
+class ScheduleProposalResponse(BaseModel):
+    id: int
+    year_month: str = Field(title="年月")
+    rank: int = Field(title="案番号")
+    diff_from_first: int = Field(title="第1案との差分マス数")
+    assignments: list[ProposalAssignment] = Field(title="シフト割当")
+    unfulfilled_requests: list[UnfulfilledRequest] = Field(title="未充足希望休")
+    created_at: dt.datetime
+
+
+class ObjectiveWeightsResponse(BaseModel):
+    requests: int = Field(title="希望休")
+    night_minimum_shortfall: int = Field(title="夜勤確定回数の不足")
+    night_diff: int = Field(title="夜勤回数の偏り")
+    holiday_diff: int = Field(title="日祝出勤の偏り")
+    early_diff: int = Field(title="早番回数の偏り")
+    day_shift_requests: int = Field(title="日勤希望")
+
+    model_config = {"from_attributes": True}
+
+
+class ParetoPointResponse(BaseModel):
+    proposal_id: int = Field(title="案ID")
+    weights: ObjectiveWeightsResponse = Field(title="重み")
+    night_diff: int = Field(title="夜勤回数の偏り")
+    holiday_diff: int = Field(title="日祝出勤の偏り")
+    early_diff: int = Field(title="早番回数の偏り")
+    fulfilled_requests: int = Field(title="希望休充足数")
+    request_total: int = Field(title="希望休合計")
+    fulfilled_day_shift_requests: int = Field(title="日勤希望充足数")
+    day_shift_request_total: int = Field(title="日勤希望合計")
+
+
+class RepairChange(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    member_name: str = Field(title="メンバー名")
+    date: dt.date = Field(title="日付")
+    before: ShiftType | None = Field(title="変更前のシフト種別")
+    shift_type: ShiftType = Field(title="変更後のシフト種別")
+    is_early: bool = Field(default=False, title="早番")
+
+
+class ScheduleRepairResponse(BaseModel):
+    changes: list[RepairChange] = Field(title="変更したマス")
+    radius_days: int = Field(title="動かした範囲（前後の日数）")
+    applied: bool = Field(title="保存済み")
+
+
+class SuggestedMember(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    member_name: str = Field(title="メンバー名")
+    shift_type: ShiftType | None = Field(title="現在のシフト種別")
+
+
+class AssignmentSuggestionResponse(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    date: dt.date = Field(title="日付")
+    shift_type: ShiftType | None = Field(title="現在のシフト種別")
+    shifts: list[ShiftType] = Field(title="変更できるシフト種別")
+    members: list[SuggestedMember] = Field(title="このシフトに入れるメンバー")
+    swaps: list[SuggestedMember] = Field(title="入れ替えできるメンバー")
+
+
+class RuleViolationResponse(BaseModel):
+    code: str = Field(title="ルール番号")
+    label: str = Field(title="ルール")
+    message: str = Field(title="メッセージ")
+    member_id: int | None = Field(default=None, title="メンバーID")
+    date: dt.date | None = Field(default=None, title="日付")
+
+
+class ScheduleValidationResponse(BaseModel):
+    schedule_id: int = Field(title="スケジュールID")
+    year_month: str = Field(title="年月")
+    violations: list[RuleViolationResponse] = Field(title="違反")
+
+
+class ScheduleCoverageResponse(BaseModel):
+    schedule_id: int = Field(title="スケジュールID")
+    year_month: str = Field(title="年月")
+    version: int = Field(title="割当のバージョン")
+    dates: list[dt.date] = Field(title="日付（行）")
+    shift_types: list[ShiftType] = Field(title="シフト種別（列）")
+    assigned: list[list[int]] = Field(title="配置人数（日付 × シフト種別）")
+    min_staff: list[list[int]] = Field(title="必要人数の下限（日付 × シフト種別）")
+    max_staff: list[list[int]] = Field(title="必要人数の上限（日付 × シフト種別）")
+
+
+class ScheduleArtifactResponse(BaseModel):
+    kind: ArtifactKind = Field(title="成果物の種類")
+    member_id: int | None = Field(default=None, title="メンバーID")
+    version: int = Field(title="生成した割当のバージョン")
+    media_type: str = Field(title="メディアタイプ")
+    size: int = Field(title="バイト数")
+    created_at: dt.datetime | None = Field(default=None, title="生成日時")
+
+
+class ScheduleArtifactsResponse(BaseModel):
+    schedule_id: int = Field(title="スケジュールID")
+    status: ScheduleStatus = Field(title="ステータス")
+    published_version: int | None = Field(default=None, title="公開した割当のバージョン")
+    published_at: dt.datetime | None = Field(default=None, title="公開日時")
+    rendering: bool = Field(title="成果物を生成中")
+    artifacts: list[ScheduleArtifactResponse] = Field(title="成果物")
@@ -0,0 +1,126 @@
+"""件数の多いレスポンスの JSON 化。
+
+FastAPI は戻り値を response_model で検証し直してから JSON にする（バージョンによっては jsonable_encoder で
+dict に変換してから標準の json で文字列にする）。一覧のエンドポイントは作ったモデルを TypeAdapter で
+まとめて pydantic-core に渡して JSON のバイト列にし、そのまま Response として返す。
+response_model はドキュメント（OpenAPI）のために残す。
+
+    python -m response.serialize --members 100     # エンドポイントごとの JSON 化の時間と gzip 後のサイズを比べる
+"""
+
+import argparse
+import datetime
+import gzip
+import json
+import time
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+
+def json_response[T](adapter: TypeAdapter[T], value: T) -> Response:
+    return Response(content=adapter.dump_json(value), media_type="application/json")
+
+
+def _benchmark(dump: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+    data = dump()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        dump()
+    return (time.perf_counter() - started) / repeat, data
+
+
+def _samples(member_count: int) -> dict[str, tuple[TypeAdapter[Any], Any]]:
+    """エンドポイントごとの、member_count 人・1か月分のレスポンスの例。"""
+    from entity.enums import CapabilityType, EmploymentType, Qualification, RequestType, ShiftType
+    from response.member import MemberResponse
+    from response.schedule import ScheduleResponse, ShiftAssignmentResponse
+    from response.shift_request import ShiftRequestResponse
+    from solver.config import get_month_dates
+
+    now = datetime.datetime(2025, 1, 1, 9, 0)
+    dates = get_month_dates("2025-01")
+    shift_types = list(ShiftType)
+    members = [
+        MemberResponse(
+            id=m,
+            name=f"メンバー{m:03d}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=8,
+            min_night_shifts=0,
+            external_night_count=0,
+            position=m,
+            night_shift_deduction_balance=0,
+            capabilities=[CapabilityType.day_shift, CapabilityType.night_shift],
+            created_at=now,
+            updated_at=now,
+        )
+        for m in range(1, member_count + 1)
+    ]
+    requests = [
+        ShiftRequestResponse(
+            id=m * 100 + k,
+            member_id=m,
+            member_name=f"メンバー{m:03d}",
+            year_month="2025-01",
+            date=dates[(m + k * 3) % len(dates)],
+            request_type=RequestType.day_off,
+            created_at=now,
+        )
+        for m in range(1, member_count + 1)
+        for k in range(8)
+    ]
+    schedule = ScheduleResponse(
+        id=1,
+        year_month="2025-01",
+        status="draft",
+        version=1,
+        assignments=[
+            ShiftAssignmentResponse(
+                id=m * 100 + j,
+                schedule_id=1,
+                member_id=m,
+                member_name=f"メンバー{m:03d}",
+                date=d,
+                shift_type=shift_types[(m + j) % len(shift_types)],
+                created_at=now,
+            )
+            for m in range(1, member_count + 1)
+            for j, d in enumerate(dates)
+        ],
+        created_at=now,
+        updated_at=now,
+    )
+    return {
+        "GET /members/": (TypeAdapter(list[MemberResponse]), members),
+        "GET /shift-requests/": (TypeAdapter(list[ShiftRequestResponse]), requests),
+        "GET /schedules/": (TypeAdapter(ScheduleResponse), schedule),
+    }
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="一覧のレスポンスの JSON 化の方法を比べる")
+    parser.add_argument("--members", type=int, default=100, help="メンバー数")
+    parser.add_argument("--repeat", type=int, default=20, help="計測の回数")
+    args = parser.parse_args(argv)
+
+    print(f"{args.members}人・1か月分（{args.repeat}回の平均）")
+    for endpoint, (adapter, value) in _samples(args.members).items():
+        default_time, default_body = _benchmark(
+            lambda v=value: json.dumps(jsonable_encoder(v), ensure_ascii=False).encode(), args.repeat
+        )
+        fast_time, fast_body = _benchmark(lambda a=adapter, v=value: a.dump_json(v), args.repeat)
+        print(
+            f"{endpoint:<20} jsonable_encoder+json: {default_time * 1000:7.2f} ms"
+            f"  TypeAdapter: {fast_time * 1000:6.2f} ms"
+            f"  {len(fast_body) / 1024:7.1f} KiB → gzip {len(gzip.compress(fast_body, 6)) / 1024:6.1f} KiB"
+        )
+        assert json.loads(default_body) == json.loads(fast_body)
+
+
+if __name__ == "__main__":
+    main()
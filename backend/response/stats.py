@@ -0,0 +1,49 @@
+from pydantic import BaseModel, Field
+
+
+class MemberStatValues(BaseModel):
+    working_days: int = Field(title="勤務日数")
+    day_off_count: int = Field(title="公休数")
+    paid_leave_count: int = Field(title="有給数")
+    night_shift_count: int = Field(title="夜勤回数")
+    external_night_count: int = Field(title="他院夜勤回数")
+    early_shift_count: int = Field(title="早番回数")
+    holiday_work_count: int = Field(title="日祝出勤数")
+    request_total: int = Field(title="希望休合計")
+    request_fulfilled: int = Field(title="希望休充足数")
+
+
+class MonthlyMemberStat(MemberStatValues):
+    year_month: str = Field(title="年月")
+
+
+class MemberYearStats(BaseModel):
+    member_id: int = Field(title="メンバーID")
+    member_name: str = Field(title="メンバー名")
+    months: list[MonthlyMemberStat] = Field(title="月ごとの集計")
+    total: MemberStatValues = Field(title="年間合計")
+
+
+class YearStatsResponse(BaseModel):
+    year: int = Field(title="年")
+    members: list[MemberYearStats] = Field(title="メンバーごとの集計")
+
+
+class MemberStatTotals(MemberStatValues):
+    member_id: int = Field(title="メンバーID")
+    member_name: str = Field(title="メンバー名")
+    months: int = Field(title="集計した月数")
+
+
+class MetricSpread(BaseModel):
+    metric: str = Field(title="項目")
+    min: int = Field(title="最小")
+    max: int = Field(title="最大")
+    mean: float = Field(title="平均")
+
+
+class StatsAnalyticsResponse(BaseModel):
+    start_month: str = Field(title="開始年月")
+    end_month: str = Field(title="終了年月")
+    members: list[MemberStatTotals] = Field(title="メンバーごとの合計")
+    spreads: list[MetricSpread] = Field(title="項目ごとのメンバー間のばらつき")
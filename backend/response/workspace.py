@@ -0,0 +1,48 @@
+import datetime as dt
+
+from pydantic import BaseModel, Field
+
+from entity.enums import RequestType, ScheduleStatus, ShiftType
+from response.member import MemberResponse
+from response.schedule import ScheduleSummaryResponse
+
+
+class WorkspaceShiftRequest(BaseModel):
+    id: int
+    member_id: int = Field(title="メンバーID")
+    date: dt.date = Field(title="日付")
+    request_type: RequestType = Field(title="希望種別")
+
+
+class WorkspaceAssignment(BaseModel):
+    id: int
+    member_id: int = Field(title="メンバーID")
+    date: dt.date = Field(title="日付")
+    shift_type: ShiftType = Field(title="シフト種別")
+    is_early: bool = Field(title="早番")
+
+
+class WorkspaceSchedule(BaseModel):
+    id: int
+    status: ScheduleStatus = Field(title="ステータス")
+    version: int = Field(title="割当のバージョン")
+    assignments: list[WorkspaceAssignment] = Field(title="シフト割当")
+    created_at: dt.datetime
+    updated_at: dt.datetime
+
+
+class MonthWorkspaceResponse(BaseModel):
+    """月の画面に必要なものをまとめた応答（GET /workspace/{year_month}）
+
+    メンバーは members に1回だけ含め、ほかのセクションは member_id で参照する。
+    summary は GET /schedules/{id}/summary と同じもの。
+    選ばなかったセクションとスケジュールのない月の schedule・summary は null。
+    """
+
+    year_month: str = Field(title="年月")
+    dates: list[dt.date] = Field(title="日付")
+    members: list[MemberResponse] = Field(title="メンバー")
+    shift_requests: list[WorkspaceShiftRequest] | None = Field(title="希望休")
+    pediatric_dates: list[dt.date] | None = Field(title="小児科医の出勤日")
+    schedule: WorkspaceSchedule | None = Field(title="スケジュール")
+    summary: ScheduleSummaryResponse | None = Field(title="サマリー")
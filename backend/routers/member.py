@@ -1,7 +1,7 @@
 from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
-from pydantic import BaseModel, Field
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
@@ -11,11 +11,16 @@ from entity.member import Member
 from entity.member_capability import MemberCapability
 from params.member import MemberCreateParams, MemberUpdateParams
 from response.member import MemberResponse
+from response.serialize import json_response
+from solver.feasibility import invalidate_feasibility_index
+from solver.validators import invalidate_validation_state
 
 router = APIRouter(prefix="/members", tags=["members"])
 
+_MEMBER_LIST = TypeAdapter(list[MemberResponse])
 
-def _to_response(member: Member) -> MemberResponse:
+
+def member_to_response(member: Member) -> MemberResponse:
     return MemberResponse(
         id=member.id,
         name=member.name,
@@ -33,9 +38,9 @@ def _to_response(member: Member) -> MemberResponse:
 
 
 @router.get("/", response_model=list[MemberResponse])
-def get_members(db: Session = Depends(get_db)) -> list[MemberResponse]:
+def get_members(db: Session = Depends(get_db)) -> Response:
     members = db.query(Member).options(joinedload(Member.capabilities)).order_by(Member.position, Member.id).all()
-    return [_to_response(m) for m in members]
+    return json_response(_MEMBER_LIST, [member_to_response(m) for m in members])
 
 
 @router.get("/{member_id}", response_model=MemberResponse)
@@ -43,7 +48,7 @@ def get_member(member_id: int, db: Session = Depends(get_db)) -> MemberResponse:
     member = db.query(Member).options(joinedload(Member.capabilities)).filter(Member.id == member_id).first()
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
-    return _to_response(member)
+    return member_to_response(member)
 
 
 @router.post("/", response_model=MemberResponse)
@@ -65,8 +70,9 @@ def create_member(params: MemberCreateParams, db: Session = Depends(get_db)) ->
         db.add(MemberCapability(member_id=member.id, capability_type=cap))
 
     db.commit()
+    invalidate_feasibility_index()
     db.refresh(member)
-    return _to_response(member)
+    return member_to_response(member)
 
 
 @router.put("/{member_id}", response_model=MemberResponse)
@@ -98,8 +104,13 @@ def update_member(member_id: int, params: MemberUpdateParams, db: Session = Depe
         _sync_capabilities(db, member, params.capabilities)
 
     db.commit()
+    # 候補の判定は資格・能力・夜勤回数などの設定をすべて使うため、どの変更でも読み直させる
+    invalidate_feasibility_index()
+    if params.qualification is not None:
+        # 夜勤の助産師判定（H8）に使う資格を読み直させる
+        invalidate_validation_state()
     db.refresh(member)
-    return _to_response(member)
+    return member_to_response(member)
 
 
 def _sync_capabilities(db: Session, member: Member, capabilities: list[CapabilityType]) -> None:
@@ -125,6 +136,7 @@ def delete_member(member_id: int, db: Session = Depends(get_db)) -> dict[str, st
 
     db.delete(member)
     db.commit()
+    invalidate_feasibility_index()
     return {"detail": "Deleted"}
 
 
@@ -153,6 +165,7 @@ def reorder_member(params: ReorderParams, db: Session = Depends(get_db)) -> list
         target.position, neighbor.position = neighbor.position, target.position
 
     db.commit()
+    invalidate_feasibility_index()
 
     members = db.query(Member).options(joinedload(Member.capabilities)).order_by(Member.position, Member.id).all()
-    return [_to_response(m) for m in members]
+    return [member_to_response(m) for m in members]
@@ -6,6 +6,7 @@ from entity.member import Member
 from entity.ng_pair import NgPair
 from params.ng_pair import NgPairCreateParams
 from response.ng_pair import NgPairResponse
+from solver.feasibility import invalidate_feasibility_index
 
 router = APIRouter(prefix="/ng-pairs", tags=["ng-pairs"])
 
@@ -46,6 +47,7 @@ def create_ng_pair(params: NgPairCreateParams, db: Session = Depends(get_db)) ->
     pair = NgPair(member_id_1=id_1, member_id_2=id_2)
     db.add(pair)
     db.commit()
+    invalidate_feasibility_index()
     db.refresh(pair)
     return _to_response(pair)
 
@@ -57,4 +59,5 @@ def delete_ng_pair(ng_pair_id: int, db: Session = Depends(get_db)) -> dict[str,
         raise HTTPException(status_code=404, detail="NG pair not found")
     db.delete(pair)
     db.commit()
+    invalidate_feasibility_index()
     return {"detail": "Deleted"}
@@ -5,6 +5,8 @@ from db.session import get_db
 from entity.pediatric_doctor_schedule import PediatricDoctorSchedule
 from params.pediatric_doctor_schedule import PediatricDoctorScheduleBulkParams
 from response.pediatric_doctor_schedule import PediatricDoctorScheduleResponse
+from solver.coverage import invalidate_coverage
+from solver.feasibility import invalidate_feasibility_index
 
 router = APIRouter(prefix="/pediatric-doctor-schedules", tags=["pediatric-doctor-schedules"])
 
@@ -40,6 +42,9 @@ def bulk_update_pediatric_doctor_schedules(
         db.add(PediatricDoctorSchedule(date=d))
 
     db.commit()
+    # 外来（助産師）の必要人数が変わる
+    invalidate_coverage()
+    invalidate_feasibility_index()
 
     schedules = (
         db.query(PediatricDoctorSchedule)
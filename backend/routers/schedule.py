@@ -1,33 +1,85 @@
+import asyncio
 import datetime as dt
+from collections.abc import Callable, Iterable
+from typing import Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, WebSocket, status
 from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import func, update
 from sqlalchemy.exc import IntegrityError
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm import Session, joinedload, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from db.session import get_db
-from entity.enums import ShiftType
+from entity.enums import ArtifactKind, ObjectiveMode, ScheduleStatus, ShiftType
 from entity.member import Member
 from entity.schedule import Schedule
+from entity.schedule_artifact import ScheduleArtifact
+from entity.schedule_change import ScheduleChange
+from entity.schedule_proposal import ScheduleProposal
 from entity.shift_assignment import ShiftAssignment
 from entity.shift_request import ShiftRequest
-from params.schedule import ScheduleGenerateParams, ShiftAssignmentCreateParams, ShiftAssignmentUpdateParams
+from events.broker import get_broker, schedule_channel
+from params.schedule import (
+    ScheduleBatchGenerateParams,
+    ScheduleGenerateParams,
+    ScheduleParetoParams,
+    ScheduleProposalGenerateParams,
+    ScheduleRepairParams,
+    ShiftAssignmentCreateParams,
+    ShiftAssignmentUpdateParams,
+)
+from pdf.cache import schedule_pdfs
+from publish.pipeline import (
+    ScheduleSnapshot,
+    content_etag,
+    is_publishing,
+    load_artifact,
+    members_digest,
+    start_publication,
+)
 from response.schedule import (
+    AssignmentSuggestionResponse,
+    BatchGenerateResponse,
     GenerateResponse,
     MemberSummary,
+    ObjectiveWeightsResponse,
+    ParetoPointResponse,
+    ProposalAssignment,
+    RepairChange,
+    RuleViolationResponse,
+    ScheduleArtifactResponse,
+    ScheduleArtifactsResponse,
+    ScheduleChangesResponse,
+    ScheduleCompactResponse,
+    ScheduleCoverageResponse,
+    ScheduleMemberEntry,
+    ScheduleProposalResponse,
+    ScheduleRepairResponse,
     ScheduleResponse,
     ScheduleSummaryResponse,
+    ScheduleValidationResponse,
     ShiftAssignmentResponse,
     ShiftAssignmentResult,
+    SuggestedMember,
     UnfulfilledRequest,
 )
-from solver.validators import check_assignment_warnings
+from response.serialize import json_response
+from solver.coverage import get_coverage, invalidate_coverage
+from solver.feasibility import feasibility_index, invalidate_feasibility_index, record_feasibility_changes
+from solver.matrix import SHIFT_CODES, ScheduleMatrix
+from solver.stats import leave_requests_filter, member_stats, refresh_member_stats
+from solver.validators import (
+    RULE_LABELS,
+    check_assignment_warnings,
+    invalidate_validation_state,
+    record_assignment_changes,
+    validate_schedule,
+)
 
 router = APIRouter(prefix="/schedules", tags=["schedules"])
 
-NIGHT_SHIFTS = {ShiftType.night_leader, ShiftType.night}
-NON_WORKING_TYPES = {ShiftType.day_off}
-
 
 def _assignment_to_response(a: ShiftAssignment) -> ShiftAssignmentResponse:
     return ShiftAssignmentResponse(
@@ -42,19 +94,32 @@ def _assignment_to_response(a: ShiftAssignment) -> ShiftAssignmentResponse:
     )
 
 
+_SCHEDULE = TypeAdapter(ScheduleResponse)
+_COMPACT_SCHEDULE = TypeAdapter(ScheduleCompactResponse)
+
+
 def _schedule_to_response(schedule: Schedule) -> ScheduleResponse:
     return ScheduleResponse(
         id=schedule.id,
         year_month=schedule.year_month,
         status=schedule.status,
+        version=schedule.version,
         assignments=[_assignment_to_response(a) for a in schedule.assignments],
         created_at=schedule.created_at,
         updated_at=schedule.updated_at,
     )
 
 
-@router.get("/", response_model=ScheduleResponse | None)
-def get_schedule(year_month: str, db: Session = Depends(get_db)) -> ScheduleResponse | None:
+@router.get("/", response_model=ScheduleResponse | ScheduleCompactResponse | None)
+def get_schedule(
+    year_month: str,
+    payload_format: Literal["full", "compact"] = Query(default="full", alias="format"),
+    db: Session = Depends(get_db),
+) -> Response | None:
+    """年月のスケジュール。format=compact は割当をメンバー × 日付 のシフト番号の配列で返す"""
+    if payload_format == "compact":
+        compact = _get_compact_schedule(db, year_month)
+        return None if compact is None else json_response(_COMPACT_SCHEDULE, compact)
     schedule = (
         db.query(Schedule)
         .options(joinedload(Schedule.assignments).joinedload(ShiftAssignment.member))
@@ -63,31 +128,94 @@ def get_schedule(year_month: str, db: Session = Depends(get_db)) -> ScheduleResp
     )
     if not schedule:
         return None
-    return _schedule_to_response(schedule)
+    return json_response(_SCHEDULE, _schedule_to_response(schedule))
 
 
-@router.post("/generate", response_model=GenerateResponse)
-def generate_schedule(params: ScheduleGenerateParams, db: Session = Depends(get_db)) -> GenerateResponse:
-    from solver.generator import generate_shift
+def _get_compact_schedule(db: Session, year_month: str) -> ScheduleCompactResponse | None:
+    """割当は (メンバー, 日付, シフト種別, 早番) だけを読み、ORM のオブジェクトを作らずに配列にする"""
+    from solver.config import get_month_dates
+
+    schedule = db.query(Schedule).filter(Schedule.year_month == year_month).first()
+    if not schedule:
+        return None
+    members = db.query(Member.id, Member.name).order_by(Member.position, Member.id).all()
+    dates = get_month_dates(year_month)
+    matrix = ScheduleMatrix.load(db, schedule.id, [m.id for m in members], dates)
+    return ScheduleCompactResponse(
+        id=schedule.id,
+        year_month=schedule.year_month,
+        status=schedule.status,
+        version=schedule.version,
+        dates=dates,
+        shift_types=SHIFT_CODES,
+        members=[ScheduleMemberEntry(id=m.id, name=m.name) for m in members],
+        shifts=matrix.codes.tolist(),
+        early=matrix.early.astype(int).tolist(),
+        created_at=schedule.created_at,
+        updated_at=schedule.updated_at,
+    )
+
+
+def _publish(schedule_id: int, event: str, **payload: object) -> None:
+    """コミットした変更をスケジュールのチャンネルへ配信する（payload は JSON にできる値）"""
+    get_broker().publish(schedule_channel(schedule_id), {"event": event, "schedule_id": schedule_id, **payload})
 
-    existing = db.query(Schedule).filter(Schedule.year_month == params.year_month).first()
+
+def _assignment_payload(a: ShiftAssignment) -> dict[str, object]:
+    return _assignment_to_response(a).model_dump(mode="json")
+
+
+def _bump_version(db: Session, schedule: Schedule) -> int:
+    """割当の書き換えをスケジュールの version に記録し、新しい version を返す
+
+    読んだ値に足して書き戻すと同時の編集が同じ version を使うため、加算は UPDATE 文で行って読み直す。
+    更新した行のロックは commit まで持つため、同じスケジュールへの書き換えはここで順番になる。
+    """
+    db.execute(
+        update(Schedule)
+        .where(Schedule.id == schedule.id)
+        .values(version=Schedule.version + 1)
+        .execution_options(synchronize_session=False)
+    )
+    db.refresh(schedule, ["version"])
+    return schedule.version
+
+
+def _log_changes(
+    db: Session,
+    schedule: Schedule,
+    version: int,
+    upserted: Iterable[ShiftAssignment] = (),
+    deleted_ids: Iterable[int] = (),
+) -> None:
+    """割当の書き換えを差分の同期用に記録する（追加した割当の id を得るため先に flush する）
+
+    削除した id が新しい割当に再利用されても新しい方が残るように、削除を先に記録する。
+    """
+    db.add_all(
+        ScheduleChange(schedule_id=schedule.id, version=version, assignment_id=i, deleted=True) for i in deleted_ids
+    )
+    db.flush()
+    db.add_all(ScheduleChange(schedule_id=schedule.id, version=version, assignment_id=a.id) for a in upserted)
+
+
+def _replace_assignments(db: Session, year_month: str, assignments: list[dict[str, object]]) -> Schedule:
+    # 前後の月の境界も変わるため、メモリ上の検証状態と候補のインデックスはすべて読み直させる
+    invalidate_validation_state()
+    invalidate_feasibility_index()
+    existing = db.query(Schedule).filter(Schedule.year_month == year_month).first()
     if existing:
         db.query(ShiftAssignment).filter(ShiftAssignment.schedule_id == existing.id).delete()
+        # 一括の書き換えは差分にせず、それより前からの同期は全体を読み直させる
+        existing.resync_version = _bump_version(db, existing)
+        db.query(ScheduleChange).filter(ScheduleChange.schedule_id == existing.id).delete()
         schedule = existing
     else:
-        schedule = Schedule(year_month=params.year_month)
+        schedule = Schedule(year_month=year_month)
         db.add(schedule)
         db.flush()
 
-    try:
-        result_assignments, unfulfilled_raw = generate_shift(db, params.year_month)
-    except RuntimeError as e:
-        raise HTTPException(
-            status_code=422,
-            detail=str(e),
-        ) from e
-
-    for a in result_assignments:
+    for a in assignments:
         db.add(
             ShiftAssignment(
                 schedule_id=schedule.id,
@@ -97,9 +225,41 @@ def generate_schedule(params: ScheduleGenerateParams, db: Session = Depends(get_
                 is_early=a.get("is_early", False),
             )
         )
+    refresh_member_stats(db, schedule)
+    return schedule
+
 
+def _unfulfilled_to_response(unfulfilled_raw: list[dict[str, object]]) -> list[UnfulfilledRequest]:
+    return [
+        UnfulfilledRequest(member_id=u["member_id"], member_name=u["member_name"], date=u["date"])
+        for u in unfulfilled_raw
+    ]
+
+
+@router.post("/generate", response_model=GenerateResponse)
+def generate_schedule(params: ScheduleGenerateParams, db: Session = Depends(get_db)) -> GenerateResponse:
+    from solver.generator import generate_shift
+
+    # 生成の経過は、書き換えられる既存のスケジュールを開いている接続に届ける
+    existing_id = db.query(Schedule.id).filter(Schedule.year_month == params.year_month).scalar()
+    if existing_id is not None:
+        _publish(existing_id, "generation.started", year_month=params.year_month)
+    try:
+        result_assignments, unfulfilled_raw = generate_shift(
+            db, params.year_month, mode=params.objective_mode, lookback_months=params.fairness_lookback_months
+        )
+    except RuntimeError as e:
+        if existing_id is not None:
+            _publish(existing_id, "generation.failed", year_month=params.year_month, detail=str(e))
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    schedule = _replace_assignments(db, params.year_month, result_assignments)
     db.commit()
     db.refresh(schedule)
+    _publish(schedule.id, "generation.finished", year_month=schedule.year_month, version=schedule.version)
 
     schedule_with_assignments = (
         db.query(Schedule)
@@ -108,14 +268,221 @@ def generate_schedule(params: ScheduleGenerateParams, db: Session = Depends(get_
         .first()
     )
 
-    unfulfilled_responses = [
-        UnfulfilledRequest(member_id=u["member_id"], member_name=u["member_name"], date=u["date"])
-        for u in unfulfilled_raw
+    return GenerateResponse(
+        schedule=_schedule_to_response(schedule_with_assignments),
+        unfulfilled_requests=_unfulfilled_to_response(unfulfilled_raw),
+    )
+
+
+@router.post("/generate-batch", response_model=BatchGenerateResponse)
+def generate_schedule_batch(
+    params: ScheduleBatchGenerateParams, db: Session = Depends(get_db)
+) -> BatchGenerateResponse:
+    from solver.config import get_month_range
+    from solver.generator import generate_shift_batch
+
+    if params.rolling and params.objective_mode != ObjectiveMode.weighted:
+        raise HTTPException(status_code=400, detail="ローリングホライズンの生成では目的関数の優先順位を指定できません")
+
+    year_months = get_month_range(params.start_month, params.end_month)
+    # 期間内の既存のスケジュールを開いている接続に、期間全体の経過を届ける
+    existing_ids = [
+        schedule_id for (schedule_id,) in db.query(Schedule.id).filter(Schedule.year_month.in_(year_months))
     ]
 
+    def notify(event: str, **payload: object) -> None:
+        for schedule_id in existing_ids:
+            _publish(schedule_id, event, start_month=params.start_month, end_month=params.end_month, **payload)
+
+    solved = 0
+
+    def on_progress(year_month: str) -> None:
+        nonlocal solved
+        solved += 1
+        notify("generation.progress", year_month=year_month, done=solved, total=len(year_months))
+
+    notify("generation.started", total=len(year_months))
+    try:
+        results = generate_shift_batch(
+            db,
+            year_months,
+            rolling=params.rolling,
+            mode=params.objective_mode,
+            lookback_months=params.fairness_lookback_months,
+            on_progress=on_progress,
+        )
+    except (RuntimeError, ValueError) as e:
+        notify("generation.failed", detail=str(e))
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    # 全月の結果を1トランザクションで確定する
+    replaced = [_replace_assignments(db, ym, results[ym][0]) for ym in year_months]
+    db.commit()
+    for schedule in replaced:
+        _publish(schedule.id, "generation.finished", year_month=schedule.year_month, version=schedule.version)
+
+    schedules = (
+        db.query(Schedule)
+        .options(joinedload(Schedule.assignments).joinedload(ShiftAssignment.member))
+        .filter(Schedule.year_month.in_(year_months))
+        .all()
+    )
+    schedule_map = {s.year_month: s for s in schedules}
+
+    return BatchGenerateResponse(
+        results=[
+            GenerateResponse(
+                schedule=_schedule_to_response(schedule_map[ym]),
+                unfulfilled_requests=_unfulfilled_to_response(results[ym][1]),
+            )
+            for ym in year_months
+        ]
+    )
+
+
+def _proposal_to_response(proposal: ScheduleProposal, first: ScheduleProposal) -> ScheduleProposalResponse:
+    first_cells = {(a["member_id"], a["date"]): a["shift_type"] for a in first.assignments}
+    diff = sum(1 for a in proposal.assignments if first_cells.get((a["member_id"], a["date"])) != a["shift_type"])
+    return ScheduleProposalResponse(
+        id=proposal.id,
+        year_month=proposal.year_month,
+        rank=proposal.rank,
+        diff_from_first=diff,
+        assignments=[ProposalAssignment(**a) for a in proposal.assignments],
+        unfulfilled_requests=_unfulfilled_to_response(proposal.unfulfilled_requests),
+        created_at=proposal.created_at,
+    )
+
+
+def _proposals_to_response(proposals: list[ScheduleProposal]) -> list[ScheduleProposalResponse]:
+    return [_proposal_to_response(p, proposals[0]) for p in proposals]
+
+
+def _store_proposals(
+    db: Session,
+    year_month: str,
+    results: list[tuple[list[dict[str, object]], list[dict[str, object]]]],
+) -> list[ScheduleProposal]:
+    # 同じ月の以前の案は置き換える
+    db.query(ScheduleProposal).filter(ScheduleProposal.year_month == year_month).delete()
+    proposals = [
+        ScheduleProposal(
+            year_month=year_month,
+            rank=rank,
+            assignments=[
+                {
+                    "member_id": a["member_id"],
+                    "member_name": a["member_name"],
+                    "date": str(a["date"]),
+                    "shift_type": ShiftType(a["shift_type"]).value,
+                    "is_early": bool(a.get("is_early", False)),
+                }
+                for a in result_assignments
+            ],
+            unfulfilled_requests=[{**u, "date": str(u["date"])} for u in unfulfilled_raw],
+        )
+        for rank, (result_assignments, unfulfilled_raw) in enumerate(results, start=1)
+    ]
+    db.add_all(proposals)
+    db.commit()
+    for proposal in proposals:
+        db.refresh(proposal)
+    return proposals
+
+
+@router.get("/proposals", response_model=list[ScheduleProposalResponse])
+def get_proposals(year_month: str, db: Session = Depends(get_db)) -> list[ScheduleProposalResponse]:
+    proposals = (
+        db.query(ScheduleProposal)
+        .filter(ScheduleProposal.year_month == year_month)
+        .order_by(ScheduleProposal.rank)
+        .all()
+    )
+    return _proposals_to_response(proposals)
+
+
+@router.post("/proposals", response_model=list[ScheduleProposalResponse])
+def generate_proposals(
+    params: ScheduleProposalGenerateParams, db: Session = Depends(get_db)
+) -> list[ScheduleProposalResponse]:
+    from solver.generator import generate_shift_alternatives
+
+    try:
+        alternatives = generate_shift_alternatives(
+            db,
+            params.year_month,
+            params.count,
+            mode=params.objective_mode,
+            lookback_months=params.fairness_lookback_months,
+        )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    proposals = _store_proposals(db, params.year_month, alternatives)
+    return _proposals_to_response(proposals)
+
+
+@router.post("/pareto", response_model=list[ParetoPointResponse])
+def generate_pareto(params: ScheduleParetoParams, db: Session = Depends(get_db)) -> list[ParetoPointResponse]:
+    from solver.generator import ObjectiveWeights, build_problem
+    from solver.pareto import compute_pareto_front
+
+    weight_grid = [ObjectiveWeights(**w.model_dump()) for w in params.weights] if params.weights else None
+    try:
+        front = compute_pareto_front(build_problem(db, params.year_month), weight_grid)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    # 非劣解は案として保存し、どれでも確定できるようにする
+    proposals = _store_proposals(db, params.year_month, [(p.assignments, p.unfulfilled) for p in front])
+    return [
+        ParetoPointResponse(
+            proposal_id=proposal.id,
+            weights=ObjectiveWeightsResponse.model_validate(p.weights),
+            night_diff=p.night_diff,
+            holiday_diff=p.holiday_diff,
+            early_diff=p.early_diff,
+            fulfilled_requests=p.fulfilled_requests,
+            request_total=p.request_total,
+            fulfilled_day_shift_requests=p.fulfilled_day_shift_requests,
+            day_shift_request_total=p.day_shift_request_total,
+        )
+        for p, proposal in zip(front, proposals, strict=True)
+    ]
+
+
+@router.post("/proposals/{proposal_id}/commit", response_model=GenerateResponse)
+def commit_proposal(proposal_id: int, db: Session = Depends(get_db)) -> GenerateResponse:
+    proposal = db.query(ScheduleProposal).filter(ScheduleProposal.id == proposal_id).first()
+    if not proposal:
+        raise HTTPException(status_code=404, detail="Proposal not found")
+
+    assignments = [
+        {**a, "date": dt.date.fromisoformat(a["date"]), "shift_type": ShiftType(a["shift_type"])}
+        for a in proposal.assignments
+    ]
+    schedule = _replace_assignments(db, proposal.year_month, assignments)
+    db.commit()
+    _publish(schedule.id, "schedule.replaced", year_month=schedule.year_month, version=schedule.version)
+
+    schedule_with_assignments = (
+        db.query(Schedule)
+        .options(joinedload(Schedule.assignments).joinedload(ShiftAssignment.member))
+        .filter(Schedule.id == schedule.id)
+        .first()
+    )
     return GenerateResponse(
         schedule=_schedule_to_response(schedule_with_assignments),
-        unfulfilled_requests=unfulfilled_responses,
+        unfulfilled_requests=_unfulfilled_to_response(proposal.unfulfilled_requests),
     )
 
 
@@ -126,6 +493,11 @@ def delete_schedule(schedule_id: int, db: Session = Depends(get_db)) -> None:
         raise HTTPException(status_code=404, detail="Schedule not found")
     db.delete(schedule)
     db.commit()
+    invalidate_validation_state()
+    invalidate_feasibility_index()
+    invalidate_coverage(schedule_id)
+    schedule_pdfs.invalidate(schedule_id)
+    _publish(schedule_id, "schedule.deleted")
 
 
 @router.post("/{schedule_id}/assignments", response_model=ShiftAssignmentResult, status_code=201)
@@ -155,9 +527,13 @@ def create_assignment(
         )
         .first()
     )
+    changes: list[tuple[int, dt.date, ShiftType | None]] = []
+    deleted_ids = []
     if existing_off:
+        deleted_ids.append(existing_off.id)
         db.delete(existing_off)
         db.flush()
+        changes.append((params.member_id, parsed_date, None))
 
     # フリー枠（病棟F・外来F）は複数人割り当て可能なので重複チェックをスキップ
     multi_assignable = {ShiftType.ward_free, ShiftType.outpatient_free}
@@ -184,7 +560,10 @@ def create_assignment(
         shift_type=params.shift_type,
     )
     db.add(assignment)
+    version = _bump_version(db, schedule)
     try:
+        _log_changes(db, schedule, version, [assignment], deleted_ids)
+        refresh_member_stats(db, schedule, [params.member_id])
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -192,14 +571,18 @@ def create_assignment(
             status_code=409,
             detail=f"{member.name} は同日に既にシフトが割り当てられています",
         ) from None
-    db.refresh(assignment)
+    changes.append((params.member_id, parsed_date, params.shift_type))
     assignment = (
         db.query(ShiftAssignment)
         .options(joinedload(ShiftAssignment.member))
         .filter(ShiftAssignment.id == assignment.id)
         .first()
     )
-    warnings = check_assignment_warnings(db, schedule_id, params.member_id, parsed_date)
+    for deleted_id in deleted_ids:
+        _publish(schedule_id, "assignment.deleted", version=version, assignment_id=deleted_id)
+    _publish(schedule_id, "assignment.created", version=version, assignment=_assignment_payload(assignment))
+    warnings = check_assignment_warnings(db, schedule_id, version, member, parsed_date, changes)
+    record_feasibility_changes(schedule_id, version, [(m, d, s, False) for m, d, s in changes])
     return ShiftAssignmentResult(assignment=_assignment_to_response(assignment), warnings=warnings)
 
 
@@ -223,9 +606,17 @@ def update_assignment(
     if not member:
         raise HTTPException(status_code=404, detail="Member not found")
 
+    schedule = assignment.schedule
+    changes: list[tuple[int, dt.date, ShiftType | None]] = [
+        (assignment.member_id, assignment.date, None),
+        (params.member_id, assignment.date, params.shift_type),
+    ]
     assignment.shift_type = params.shift_type
     assignment.member_id = params.member_id
+    version = _bump_version(db, schedule)
     try:
+        _log_changes(db, schedule, version, [assignment])
+        refresh_member_stats(db, schedule, {changes[0][0], params.member_id})
         db.commit()
     except IntegrityError:
         db.rollback()
@@ -234,7 +625,9 @@ def update_assignment(
             detail=f"{member.name} は同日に既にシフトが割り当てられています",
         ) from None
     db.refresh(assignment)
-    warnings = check_assignment_warnings(db, schedule_id, params.member_id, assignment.date)
+    _publish(schedule_id, "assignment.updated", version=version, assignment=_assignment_payload(assignment))
+    warnings = check_assignment_warnings(db, schedule_id, version, member, assignment.date, changes)
+    record_feasibility_changes(schedule_id, version, [(m, d, s, assignment.is_early) for m, d, s in changes])
     return ShiftAssignmentResult(assignment=_assignment_to_response(assignment), warnings=warnings)
 
 
@@ -252,121 +645,616 @@ def delete_assignment(
     if not assignment:
         raise HTTPException(status_code=404, detail="Assignment not found")
 
+    schedule = assignment.schedule
+    change = (assignment.member_id, assignment.date, None)
+    version = _bump_version(db, schedule)
+    deleted_id = assignment.id
+    _log_changes(db, schedule, version, deleted_ids=[deleted_id])
     db.delete(assignment)
+    refresh_member_stats(db, schedule, [change[0]])
     db.commit()
+    record_assignment_changes(schedule_id, version, [change])
+    record_feasibility_changes(schedule_id, version, [(*change, False)])
+    _publish(schedule_id, "assignment.deleted", version=version, assignment_id=deleted_id)
 
 
-@router.get("/{schedule_id}/summary", response_model=ScheduleSummaryResponse)
-def get_schedule_summary(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleSummaryResponse:
-    from solver.config import get_base_off_days, get_month_dates
+@router.get("/{schedule_id}/changes", response_model=ScheduleChangesResponse)
+def get_schedule_changes(
+    schedule_id: int,
+    since: int = Query(ge=0),
+    db: Session = Depends(get_db),
+) -> ScheduleChangesResponse:
+    """version が since の時点から作成・更新・削除された割当。一括の書き換えをまたぐ場合は resync を返す"""
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    response = ScheduleChangesResponse(
+        schedule_id=schedule_id, since=since, version=schedule.version, resync=False, upserted=[], deleted=[]
+    )
+    if since < schedule.resync_version or since > schedule.version:
+        response.resync = True
+        return response
+
+    # 同じ割当の変更は最後のものだけを使う
+    latest: dict[int, bool] = {}
+    rows = (
+        db.query(ScheduleChange.assignment_id, ScheduleChange.deleted)
+        .filter(ScheduleChange.schedule_id == schedule_id, ScheduleChange.version > since)
+        .order_by(ScheduleChange.version, ScheduleChange.id)
+    )
+    for assignment_id, deleted in rows:
+        latest[assignment_id] = deleted
+    upserted_ids = [i for i, deleted in latest.items() if not deleted]
+    if upserted_ids:
+        assignments = (
+            db.query(ShiftAssignment)
+            .options(joinedload(ShiftAssignment.member))
+            .filter(ShiftAssignment.id.in_(upserted_ids))
+            .order_by(ShiftAssignment.date, ShiftAssignment.id)
+        )
+        response.upserted = [_assignment_to_response(a) for a in assignments]
+    response.deleted = sorted(i for i, deleted in latest.items() if deleted)
+    return response
+
+
+@router.websocket("/{schedule_id}/ws")
+async def schedule_events(websocket: WebSocket, schedule_id: int, db: Session = Depends(get_db)) -> None:
+    """スケジュールの割当の作成・更新・削除と生成の経過を、コミットされた順に JSON で送る
+
+    接続直後に現在の version を subscribed で送る。取りこぼした場合（resync を受け取った場合を含む）は
+    GET /{schedule_id}/changes で差分を読み直す。
+    """
+
+    def current_version() -> int | None:
+        try:
+            return db.query(Schedule.version).filter(Schedule.id == schedule_id).scalar()
+        finally:
+            # 読み取りのトランザクションを終え、接続している間 DB の接続を借りたままにしない
+            db.rollback()
+
+    # version を読む前に購読し、その間にコミットされた変更を取りこぼさない
+    subscription = get_broker().subscribe(schedule_channel(schedule_id))
+    version = await run_in_threadpool(current_version)
+    if version is None:
+        subscription.close()
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason="Schedule not found")
+        return
+
+    async def forward() -> None:
+        while True:
+            await websocket.send_json(await subscription.get())
+
+    await websocket.accept()
+    await websocket.send_json({"event": "subscribed", "schedule_id": schedule_id, "version": version})
+    sender = asyncio.create_task(forward())
+    try:
+        # クライアントからのメッセージは使わず、切断されるまで読み捨てる
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+    finally:
+        sender.cancel()
+        subscription.close()
+
+
+@router.get("/{schedule_id}/validate", response_model=ScheduleValidationResponse)
+def get_schedule_violations(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleValidationResponse:
+    """スケジュール全体のハード制約違反を返す"""
+    from solver.feasibility import load_schedule_inputs
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    try:
+        violations = validate_schedule(*load_schedule_inputs(db, schedule))
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    return ScheduleValidationResponse(
+        schedule_id=schedule_id,
+        year_month=schedule.year_month,
+        violations=[
+            RuleViolationResponse(
+                code=v.code, label=RULE_LABELS[v.code], message=v.message, member_id=v.member_id, date=v.date
+            )
+            for v in violations
+        ],
+    )
+
+
+@router.get("/{schedule_id}/suggestions", response_model=AssignmentSuggestionResponse)
+def get_assignment_suggestions(
+    schedule_id: int,
+    member_id: int,
+    date: dt.date,
+    shift_type: ShiftType | None = None,
+    db: Session = Depends(get_db),
+) -> AssignmentSuggestionResponse:
+    """マス（メンバー×日付）に入れられるシフト、shift_type に移れるメンバー、入れ替えできるメンバーを返す"""
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    try:
+        with feasibility_index(db, schedule) as index:
+            if member_id not in index.p.member_names:
+                raise HTTPException(status_code=404, detail="Member not found")
+            if date not in index.date_index:
+                raise HTTPException(status_code=400, detail=f"{date} は {schedule.year_month} の日付ではありません")
+
+            suggestions = index.suggest(member_id, date, shift_type)
+
+            def _member(n: int) -> SuggestedMember:
+                return SuggestedMember(
+                    member_id=n, member_name=index.p.member_names[n], shift_type=index.cells.get((n, date))
+                )
+
+            return AssignmentSuggestionResponse(
+                member_id=member_id,
+                date=date,
+                shift_type=index.cells.get((member_id, date)),
+                shifts=suggestions.shifts,
+                members=[_member(n) for n in suggestions.members],
+                swaps=[_member(n) for n in suggestions.swaps],
+            )
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+
+@router.post("/{schedule_id}/repair", response_model=ScheduleRepairResponse)
+def repair_schedule(
+    schedule_id: int,
+    params: ScheduleRepairParams,
+    db: Session = Depends(get_db),
+) -> ScheduleRepairResponse:
+    """欠勤や違反のある日付の周辺だけを、現在のシフトからの変更が最小になるように組み直す"""
+    from solver.boundary import load_boundary_state
+    from solver.generator import build_problem
+    from solver.repair import solve_repair
 
     schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
     assignments = db.query(ShiftAssignment).filter(ShiftAssignment.schedule_id == schedule_id).all()
-    requests = db.query(ShiftRequest).filter(ShiftRequest.year_month == schedule.year_month).all()
-    members = db.query(Member).order_by(Member.position, Member.id).all()
+    current = {(a.member_id, a.date): (a.shift_type, a.is_early) for a in assignments}
+    fixed = {(c.member_id, c.date): c.shift_type for c in params.fixed}
+    try:
+        problem = build_problem(db, schedule.year_month)
+        outside = [d for _, d in fixed if d not in problem.dates] + [d for d in params.dates if d not in problem.dates]
+        if outside:
+            raise ValueError(f"{outside[0]} は {schedule.year_month} の日付ではありません")
+        result = solve_repair(
+            problem,
+            current,
+            fixed,
+            load_boundary_state(db, problem.dates[0]),
+            affected_dates=params.dates,
+            affected_member_ids=params.member_ids,
+            radius_days=params.radius_days,
+        )
+    except (RuntimeError, ValueError) as e:
+        raise HTTPException(
+            status_code=422,
+            detail=str(e),
+        ) from e
+
+    if not params.dry_run:
+        # 変更したマスだけを書き換え、ほかの割当には触れない
+        by_cell = {(a.member_id, a.date): a for a in assignments}
+        touched = []
+        events: list[tuple[str, ShiftAssignment]] = []
+        for c in result.changes:
+            existing = by_cell.get((c["member_id"], c["date"]))
+            if existing:
+                existing.shift_type = c["shift_type"]
+                existing.is_early = c["is_early"]
+                touched.append(existing)
+                events.append(("assignment.updated", existing))
+            else:
+                added = ShiftAssignment(
+                    schedule_id=schedule_id,
+                    member_id=c["member_id"],
+                    date=c["date"],
+                    shift_type=c["shift_type"],
+                    is_early=c["is_early"],
+                )
+                db.add(added)
+                touched.append(added)
+                events.append(("assignment.created", added))
+        version = _bump_version(db, schedule)
+        _log_changes(db, schedule, version, touched)
+        refresh_member_stats(db, schedule, {c["member_id"] for c in result.changes})
+        db.commit()
+        record_assignment_changes(
+            schedule_id, version, [(c["member_id"], c["date"], c["shift_type"]) for c in result.changes]
+        )
+        record_feasibility_changes(
+            schedule_id,
+            version,
+            [(c["member_id"], c["date"], c["shift_type"], c["is_early"]) for c in result.changes],
+        )
+        for event, a in events:
+            _publish(schedule_id, event, version=version, assignment=_assignment_payload(a))
+
+    return ScheduleRepairResponse(
+        changes=[RepairChange(**c) for c in result.changes],
+        radius_days=result.radius_days,
+        applied=not params.dry_run,
+    )
+
+
+@router.get("/{schedule_id}/summary", response_model=ScheduleSummaryResponse)
+def get_schedule_summary(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleSummaryResponse:
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return build_schedule_summary(db, schedule)
+
+
+def build_schedule_summary(db: Session, schedule: Schedule) -> ScheduleSummaryResponse:
+    """メンバーごとの集計。/summary・月の画面（/workspace）・公開時の成果物で同じものを使う"""
+    from solver.config import get_base_off_days, get_month_dates
 
     month_dates = get_month_dates(schedule.year_month)
     days_in_month = len(month_dates)
     base_off_days = get_base_off_days(days_in_month)
     expected_working_days = days_in_month - base_off_days
 
-    request_entries_by_member: dict[int, list[tuple[str, str]]] = {}
-    for r in requests:
-        rt = r.request_type.value if hasattr(r.request_type, "value") else str(r.request_type)
-        if rt in ("day_shift_request", "night_shift_request"):
-            continue
-        request_entries_by_member.setdefault(r.member_id, []).append((str(r.date), rt))
-
-    member_summaries: list[MemberSummary] = []
-    for member in members:
-        member_assignments = [a for a in assignments if a.member_id == member.id]
-        working = [a for a in member_assignments if a.shift_type not in NON_WORKING_TYPES]
-        day_offs = [a for a in member_assignments if a.shift_type == ShiftType.day_off]
-        paid_leaves = [a for a in member_assignments if a.shift_type == ShiftType.paid_leave]
-        nights = [a for a in member_assignments if a.shift_type in NIGHT_SHIFTS]
-        external_nights = [a for a in member_assignments if a.shift_type == ShiftType.external_night]
-        early_shifts = [a for a in member_assignments if a.is_early]
-        holidays = [a for a in working if a.date.weekday() == 6]  # Sunday
-
-        entries = request_entries_by_member.get(member.id, [])
-        req_dates_set = {d for d, _ in entries}
-
-        # fulfilled: request_type に応じて day_off or paid_leave の存在を確認
-        assignment_map: dict[str, set[str]] = {}
-        for a in member_assignments:
-            st_val = a.shift_type.value if hasattr(a.shift_type, "value") else str(a.shift_type)
-            assignment_map.setdefault(str(a.date), set()).add(st_val)
-
-        fulfilled = 0
-        for d, rt in entries:
-            assigned_types = assignment_map.get(d, set())
-            if rt == "paid_leave":
-                if "paid_leave" in assigned_types:
-                    fulfilled += 1
-            else:
-                if "day_off" in assigned_types:
-                    fulfilled += 1
-
-        member_summaries.append(
-            MemberSummary(
-                member_id=member.id,
-                member_name=member.name,
-                employment_type=member.employment_type,
-                working_days=len(working),
-                day_off_count=len(day_offs),
-                paid_leave_count=len(paid_leaves),
-                night_shift_count=len(nights),
-                night_shift_shortfall=max(0, member.min_night_shifts - len(nights) - member.external_night_count),
-                external_night_count=len(external_nights),
-                early_shift_count=len(early_shifts),
-                holiday_work_count=len(holidays),
-                request_fulfilled=fulfilled,
-                request_total=len(req_dates_set),
-                request_dates=sorted(dt.date.fromisoformat(d) for d in req_dates_set),
-            )
+    request_dates: dict[int, list[dt.date]] = {}
+    for member_id, d in (
+        db.query(ShiftRequest.member_id, ShiftRequest.date)
+        .filter(leave_requests_filter(schedule.year_month))
+        .order_by(ShiftRequest.date)
+    ):
+        request_dates.setdefault(member_id, []).append(d)
+
+    member_summaries = [
+        MemberSummary(
+            member_id=row.id,
+            member_name=row.name,
+            employment_type=row.employment_type,
+            working_days=row.working_days,
+            day_off_count=row.day_off_count,
+            paid_leave_count=row.paid_leave_count,
+            night_shift_count=row.night_shift_count,
+            night_shift_shortfall=max(0, row.min_night_shifts - row.night_shift_count - row.configured_external_nights),
+            external_night_count=row.external_night_count,
+            early_shift_count=row.early_shift_count,
+            holiday_work_count=row.holiday_work_count,
+            request_fulfilled=row.request_fulfilled,
+            request_total=row.request_total,
+            request_dates=request_dates.get(row.id, []),
         )
+        for row in member_stats(db, schedule.id, schedule.year_month)
+    ]
 
     return ScheduleSummaryResponse(
-        schedule_id=schedule_id,
+        schedule_id=schedule.id,
         year_month=schedule.year_month,
         expected_working_days=expected_working_days,
         members=member_summaries,
     )
 
 
+@router.get("/{schedule_id}/coverage", response_model=ScheduleCoverageResponse)
+def get_schedule_coverage(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleCoverageResponse:
+    """日付 × ポジションの配置人数と必要人数"""
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    coverage = get_coverage(db, schedule)
+    return ScheduleCoverageResponse(
+        schedule_id=schedule_id,
+        year_month=coverage.year_month,
+        version=coverage.version,
+        dates=coverage.dates,
+        shift_types=coverage.shift_types,
+        assigned=coverage.assigned.tolist(),
+        min_staff=coverage.min_staff.tolist(),
+        max_staff=coverage.max_staff.tolist(),
+    )
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
 @router.get("/{schedule_id}/pdf")
-def get_schedule_pdf(schedule_id: int, db: Session = Depends(get_db)) -> StreamingResponse:
-    from pdf.generator import generate_schedule_pdf
+def get_schedule_pdf(
+    schedule_id: int,
+    layout: Literal["shifts", "members"] = Query(default="shifts"),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """シフト表のPDF。割当の version とメンバー名の並びが同じ間は生成済みのもの（公開時の成果物を含む）を返す
 
-    schedule = (
-        db.query(Schedule)
-        .options(joinedload(Schedule.assignments).joinedload(ShiftAssignment.member))
-        .filter(Schedule.id == schedule_id)
-        .first()
+    layout=members はメンバー × 日付 の表にする。
+    """
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    members = db.query(Member.id, Member.name).order_by(Member.position, Member.id).all()
+    digest = members_digest((m.id, m.name) for m in members)
+    kind = ArtifactKind.ward_pdf.value if layout == "shifts" else f"pdf_{layout}"
+    etag = content_etag(schedule_id, schedule.version, digest, kind)
+    filename = f"shift_{schedule.year_month}.pdf" if layout == "shifts" else f"shift_{layout}_{schedule.year_month}.pdf"
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    def render() -> bytes:
+        from pdf.generator import generate_schedule_pdf
+        from pdf.member_grid import generate_member_grid_pdf
+        from solver.config import get_month_dates
+
+        if layout == "shifts":
+            stored = load_artifact(db, schedule_id, ArtifactKind.ward_pdf)
+            if stored is not None and stored.etag == etag:
+                return stored.content
+        matrix = ScheduleMatrix.load(db, schedule_id, [m.id for m in members], get_month_dates(schedule.year_month))
+        names = {m.id: m.name for m in members}
+        if layout == "members":
+            return generate_member_grid_pdf(schedule.year_month, matrix, names)
+        return generate_schedule_pdf(schedule.year_month, matrix, names).getvalue()
+
+    content = schedule_pdfs.get_or_render((schedule_id, schedule.version, digest, layout), render)
+    return Response(content=content, media_type="application/pdf", headers=headers)
+
+
+@router.get("/{schedule_id}/rosters")
+def get_member_rosters(
+    schedule_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """全メンバーの個人勤務表PDFを ZIP で返す。公開時の成果物が今の内容と同じならそれを使う"""
+    from export.stream import stream_zip
+    from pdf.roster import render_member_rosters
+    from solver.config import get_month_dates
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    members = db.query(Member.id, Member.name).order_by(Member.position, Member.id).all()
+    digest = members_digest((m.id, m.name) for m in members)
+    etag = content_etag(schedule_id, schedule.version, digest, "rosters_zip")
+    roster_etag = content_etag(schedule_id, schedule.version, digest, ArtifactKind.member_roster.value)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="rosters_{schedule.year_month}.zip"',
+    }
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+
+    stored = dict(
+        db.query(ScheduleArtifact.member_id, ScheduleArtifact.content).filter(
+            ScheduleArtifact.schedule_id == schedule_id,
+            ScheduleArtifact.kind == ArtifactKind.member_roster,
+            ScheduleArtifact.etag == roster_etag,
+        )
     )
+    if len(stored) == len(members):
+        pdfs: Iterable[tuple[int, bytes]] = ((m.id, stored[m.id]) for m in members)
+    else:
+        # 本文を返し始める前に必要なものをすべて読み、以降はDBを使わない
+        matrix = ScheduleMatrix.load(db, schedule_id, [m.id for m in members], get_month_dates(schedule.year_month))
+        pdfs = render_member_rosters(schedule.year_month, matrix, {m.id: m.name for m in members})
+
+    names = {m.id: m.name.replace("/", "_") for m in members}
+    files = ((f"{k:03d}_{names[m]}.pdf", pdf) for k, (m, pdf) in enumerate(pdfs, start=1))
+    return StreamingResponse(stream_zip(files), media_type="application/zip", headers=headers)
+
+
+def _content_etag(db: Session, schedule: Schedule, kind: ArtifactKind) -> str:
+    """割当の version とメンバー名の並びから作る ETag。公開時の成果物の etag と同じ形。"""
+    members = db.query(Member.id, Member.name).order_by(Member.position, Member.id).all()
+    return content_etag(schedule.id, schedule.version, members_digest((m.id, m.name) for m in members), kind.value)
+
+
+def _export_response(
+    db: Session,
+    schedule: Schedule,
+    kind: ArtifactKind,
+    render: Callable[[], Iterable[bytes]],
+    media_type: str,
+    filename: str,
+    if_none_match: str | None,
+    member_id: int | None = None,
+) -> Response:
+    """書き出しのレスポンス。公開時の成果物が今の内容と同じならそのバイト列を返し、違えば生成しながら返す"""
+    etag = _content_etag(db, schedule, kind)
+    headers = {
+        "ETag": etag,
+        "Cache-Control": "no-cache",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    stored = load_artifact(db, schedule.id, kind, member_id)
+    if stored is not None and stored.etag == etag:
+        return Response(content=stored.content, media_type=media_type, headers=headers)
+    return StreamingResponse(render(), media_type=media_type, headers=headers)
+
+
+@router.get("/{schedule_id}/export/csv")
+def export_schedule_csv(
+    schedule_id: int,
+    layout: Literal["grid", "long"] = Query(default="grid"),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """割当の CSV。grid はメンバー × 日付 の表、long は割当1件を1行にした形式"""
+    from export.schedule import CSV_MEDIA_TYPE, LONG_HEADER, grid_header, grid_rows, long_rows, stream_csv
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
     if not schedule:
         raise HTTPException(status_code=404, detail="Schedule not found")
 
-    assignment_data = [
-        {
-            "member_name": a.member.name,
-            "date": a.date,
-            "shift_type": a.shift_type,
-            "is_early": a.is_early,
-        }
-        for a in schedule.assignments
-    ]
+    def render() -> Iterable[bytes]:
+        if layout == "grid":
+            return stream_csv(grid_header(schedule.year_month), grid_rows(db, schedule))
+        return stream_csv(LONG_HEADER, long_rows(db, schedule))
+
+    kind = ArtifactKind.csv_grid if layout == "grid" else ArtifactKind.csv_long
+    filename = f"shift_{layout}_{schedule.year_month}.csv"
+    return _export_response(db, schedule, kind, render, CSV_MEDIA_TYPE, filename, if_none_match)
+
+
+@router.get("/{schedule_id}/export/xlsx")
+def export_schedule_xlsx(
+    schedule_id: int,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """割当の XLSX。メンバー × 日付 の表と、割当1件を1行にした一覧の2シート"""
+    from export.schedule import XLSX_MEDIA_TYPE, grid_rows, long_rows, schedule_xlsx
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    def render() -> Iterable[bytes]:
+        return schedule_xlsx(schedule.year_month, grid_rows(db, schedule), long_rows(db, schedule))
 
-    pdf_buffer = generate_schedule_pdf(schedule.year_month, assignment_data)
+    filename = f"shift_{schedule.year_month}.xlsx"
+    return _export_response(db, schedule, ArtifactKind.xlsx, render, XLSX_MEDIA_TYPE, filename, if_none_match)
 
-    return StreamingResponse(
-        pdf_buffer,
-        media_type="application/pdf",
-        headers={"Content-Disposition": f'attachment; filename="shift_{schedule.year_month}.pdf"'},
+
+@router.get("/{schedule_id}/export/ical")
+def export_member_ical(
+    schedule_id: int,
+    member_id: int = Query(),
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """メンバー1人分の勤務の iCalendar（終日の予定）"""
+    from export.schedule import ICAL_MEDIA_TYPE, member_ical
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    member_name = db.query(Member.name).filter(Member.id == member_id).scalar()
+    if member_name is None:
+        raise HTTPException(status_code=404, detail="Member not found")
+
+    def render() -> Iterable[bytes]:
+        return member_ical(db, schedule, member_id, member_name)
+
+    filename = f"shift_{schedule.year_month}_{member_id}.ics"
+    return _export_response(
+        db, schedule, ArtifactKind.ical, render, ICAL_MEDIA_TYPE, filename, if_none_match, member_id=member_id
+    )
+
+
+def _artifacts_to_response(db: Session, schedule: Schedule) -> ScheduleArtifactsResponse:
+    # 本体は読まずに長さだけ求める
+    artifacts = (
+        db.query(
+            ScheduleArtifact.kind,
+            ScheduleArtifact.member_id,
+            ScheduleArtifact.version,
+            ScheduleArtifact.media_type,
+            func.length(ScheduleArtifact.content).label("size"),
+            ScheduleArtifact.created_at,
+        )
+        .filter(ScheduleArtifact.schedule_id == schedule.id)
+        .order_by(ScheduleArtifact.kind, ScheduleArtifact.member_id)
+        .all()
+    )
+    return ScheduleArtifactsResponse(
+        schedule_id=schedule.id,
+        status=schedule.status,
+        published_version=schedule.published_version,
+        published_at=schedule.published_at,
+        rendering=is_publishing(schedule.id),
+        artifacts=[
+            ScheduleArtifactResponse(
+                kind=a.kind,
+                member_id=a.member_id,
+                version=a.version,
+                media_type=a.media_type,
+                size=a.size,
+                created_at=a.created_at,
+            )
+            for a in artifacts
+        ],
+    )
+
+
+@router.post("/{schedule_id}/publish", response_model=ScheduleArtifactsResponse, status_code=202)
+def publish_schedule(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleArtifactsResponse:
+    """現在の割当を公開し、PDF・集計などの成果物をバックグラウンドで生成する"""
+    from solver.config import get_month_dates
+
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+
+    members = db.query(Member.id, Member.name).order_by(Member.position, Member.id).all()
+    snapshot = ScheduleSnapshot(
+        schedule_id=schedule_id,
+        version=schedule.version,
+        year_month=schedule.year_month,
+        matrix=ScheduleMatrix.load(db, schedule_id, [m.id for m in members], get_month_dates(schedule.year_month)),
+        member_names={m.id: m.name for m in members},
+        members_digest=members_digest((m.id, m.name) for m in members),
+        summary_json=build_schedule_summary(db, schedule).model_dump_json().encode(),
     )
+    schedule.status = ScheduleStatus.published
+    schedule.published_version = schedule.version
+    schedule.published_at = dt.datetime.now(dt.UTC)
+    db.commit()
+
+    response = _artifacts_to_response(db, schedule)
+    start_publication(snapshot, sessionmaker(bind=db.get_bind(), autocommit=False, autoflush=False))
+    response.rendering = True
+    return response
+
+
+@router.get("/{schedule_id}/artifacts", response_model=ScheduleArtifactsResponse)
+def get_schedule_artifacts(schedule_id: int, db: Session = Depends(get_db)) -> ScheduleArtifactsResponse:
+    schedule = db.query(Schedule).filter(Schedule.id == schedule_id).first()
+    if not schedule:
+        raise HTTPException(status_code=404, detail="Schedule not found")
+    return _artifacts_to_response(db, schedule)
+
+
+@router.get("/{schedule_id}/artifacts/{kind}")
+def get_schedule_artifact(
+    schedule_id: int,
+    kind: ArtifactKind,
+    member_id: int | None = None,
+    if_none_match: str | None = Header(default=None),
+    db: Session = Depends(get_db),
+) -> Response:
+    """公開時に生成した成果物を保存済みのバイト列のまま返す"""
+    artifact = load_artifact(db, schedule_id, kind, member_id)
+    if artifact is None:
+        raise HTTPException(status_code=404, detail="Artifact not found")
+
+    headers = {"ETag": artifact.etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, artifact.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=artifact.content, media_type=artifact.media_type, headers=headers)
 
 
 @router.patch("/{schedule_id}/assignments/{assignment_id}/early", response_model=ShiftAssignmentResponse)
@@ -385,8 +1273,16 @@ def toggle_early_shift(
         raise HTTPException(status_code=404, detail="Assignment not found")
 
     assignment.is_early = not assignment.is_early
+    version = _bump_version(db, assignment.schedule)
+    _log_changes(db, assignment.schedule, version, [assignment])
+    refresh_member_stats(db, assignment.schedule, [assignment.member_id])
     db.commit()
+    record_assignment_changes(schedule_id, version, [])
+    record_feasibility_changes(
+        schedule_id, version, [(assignment.member_id, assignment.date, assignment.shift_type, assignment.is_early)]
+    )
     db.refresh(assignment)
+    _publish(schedule_id, "assignment.updated", version=version, assignment=_assignment_payload(assignment))
     return _assignment_to_response(assignment)
 
 
@@ -413,6 +1309,13 @@ def toggle_paid_leave(
     else:
         raise HTTPException(status_code=400, detail="公休または有給のシフトのみ切替可能です")
 
+    change = (assignment.member_id, assignment.date, assignment.shift_type)
+    version = _bump_version(db, assignment.schedule)
+    _log_changes(db, assignment.schedule, version, [assignment])
+    refresh_member_stats(db, assignment.schedule, [assignment.member_id])
     db.commit()
+    record_assignment_changes(schedule_id, version, [change])
+    record_feasibility_changes(schedule_id, version, [(*change, assignment.is_early)])
     db.refresh(assignment)
+    _publish(schedule_id, "assignment.updated", version=version, assignment=_assignment_payload(assignment))
     return _assignment_to_response(assignment)
@@ -1,14 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
 
 from db.session import get_db
 from entity.member import Member
+from entity.schedule import Schedule
 from entity.shift_request import ShiftRequest
 from params.shift_request import ShiftRequestBulkParams
+from response.serialize import json_response
 from response.shift_request import ShiftRequestResponse
+from solver.feasibility import invalidate_feasibility_index
+from solver.stats import refresh_member_stats
 
 router = APIRouter(prefix="/shift-requests", tags=["shift-requests"])
 
+_SHIFT_REQUEST_LIST = TypeAdapter(list[ShiftRequestResponse])
+
 
 def _to_response(req: ShiftRequest) -> ShiftRequestResponse:
     return ShiftRequestResponse(
@@ -22,15 +29,23 @@ def _to_response(req: ShiftRequest) -> ShiftRequestResponse:
     )
 
 
+def _refresh_stats(db: Session, member_id: int, year_month: str) -> None:
+    """希望休の充足数は確定済みの割当と突き合わせるため、その月のスケジュールがあれば集計し直す"""
+    schedule = db.query(Schedule).filter(Schedule.year_month == year_month).first()
+    if schedule:
+        refresh_member_stats(db, schedule, [member_id])
+
+
 @router.get("/", response_model=list[ShiftRequestResponse])
-def get_shift_requests(year_month: str, db: Session = Depends(get_db)) -> list[ShiftRequestResponse]:
+def get_shift_requests(year_month: str, db: Session = Depends(get_db)) -> Response:
     requests = (
         db.query(ShiftRequest)
+        .options(joinedload(ShiftRequest.member))
         .filter(ShiftRequest.year_month == year_month)
         .order_by(ShiftRequest.member_id, ShiftRequest.date)
         .all()
     )
-    return [_to_response(r) for r in requests]
+    return json_response(_SHIFT_REQUEST_LIST, [_to_response(r) for r in requests])
 
 
 @router.delete("/", status_code=204)
@@ -42,7 +57,9 @@ def delete_shift_requests(member_id: int, year_month: str, db: Session = Depends
     )
     if deleted == 0:
         raise HTTPException(status_code=404, detail="対象の希望休が見つかりません")
+    _refresh_stats(db, member_id, year_month)
     db.commit()
+    invalidate_feasibility_index()
 
 
 @router.put("/", response_model=list[ShiftRequestResponse])
@@ -68,7 +85,9 @@ def bulk_update_shift_requests(
             )
         )
 
+    _refresh_stats(db, params.member_id, params.year_month)
     db.commit()
+    invalidate_feasibility_index()
 
     requests = (
         db.query(ShiftRequest)
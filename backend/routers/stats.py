@@ -0,0 +1,90 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from db.session import get_db
+from entity.member import Member
+from entity.member_monthly_stat import MemberMonthlyStat
+from response.stats import (
+    MemberStatTotals,
+    MemberStatValues,
+    MemberYearStats,
+    MetricSpread,
+    MonthlyMemberStat,
+    StatsAnalyticsResponse,
+    YearStatsResponse,
+)
+from solver.stats import STAT_COLUMNS
+
+router = APIRouter(prefix="/stats", tags=["stats"])
+
+YEAR_MONTH_PATTERN = r"^\d{4}-(0[1-9]|1[0-2])$"
+
+
+@router.get("/year", response_model=YearStatsResponse)
+def get_year_stats(year: int = Query(ge=2000, le=2100), db: Session = Depends(get_db)) -> YearStatsResponse:
+    """メンバーごとの月別集計と年間合計（集計テーブルを年月で引くだけで、割当は読まない）"""
+    rows = (
+        db.query(MemberMonthlyStat, Member.name)
+        .join(Member, Member.id == MemberMonthlyStat.member_id)
+        .filter(MemberMonthlyStat.year_month.between(f"{year:04d}-01", f"{year:04d}-12"))
+        .order_by(Member.position, Member.id, MemberMonthlyStat.year_month)
+        .all()
+    )
+
+    members: dict[int, MemberYearStats] = {}
+    for stat, name in rows:
+        values = {c: getattr(stat, c) for c in STAT_COLUMNS}
+        entry = members.get(stat.member_id)
+        if entry is None:
+            entry = members[stat.member_id] = MemberYearStats(
+                member_id=stat.member_id,
+                member_name=name,
+                months=[],
+                total=MemberStatValues(**dict.fromkeys(STAT_COLUMNS, 0)),
+            )
+        entry.months.append(MonthlyMemberStat(year_month=stat.year_month, **values))
+        for c, v in values.items():
+            setattr(entry.total, c, getattr(entry.total, c) + v)
+    return YearStatsResponse(year=year, members=list(members.values()))
+
+
+@router.get("/analytics", response_model=StatsAnalyticsResponse)
+def get_stats_analytics(
+    start_month: str = Query(pattern=YEAR_MONTH_PATTERN),
+    end_month: str = Query(pattern=YEAR_MONTH_PATTERN),
+    db: Session = Depends(get_db),
+) -> StatsAnalyticsResponse:
+    """期間内のメンバーごとの合計と、項目ごとのメンバー間の最小・最大・平均"""
+    if start_month > end_month:
+        raise HTTPException(status_code=400, detail="開始年月は終了年月以前にしてください")
+
+    rows = (
+        db.query(
+            Member.id,
+            Member.name,
+            func.count(MemberMonthlyStat.id),
+            *(func.sum(getattr(MemberMonthlyStat, c)) for c in STAT_COLUMNS),
+        )
+        .join(MemberMonthlyStat, MemberMonthlyStat.member_id == Member.id)
+        .filter(MemberMonthlyStat.year_month.between(start_month, end_month))
+        .group_by(Member.id, Member.name, Member.position)
+        .order_by(Member.position, Member.id)
+        .all()
+    )
+    members = [
+        MemberStatTotals(
+            member_id=member_id,
+            member_name=name,
+            months=months,
+            **{c: int(v) for c, v in zip(STAT_COLUMNS, totals, strict=True)},
+        )
+        for member_id, name, months, *totals in rows
+    ]
+
+    spreads: list[MetricSpread] = []
+    if members:
+        for c in STAT_COLUMNS:
+            values = [getattr(m, c) for m in members]
+            spreads.append(MetricSpread(metric=c, min=min(values), max=max(values), mean=sum(values) / len(values)))
+    return StatsAnalyticsResponse(start_month=start_month, end_month=end_month, members=members, spreads=spreads)
@@ -0,0 +1,105 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Path, Query, Response
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session, joinedload
+
+from db.session import get_db
+from entity.member import Member
+from entity.pediatric_doctor_schedule import PediatricDoctorSchedule
+from entity.schedule import Schedule
+from entity.shift_assignment import ShiftAssignment
+from entity.shift_request import ShiftRequest
+from response.serialize import json_response
+from response.workspace import (
+    MonthWorkspaceResponse,
+    WorkspaceAssignment,
+    WorkspaceSchedule,
+    WorkspaceShiftRequest,
+)
+from routers.member import member_to_response
+from routers.schedule import build_schedule_summary
+from solver.config import get_month_dates
+
+router = APIRouter(prefix="/workspace", tags=["workspace"])
+
+WorkspaceSection = Literal["shift_requests", "pediatric_dates", "schedule", "summary"]
+
+WORKSPACE_SECTIONS: list[WorkspaceSection] = ["shift_requests", "pediatric_dates", "schedule", "summary"]
+
+_WORKSPACE = TypeAdapter(MonthWorkspaceResponse)
+
+
+@router.get("/{year_month}", response_model=MonthWorkspaceResponse)
+def get_month_workspace(
+    year_month: str = Path(pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    sections: list[WorkspaceSection] = Query(default=WORKSPACE_SECTIONS),
+    db: Session = Depends(get_db),
+) -> Response:
+    """月の画面を開くのに必要なメンバー・希望休・小児科医の出勤日・スケジュール・サマリーを1回で返す
+
+    セクションごとに必要なカラムだけを1回のクエリで読み（メンバーの数によらずクエリは最大7回）、
+    メンバー名は members にだけ含める。sections で返すセクションを選べる（メンバーは常に返す）。
+    """
+    dates = get_month_dates(year_month)
+    members = db.query(Member).options(joinedload(Member.capabilities)).order_by(Member.position, Member.id).all()
+
+    shift_requests = None
+    if "shift_requests" in sections:
+        shift_requests = [
+            WorkspaceShiftRequest(id=i, member_id=member_id, date=d, request_type=request_type)
+            for i, member_id, d, request_type in db.query(
+                ShiftRequest.id, ShiftRequest.member_id, ShiftRequest.date, ShiftRequest.request_type
+            )
+            .filter(ShiftRequest.year_month == year_month)
+            .order_by(ShiftRequest.member_id, ShiftRequest.date)
+        ]
+
+    pediatric_dates = None
+    if "pediatric_dates" in sections:
+        pediatric_dates = [
+            d
+            for (d,) in db.query(PediatricDoctorSchedule.date)
+            .filter(PediatricDoctorSchedule.date >= dates[0], PediatricDoctorSchedule.date <= dates[-1])
+            .order_by(PediatricDoctorSchedule.date)
+        ]
+
+    schedule = None
+    summary = None
+    if "schedule" in sections or "summary" in sections:
+        found = db.query(Schedule).filter(Schedule.year_month == year_month).first()
+        if found and "schedule" in sections:
+            schedule = WorkspaceSchedule(
+                id=found.id,
+                status=found.status,
+                version=found.version,
+                assignments=[
+                    WorkspaceAssignment(id=i, member_id=member_id, date=d, shift_type=shift_type, is_early=is_early)
+                    for i, member_id, d, shift_type, is_early in db.query(
+                        ShiftAssignment.id,
+                        ShiftAssignment.member_id,
+                        ShiftAssignment.date,
+                        ShiftAssignment.shift_type,
+                        ShiftAssignment.is_early,
+                    )
+                    .filter(ShiftAssignment.schedule_id == found.id)
+                    .order_by(ShiftAssignment.date, ShiftAssignment.id)
+                ],
+                created_at=found.created_at,
+                updated_at=found.updated_at,
+            )
+        if found and "summary" in sections:
+            summary = build_schedule_summary(db, found)
+
+    return json_response(
+        _WORKSPACE,
+        MonthWorkspaceResponse(
+            year_month=year_month,
+            dates=dates,
+            members=[member_to_response(m) for m in members],
+            shift_requests=shift_requests,
+            pediatric_dates=pediatric_dates,
+            schedule=schedule,
+            summary=summary,
+        ),
+    )
@@ -0,0 +1,91 @@
+"""期間の境界をまたいで引き継ぐメンバーごとの状態。"""
+
+import datetime
+from dataclasses import dataclass, field
+
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.shift_assignment import ShiftAssignment
+from solver.config import EXTERNAL_NIGHT_TYPES, NIGHT_SHIFT_TYPES, OFF_DAY_TYPES, get_year_month, is_holiday_work
+
+type Assignment = dict[str, object]
+
+# H9 の判定に必要な遡り日数（最大連続勤務5日 + 1）
+LOOKBACK_DAYS = 6
+
+
+@dataclass
+class BoundaryState:
+    """確定済みの期間から次の期間へ引き継ぐメンバーごとの状態。"""
+
+    night_member_ids: set[int] = field(default_factory=set)  # 最終日に夜勤・他院夜勤（H6）
+    work_runs: dict[int, int] = field(default_factory=dict)  # 最終日時点の連続勤務日数（H9）
+    month_nights: dict[str, dict[int, int]] = field(default_factory=dict)  # 月ごとの院内夜勤回数（H10/H16）
+    month_off_days: dict[str, dict[int, int]] = field(default_factory=dict)  # 月ごとの公休数（H11）
+    month_external_nights: dict[str, dict[int, int]] = field(default_factory=dict)  # 月ごとの他院夜勤回数（H17）
+    total_nights: dict[int, int] = field(default_factory=dict)  # 通算の院内夜勤回数（均等化のオフセット）
+    total_holidays: dict[int, int] = field(default_factory=dict)  # 通算の日祝出勤回数（均等化のオフセット）
+    total_earlies: dict[int, int] = field(default_factory=dict)  # 通算の早番回数（均等化のオフセット）
+
+    def advance(self, assignments: list[Assignment]) -> None:
+        """確定した割当を反映して境界状態を進める。割当は全メンバー×連続した日付を含むこと。"""
+        by_date: dict[datetime.date, list[Assignment]] = {}
+        for a in assignments:
+            d = a["date"]
+            d = d if isinstance(d, datetime.date) else datetime.date.fromisoformat(str(d))
+            by_date.setdefault(d, []).append(a)
+
+        for d in sorted(by_date):
+            ym = get_year_month(d)
+            nights = self.month_nights.setdefault(ym, {})
+            offs = self.month_off_days.setdefault(ym, {})
+            externals = self.month_external_nights.setdefault(ym, {})
+            night_ids: set[int] = set()
+            for a in by_date[d]:
+                m = int(a["member_id"])
+                st = a["shift_type"]
+                if st in OFF_DAY_TYPES:
+                    self.work_runs[m] = 0
+                else:
+                    self.work_runs[m] = self.work_runs.get(m, 0) + 1
+                if st == ShiftType.day_off:
+                    offs[m] = offs.get(m, 0) + 1
+                if st in NIGHT_SHIFT_TYPES:
+                    nights[m] = nights.get(m, 0) + 1
+                    self.total_nights[m] = self.total_nights.get(m, 0) + 1
+                if is_holiday_work(d, st):
+                    self.total_holidays[m] = self.total_holidays.get(m, 0) + 1
+                if a.get("is_early"):
+                    self.total_earlies[m] = self.total_earlies.get(m, 0) + 1
+                if st in EXTERNAL_NIGHT_TYPES:
+                    externals[m] = externals.get(m, 0) + 1
+                if st in NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES:
+                    night_ids.add(m)
+            self.night_member_ids = night_ids
+
+
+def load_boundary_state(db: Session, first_date: datetime.date) -> BoundaryState:
+    """first_date の直前に確定済みの割当から境界状態を読み込む。"""
+    since = first_date - datetime.timedelta(days=LOOKBACK_DAYS)
+    rows = (
+        db.query(ShiftAssignment.member_id, ShiftAssignment.date, ShiftAssignment.shift_type)
+        .filter(ShiftAssignment.date >= since, ShiftAssignment.date < first_date)
+        .all()
+    )
+    shifts: dict[int, dict[datetime.date, ShiftType]] = {}
+    for member_id, d, shift_type in rows:
+        shifts.setdefault(member_id, {})[d] = shift_type
+
+    state = BoundaryState()
+    last_day = first_date - datetime.timedelta(days=1)
+    for member_id, by_date in shifts.items():
+        if by_date.get(last_day) in NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES:
+            state.night_member_ids.add(member_id)
+        run = 0
+        d = last_day
+        while d >= since and d in by_date and by_date[d] not in OFF_DAY_TYPES:
+            run += 1
+            d -= datetime.timedelta(days=1)
+        state.work_runs[member_id] = run
+    return state
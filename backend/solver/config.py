@@ -152,6 +152,16 @@ def get_day_type(d: datetime.date) -> DayType:
     return DayType.weekday
 
 
+def get_holiday_dates(dates: list[datetime.date]) -> list[datetime.date]:
+    """日祝出勤を数える日（日曜・祝日。平日扱いにする日を除く）。"""
+    return [d for d in dates if get_day_type(d) == DayType.sunday_holiday]
+
+
+def is_holiday_work(d: datetime.date, shift_type: ShiftType) -> bool:
+    """日祝出勤か。日曜・祝日の公休・有給以外のシフトを数える（S3 の均等化・集計・過去の回数で共通）。"""
+    return shift_type not in OFF_DAY_TYPES and get_day_type(d) == DayType.sunday_holiday
+
+
 def get_month_dates(year_month: str) -> list[datetime.date]:
     year, month = map(int, year_month.split("-"))
     _, last_day = calendar.monthrange(year, month)
@@ -164,3 +174,23 @@ def get_base_off_days(days_in_month: int) -> int:
     if days_in_month == 30:
         return 9
     return 8
+
+
+def get_year_month(d: datetime.date) -> str:
+    return f"{d.year:04d}-{d.month:02d}"
+
+
+def get_month_range(start_month: str, end_month: str) -> list[str]:
+    year, month = map(int, start_month.split("-"))
+    months: list[str] = []
+    while (ym := f"{year:04d}-{month:02d}") <= end_month:
+        months.append(ym)
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+def add_months(year_month: str, months: int) -> str:
+    """year_month の months か月後（負なら前）の年月。"""
+    year, month = map(int, year_month.split("-"))
+    index = year * 12 + month - 1 + months
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
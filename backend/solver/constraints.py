@@ -12,6 +12,7 @@ from solver.config import (
     WARD_SHIFT_TYPES,
     DayType,
     get_day_type,
+    get_holiday_dates,
 )
 
 type VarDict = dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]]
@@ -202,6 +203,44 @@ def add_max_consecutive_work(
             model.add(sum(off_vars) >= 1)
 
 
+def add_prev_consecutive_work(
+    model: cp_model.CpModel,
+    x: VarDict,
+    member_ids: list[int],
+    dates: list[datetime.date],
+    prev_work_runs: dict[int, int],
+) -> None:
+    """H9 補助: 期間開始前から続く連続勤務を引き継ぎ、合計5日を超えないよう先頭付近に休みを入れる"""
+    for m in member_ids:
+        run = prev_work_runs.get(m, 0)
+        if run <= 0:
+            continue
+        window = dates[: max(6 - run, 1)]
+        if len(window) < 6 - run:
+            continue
+        off_vars = [x[m][str(d)][s] for d in window for s in OFF_DAY_TYPES]
+        model.add(sum(off_vars) >= 1)
+
+
+def add_shift_count_bounds(
+    model: cp_model.CpModel,
+    x: VarDict,
+    member_ids: list[int],
+    dates: list[datetime.date],
+    shift_types: set[ShiftType],
+    lower: dict[int, int],
+    upper: dict[int, int] | None = None,
+) -> None:
+    """H11/H17 期間分割用: 月の一部だけを解くときの回数を下限・上限の範囲で制約する"""
+    for m in member_ids:
+        count = sum(x[m][str(d)][s] for d in dates for s in shift_types)
+        lo = lower.get(m, 0)
+        if lo > 0:
+            model.add(count >= lo)
+        if upper is not None and m in upper:
+            model.add(count <= max(upper[m], 0))
+
+
 def add_night_shift_limit(
     model: cp_model.CpModel,
     x: VarDict,
@@ -405,21 +444,24 @@ def add_early_equalization(
     model: cp_model.CpModel,
     early: dict[int, dict[str, cp_model.IntVar]],
     dates: list[datetime.date],
+    offsets: dict[int, int] | None = None,
 ) -> cp_model.IntVar:
-    """S4: 早番回数の均等化。max-min差を返す"""
+    """S4: 早番回数の均等化。offsets は期間外の既存回数（定数）。max-min差を返す"""
+    base = offsets or {}
     early_member_ids = list(early.keys())
+    upper = len(dates) + max((base.get(m, 0) for m in early_member_ids), default=0)
     early_counts = []
     for m in early_member_ids:
-        count = model.new_int_var(0, len(dates), f"early_count_{m}")
-        model.add(count == sum(early[m][str(d)] for d in dates))
+        count = model.new_int_var(0, upper, f"early_count_{m}")
+        model.add(count == base.get(m, 0) + sum(early[m][str(d)] for d in dates))
         early_counts.append(count)
 
-    max_early = model.new_int_var(0, len(dates), "max_early")
-    min_early = model.new_int_var(0, len(dates), "min_early")
+    max_early = model.new_int_var(0, upper, "max_early")
+    min_early = model.new_int_var(0, upper, "min_early")
     model.add_max_equality(max_early, early_counts)
     model.add_min_equality(min_early, early_counts)
 
-    diff = model.new_int_var(0, len(dates), "early_diff")
+    diff = model.new_int_var(0, upper, "early_diff")
     model.add(diff == max_early - min_early)
     return diff
 
@@ -473,24 +515,27 @@ def add_night_equalization(
     x: VarDict,
     member_ids: list[int],
     dates: list[datetime.date],
+    offsets: dict[int, int] | None = None,
 ) -> cp_model.IntVar:
-    """S2: 夜勤回数の均等化。max-min差を返す"""
+    """S2: 夜勤回数の均等化。offsets は期間外の既存回数（定数）。max-min差を返す"""
+    base = offsets or {}
+    upper = len(dates) + max(base.values(), default=0)
     night_counts = []
     for m in member_ids:
-        count = model.new_int_var(0, len(dates), f"night_count_{m}")
+        count = model.new_int_var(0, upper, f"night_count_{m}")
         night_vars = []
         for d in dates:
             for ns in NIGHT_SHIFT_TYPES:
                 night_vars.append(x[m][str(d)][ns])
-        model.add(count == sum(night_vars))
+        model.add(count == base.get(m, 0) + sum(night_vars))
         night_counts.append(count)
 
-    max_night = model.new_int_var(0, len(dates), "max_night")
-    min_night = model.new_int_var(0, len(dates), "min_night")
+    max_night = model.new_int_var(0, upper, "max_night")
+    min_night = model.new_int_var(0, upper, "min_night")
     model.add_max_equality(max_night, night_counts)
     model.add_min_equality(min_night, night_counts)
 
-    diff = model.new_int_var(0, len(dates), "night_diff")
+    diff = model.new_int_var(0, upper, "night_diff")
     model.add(diff == max_night - min_night)
     return diff
 
@@ -518,28 +563,31 @@ def add_holiday_equalization(
     x: VarDict,
     member_ids: list[int],
     dates: list[datetime.date],
+    offsets: dict[int, int] | None = None,
 ) -> cp_model.IntVar:
-    """S3: 日祝出勤の均等化。max-min差を返す"""
-    holiday_dates = [d for d in dates if get_day_type(d) == DayType.sunday_holiday]
+    """S3: 日祝出勤の均等化。offsets は期間外の既存回数（定数）。max-min差を返す"""
+    holiday_dates = get_holiday_dates(dates)
     if not holiday_dates:
         return model.new_int_var(0, 0, "holiday_diff_zero")
 
+    base = offsets or {}
+    upper = len(holiday_dates) + max((base.get(m, 0) for m in member_ids), default=0)
     holiday_counts = []
     for m in member_ids:
-        count = model.new_int_var(0, len(holiday_dates), f"holiday_count_{m}")
+        count = model.new_int_var(0, upper, f"holiday_count_{m}")
         work_vars = []
         for d in holiday_dates:
             for s in ShiftType:
                 if s not in OFF_DAY_TYPES:
                     work_vars.append(x[m][str(d)][s])
-        model.add(count == sum(work_vars))
+        model.add(count == base.get(m, 0) + sum(work_vars))
         holiday_counts.append(count)
 
-    max_h = model.new_int_var(0, len(holiday_dates), "max_holiday")
-    min_h = model.new_int_var(0, len(holiday_dates), "min_holiday")
+    max_h = model.new_int_var(0, upper, "max_holiday")
+    min_h = model.new_int_var(0, upper, "min_holiday")
     model.add_max_equality(max_h, holiday_counts)
     model.add_min_equality(min_h, holiday_counts)
 
-    diff = model.new_int_var(0, len(holiday_dates), "holiday_diff")
+    diff = model.new_int_var(0, upper, "holiday_diff")
     model.add(diff == max_h - min_h)
     return diff
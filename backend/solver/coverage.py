@@ -0,0 +1,120 @@
+"""日付 × ポジションの配置人数と必要人数（充足状況のヒートマップ用）。
+
+配置人数は割当を (日付, シフト種別) でグループ化した1回のクエリで数える。
+結果はスケジュールの version ごとにメモリ上に保持し、割当が変わらない間は読み直さない。
+"""
+
+import datetime
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.pediatric_doctor_schedule import PediatricDoctorSchedule
+from entity.schedule import Schedule
+from entity.shift_assignment import ShiftAssignment
+from solver.config import STAFFING_REQUIREMENTS, get_day_type, get_month_dates
+
+# ヒートマップの列（必要人数の定義があるポジション）
+COVERAGE_SHIFT_TYPES: list[ShiftType] = [req.shift_type for req in STAFFING_REQUIREMENTS]
+# 保持するスケジュール数（古く使われたものから捨てる）
+COVERAGE_CACHE_SIZE = 32
+# 小児科医の勤務日に外来（助産師）に必要な人数
+PEDIATRIC_MW_OUTPATIENT_MIN_STAFF = 2
+
+
+@dataclass(frozen=True)
+class Coverage:
+    schedule_id: int
+    version: int
+    year_month: str
+    dates: list[datetime.date]
+    shift_types: list[ShiftType]
+    assigned: np.ndarray  # (日付, ポジション) の配置人数
+    min_staff: np.ndarray  # (日付, ポジション) の必要人数の下限
+    max_staff: np.ndarray  # (日付, ポジション) の必要人数の上限
+
+
+def staffing_bounds(
+    dates: list[datetime.date],
+    pediatric_dates: set[datetime.date],
+    shift_types: list[ShiftType],
+    unbounded: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """(日付, シフト種別) ごとの必要人数の下限・上限。定義のないシフトは 0〜unbounded。"""
+    lower = np.zeros((len(dates), len(shift_types)), dtype=np.int16)
+    upper = np.full((len(dates), len(shift_types)), unbounded, dtype=np.int16)
+    column = {s: k for k, s in enumerate(shift_types)}
+    day_types = [get_day_type(d) for d in dates]
+    for req in STAFFING_REQUIREMENTS:
+        k = column.get(req.shift_type)
+        if k is None:
+            continue
+        for j, d in enumerate(dates):
+            lower[j, k] = req.min_staff.get(day_types[j], 0)
+            upper[j, k] = req.max_staff.get(day_types[j], 0)
+            if req.shift_type == ShiftType.mw_outpatient and d in pediatric_dates:
+                lower[j, k] = max(lower[j, k], PEDIATRIC_MW_OUTPATIENT_MIN_STAFF)
+    return lower, upper
+
+
+def load_coverage(db: Session, schedule: Schedule) -> Coverage:
+    dates = get_month_dates(schedule.year_month)
+    pediatric_dates = {
+        d
+        for (d,) in db.query(PediatricDoctorSchedule.date).filter(
+            PediatricDoctorSchedule.date >= dates[0], PediatricDoctorSchedule.date <= dates[-1]
+        )
+    }
+    column = {s: k for k, s in enumerate(COVERAGE_SHIFT_TYPES)}
+    date_index = {d: j for j, d in enumerate(dates)}
+    assigned = np.zeros((len(dates), len(COVERAGE_SHIFT_TYPES)), dtype=np.int16)
+    rows = (
+        db.query(ShiftAssignment.date, ShiftAssignment.shift_type, func.count(ShiftAssignment.id))
+        .filter(ShiftAssignment.schedule_id == schedule.id)
+        .group_by(ShiftAssignment.date, ShiftAssignment.shift_type)
+    )
+    for d, s, count in rows:
+        j, k = date_index.get(d), column.get(s)
+        if j is not None and k is not None:
+            assigned[j, k] = count
+
+    lower, upper = staffing_bounds(dates, pediatric_dates, COVERAGE_SHIFT_TYPES, 0)
+    return Coverage(
+        schedule.id, schedule.version, schedule.year_month, dates, COVERAGE_SHIFT_TYPES, assigned, lower, upper
+    )
+
+
+# スケジュールID → 充足状況。スケジュールの version が一致する間だけ使う
+_coverages: OrderedDict[int, Coverage] = OrderedDict()
+_coverages_lock = threading.Lock()
+
+
+def get_coverage(db: Session, schedule: Schedule) -> Coverage:
+    """スケジュールの充足状況。同じ version のものを保持していればそれを返す。"""
+    with _coverages_lock:
+        cached = _coverages.get(schedule.id)
+        if cached is not None and cached.version == schedule.version:
+            _coverages.move_to_end(schedule.id)
+            return cached
+
+    coverage = load_coverage(db, schedule)
+    with _coverages_lock:
+        _coverages[schedule.id] = coverage
+        _coverages.move_to_end(schedule.id)
+        while len(_coverages) > COVERAGE_CACHE_SIZE:
+            _coverages.popitem(last=False)
+    return coverage
+
+
+def invalidate_coverage(schedule_id: int | None = None) -> None:
+    """充足状況を捨てる。schedule_id を省略するとすべて捨てる（小児科医の勤務日の変更など）。"""
+    with _coverages_lock:
+        if schedule_id is None:
+            _coverages.clear()
+        else:
+            _coverages.pop(schedule_id, None)
@@ -0,0 +1,388 @@
+"""手動編集の候補を返すための実行可能性インデックス。
+
+スケジュールを1回読み込み、メンバーごとの夜勤・公休・他院夜勤の回数と、日付ごとのポジション人数・夜勤メンバーを保持する。
+1マスの変更や同じ日の2マスの入れ替えがハード制約を破るかは、変更したマスの前後と回数の差分だけで判定できるため、
+候補1件あたりの判定はメンバー数・日数によらない。
+
+既に違反している制約は、変更で悪化しない限り違反として扱わない。
+
+インデックスはスケジュールごとにメモリ上に保持し、スケジュールの version が一致する間だけ使う。
+1マスずつの編集は record_feasibility_changes で差分を反映して version を進め、一括の書き換えや
+生成の入力（メンバー・希望休・NGペア・小児科医の出勤日）の変更では捨てて読み直させる。
+"""
+
+import datetime
+import threading
+from collections import Counter
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+from sqlalchemy.orm import Session
+
+from entity.enums import CapabilityType, Qualification, ShiftType
+from entity.schedule import Schedule
+from entity.shift_assignment import ShiftAssignment
+from solver.boundary import LOOKBACK_DAYS, BoundaryState, load_boundary_state
+from solver.config import (
+    DAY_SHIFT_TYPES,
+    EXTERNAL_NIGHT_TYPES,
+    NIGHT_SHIFT_TYPES,
+    OFF_DAY_TYPES,
+    STAFFING_REQUIREMENTS,
+    WARD_SHIFT_TYPES,
+    DayType,
+    StaffingRequirement,
+    get_day_type,
+)
+from solver.validators import MAX_CONSECUTIVE_WORK_DAYS, ROOKIE_WARD_MIN_STAFF
+
+if TYPE_CHECKING:
+    from solver.generator import ShiftProblem
+
+type Cell = tuple[int, datetime.date]
+# 1マスの変更（メンバー, 日付, 変更後のシフト, 早番）。シフトが None なら割当の削除
+type CellChange = tuple[int, datetime.date, ShiftType | None, bool]
+
+_REQUIREMENTS: dict[ShiftType, StaffingRequirement] = {r.shift_type: r for r in STAFFING_REQUIREMENTS}
+_NIGHT_OR_EXTERNAL = NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES
+
+
+def _distance(value: int, lower: int, upper: int) -> int:
+    """範囲 [lower, upper] からのはみ出し量。"""
+    return max(lower - value, value - upper, 0)
+
+
+def _worse(before: int, after: int, lower: int, upper: int) -> bool:
+    return _distance(after, lower, upper) > _distance(before, lower, upper)
+
+
+def load_schedule_inputs(
+    db: Session, schedule: Schedule
+) -> tuple[ShiftProblem, dict[Cell, ShiftType], set[Cell], BoundaryState]:
+    """生成の入力・割当（早番を含む）・前月からの境界状態を読み込む。"""
+    from solver.generator import build_problem
+
+    p = build_problem(db, schedule.year_month)
+    rows = (
+        db.query(ShiftAssignment.member_id, ShiftAssignment.date, ShiftAssignment.shift_type, ShiftAssignment.is_early)
+        .filter(ShiftAssignment.schedule_id == schedule.id)
+        .all()
+    )
+    cells = {(m, d): s for m, d, s, _ in rows}
+    early_cells = {(m, d) for m, d, _, is_early in rows if is_early}
+    return p, cells, early_cells, load_boundary_state(db, p.dates[0])
+
+
+@dataclass
+class Suggestions:
+    shifts: list[ShiftType]  # このマスに入れられるシフト
+    members: list[int]  # 同じ日に shift_type へ移れるメンバー
+    swaps: list[int]  # このマスと同じ日のシフトを入れ替えられるメンバー
+
+
+class FeasibilityIndex:
+    """1か月分の割当とメンバーごと・日付ごとの集計値。apply で1マスずつ差分更新できる。"""
+
+    def __init__(
+        self,
+        p: ShiftProblem,
+        cells: dict[Cell, ShiftType],
+        early_cells: set[Cell] | None = None,
+        boundary: BoundaryState | None = None,
+        version: int = 0,
+    ) -> None:
+        self.p = p
+        self.version = version
+        self.dates = p.dates
+        self.date_index = {d: i for i, d in enumerate(p.dates)}
+        self.day_types = {d: get_day_type(d) for d in p.dates}
+        self.prev_night_ids = boundary.night_member_ids if boundary else p.prev_night_member_ids
+        self.prev_work_runs = boundary.work_runs if boundary else {}
+
+        members = set(p.member_ids)
+        self.cells = {c: s for c, s in cells.items() if c[0] in members and c[1] in self.date_index}
+        self.early_cells = {c for c in early_cells or set() if c in self.cells}
+
+        self.ng: dict[int, set[int]] = {m: set() for m in p.member_ids}
+        for a, b in p.ng_pairs:
+            if a in members and b in members:
+                self.ng[a].add(b)
+                self.ng[b].add(a)
+        self.requests = {(m, d): s for m, entries in p.request_map.items() for d, s in entries}
+        self.night_requests = {(m, d) for m, ds in p.night_shift_request_map.items() for d in ds}
+        self.midwives = {m for m in p.member_ids if p.member_qualifications.get(m) == Qualification.midwife}
+        self.ward_capable = {
+            m for m in p.member_ids if CapabilityType.ward_staff in p.member_capabilities.get(m, set())
+        }
+        self.rookies = set(p.rookie_ids)
+
+        self.night_counts: Counter[int] = Counter()
+        self.off_counts: Counter[int] = Counter()
+        self.external_counts: Counter[int] = Counter()
+        self.staff: dict[datetime.date, Counter[ShiftType]] = {d: Counter() for d in p.dates}
+        self.night_members: dict[datetime.date, set[int]] = {d: set() for d in p.dates}
+        self.ward_counts: Counter[datetime.date] = Counter()
+        self.rookies_in_ward: dict[datetime.date, set[int]] = {d: set() for d in p.dates}
+        for (m, d), s in self.cells.items():
+            self._count(m, d, s, 1)
+
+    @classmethod
+    def load(cls, db: Session, schedule: Schedule) -> FeasibilityIndex:
+        """スケジュールの割当と生成の入力をまとめて読み込む。クエリ数はメンバー数・候補数によらない。"""
+        return cls(*load_schedule_inputs(db, schedule), version=schedule.version)
+
+    def _count(self, m: int, d: datetime.date, s: ShiftType, sign: int) -> None:
+        if s in NIGHT_SHIFT_TYPES:
+            self.night_counts[m] += sign
+            if sign > 0:
+                self.night_members[d].add(m)
+            else:
+                self.night_members[d].discard(m)
+        elif s == ShiftType.day_off:
+            self.off_counts[m] += sign
+        elif s in EXTERNAL_NIGHT_TYPES:
+            self.external_counts[m] += sign
+        if s in WARD_SHIFT_TYPES:
+            if m in self.ward_capable:
+                self.ward_counts[d] += sign
+            if m in self.rookies:
+                if sign > 0:
+                    self.rookies_in_ward[d].add(m)
+                else:
+                    self.rookies_in_ward[d].discard(m)
+        self.staff[d][s] += sign
+
+    def apply(self, m: int, d: datetime.date, s: ShiftType | None, *, is_early: bool = False) -> None:
+        """1マスの変更を反映する（None は割当の削除）。このインデックスにないメンバー・日付は無視する。"""
+        if m not in self.ng or d not in self.date_index:
+            return
+        old = self.cells.pop((m, d), None)
+        if old is not None:
+            self._count(m, d, old, -1)
+        self.early_cells.discard((m, d))
+        if s is not None:
+            self.cells[(m, d)] = s
+            self._count(m, d, s, 1)
+            if is_early:
+                self.early_cells.add((m, d))
+
+    def violations(self, d: datetime.date, changes: dict[int, ShiftType]) -> set[str]:
+        """同じ日の変更（メンバー → 変更後のシフト）で新たに破られるハード制約の番号を返す。"""
+        codes: set[str] = set()
+        for m, s in changes.items():
+            codes |= self._member_violations(m, d, s)
+        return codes | self._date_violations(d, changes)
+
+    def _ineligible(self, m: int, s: ShiftType) -> str | None:
+        caps = self.p.member_capabilities.get(m, set())
+        if s in DAY_SHIFT_TYPES and CapabilityType.day_shift not in caps:
+            return "H4"
+        if s in _NIGHT_OR_EXTERNAL and CapabilityType.night_shift not in caps:
+            return "H5"
+        req = _REQUIREMENTS.get(s)
+        if req and (
+            any(c not in caps for c in req.required_capabilities)
+            or (req.required_qualification and self.p.member_qualifications.get(m) != req.required_qualification)
+        ):
+            return "H3"
+        return None
+
+    def _run(self, m: int, i: int, step: int) -> int:
+        """i から step 方向へ続く勤務日数（上限+1まで）。月初より前は前月からの連続勤務を足す。"""
+        run = 0
+        while 0 <= i < len(self.dates) and run <= MAX_CONSECUTIVE_WORK_DAYS:
+            s = self.cells.get((m, self.dates[i]))
+            if s is None or s in OFF_DAY_TYPES:
+                return run
+            run += 1
+            i += step
+        if i < 0:
+            run += self.prev_work_runs.get(m, 0)
+        return run
+
+    def _member_violations(self, m: int, d: datetime.date, s: ShiftType) -> set[str]:
+        cell = (m, d)
+        old = self.cells.get(cell)
+        if s == old:
+            return set()
+        p = self.p
+        codes: set[str] = set()
+
+        if code := self._ineligible(m, s):
+            codes.add(code)
+        if self.day_types[d] == DayType.sunday_holiday and s in DAY_SHIFT_TYPES - WARD_SHIFT_TYPES:
+            codes.add("H14")
+
+        # H6: 夜勤の翌日は休み
+        i = self.date_index[d]
+        prev = self.cells.get((m, self.dates[i - 1])) if i > 0 else None
+        prev_night = prev in _NIGHT_OR_EXTERNAL if i > 0 else m in self.prev_night_ids
+        nxt = self.cells.get((m, self.dates[i + 1])) if i + 1 < len(self.dates) else None
+        if prev_night and s not in OFF_DAY_TYPES:
+            codes.add("H6")
+        if s in _NIGHT_OR_EXTERNAL and nxt is not None and nxt not in OFF_DAY_TYPES:
+            codes.add("H6")
+
+        # H9: 休みを勤務に変えたときだけ連続勤務が伸びる
+        if s not in OFF_DAY_TYPES and (old is None or old in OFF_DAY_TYPES):
+            if self._run(m, i - 1, -1) + 1 + self._run(m, i + 1, 1) > MAX_CONSECUTIVE_WORK_DAYS:
+                codes.add("H9")
+
+        ext = p.member_external_nights.get(m, 0)
+        night_delta = (s in NIGHT_SHIFT_TYPES) - (old in NIGHT_SHIFT_TYPES)
+        if night_delta:
+            nights = self.night_counts[m]
+            max_n = p.member_max_nights.get(m, 4) - ext
+            min_n = p.member_min_nights.get(m, 0) - ext
+            if _worse(nights, nights + night_delta, 0, max_n):
+                codes.add("H10")
+            if _worse(nights, nights + night_delta, min_n, len(self.dates)):
+                codes.add("H16")
+        off_delta = (s == ShiftType.day_off) - (old == ShiftType.day_off)
+        if off_delta:
+            offs = self.off_counts[m]
+            required = p.member_off_days.get(m, 10)
+            upper = len(self.dates) if m in p.part_time_ids else required
+            if _worse(offs, offs + off_delta, required, upper):
+                codes.add("H11")
+        ext_delta = (s in EXTERNAL_NIGHT_TYPES) - (old in EXTERNAL_NIGHT_TYPES)
+        if ext_delta and _worse(self.external_counts[m], self.external_counts[m] + ext_delta, ext, ext):
+            codes.add("H17")
+
+        requested = self.requests.get(cell)
+        if requested is not None and old == requested:
+            codes.add("H12")
+        if s == ShiftType.paid_leave and requested != ShiftType.paid_leave:
+            codes.add("H12")
+        if cell in self.night_requests and s not in NIGHT_SHIFT_TYPES:
+            codes.add("H18")
+        if cell in self.early_cells and s not in DAY_SHIFT_TYPES:
+            codes.add("H15")
+        return codes
+
+    def _staffing_range(self, d: datetime.date, s: ShiftType) -> tuple[int, int] | None:
+        req = _REQUIREMENTS.get(s)
+        if req is None:
+            return None
+        day_type = self.day_types[d]
+        lower = req.min_staff.get(day_type, 0)
+        if s == ShiftType.mw_outpatient and d in self.p.pediatric_dates:
+            lower = max(lower, 2)
+        return lower, req.max_staff.get(day_type, 0)
+
+    def _date_violations(self, d: datetime.date, changes: dict[int, ShiftType]) -> set[str]:
+        codes: set[str] = set()
+        delta: Counter[ShiftType] = Counter()
+        for m, s in changes.items():
+            old = self.cells.get((m, d))
+            if old == s:
+                continue
+            if old is not None:
+                delta[old] -= 1
+            delta[s] += 1
+
+        # H2: ポジションごとの人数
+        for s, dlt in delta.items():
+            bounds = self._staffing_range(d, s)
+            if dlt and bounds and _worse(self.staff[d][s], self.staff[d][s] + dlt, *bounds):
+                codes.add("H2")
+
+        nights = self.night_members[d]
+        nights_after = {m for m in nights if m not in changes} | {
+            m for m, s in changes.items() if s in NIGHT_SHIFT_TYPES
+        }
+        if nights_after != nights:
+            # H7: NGペアの同日夜勤
+            if any(self.ng[m] & nights_after for m in nights_after - nights):
+                codes.add("H7")
+            # H8: 夜勤に助産師
+            if nights_after and not nights_after & self.midwives and (not nights or nights & self.midwives):
+                codes.add("H8")
+
+        # H13: 新人が病棟に入る日は病棟系5名
+        ward = self.ward_counts[d]
+        ward_after = ward
+        rookies_after = set(self.rookies_in_ward[d])
+        for m, s in changes.items():
+            in_before = self.cells.get((m, d)) in WARD_SHIFT_TYPES
+            in_after = s in WARD_SHIFT_TYPES
+            if m in self.ward_capable:
+                ward_after += in_after - in_before
+            if m in self.rookies and in_after:
+                rookies_after.add(m)
+            elif m in self.rookies:
+                rookies_after.discard(m)
+        violated_before = bool(self.rookies_in_ward[d]) and ward < ROOKIE_WARD_MIN_STAFF
+        violated_after = bool(rookies_after) and ward_after < ROOKIE_WARD_MIN_STAFF
+        if violated_after and (not violated_before or ward_after < ward):
+            codes.add("H13")
+        return codes
+
+    def suggest(self, m: int, d: datetime.date, shift_type: ShiftType | None = None) -> Suggestions:
+        """マス (m, d) について、入れられるシフト・shift_type に移れるメンバー・入れ替え相手を返す。
+
+        shift_type を省略した場合は、このマスの現在のシフトに移れるメンバーを返す。
+        """
+        current = self.cells.get((m, d))
+        target = shift_type or current
+        shifts = [s for s in ShiftType if s != current and not self.violations(d, {m: s})]
+
+        members: list[int] = []
+        swaps: list[int] = []
+        for n in self.p.member_ids:
+            if n == m:
+                continue
+            theirs = self.cells.get((n, d))
+            if target is not None and theirs != target and not self.violations(d, {n: target}):
+                members.append(n)
+            if current is not None and theirs is not None and theirs != current:
+                if not self.violations(d, {m: theirs, n: current}):
+                    swaps.append(n)
+        return Suggestions(shifts=shifts, members=members, swaps=swaps)
+
+
+# スケジュールID → インデックス。スケジュールの version が一致する間だけ使う
+_indexes: dict[int, FeasibilityIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+@contextmanager
+def feasibility_index(db: Session, schedule: Schedule) -> Iterator[FeasibilityIndex]:
+    """スケジュールのインデックス。無いか version が違えば読み直す。with の間はほかのリクエストが更新しない。"""
+    with _indexes_lock:
+        index = _indexes.get(schedule.id)
+        if index is None or index.version != schedule.version:
+            index = FeasibilityIndex.load(db, schedule)
+            _indexes[schedule.id] = index
+        yield index
+
+
+def record_feasibility_changes(schedule_id: int, version: int, changes: Iterable[CellChange]) -> None:
+    """コミット済みの1マスずつの変更を反映して version へ進める。インデックスが無いか古ければ捨てる。"""
+    changes = list(changes)
+    with _indexes_lock:
+        # 月末の変更は翌月の前月境界（H6/H9）を変えるため、翌月のインデックスを捨てる
+        for other_id, other in list(_indexes.items()):
+            if other_id != schedule_id and any(
+                0 < (other.dates[0] - d).days <= LOOKBACK_DAYS for _, d, _, _ in changes
+            ):
+                del _indexes[other_id]
+
+        index = _indexes.get(schedule_id)
+        if index is None or index.version != version - 1:
+            _indexes.pop(schedule_id, None)
+            return
+        for m, d, s, is_early in changes:
+            index.apply(m, d, s, is_early=is_early)
+        index.version = version
+
+
+def invalidate_feasibility_index(schedule_id: int | None = None) -> None:
+    """インデックスを捨てる。schedule_id を省略するとすべて捨てる（生成の入力の変更など）。"""
+    with _indexes_lock:
+        if schedule_id is None:
+            _indexes.clear()
+        else:
+            _indexes.pop(schedule_id, None)
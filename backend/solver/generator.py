@@ -1,18 +1,30 @@
-import calendar
 import datetime
 import logging
+from collections.abc import Callable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 
 from ortools.sat.python import cp_model
 from sqlalchemy.orm import Session
 
-from entity.enums import CapabilityType, EmploymentType, Qualification, RequestType, ShiftType
+from entity.enums import CapabilityType, EmploymentType, ObjectiveMode, Qualification, RequestType, ShiftType
 from entity.member import Member
 from entity.member_capability import MemberCapability
 from entity.ng_pair import NgPair
 from entity.schedule import Schedule
 from entity.shift_assignment import ShiftAssignment
 from entity.shift_request import ShiftRequest
-from solver.config import ALL_SHIFT_TYPES, EXTERNAL_NIGHT_TYPES, NIGHT_SHIFT_TYPES, get_base_off_days, get_month_dates
+from solver.boundary import BoundaryState, load_boundary_state
+from solver.config import (
+    ALL_SHIFT_TYPES,
+    EXTERNAL_NIGHT_TYPES,
+    NIGHT_SHIFT_TYPES,
+    add_months,
+    get_base_off_days,
+    get_month_dates,
+    get_year_month,
+    is_holiday_work,
+)
 from solver.constraints import (
     add_capability_constraints,
     add_day_shift_eligibility,
@@ -34,6 +46,7 @@ from solver.constraints import (
     add_off_day_count,
     add_one_shift_per_day,
     add_paid_leave_only_requested,
+    add_prev_consecutive_work,
     add_prev_month_night_rest,
     add_rookie_ward_constraint,
     add_shift_request_hard,
@@ -42,11 +55,20 @@ from solver.constraints import (
     add_sunday_holiday_ward_only,
 )
 from solver.diagnostics import diagnose_infeasibility
+from solver.stats import MemberHistory, load_member_history
 
 logger = logging.getLogger(__name__)
 
 SOLVER_TIMEOUT_SECONDS = 60
 RELAXATION_TIMEOUT_SECONDS = 10
+# 代替案どうしで最低限異なるマス数と、代替案1件あたりの求解時間
+ALTERNATIVE_MIN_DIFF_CELLS = 10
+ALTERNATIVE_TIMEOUT_SECONDS = 10
+# 辞書式モードの各段階の求解時間（実行可能解を求める最初の求解は SOLVER_TIMEOUT_SECONDS）
+LEXICOGRAPHIC_STAGE_TIMEOUT_SECONDS = 20
+# 緩和診断は同時に解くモデル数 × 1モデルあたりのワーカー数でCPUを分け合う
+RELAXATION_PARALLELISM = 4
+RELAXATION_SOLVER_WORKERS = 2
 
 # 緩和対象の制約ラベル（H1-H5は基本制約のためスキップ不可）
 CONSTRAINT_LABELS: dict[str, str] = {
@@ -65,9 +87,35 @@ CONSTRAINT_LABELS: dict[str, str] = {
 }
 
 
-def _load_data(
-    db: Session, year_month: str
-) -> tuple[
+@dataclass
+class ShiftProblem:
+    """1か月分のシフト生成の入力。ORMオブジェクトを持たないためプロセス間で受け渡しできる。"""
+
+    year_month: str
+    dates: list[datetime.date]
+    member_ids: list[int]
+    member_names: dict[int, str]
+    member_capabilities: dict[int, set[CapabilityType]]
+    member_qualifications: dict[int, Qualification]
+    member_max_nights: dict[int, int]
+    member_min_nights: dict[int, int]
+    member_external_nights: dict[int, int]
+    member_off_days: dict[int, int]
+    ng_pairs: list[tuple[int, int]]
+    request_map: dict[int, list[tuple[datetime.date, ShiftType]]]
+    day_shift_request_map: dict[int, list[datetime.date]]
+    night_shift_request_map: dict[int, list[datetime.date]]
+    pediatric_dates: set[datetime.date]
+    prev_night_member_ids: set[int]
+    rookie_ids: list[int]
+    part_time_ids: set[int]
+    # 過去の月の通算回数（均等化のオフセット。過去を見ない場合は空）
+    night_history: dict[int, int] = field(default_factory=dict)
+    holiday_history: dict[int, int] = field(default_factory=dict)
+    early_history: dict[int, int] = field(default_factory=dict)
+
+
+type LoadedData = tuple[
     list[Member],
     dict[int, set[CapabilityType]],
     dict[int, Qualification],
@@ -80,7 +128,30 @@ def _load_data(
     dict[int, list[datetime.date]],
     set[datetime.date],
     set[int],
-]:
+]
+
+
+@dataclass(frozen=True)
+class ObjectiveWeights:
+    """重み付き和モードでの各目的の重み。"""
+
+    requests: int = 100
+    night_minimum_shortfall: int = 50
+    night_diff: int = 10
+    holiday_diff: int = 5
+    early_diff: int = 3
+    day_shift_requests: int = 2
+
+
+DEFAULT_OBJECTIVE_WEIGHTS = ObjectiveWeights()
+
+
+def _load_data(db: Session, year_month: str) -> LoadedData:
+    return _load_data_batch(db, [year_month])[year_month]
+
+
+def _load_data_batch(db: Session, year_months: list[str]) -> dict[str, LoadedData]:
+    """複数月分の入力をテーブルごとに1クエリでまとめて読み込む。"""
     all_members = db.query(Member).order_by(Member.id).all()
 
     member_capabilities: dict[int, set[CapabilityType]] = {}
@@ -98,67 +169,70 @@ def _load_data(
     ng_pairs_raw = db.query(NgPair).all()
     ng_pairs = [(p.member_id_1, p.member_id_2) for p in ng_pairs_raw]
 
-    requests_raw = db.query(ShiftRequest).filter(ShiftRequest.year_month == year_month).all()
-    request_map: dict[int, list[tuple[datetime.date, ShiftType]]] = {}
-    day_shift_request_map: dict[int, list[datetime.date]] = {}
-    night_shift_request_map: dict[int, list[datetime.date]] = {}
-    for r in requests_raw:
-        if r.request_type == RequestType.day_shift_request:
-            day_shift_request_map.setdefault(r.member_id, []).append(r.date)
-        elif r.request_type == RequestType.night_shift_request:
-            night_shift_request_map.setdefault(r.member_id, []).append(r.date)
-        else:
-            shift_type = ShiftType.paid_leave if r.request_type == RequestType.paid_leave else ShiftType.day_off
-            request_map.setdefault(r.member_id, []).append((r.date, shift_type))
+    requests_by_month: dict[str, list[ShiftRequest]] = {}
+    for r in db.query(ShiftRequest).filter(ShiftRequest.year_month.in_(year_months)).all():
+        requests_by_month.setdefault(r.year_month, []).append(r)
 
     from entity.pediatric_doctor_schedule import PediatricDoctorSchedule
 
-    dates = get_month_dates(year_month)
+    month_dates = {ym: get_month_dates(ym) for ym in year_months}
+    first = min(dates[0] for dates in month_dates.values())
+    last = max(dates[-1] for dates in month_dates.values())
     pediatric_raw = (
         db.query(PediatricDoctorSchedule)
-        .filter(PediatricDoctorSchedule.date >= dates[0], PediatricDoctorSchedule.date <= dates[-1])
+        .filter(PediatricDoctorSchedule.date >= first, PediatricDoctorSchedule.date <= last)
         .all()
     )
-    pediatric_dates = {p.date for p in pediatric_raw}
+    all_pediatric_dates = {p.date for p in pediatric_raw}
 
     # 前月最終日に夜勤だったメンバーを取得
-    year, month = map(int, year_month.split("-"))
-    if month == 1:
-        prev_year, prev_month = year - 1, 12
-    else:
-        prev_year, prev_month = year, month - 1
-    prev_year_month = f"{prev_year:04d}-{prev_month:02d}"
-    _, prev_last_day = calendar.monthrange(prev_year, prev_month)
-    prev_last_date = datetime.date(prev_year, prev_month, prev_last_day)
-
-    prev_night_member_ids: set[int] = set()
-    prev_schedule = db.query(Schedule).filter(Schedule.year_month == prev_year_month).first()
-    if prev_schedule:
-        prev_night_assignments = (
-            db.query(ShiftAssignment)
-            .filter(
-                ShiftAssignment.schedule_id == prev_schedule.id,
-                ShiftAssignment.date == prev_last_date,
-                ShiftAssignment.shift_type.in_(list(NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES)),
-            )
-            .all()
+    prev_last_dates = {ym: dates[0] - datetime.timedelta(days=1) for ym, dates in month_dates.items()}
+    prev_nights_by_date: dict[datetime.date, set[int]] = {}
+    prev_night_assignments = (
+        db.query(ShiftAssignment.member_id, ShiftAssignment.date)
+        .join(Schedule, ShiftAssignment.schedule_id == Schedule.id)
+        .filter(
+            Schedule.year_month.in_([get_year_month(d) for d in prev_last_dates.values()]),
+            ShiftAssignment.date.in_(list(prev_last_dates.values())),
+            ShiftAssignment.shift_type.in_(list(NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES)),
         )
-        prev_night_member_ids = {a.member_id for a in prev_night_assignments}
-
-    return (
-        members,
-        member_capabilities,
-        member_qualifications,
-        member_max_nights,
-        member_min_nights,
-        member_external_nights,
-        ng_pairs,
-        request_map,
-        day_shift_request_map,
-        night_shift_request_map,
-        pediatric_dates,
-        prev_night_member_ids,
+        .all()
     )
+    for member_id, d in prev_night_assignments:
+        prev_nights_by_date.setdefault(d, set()).add(member_id)
+
+    result: dict[str, LoadedData] = {}
+    for ym in year_months:
+        request_map: dict[int, list[tuple[datetime.date, ShiftType]]] = {}
+        day_shift_request_map: dict[int, list[datetime.date]] = {}
+        night_shift_request_map: dict[int, list[datetime.date]] = {}
+        for r in requests_by_month.get(ym, []):
+            if r.request_type == RequestType.day_shift_request:
+                day_shift_request_map.setdefault(r.member_id, []).append(r.date)
+            elif r.request_type == RequestType.night_shift_request:
+                night_shift_request_map.setdefault(r.member_id, []).append(r.date)
+            else:
+                shift_type = ShiftType.paid_leave if r.request_type == RequestType.paid_leave else ShiftType.day_off
+                request_map.setdefault(r.member_id, []).append((r.date, shift_type))
+
+        dates = month_dates[ym]
+        pediatric_dates = {d for d in all_pediatric_dates if dates[0] <= d <= dates[-1]}
+
+        result[ym] = (
+            members,
+            member_capabilities,
+            member_qualifications,
+            member_max_nights,
+            member_min_nights,
+            member_external_nights,
+            ng_pairs,
+            request_map,
+            day_shift_request_map,
+            night_shift_request_map,
+            pediatric_dates,
+            prev_nights_by_date.get(prev_last_dates[ym], set()),
+        )
+    return result
 
 
 def _create_variables(
@@ -194,6 +268,7 @@ def _add_hard_constraints(
     part_time_ids: set[int] | None = None,
     skip_constraints: set[str] | None = None,
     prev_night_member_ids: set[int] | None = None,
+    prev_work_runs: dict[int, int] | None = None,
 ) -> dict[int, dict[str, cp_model.IntVar]] | None:
     skip = skip_constraints or set()
 
@@ -214,6 +289,8 @@ def _add_hard_constraints(
         add_night_midwife_constraint(model, x, member_ids, dates, member_qualifications)
     if "H9" not in skip:
         add_max_consecutive_work(model, x, member_ids, dates)
+        if prev_work_runs:
+            add_prev_consecutive_work(model, x, member_ids, dates, prev_work_runs)
     if "H10" not in skip:
         add_night_shift_limit(model, x, member_ids, dates, member_max_nights, member_external_nights)
     if "H11" not in skip:
@@ -247,13 +324,13 @@ def _diagnose_by_relaxation(
     member_external_nights: dict[int, int] | None = None,
     part_time_ids: set[int] | None = None,
 ) -> list[str]:
-    """制約を1つずつ外して再求解し、どの制約が原因か特定する。"""
-    relaxable: list[str] = []
+    """制約を1つずつ外して再求解し、どの制約が原因か特定する。
 
-    for key, label in CONSTRAINT_LABELS.items():
-        if key == "H13" and not rookie_ids:
-            continue
+    各緩和は独立しているため並列に解く（CP-SATは求解中にGILを解放する）。
+    """
+    keys = [key for key in CONSTRAINT_LABELS if not (key == "H13" and not rookie_ids)]
 
+    def is_feasible_without(key: str) -> bool:
         model = cp_model.CpModel()
         x = _create_variables(model, member_ids, dates)
         _add_hard_constraints(
@@ -276,17 +353,160 @@ def _diagnose_by_relaxation(
 
         solver = cp_model.CpSolver()
         solver.parameters.max_time_in_seconds = RELAXATION_TIMEOUT_SECONDS
+        solver.parameters.num_workers = RELAXATION_SOLVER_WORKERS
         status = solver.solve(model)
+        return status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+    with ThreadPoolExecutor(max_workers=RELAXATION_PARALLELISM) as executor:
+        feasible = list(executor.map(is_feasible_without, keys))
 
-        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+    relaxable: list[str] = []
+    for key, ok in zip(keys, feasible, strict=True):
+        if ok:
+            label = CONSTRAINT_LABELS[key]
             relaxable.append(f"「{label}」（{key}）を緩和すると解が見つかります")
             logger.info("Relaxation diagnostic: removing %s (%s) makes problem feasible", key, label)
 
     return relaxable
 
 
-def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
-    """シフトを生成する。(assignments, unfulfilled_requests)を返す。"""
+type Objective = tuple[str, cp_model.LinearExprT, int]  # (名前, 最小化する式, 重み付き和での重み)
+
+
+def _new_solver(time_limit: float, num_workers: int = 0) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    if num_workers:
+        solver.parameters.num_workers = num_workers
+    return solver
+
+
+def _add_solution_hint(model: cp_model.CpModel, solution: Sequence[int]) -> None:
+    """同じ構造のモデルで得た解をヒントとして与える。変数の数が違うモデルには何もしない。"""
+    if len(solution) != len(model.proto.variables):
+        return
+    model.clear_hints()
+    model.proto.solution_hint.vars.extend(range(len(solution)))
+    model.proto.solution_hint.values.extend(solution)
+
+
+def _solve_objectives(
+    model: cp_model.CpModel,
+    objectives: list[Objective],
+    mode: ObjectiveMode,
+    *,
+    hint: Sequence[int] | None = None,
+    time_limit: float = SOLVER_TIMEOUT_SECONDS,
+    num_workers: int = 0,
+    first_solution: bool = False,
+) -> tuple[cp_model.CpSolver, cp_model.CpSolverStatus]:
+    """目的のリスト（優先順位順）を mode に従って解く。
+
+    first_solution=True の場合は目的を設定せず、実行可能解が1つ見つかった時点で返す（解があるかの判定用）。
+    """
+    if hint:
+        _add_solution_hint(model, hint)
+    if first_solution:
+        solver = _new_solver(time_limit, num_workers)
+        return solver, solver.solve(model)
+    if mode == ObjectiveMode.lexicographic:
+        return _solve_lexicographic(model, objectives, time_limit=time_limit, num_workers=num_workers)
+
+    model.minimize(sum(expr * weight for _, expr, weight in objectives))
+    solver = _new_solver(time_limit, num_workers)
+    return solver, solver.solve(model)
+
+
+def _solve_lexicographic(
+    model: cp_model.CpModel,
+    objectives: list[Objective],
+    *,
+    time_limit: float = SOLVER_TIMEOUT_SECONDS,
+    num_workers: int = 0,
+) -> tuple[cp_model.CpSolver, cp_model.CpSolverStatus]:
+    """目的を1つずつ最小化し、得られた値を制約として固定してから次の目的へ進む。
+
+    先に目的なしで実行可能解を求め、各段階は直前の解をヒントに始める。
+    そのため段階が時間切れになっても、直前の段階の解が残る。
+    """
+    best = _new_solver(time_limit, num_workers)
+    best_status = best.solve(model)
+    if best_status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return best, best_status
+
+    for name, expr, _ in objectives:
+        if isinstance(expr, int):
+            continue
+        _add_solution_hint(model, best.response_proto.solution)
+        model.minimize(expr)
+
+        solver = _new_solver(LEXICOGRAPHIC_STAGE_TIMEOUT_SECONDS, num_workers)
+        status = solver.solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            logger.info("Lexicographic stage %s found no solution. Keeping previous stage.", name)
+            break
+
+        optimum = round(solver.objective_value)
+        model.add(expr <= optimum)
+        logger.info("Lexicographic stage %s: %d (%s)", name, optimum, solver.status_name(status))
+        best, best_status = solver, status
+
+    return best, best_status
+
+
+def build_problem(db: Session, year_month: str, *, lookback_months: int = 0) -> ShiftProblem:
+    """DBから入力データを読み込み、公休日数などの派生値を計算する。
+
+    lookback_months を指定すると、直前の月までの集計（member_monthly_stats）から
+    夜勤・日祝出勤・早番の通算回数を読み、均等化のオフセットにする。
+    """
+    p = _to_problem(year_month, _load_data(db, year_month))
+    if lookback_months:
+        history = load_member_history(db, add_months(year_month, -lookback_months), add_months(year_month, -1))
+        _set_history(p, history)
+    return p
+
+
+def build_problems(db: Session, year_months: list[str], *, lookback_months: int = 0) -> list[ShiftProblem]:
+    """複数月分の入力をまとめて読み込む。
+
+    過去の回数は期間の開始より前の月の集計だけを読む。期間内の月の分は求解しながら add_history で加える。
+    """
+    loaded = _load_data_batch(db, year_months)
+    problems = [_to_problem(ym, loaded[ym]) for ym in year_months]
+    if lookback_months:
+        before_start = add_months(min(year_months), -1)
+        for p in problems:
+            start = add_months(p.year_month, -lookback_months)
+            _set_history(p, load_member_history(db, start, min(add_months(p.year_month, -1), before_start)))
+    return problems
+
+
+def _set_history(p: ShiftProblem, history: MemberHistory) -> None:
+    members = set(p.member_ids)
+    p.night_history = {m: n for m, n in history.nights.items() if m in members}
+    p.holiday_history = {m: n for m, n in history.holidays.items() if m in members}
+    p.early_history = {m: n for m, n in history.earlies.items() if m in members}
+
+
+def add_history(p: ShiftProblem, assignments: list[dict[str, object]]) -> None:
+    """求解済みの月の割当の回数を p の過去の回数に加える。数え方は member_monthly_stats と同じ。"""
+    for a in assignments:
+        m = int(a["member_id"])
+        if m not in p.member_ids:
+            continue
+        s = a["shift_type"]
+        d = a["date"]
+        d = d if isinstance(d, datetime.date) else datetime.date.fromisoformat(str(d))
+        if s in NIGHT_SHIFT_TYPES:
+            p.night_history[m] = p.night_history.get(m, 0) + 1
+        if is_holiday_work(d, s):
+            p.holiday_history[m] = p.holiday_history.get(m, 0) + 1
+        if a.get("is_early"):
+            p.early_history[m] = p.early_history.get(m, 0) + 1
+
+
+def _to_problem(year_month: str, data: LoadedData) -> ShiftProblem:
     (
         members,
         member_capabilities,
@@ -300,7 +520,7 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
         night_shift_request_map,
         pediatric_dates,
         prev_night_member_ids,
-    ) = _load_data(db, year_month)
+    ) = data
 
     dates = get_month_dates(year_month)
     member_ids = [m.id for m in members]
@@ -335,6 +555,189 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
             name = member_name_map.get(m_id, str(m_id))
             raise RuntimeError(f"{name}の夜勤希望({len(req_dates)}日)が夜勤上限({max_n}回)を超えています。")
 
+    return ShiftProblem(
+        year_month=year_month,
+        dates=dates,
+        member_ids=member_ids,
+        member_names=member_name_map,
+        member_capabilities=member_capabilities,
+        member_qualifications=member_qualifications,
+        member_max_nights=member_max_nights,
+        member_min_nights=member_min_nights,
+        member_external_nights=member_external_nights,
+        member_off_days=member_off_days,
+        ng_pairs=ng_pairs,
+        request_map=request_map,
+        day_shift_request_map=day_shift_request_map,
+        night_shift_request_map=night_shift_request_map,
+        pediatric_dates=pediatric_dates,
+        prev_night_member_ids=prev_night_member_ids,
+        rookie_ids=rookie_ids,
+        part_time_ids=part_time_ids,
+    )
+
+
+def generate_shift(
+    db: Session,
+    year_month: str,
+    *,
+    mode: ObjectiveMode = ObjectiveMode.weighted,
+    lookback_months: int = 0,
+) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+    """シフトを生成する。(assignments, unfulfilled_requests)を返す。
+
+    lookback_months > 0 の場合、直前の lookback_months か月の回数も含めて均等化する。
+    """
+    return solve_problem(build_problem(db, year_month, lookback_months=lookback_months), mode=mode)
+
+
+def generate_shift_alternatives(
+    db: Session,
+    year_month: str,
+    count: int,
+    *,
+    mode: ObjectiveMode = ObjectiveMode.weighted,
+    lookback_months: int = 0,
+) -> list[tuple[list[dict[str, object]], list[dict[str, object]]]]:
+    """互いに異なるシフト案を最大 count 件生成する。"""
+    p = build_problem(db, year_month, lookback_months=lookback_months)
+    return solve_problem_alternatives(p, count, mode=mode)
+
+
+def generate_shift_batch(
+    db: Session,
+    year_months: list[str],
+    *,
+    rolling: bool = False,
+    mode: ObjectiveMode = ObjectiveMode.weighted,
+    lookback_months: int = 0,
+    on_progress: Callable[[str], None] | None = None,
+) -> dict[str, tuple[list[dict[str, object]], list[dict[str, object]]]]:
+    """連続する複数月のシフトを生成する。月ごとに (assignments, unfulfilled_requests) を返す。
+
+    入力はまとめて1回で読み込み、月末の夜勤・連続勤務は求解結果からメモリ上で次の月へ引き継ぐ。
+    rolling=True の場合は期間全体をローリングホライズンで解く（過去の回数は夜勤・日祝出勤・早番の通算として引き継ぐ）。
+    ローリングホライズンは重み付き和でしか解けないため、mode に weighted 以外を渡すと ValueError。
+    on_progress は月の結果が確定するたびにその年月で呼ばれる（rolling=True では全体を解き終えた後にまとめて呼ばれる）。
+    """
+    if rolling and mode != ObjectiveMode.weighted:
+        raise ValueError("ローリングホライズンの生成では目的関数の優先順位を指定できません")
+    problems = build_problems(db, year_months, lookback_months=lookback_months)
+    boundary = load_boundary_state(db, problems[0].dates[0])
+
+    if rolling:
+        from solver.rolling import solve_rolling
+
+        boundary.total_nights = dict(problems[0].night_history)
+        boundary.total_holidays = dict(problems[0].holiday_history)
+        boundary.total_earlies = dict(problems[0].early_history)
+        results, _ = solve_rolling(problems, boundary=boundary)
+        if on_progress is not None:
+            for year_month in results:
+                on_progress(year_month)
+        return results
+
+    results = {}
+    for i, p in enumerate(problems):
+        try:
+            assignments, unfulfilled = solve_problem(p, boundary, mode=mode)
+        except RuntimeError as e:
+            raise RuntimeError(f"{p.year_month}: {e}") from e
+        boundary.advance(assignments)
+        if lookback_months:
+            for later in problems[i + 1 :]:
+                if add_months(later.year_month, -lookback_months) <= p.year_month:
+                    add_history(later, assignments)
+        results[p.year_month] = (assignments, unfulfilled)
+        if on_progress is not None:
+            on_progress(p.year_month)
+    return results
+
+
+def solve_problem(
+    p: ShiftProblem,
+    boundary: BoundaryState | None = None,
+    *,
+    mode: ObjectiveMode = ObjectiveMode.weighted,
+) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+    """読み込み済みの入力からシフトを求解する。(assignments, unfulfilled_requests)を返す。
+
+    boundary を渡すと、前月末の夜勤・連続勤務をDBではなくその状態から引き継ぐ。
+    mode で目的関数を重み付き和で解くか、優先順位順（辞書式）に解くかを選ぶ。
+    """
+    _, x, early, solver, _ = _solve_steps(p, boundary, mode)
+    return _extract_result(p, x, early, solver)
+
+
+def solve_problem_alternatives(
+    p: ShiftProblem,
+    count: int,
+    boundary: BoundaryState | None = None,
+    *,
+    mode: ObjectiveMode = ObjectiveMode.weighted,
+    min_diff_cells: int = ALTERNATIVE_MIN_DIFF_CELLS,
+) -> list[tuple[list[dict[str, object]], list[dict[str, object]]]]:
+    """互いに min_diff_cells マス以上異なるシフトを最大 count 件求める。先頭は solve_problem と同じ解。
+
+    最初の求解で得たモデルを使い回し、既出の解との一致マス数に上限を課して解き直す。
+    求解は直前の解をヒントに始めるため、1件あたりの時間は通常の生成より短い。
+    """
+    model, x, early, solver, _ = _solve_steps(p, boundary, mode)
+    results = [_extract_result(p, x, early, solver)]
+    cells = [(m, str(d)) for m in p.member_ids for d in p.dates]
+
+    while len(results) < count:
+        # 直前の解と一致するマスを cells - min_diff_cells 個までに制限する
+        same = [x[m][ds][_assigned_shift(x, solver, m, ds)] for m, ds in cells]
+        model.add(sum(same) <= len(cells) - min_diff_cells)
+        _add_solution_hint(model, solver.response_proto.solution)
+
+        next_solver = _new_solver(ALTERNATIVE_TIMEOUT_SECONDS)
+        status = next_solver.solve(model)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            logger.info("No further alternative found after %d solutions.", len(results))
+            break
+        solver = next_solver
+        results.append(_extract_result(p, x, early, solver))
+
+    return results
+
+
+def _assigned_shift(
+    x: dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]], solver: cp_model.CpSolver, m: int, ds: str
+) -> ShiftType:
+    return next(s for s in ALL_SHIFT_TYPES if solver.value(x[m][ds][s]) == 1)
+
+
+def _solve_steps(
+    p: ShiftProblem,
+    boundary: BoundaryState | None,
+    mode: ObjectiveMode,
+    *,
+    weights: ObjectiveWeights = DEFAULT_OBJECTIVE_WEIGHTS,
+    hint: Sequence[int] | None = None,
+    time_limit: float = SOLVER_TIMEOUT_SECONDS,
+    num_workers: int = 0,
+    diagnose: bool = True,
+    first_solution: bool = False,
+) -> tuple[
+    cp_model.CpModel,
+    dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]],
+    dict[int, dict[str, cp_model.IntVar]] | None,
+    cp_model.CpSolver,
+    list[Objective],
+]:
+    """Step 1〜3 の順に緩和しながら求解し、解が得られたモデル・変数・目的を返す。
+
+    hint は同じ入力を別の重みで解いたときの解（response_proto.solution）。構造が同じ Step のモデルにだけ使う。
+    diagnose=False の場合、解なしでも制約緩和による診断（時間がかかる）を行わずに RuntimeError を送出する。
+    first_solution=True の場合は各 Step を目的なしで解き、最初の実行可能解で止める（目的の値は意味を持たない）。
+    """
+    dates = p.dates
+    member_ids = p.member_ids
+    prev_night_member_ids = boundary.night_member_ids if boundary else p.prev_night_member_ids
+    prev_work_runs = boundary.work_runs if boundary else None
+
     # Step 1: 希望休をハード制約
     model = cp_model.CpModel()
     x = _create_variables(model, member_ids, dates)
@@ -343,33 +746,46 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
         x,
         member_ids,
         dates,
-        member_capabilities,
-        member_qualifications,
-        member_max_nights,
-        member_min_nights,
-        member_off_days,
-        ng_pairs,
-        pediatric_dates,
-        rookie_ids,
-        member_external_nights=member_external_nights,
-        part_time_ids=part_time_ids,
+        p.member_capabilities,
+        p.member_qualifications,
+        p.member_max_nights,
+        p.member_min_nights,
+        p.member_off_days,
+        p.ng_pairs,
+        p.pediatric_dates,
+        p.rookie_ids,
+        member_external_nights=p.member_external_nights,
+        part_time_ids=p.part_time_ids,
         prev_night_member_ids=prev_night_member_ids,
+        prev_work_runs=prev_work_runs,
+    )
+    add_shift_request_hard(model, x, p.request_map)
+    add_night_shift_request_hard(model, x, p.night_shift_request_map)
+    add_paid_leave_only_requested(model, x, member_ids, dates, p.request_map)
+
+    night_diff = add_night_equalization(model, x, member_ids, dates, offsets=p.night_history)
+    holiday_diff = add_holiday_equalization(model, x, member_ids, dates, offsets=p.holiday_history)
+    early_diff = (
+        add_early_equalization(model, early, dates, offsets=p.early_history)
+        if early
+        else model.new_int_var(0, 0, "early_diff_zero")
+    )
+    day_shift_fulfilled = add_day_shift_request_soft(model, x, p.day_shift_request_map)
+    objectives = [
+        ("night_diff", night_diff, weights.night_diff),
+        ("holiday_diff", holiday_diff, weights.holiday_diff),
+        ("early_diff", early_diff, weights.early_diff),
+        ("day_shift_requests", -sum(day_shift_fulfilled), weights.day_shift_requests),
+    ]
+    solver, status = _solve_objectives(
+        model,
+        objectives,
+        mode,
+        hint=hint,
+        time_limit=time_limit,
+        num_workers=num_workers,
+        first_solution=first_solution,
     )
-    add_shift_request_hard(model, x, request_map)
-    add_night_shift_request_hard(model, x, night_shift_request_map)
-    add_paid_leave_only_requested(model, x, member_ids, dates, request_map)
-
-    night_diff = add_night_equalization(model, x, member_ids, dates)
-    holiday_diff = add_holiday_equalization(model, x, member_ids, dates)
-    early_diff = add_early_equalization(model, early, dates) if early else model.new_int_var(0, 0, "early_diff_zero")
-    day_shift_fulfilled = add_day_shift_request_soft(model, x, day_shift_request_map)
-    model.minimize(night_diff * 10 + holiday_diff * 5 + early_diff * 3 - sum(day_shift_fulfilled) * 2)
-
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = SOLVER_TIMEOUT_SECONDS
-    status = solver.solve(model)
-
-    unfulfilled: list[dict[str, object]] = []
 
     if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
         logger.info("Step 1 infeasible. Trying Step 2 with soft shift requests.")
@@ -381,41 +797,48 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
             x,
             member_ids,
             dates,
-            member_capabilities,
-            member_qualifications,
-            member_max_nights,
-            member_min_nights,
-            member_off_days,
-            ng_pairs,
-            pediatric_dates,
-            rookie_ids,
-            member_external_nights=member_external_nights,
-            part_time_ids=part_time_ids,
+            p.member_capabilities,
+            p.member_qualifications,
+            p.member_max_nights,
+            p.member_min_nights,
+            p.member_off_days,
+            p.ng_pairs,
+            p.pediatric_dates,
+            p.rookie_ids,
+            member_external_nights=p.member_external_nights,
+            part_time_ids=p.part_time_ids,
             prev_night_member_ids=prev_night_member_ids,
+            prev_work_runs=prev_work_runs,
         )
 
-        fulfilled_vars = add_shift_request_soft(model, x, request_map)
-        add_night_shift_request_hard(model, x, night_shift_request_map)
-        add_paid_leave_only_requested(model, x, member_ids, dates, request_map)
-        night_diff = add_night_equalization(model, x, member_ids, dates)
-        holiday_diff = add_holiday_equalization(model, x, member_ids, dates)
+        fulfilled_vars = add_shift_request_soft(model, x, p.request_map)
+        add_night_shift_request_hard(model, x, p.night_shift_request_map)
+        add_paid_leave_only_requested(model, x, member_ids, dates, p.request_map)
+        night_diff = add_night_equalization(model, x, member_ids, dates, offsets=p.night_history)
+        holiday_diff = add_holiday_equalization(model, x, member_ids, dates, offsets=p.holiday_history)
         if early:
-            early_diff = add_early_equalization(model, early, dates)
+            early_diff = add_early_equalization(model, early, dates, offsets=p.early_history)
         else:
             early_diff = model.new_int_var(0, 0, "early_diff_zero_s2")
-        day_shift_fulfilled = add_day_shift_request_soft(model, x, day_shift_request_map)
-
-        model.maximize(
-            sum(fulfilled_vars) * 100
-            + sum(day_shift_fulfilled) * 2
-            - night_diff * 10
-            - holiday_diff * 5
-            - early_diff * 3
-        )
+        day_shift_fulfilled = add_day_shift_request_soft(model, x, p.day_shift_request_map)
 
-        solver = cp_model.CpSolver()
-        solver.parameters.max_time_in_seconds = SOLVER_TIMEOUT_SECONDS
-        status = solver.solve(model)
+        objectives = [
+            ("requests", -sum(fulfilled_vars), weights.requests),
+            ("night_diff", night_diff, weights.night_diff),
+            ("holiday_diff", holiday_diff, weights.holiday_diff),
+            ("early_diff", early_diff, weights.early_diff),
+            ("day_shift_requests", -sum(day_shift_fulfilled), weights.day_shift_requests),
+        ]
+
+        solver, status = _solve_objectives(
+            model,
+            objectives,
+            mode,
+            hint=hint,
+            time_limit=time_limit,
+            num_workers=num_workers,
+            first_solution=first_solution,
+        )
 
         if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
             logger.info("Step 2 infeasible. Trying Step 3 with soft night minimum.")
@@ -427,77 +850,85 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
                 x,
                 member_ids,
                 dates,
-                member_capabilities,
-                member_qualifications,
-                member_max_nights,
-                member_min_nights,
-                member_off_days,
-                ng_pairs,
-                pediatric_dates,
-                rookie_ids,
-                member_external_nights=member_external_nights,
-                part_time_ids=part_time_ids,
+                p.member_capabilities,
+                p.member_qualifications,
+                p.member_max_nights,
+                p.member_min_nights,
+                p.member_off_days,
+                p.ng_pairs,
+                p.pediatric_dates,
+                p.rookie_ids,
+                member_external_nights=p.member_external_nights,
+                part_time_ids=p.part_time_ids,
                 skip_constraints={"H16"},
                 prev_night_member_ids=prev_night_member_ids,
+                prev_work_runs=prev_work_runs,
             )
 
-            fulfilled_vars = add_shift_request_soft(model, x, request_map)
-            add_night_shift_request_hard(model, x, night_shift_request_map)
-            add_paid_leave_only_requested(model, x, member_ids, dates, request_map)
+            fulfilled_vars = add_shift_request_soft(model, x, p.request_map)
+            add_night_shift_request_hard(model, x, p.night_shift_request_map)
+            add_paid_leave_only_requested(model, x, member_ids, dates, p.request_map)
             night_min_shortfall = add_night_shift_minimum_soft(
-                model, x, member_ids, dates, member_min_nights, member_external_nights
+                model, x, member_ids, dates, p.member_min_nights, p.member_external_nights
             )
-            night_diff = add_night_equalization(model, x, member_ids, dates)
-            holiday_diff = add_holiday_equalization(model, x, member_ids, dates)
+            night_diff = add_night_equalization(model, x, member_ids, dates, offsets=p.night_history)
+            holiday_diff = add_holiday_equalization(model, x, member_ids, dates, offsets=p.holiday_history)
             if early:
-                early_diff = add_early_equalization(model, early, dates)
+                early_diff = add_early_equalization(model, early, dates, offsets=p.early_history)
             else:
                 early_diff = model.new_int_var(0, 0, "early_diff_zero_s3")
-            day_shift_fulfilled = add_day_shift_request_soft(model, x, day_shift_request_map)
-
-            model.maximize(
-                sum(fulfilled_vars) * 100
-                + sum(day_shift_fulfilled) * 2
-                - sum(night_min_shortfall) * 50
-                - night_diff * 10
-                - holiday_diff * 5
-                - early_diff * 3
+            day_shift_fulfilled = add_day_shift_request_soft(model, x, p.day_shift_request_map)
+
+            objectives = [
+                ("requests", -sum(fulfilled_vars), weights.requests),
+                ("night_minimum_shortfall", sum(night_min_shortfall), weights.night_minimum_shortfall),
+                ("night_diff", night_diff, weights.night_diff),
+                ("holiday_diff", holiday_diff, weights.holiday_diff),
+                ("early_diff", early_diff, weights.early_diff),
+                ("day_shift_requests", -sum(day_shift_fulfilled), weights.day_shift_requests),
+            ]
+
+            solver, status = _solve_objectives(
+                model,
+                objectives,
+                mode,
+                hint=hint,
+                time_limit=time_limit,
+                num_workers=num_workers,
+                first_solution=first_solution,
             )
 
-            solver = cp_model.CpSolver()
-            solver.parameters.max_time_in_seconds = SOLVER_TIMEOUT_SECONDS
-            status = solver.solve(model)
-
             if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
-                member_name_map = {m.id: m.name for m in members}
                 problems = diagnose_infeasibility(
                     member_ids,
-                    member_name_map,
-                    member_capabilities,
-                    member_qualifications,
-                    member_max_nights,
-                    member_off_days,
+                    p.member_names,
+                    p.member_capabilities,
+                    p.member_qualifications,
+                    p.member_max_nights,
+                    p.member_off_days,
                     dates,
-                    member_external_nights=member_external_nights,
-                    part_time_ids=part_time_ids,
+                    member_external_nights=p.member_external_nights,
+                    part_time_ids=p.part_time_ids,
                 )
                 if problems:
-                    detail = "以下の問題が見つかりました:\n" + "\n".join(f"・{p}" for p in problems)
+                    detail = "以下の問題が見つかりました:\n" + "\n".join(f"・{msg}" for msg in problems)
+                elif not diagnose:
+                    detail = "制約条件を満たすシフトの組み合わせが見つかりませんでした。"
                 else:
                     logger.info("Static diagnostics found no issues. Running constraint relaxation diagnosis.")
                     relaxable = _diagnose_by_relaxation(
                         member_ids,
                         dates,
-                        member_capabilities,
-                        member_qualifications,
-                        member_max_nights,
-                        member_min_nights,
-                        member_off_days,
-                        ng_pairs,
-                        pediatric_dates,
-                        rookie_ids,
-                        member_external_nights=member_external_nights,
-                        part_time_ids=part_time_ids,
+                        p.member_capabilities,
+                        p.member_qualifications,
+                        p.member_max_nights,
+                        p.member_min_nights,
+                        p.member_off_days,
+                        p.ng_pairs,
+                        p.pediatric_dates,
+                        p.rookie_ids,
+                        member_external_nights=p.member_external_nights,
+                        part_time_ids=p.part_time_ids,
                     )
                     if relaxable:
                         detail = (
@@ -513,24 +944,32 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
 
             logger.warning("Step 3: 夜勤確定回数（H16）をソフト制約に緩和して生成しました。")
 
-        # 叶えられなかった希望休を特定
-        member_name_map = {m.id: m.name for m in members}
-        for m_id, entries in request_map.items():
-            for d, shift_type in entries:
-                if solver.value(x[m_id][str(d)][shift_type]) == 0:
-                    unfulfilled.append(
-                        {
-                            "member_id": m_id,
-                            "member_name": member_name_map.get(m_id, ""),
-                            "date": str(d),
-                        }
-                    )
+    return model, x, early, solver, objectives
+
+
+def _extract_result(
+    p: ShiftProblem,
+    x: dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]],
+    early: dict[int, dict[str, cp_model.IntVar]] | None,
+    solver: cp_model.CpSolver,
+) -> tuple[list[dict[str, object]], list[dict[str, object]]]:
+    # 叶えられなかった希望休を特定
+    unfulfilled: list[dict[str, object]] = []
+    for m_id, entries in p.request_map.items():
+        for d, shift_type in entries:
+            if solver.value(x[m_id][str(d)][shift_type]) == 0:
+                unfulfilled.append(
+                    {
+                        "member_id": m_id,
+                        "member_name": p.member_names.get(m_id, ""),
+                        "date": str(d),
+                    }
+                )
 
     # 結果を取得
-    member_name_map = {m.id: m.name for m in members}
     assignments: list[dict[str, object]] = []
-    for m in member_ids:
-        for d in dates:
+    for m in p.member_ids:
+        for d in p.dates:
             ds = str(d)
             for s in ALL_SHIFT_TYPES:
                 if solver.value(x[m][ds][s]) == 1:
@@ -540,7 +979,7 @@ def generate_shift(db: Session, year_month: str) -> tuple[list[dict[str, object]
                     assignments.append(
                         {
                             "member_id": m,
-                            "member_name": member_name_map.get(m, ""),
+                            "member_name": p.member_names.get(m, ""),
                             "date": ds,
                             "shift_type": s,
                             "is_early": is_early,
@@ -0,0 +1,114 @@
+"""スケジュールの メンバー × 日付 の行列表現。
+
+集計・PDF・検証はこの行列から numpy の演算で回数や表の配置を求める。
+割当は必要なカラムだけを1回のクエリで読み、ORM のオブジェクトは作らない。
+"""
+
+import datetime
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.shift_assignment import ShiftAssignment
+
+# シフト種別 ↔ 行列に入れる番号（未割当は UNASSIGNED）
+SHIFT_CODES: list[ShiftType] = list(ShiftType)
+SHIFT_CODE_OF: dict[ShiftType, int] = {s: k for k, s in enumerate(SHIFT_CODES)}
+UNASSIGNED = -1
+
+type Cell = tuple[int, datetime.date]
+
+
+def shift_mask(shift_types: Iterable[ShiftType]) -> np.ndarray:
+    """シフト番号ごとの真偽値（shift_types に含まれるか）。"""
+    targets = set(shift_types)
+    return np.array([s in targets for s in SHIFT_CODES])
+
+
+@dataclass
+class ScheduleMatrix:
+    member_ids: list[int]
+    dates: list[datetime.date]
+    codes: np.ndarray  # (メンバー, 日付) のシフト番号 int8
+    early: np.ndarray  # (メンバー, 日付) の早番フラグ
+    member_index: dict[int, int] = field(init=False)
+    date_index: dict[datetime.date, int] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.member_index = {m: i for i, m in enumerate(self.member_ids)}
+        self.date_index = {d: j for j, d in enumerate(self.dates)}
+
+    @classmethod
+    def empty(cls, member_ids: list[int], dates: list[datetime.date]) -> ScheduleMatrix:
+        shape = (len(member_ids), len(dates))
+        return cls(member_ids, dates, np.full(shape, UNASSIGNED, dtype=np.int8), np.zeros(shape, dtype=bool))
+
+    @classmethod
+    def from_cells(
+        cls,
+        member_ids: list[int],
+        dates: list[datetime.date],
+        cells: dict[Cell, ShiftType],
+        early_cells: Iterable[Cell] = (),
+    ) -> ScheduleMatrix:
+        """(メンバー, 日付) → シフト の辞書から作る。member_ids・dates にないマスは無視する。"""
+        matrix = cls.empty(member_ids, dates)
+        for (m, d), s in cells.items():
+            matrix.set(m, d, s)
+        for m, d in early_cells:
+            i, j = matrix.member_index.get(m), matrix.date_index.get(d)
+            if i is not None and j is not None:
+                matrix.early[i, j] = True
+        return matrix
+
+    @classmethod
+    def load(
+        cls,
+        db: Session,
+        schedule_id: int,
+        member_ids: list[int],
+        dates: list[datetime.date],
+    ) -> ScheduleMatrix:
+        """スケジュールの割当を (member_id, date, shift_type, is_early) だけ読んで行列にする。"""
+        matrix = cls.empty(member_ids, dates)
+        rows = db.query(
+            ShiftAssignment.member_id, ShiftAssignment.date, ShiftAssignment.shift_type, ShiftAssignment.is_early
+        ).filter(ShiftAssignment.schedule_id == schedule_id)
+        for m, d, s, is_early in rows:
+            i, j = matrix.member_index.get(m), matrix.date_index.get(d)
+            if i is None or j is None:
+                continue
+            matrix.codes[i, j] = SHIFT_CODE_OF[s]
+            matrix.early[i, j] = bool(is_early)
+        return matrix
+
+    def set(self, member_id: int, date: datetime.date, shift_type: ShiftType | None) -> None:
+        i, j = self.member_index.get(member_id), self.date_index.get(date)
+        if i is None or j is None:
+            return
+        self.codes[i, j] = UNASSIGNED if shift_type is None else SHIFT_CODE_OF[shift_type]
+        if shift_type is None:
+            self.early[i, j] = False
+
+    def get(self, member_id: int, date: datetime.date) -> ShiftType | None:
+        code = self.codes[self.member_index[member_id], self.date_index[date]]
+        return None if code == UNASSIGNED else SHIFT_CODES[code]
+
+    @property
+    def assigned(self) -> np.ndarray:
+        return self.codes != UNASSIGNED
+
+    def onehot(self) -> np.ndarray:
+        """(メンバー, 日付, シフト番号) の真偽値。"""
+        return self.codes[:, :, None] == np.arange(len(SHIFT_CODES))
+
+    def isin(self, shift_types: Iterable[ShiftType]) -> np.ndarray:
+        """(メンバー, 日付) ごとに shift_types のいずれかか。"""
+        return np.isin(self.codes, [SHIFT_CODE_OF[s] for s in shift_types])
+
+    def count(self, shift_types: Iterable[ShiftType]) -> np.ndarray:
+        """メンバーごとの shift_types の回数。"""
+        return self.isin(shift_types).sum(axis=1)
@@ -0,0 +1,139 @@
+"""目的関数の重みを振ったシナリオ比較（パレート解の探索）。
+
+重みの組ごとに独立して解けるため、プロセスプールで並列に求解する。
+入力（ShiftProblem）は各ワーカーの起動時に1回だけ渡し、ワーカー内では直前の解を次の求解のヒントに使う。
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from entity.enums import ObjectiveMode
+from solver.boundary import Assignment
+from solver.generator import ObjectiveWeights, ShiftProblem, _extract_result, _solve_steps
+
+# 1つの重みの組あたりの求解時間
+PARETO_TIMEOUT_SECONDS = 20
+
+# 既定の重みの組（夜勤回数の偏り × 日祝出勤の偏り）
+DEFAULT_WEIGHT_GRID: list[ObjectiveWeights] = [
+    ObjectiveWeights(night_diff=night, holiday_diff=holiday) for night in (2, 10, 30) for holiday in (1, 5, 15)
+]
+
+
+@dataclass
+class ParetoPoint:
+    """1つの重みの組で得た解と、その各目的の値。"""
+
+    weights: ObjectiveWeights
+    night_diff: int
+    holiday_diff: int
+    early_diff: int
+    fulfilled_requests: int
+    request_total: int
+    fulfilled_day_shift_requests: int
+    day_shift_request_total: int
+    assignments: list[Assignment]
+    unfulfilled: list[Assignment]
+
+    def costs(self) -> tuple[int, int, int, int, int]:
+        """支配関係の判定に使う値（すべて小さいほど良い）。"""
+        return (
+            self.request_total - self.fulfilled_requests,
+            self.day_shift_request_total - self.fulfilled_day_shift_requests,
+            self.night_diff,
+            self.holiday_diff,
+            self.early_diff,
+        )
+
+    def dominates(self, other: ParetoPoint) -> bool:
+        mine, theirs = self.costs(), other.costs()
+        return all(a <= b for a, b in zip(mine, theirs, strict=True)) and mine != theirs
+
+
+def non_dominated(points: list[ParetoPoint]) -> list[ParetoPoint]:
+    """他のどの解にも支配されない解を返す。目的の値が同じ解は最初の1つだけ残す。"""
+    front: list[ParetoPoint] = []
+    seen: set[tuple[int, int, int, int, int]] = set()
+    for p in points:
+        if p.costs() in seen or any(q.dominates(p) for q in points):
+            continue
+        seen.add(p.costs())
+        front.append(p)
+    return front
+
+
+def solve_weighted(
+    problem: ShiftProblem,
+    weights: ObjectiveWeights,
+    *,
+    hint: list[int] | None = None,
+    num_workers: int = 0,
+) -> tuple[ParetoPoint, list[int]]:
+    """1つの重みの組で求解する。(解, 次の求解のヒントに使える生の解) を返す。"""
+    _, x, early, solver, objectives = _solve_steps(
+        problem,
+        None,
+        ObjectiveMode.weighted,
+        weights=weights,
+        hint=hint,
+        time_limit=PARETO_TIMEOUT_SECONDS,
+        num_workers=num_workers,
+    )
+    values = {name: expr if isinstance(expr, int) else int(solver.value(expr)) for name, expr, _ in objectives}
+    assignments, unfulfilled = _extract_result(problem, x, early, solver)
+    request_total = sum(len(entries) for entries in problem.request_map.values())
+    point = ParetoPoint(
+        weights=weights,
+        night_diff=values["night_diff"],
+        holiday_diff=values["holiday_diff"],
+        early_diff=values["early_diff"],
+        fulfilled_requests=request_total - len(unfulfilled),
+        request_total=request_total,
+        fulfilled_day_shift_requests=-values["day_shift_requests"],
+        day_shift_request_total=sum(len(dates) for dates in problem.day_shift_request_map.values()),
+        assignments=assignments,
+        unfulfilled=unfulfilled,
+    )
+    return point, list(solver.response_proto.solution)
+
+
+# ワーカープロセスごとの状態
+_worker_problem: ShiftProblem | None = None
+_worker_num_workers = 0
+_worker_hint: list[int] | None = None
+
+
+def _init_worker(problem: ShiftProblem, num_workers: int) -> None:
+    global _worker_problem, _worker_num_workers, _worker_hint
+    _worker_problem = problem
+    _worker_num_workers = num_workers
+    _worker_hint = None
+
+
+def _solve_in_worker(weights: ObjectiveWeights) -> ParetoPoint:
+    global _worker_hint
+    if _worker_problem is None:
+        raise RuntimeError("ワーカーが初期化されていません。")
+    point, _worker_hint = solve_weighted(_worker_problem, weights, hint=_worker_hint, num_workers=_worker_num_workers)
+    return point
+
+
+def compute_pareto_front(
+    problem: ShiftProblem,
+    weight_grid: list[ObjectiveWeights] | None = None,
+    *,
+    max_processes: int | None = None,
+) -> list[ParetoPoint]:
+    """重みの組ごとにプロセスプールで求解し、非劣解だけを返す。"""
+    grid = weight_grid or DEFAULT_WEIGHT_GRID
+    cpu_count = os.cpu_count() or 1
+    processes = max(1, min(len(grid), max_processes or cpu_count))
+    # プロセス数 × CP-SAT のワーカー数がコア数を超えないようにする
+    num_workers = max(1, cpu_count // processes)
+
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(problem, num_workers)
+    ) as executor:
+        points = list(executor.map(_solve_in_worker, grid))
+    return non_dominated(points)
@@ -0,0 +1,231 @@
+"""確定済みシフトの最小変更による修復。
+
+急な欠勤や手動編集による違反が出たとき、全体を作り直さずに影響のある日付の前後とメンバーだけを動かす。
+近傍の外のマスは現在のシフトに固定し（未割当のマスは勤務なしとして扱い、未割当のまま残す）、変更したマス数（早番の付け替えを含む）を最小化する。
+近傍内で解けない場合は近傍を広げて解き直す。
+"""
+
+import datetime
+import logging
+from collections.abc import Iterable
+from dataclasses import dataclass
+
+from ortools.sat.python import cp_model
+
+from entity.enums import ShiftType
+from solver.boundary import Assignment, BoundaryState
+from solver.config import ALL_SHIFT_TYPES, EXTERNAL_NIGHT_TYPES, NIGHT_SHIFT_TYPES
+from solver.constraints import add_shift_count_bounds
+from solver.generator import ShiftProblem, _add_hard_constraints, _create_variables, _new_solver
+
+logger = logging.getLogger(__name__)
+
+# 1回の求解時間と、影響日の前後に空ける日数（解けなければ倍にして最大日数まで広げる）
+REPAIR_TIMEOUT_SECONDS = 2
+REPAIR_NEIGHBOURHOOD_DAYS = 2
+REPAIR_MAX_NEIGHBOURHOOD_DAYS = 8
+
+type Cell = tuple[int, datetime.date]
+
+
+@dataclass
+class RepairResult:
+    changes: list[Assignment]  # 変更したマスだけ（before は変更前のシフト、未割当なら None）
+    radius_days: int
+
+
+def repair_neighbourhood(
+    p: ShiftProblem,
+    affected_dates: Iterable[datetime.date],
+    affected_member_ids: Iterable[int],
+    radius_days: int,
+) -> set[Cell]:
+    """動かしてよいマス: 影響日の前後 radius_days 日の全メンバーと、影響メンバーの全日。"""
+    affected = set(affected_dates)
+    window = {d for d in p.dates if any(abs((d - a).days) <= radius_days for a in affected)}
+    members = set(affected_member_ids)
+    return {(m, d) for m in p.member_ids for d in p.dates if d in window or m in members}
+
+
+def solve_repair(
+    p: ShiftProblem,
+    current: dict[Cell, tuple[ShiftType, bool]],
+    fixed: dict[Cell, ShiftType],
+    boundary: BoundaryState | None = None,
+    *,
+    affected_dates: Iterable[datetime.date] = (),
+    affected_member_ids: Iterable[int] = (),
+    radius_days: int = REPAIR_NEIGHBOURHOOD_DAYS,
+    time_limit: float = REPAIR_TIMEOUT_SECONDS,
+) -> RepairResult:
+    """current（(メンバー, 日付) → (シフト, 早番)）を fixed のマスだけ書き換えた状態から、変更の少ない解を求める。
+
+    fixed のマスとその日付・メンバーは常に影響範囲に含める。
+    """
+    dates = set(affected_dates) | {d for _, d in fixed}
+    member_ids = set(affected_member_ids) | {m for m, _ in fixed}
+    if not dates and not member_ids:
+        raise ValueError("修復する日付・メンバー・固定マスのいずれかを指定してください。")
+
+    radius = radius_days
+    while True:
+        free = repair_neighbourhood(p, dates, member_ids, radius)
+        result = _solve_repair_once(p, current, fixed, free, boundary, time_limit)
+        if result is not None:
+            return RepairResult(changes=result, radius_days=radius)
+        if radius >= REPAIR_MAX_NEIGHBOURHOOD_DAYS:
+            raise RuntimeError(
+                f"影響日の前後{radius}日の範囲では修復できませんでした。固定するシフトを見直すか、全体を再生成してください。"
+            )
+        logger.info("Repair infeasible within %d days. Widening neighbourhood.", radius)
+        radius = min(max(radius * 2, 1), REPAIR_MAX_NEIGHBOURHOOD_DAYS)
+
+
+def _solve_repair_once(
+    p: ShiftProblem,
+    current: dict[Cell, tuple[ShiftType, bool]],
+    fixed: dict[Cell, ShiftType],
+    free: set[Cell],
+    boundary: BoundaryState | None,
+    time_limit: float,
+) -> list[Assignment] | None:
+    """1つの近傍で解く。解けなければ None。"""
+    # 近傍の外の未割当のマスは勤務なし（公休）として固定し、結果には含めない（未割当のまま残す）
+    unassigned = {
+        (m, d)
+        for m in p.member_ids
+        for d in p.dates
+        if (m, d) not in current and (m, d) not in free and (m, d) not in fixed
+    }
+    held = current | dict.fromkeys(unassigned, (ShiftType.day_off, False))
+
+    model = cp_model.CpModel()
+    x = _create_variables(model, p.member_ids, p.dates)
+    # 月単位の回数（H10/H11/H16/H17）は下で現在の回数に合わせて緩めた範囲で課す
+    early = _add_hard_constraints(
+        model,
+        x,
+        p.member_ids,
+        p.dates,
+        p.member_capabilities,
+        p.member_qualifications,
+        p.member_max_nights,
+        p.member_min_nights,
+        p.member_off_days,
+        p.ng_pairs,
+        p.pediatric_dates,
+        p.rookie_ids,
+        member_external_nights=p.member_external_nights,
+        part_time_ids=p.part_time_ids,
+        skip_constraints={"H10", "H11", "H16", "H17"},
+        prev_night_member_ids=boundary.night_member_ids if boundary else p.prev_night_member_ids,
+        prev_work_runs=boundary.work_runs if boundary else None,
+    )
+    _add_count_bounds(model, x, p, held, fixed)
+
+    paid_leave_requested = {
+        (m, d) for m, entries in p.request_map.items() for d, s in entries if s == ShiftType.paid_leave
+    }
+    changed: list[cp_model.LinearExprT] = []
+    for m in p.member_ids:
+        for d in p.dates:
+            ds = str(d)
+            cell = (m, d)
+            before = held.get(cell)
+            if cell in fixed:
+                model.add(x[m][ds][fixed[cell]] == 1)
+                continue
+            if cell not in free:
+                model.add(x[m][ds][before[0]] == 1)
+                if early and m in early:
+                    model.add(early[m][ds] == int(before[1]))
+                continue
+
+            # 近傍内: 叶っている希望休・夜勤希望は崩さない。有給は希望日か元から有給の日だけ
+            if before is not None and any(d == rd and before[0] == rs for rd, rs in p.request_map.get(m, [])):
+                model.add(x[m][ds][before[0]] == 1)
+            if before is not None and d in p.night_shift_request_map.get(m, []) and before[0] in NIGHT_SHIFT_TYPES:
+                model.add(sum(x[m][ds][s] for s in NIGHT_SHIFT_TYPES) >= 1)
+            if cell not in paid_leave_requested and (before is None or before[0] != ShiftType.paid_leave):
+                model.add(x[m][ds][ShiftType.paid_leave] == 0)
+
+            if before is None:
+                continue
+            changed.append(1 - x[m][ds][before[0]])
+            model.add_hint(x[m][ds][before[0]], 1)
+            if early and m in early:
+                changed.append(1 - early[m][ds] if before[1] else early[m][ds])
+                model.add_hint(early[m][ds], int(before[1]))
+
+    model.minimize(sum(changed))
+    solver = _new_solver(time_limit)
+    status = solver.solve(model)
+    if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+        return None
+
+    changes: list[Assignment] = []
+    for m in p.member_ids:
+        for d in p.dates:
+            if (m, d) in unassigned:
+                continue
+            ds = str(d)
+            after = next(s for s in ALL_SHIFT_TYPES if solver.value(x[m][ds][s]) == 1)
+            is_early = bool(early and m in early and solver.value(early[m][ds]) == 1)
+            before = current.get((m, d))
+            if before == (after, is_early):
+                continue
+            changes.append(
+                {
+                    "member_id": m,
+                    "member_name": p.member_names.get(m, ""),
+                    "date": d,
+                    "before": before[0] if before else None,
+                    "shift_type": after,
+                    "is_early": is_early,
+                }
+            )
+    return changes
+
+
+def _add_count_bounds(
+    model: cp_model.CpModel,
+    x: dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]],
+    p: ShiftProblem,
+    current: dict[Cell, tuple[ShiftType, bool]],
+    fixed: dict[Cell, ShiftType],
+) -> None:
+    """月単位の回数制約。固定マスを反映した現在の回数が既に外れている場合は、その回数までを許す。
+
+    近傍の外にある既存の違反を直すために、近傍の外を動かす必要が出ないようにする。
+    """
+    nights = dict.fromkeys(p.member_ids, 0)
+    offs = dict.fromkeys(p.member_ids, 0)
+    externals = dict.fromkeys(p.member_ids, 0)
+    for m in p.member_ids:
+        for d in p.dates:
+            cell = (m, d)
+            s = fixed.get(cell) or (current[cell][0] if cell in current else None)
+            if s in NIGHT_SHIFT_TYPES:
+                nights[m] += 1
+            elif s == ShiftType.day_off:
+                offs[m] += 1
+            elif s in EXTERNAL_NIGHT_TYPES:
+                externals[m] += 1
+
+    night_lower: dict[int, int] = {}
+    night_upper: dict[int, int] = {}
+    off_lower: dict[int, int] = {}
+    off_upper: dict[int, int] = {}
+    for m in p.member_ids:
+        ext = p.member_external_nights.get(m, 0)
+        night_lower[m] = min(p.member_min_nights.get(m, 0) - ext, nights[m])
+        night_upper[m] = max(p.member_max_nights.get(m, 4) - ext, nights[m])
+        required_off = p.member_off_days.get(m, 10)
+        off_lower[m] = min(required_off, offs[m])
+        if m not in p.part_time_ids:
+            off_upper[m] = max(required_off, offs[m])
+
+    add_shift_count_bounds(model, x, p.member_ids, p.dates, NIGHT_SHIFT_TYPES, night_lower, night_upper)
+    add_shift_count_bounds(model, x, p.member_ids, p.dates, {ShiftType.day_off}, off_lower, off_upper)
+    # 他院夜勤は入力で決まるため現在の回数を保つ
+    add_shift_count_bounds(model, x, p.member_ids, p.dates, EXTERNAL_NIGHT_TYPES, externals, externals)
@@ -0,0 +1,289 @@
+"""長期間（複数月）向けのローリングホライズン求解。
+
+期間全体を1つのモデルにせず、重なりを持つ1〜2週間のウィンドウを順に解く。
+各ウィンドウの先頭だけを確定させ、境界状態（連続勤務・夜勤明け・月内の累積回数・均等化に使う通算回数）を次のウィンドウへ引き継ぐ。
+モデルの大きさはウィンドウ幅で決まるため、期間が伸びてもメモリは一定で、求解時間は期間に比例する。
+"""
+
+import datetime
+import logging
+import math
+
+from ortools.sat.python import cp_model
+
+from entity.enums import ShiftType
+from solver.boundary import Assignment, BoundaryState
+from solver.config import (
+    ALL_SHIFT_TYPES,
+    EXTERNAL_NIGHT_TYPES,
+    STAFFING_REQUIREMENTS,
+    get_day_type,
+    get_year_month,
+)
+from solver.constraints import (
+    add_capability_constraints,
+    add_day_shift_eligibility,
+    add_day_shift_request_soft,
+    add_early_equalization,
+    add_early_shift_constraint,
+    add_holiday_equalization,
+    add_max_consecutive_work,
+    add_ng_pair_constraint,
+    add_night_equalization,
+    add_night_midwife_constraint,
+    add_night_shift_eligibility,
+    add_night_shift_limit,
+    add_night_shift_minimum,
+    add_night_shift_minimum_soft,
+    add_night_shift_request_hard,
+    add_night_then_off,
+    add_one_shift_per_day,
+    add_paid_leave_only_requested,
+    add_prev_consecutive_work,
+    add_prev_month_night_rest,
+    add_rookie_ward_constraint,
+    add_shift_count_bounds,
+    add_shift_request_hard,
+    add_shift_request_soft,
+    add_staffing_requirements,
+    add_sunday_holiday_ward_only,
+)
+from solver.generator import ShiftProblem, _create_variables
+
+logger = logging.getLogger(__name__)
+
+WINDOW_DAYS = 14
+COMMIT_DAYS = 7
+WINDOW_TIMEOUT_SECONDS = 10
+
+
+def _off_capacity(d: datetime.date, member_count: int, pediatric_dates: set[datetime.date]) -> int:
+    """その日に休める人数の上限（全員 - 最低必要人数）。"""
+    day_type = get_day_type(d)
+    required = 0
+    for req in STAFFING_REQUIREMENTS:
+        min_s = req.min_staff.get(day_type, 0)
+        if req.shift_type == ShiftType.mw_outpatient and d in pediatric_dates and req.max_staff.get(day_type, 0) > 0:
+            min_s = max(min_s, 2)
+        required += min_s
+    return max(member_count - required, 0)
+
+
+def _build_window_model(
+    problems: dict[str, ShiftProblem],
+    member_ids: list[int],
+    dates: list[datetime.date],
+    boundary: BoundaryState,
+    hints: dict[tuple[int, str, ShiftType], int],
+    *,
+    relax_level: int,
+) -> tuple[
+    cp_model.CpModel,
+    dict[int, dict[str, dict[ShiftType, cp_model.IntVar]]],
+    dict[int, dict[str, cp_model.IntVar]] | None,
+]:
+    """ウィンドウ1つ分のモデルを構築する。relax_level: 0=希望休ハード, 1=希望休ソフト, 2=さらにH16ソフト"""
+    base = problems[get_year_month(dates[0])]
+    pediatric_dates = set().union(*(p.pediatric_dates for p in problems.values()))
+
+    model = cp_model.CpModel()
+    x = _create_variables(model, member_ids, dates)
+
+    # H1-H9, H13-H15: 日単位・連続日数の制約はウィンドウ内にそのまま適用
+    add_one_shift_per_day(model, x, member_ids, dates)
+    add_staffing_requirements(model, x, member_ids, dates, pediatric_dates)
+    add_capability_constraints(model, x, member_ids, dates, base.member_capabilities, base.member_qualifications)
+    add_day_shift_eligibility(model, x, member_ids, dates, base.member_capabilities)
+    add_night_shift_eligibility(model, x, member_ids, dates, base.member_capabilities)
+    add_night_then_off(model, x, member_ids, dates)
+    add_prev_month_night_rest(model, x, member_ids, dates, boundary.night_member_ids)
+    add_ng_pair_constraint(model, x, dates, base.ng_pairs)
+    add_night_midwife_constraint(model, x, member_ids, dates, base.member_qualifications)
+    add_max_consecutive_work(model, x, member_ids, dates)
+    add_prev_consecutive_work(model, x, member_ids, dates, boundary.work_runs)
+    add_sunday_holiday_ward_only(model, x, member_ids, dates)
+    if base.rookie_ids:
+        add_rookie_ward_constraint(model, x, member_ids, dates, base.rookie_ids, base.member_capabilities)
+    early = add_early_shift_constraint(model, x, member_ids, dates, base.member_capabilities)
+
+    # H10/H11/H16/H17: 月単位の回数制約は、確定済みの回数と月末までの残り日数から範囲を求めて適用
+    segments: dict[str, list[datetime.date]] = {}
+    for d in dates:
+        segments.setdefault(get_year_month(d), []).append(d)
+
+    fulfilled: list[cp_model.IntVar] = []
+    day_shift_fulfilled: list[cp_model.IntVar] = []
+    night_shortfall: list[cp_model.IntVar] = []
+    for ym, seg in segments.items():
+        p = problems[ym]
+        days_after = (p.dates[-1] - seg[-1]).days
+        # 夜勤は翌日休みが必要なため、残り日数で入れられる回数は最大 (days_after + 1) // 2
+        night_room = (days_after + 1) // 2
+        used_nights = boundary.month_nights.get(ym, {})
+        used_offs = boundary.month_off_days.get(ym, {})
+        used_externals = boundary.month_external_nights.get(ym, {})
+        # 公休は残り期間の「休める枠」に比例して配分する（先送りすると月末に公休が集中し人員が足りなくなる）
+        rest_dates = [d for d in p.dates if d >= seg[0]]
+        rest_capacity = sum(_off_capacity(d, len(member_ids), p.pediatric_dates) for d in rest_dates)
+        seg_capacity = sum(_off_capacity(d, len(member_ids), p.pediatric_dates) for d in seg)
+        off_ratio = seg_capacity / rest_capacity if rest_capacity else 1.0
+
+        max_nights: dict[int, int] = {}
+        min_nights: dict[int, int] = {}
+        off_lower: dict[int, int] = {}
+        off_upper: dict[int, int] = {}
+        ext_lower: dict[int, int] = {}
+        ext_upper: dict[int, int] = {}
+        for m in member_ids:
+            ext = p.member_external_nights.get(m, 0)
+            max_nights[m] = p.member_max_nights.get(m, 4) - ext - used_nights.get(m, 0)
+            min_nights[m] = p.member_min_nights.get(m, 0) - ext - used_nights.get(m, 0) - night_room
+            remaining_off = p.member_off_days.get(m, 10) - used_offs.get(m, 0)
+            share = remaining_off * off_ratio
+            off_lower[m] = max(remaining_off - days_after, math.floor(share))
+            if m not in p.part_time_ids:
+                off_upper[m] = min(remaining_off, math.ceil(share))
+            remaining_ext = ext - used_externals.get(m, 0)
+            ext_lower[m] = remaining_ext - night_room
+            ext_upper[m] = remaining_ext
+
+        add_night_shift_limit(model, x, member_ids, seg, max_nights)
+        if relax_level < 2:
+            add_night_shift_minimum(model, x, member_ids, seg, min_nights)
+        else:
+            night_shortfall += add_night_shift_minimum_soft(model, x, member_ids, seg, min_nights)
+        add_shift_count_bounds(model, x, member_ids, seg, {ShiftType.day_off}, off_lower, off_upper)
+        add_shift_count_bounds(model, x, member_ids, seg, EXTERNAL_NIGHT_TYPES, ext_lower, ext_upper)
+
+        seg_set = set(seg)
+        request_map = {
+            m: [(d, s) for d, s in entries if d in seg_set and m in x] for m, entries in p.request_map.items()
+        }
+        night_requests = {m: [d for d in ds if d in seg_set and m in x] for m, ds in p.night_shift_request_map.items()}
+        day_requests = {m: [d for d in ds if d in seg_set and m in x] for m, ds in p.day_shift_request_map.items()}
+        if relax_level == 0:
+            add_shift_request_hard(model, x, request_map)
+        else:
+            fulfilled += add_shift_request_soft(model, x, request_map)
+        add_night_shift_request_hard(model, x, night_requests)
+        add_paid_leave_only_requested(model, x, member_ids, seg, request_map)
+        day_shift_fulfilled += add_day_shift_request_soft(model, x, day_requests)
+
+    night_diff = add_night_equalization(model, x, member_ids, dates, offsets=boundary.total_nights)
+    holiday_diff = add_holiday_equalization(model, x, member_ids, dates, offsets=boundary.total_holidays)
+    early_diff = (
+        add_early_equalization(model, early, dates, offsets=boundary.total_earlies)
+        if early
+        else model.new_int_var(0, 0, "early_diff_zero")
+    )
+    model.minimize(
+        night_diff * 10
+        + holiday_diff * 5
+        + early_diff * 3
+        + sum(night_shortfall) * 50
+        - sum(day_shift_fulfilled) * 2
+        - sum(fulfilled) * 100
+    )
+
+    for (m, ds, s), value in hints.items():
+        if m in x and ds in x[m]:
+            model.add_hint(x[m][ds][s], value)
+
+    return model, x, early
+
+
+def solve_rolling(
+    problems: list[ShiftProblem],
+    *,
+    window_days: int = WINDOW_DAYS,
+    commit_days: int = COMMIT_DAYS,
+    window_timeout: float = WINDOW_TIMEOUT_SECONDS,
+    boundary: BoundaryState | None = None,
+) -> tuple[dict[str, tuple[list[Assignment], list[Assignment]]], BoundaryState]:
+    """連続する月の入力をローリングホライズンで求解する。
+
+    月ごとの (assignments, unfulfilled_requests) と、最終日時点の境界状態を返す。
+    """
+    if not problems:
+        return {}, boundary or BoundaryState()
+    if not 0 < commit_days <= window_days:
+        raise ValueError("commit_days は 1 以上 window_days 以下にしてください")
+
+    by_month = {p.year_month: p for p in problems}
+    member_ids = problems[0].member_ids
+    member_names = problems[0].member_names
+    all_dates = [d for p in problems for d in p.dates]
+    if any((b - a).days != 1 for a, b in zip(all_dates, all_dates[1:], strict=False)):
+        raise ValueError("連続した月を指定してください")
+    state = boundary or BoundaryState(night_member_ids=set(problems[0].prev_night_member_ids))
+
+    results: dict[str, tuple[list[Assignment], list[Assignment]]] = {p.year_month: ([], []) for p in problems}
+    hints: dict[tuple[int, str, ShiftType], int] = {}
+    cursor = 0
+    while cursor < len(all_dates):
+        window = all_dates[cursor : cursor + window_days]
+        is_last = cursor + window_days >= len(all_dates)
+        committed = window if is_last else window[:commit_days]
+
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = window_timeout
+        for relax_level in range(3):
+            model, x, early = _build_window_model(by_month, member_ids, window, state, hints, relax_level=relax_level)
+            status = solver.solve(model)
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+                break
+            logger.info("Window %s-%s infeasible at relax level %d", window[0], window[-1], relax_level)
+        else:
+            raise RuntimeError(
+                f"{window[0]}〜{window[-1]} の期間で制約条件を満たすシフトが見つかりませんでした。"
+                "メンバー数や希望休、NGペアの設定を見直してください。"
+            )
+        if relax_level == 2:
+            logger.warning(
+                "Window %s-%s: 夜勤確定回数（H16）をソフト制約に緩和して生成しました。", window[0], window[-1]
+            )
+
+        committed_assignments: list[Assignment] = []
+        for d in committed:
+            ds = str(d)
+            for m in member_ids:
+                for s in ALL_SHIFT_TYPES:
+                    if solver.value(x[m][ds][s]) == 1:
+                        is_early = bool(early and m in early and solver.value(early[m][ds]) == 1)
+                        committed_assignments.append(
+                            {
+                                "member_id": m,
+                                "member_name": member_names.get(m, ""),
+                                "date": ds,
+                                "shift_type": s,
+                                "is_early": is_early,
+                            }
+                        )
+                        break
+
+        committed_set = set(committed)
+        for ym, (assignments, unfulfilled) in results.items():
+            assignments.extend(a for a in committed_assignments if str(a["date"]).startswith(ym))
+            if relax_level == 0:
+                continue
+            for m_id, entries in by_month[ym].request_map.items():
+                for d, shift_type in entries:
+                    if m_id not in x or d not in committed_set:
+                        continue
+                    if solver.value(x[m_id][str(d)][shift_type]) == 0:
+                        unfulfilled.append(
+                            {"member_id": m_id, "member_name": member_names.get(m_id, ""), "date": str(d)}
+                        )
+
+        # 重なり部分の暫定解を次のウィンドウのヒントとして再利用
+        hints = {
+            (m, str(d), s): solver.value(x[m][str(d)][s])
+            for d in window
+            if d not in committed_set
+            for m in member_ids
+            for s in ALL_SHIFT_TYPES
+        }
+        state.advance(committed_assignments)
+        cursor += len(committed)
+
+    return results, state
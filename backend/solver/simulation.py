@@ -0,0 +1,262 @@
+"""人員計画のためのシミュレーション。
+
+DBの現在のメンバー構成を基に、メンバーの増減・希望休・夜勤上限を変えた問題をランダムに作り、
+短い制限時間で大量に解いて「解なし」「緩和が必要」になる月の割合を集計する。
+事前診断で解なしと分かる問題はソルバーを呼ばずに判定する。
+
+    python -m solver.simulation 2025-04 --add-night-midwives 0 1 2 --leave-requests 2 --instances 30
+"""
+
+import argparse
+import dataclasses
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+
+from entity.enums import CapabilityType, ObjectiveMode, Qualification, ShiftType
+from solver.diagnostics import diagnose_infeasibility
+from solver.generator import ShiftProblem, _solve_steps
+
+# 1 Step あたりの求解時間
+SIMULATION_TIMEOUT_SECONDS = 10
+
+
+class SimulationOutcome(str, Enum):
+    feasible = "feasible"  # Step 1 で解が見つかった
+    relaxed = "relaxed"  # 希望休（Step 2）や夜勤確定回数（Step 3）の緩和が必要だった
+    infeasible = "infeasible"  # 解なし（時間切れを含む）
+    infeasible_static = "infeasible_static"  # 事前診断で解なしと判定（ソルバー未実行）
+
+
+@dataclass(frozen=True)
+class Scenario:
+    """基になる構成に加える変更。"""
+
+    remove_members: int = 0  # ランダムに外すメンバー数
+    add_night_midwives: int = 0  # 追加する夜勤可能な助産師（既存の常勤助産師の複製）
+    leave_requests: int = 0  # メンバーごとにランダムに入れる希望休の数
+    max_nights_delta: int = 0  # 全員の夜勤上限の増減
+
+    def label(self) -> str:
+        return (
+            f"remove={self.remove_members} add_mw={self.add_night_midwives} "
+            f"leave={self.leave_requests} max_nights{self.max_nights_delta:+d}"
+        )
+
+
+@dataclass
+class ScenarioSummary:
+    scenario: Scenario
+    counts: dict[SimulationOutcome, int]
+
+    @property
+    def instances(self) -> int:
+        return sum(self.counts.values())
+
+    def rate(self, *outcomes: SimulationOutcome) -> float:
+        return sum(self.counts[o] for o in outcomes) / self.instances if self.instances else 0.0
+
+
+def perturb(base: ShiftProblem, scenario: Scenario, rng: random.Random) -> ShiftProblem:
+    """base にシナリオの変更をランダムに適用した問題を返す。"""
+    p = dataclasses.replace(
+        base,
+        member_ids=list(base.member_ids),
+        member_names=dict(base.member_names),
+        member_capabilities=dict(base.member_capabilities),
+        member_qualifications=dict(base.member_qualifications),
+        member_max_nights=dict(base.member_max_nights),
+        member_min_nights=dict(base.member_min_nights),
+        member_external_nights=dict(base.member_external_nights),
+        member_off_days=dict(base.member_off_days),
+        request_map={m: list(v) for m, v in base.request_map.items()},
+    )
+
+    if scenario.remove_members:
+        removed = set(rng.sample(p.member_ids, min(scenario.remove_members, len(p.member_ids))))
+        p.member_ids = [m for m in p.member_ids if m not in removed]
+        p.ng_pairs = [(a, b) for a, b in p.ng_pairs if a not in removed and b not in removed]
+        p.request_map = {m: v for m, v in p.request_map.items() if m not in removed}
+        p.day_shift_request_map = {m: v for m, v in p.day_shift_request_map.items() if m not in removed}
+        p.night_shift_request_map = {m: v for m, v in p.night_shift_request_map.items() if m not in removed}
+        p.prev_night_member_ids = p.prev_night_member_ids - removed
+        p.rookie_ids = [m for m in p.rookie_ids if m not in removed]
+        p.part_time_ids = p.part_time_ids - removed
+
+    if scenario.add_night_midwives:
+        template = next(
+            (
+                m
+                for m in base.member_ids
+                if base.member_qualifications[m] == Qualification.midwife
+                and CapabilityType.night_shift in base.member_capabilities[m]
+                and m not in base.part_time_ids
+            ),
+            None,
+        )
+        if template is None:
+            raise ValueError("複製元になる夜勤可能な常勤助産師がいません。")
+        next_id = max(base.member_ids) + 1
+        for i in range(scenario.add_night_midwives):
+            m = next_id + i
+            p.member_ids.append(m)
+            p.member_names[m] = f"追加助産師{i + 1}"
+            p.member_capabilities[m] = set(base.member_capabilities[template])
+            p.member_qualifications[m] = Qualification.midwife
+            p.member_max_nights[m] = base.member_max_nights[template]
+            p.member_min_nights[m] = 0
+            p.member_external_nights[m] = 0
+            p.member_off_days[m] = base.member_off_days[template]
+
+    if scenario.max_nights_delta:
+        for m in p.member_ids:
+            p.member_max_nights[m] = min(6, max(1, p.member_max_nights[m] + scenario.max_nights_delta))
+            p.member_min_nights[m] = min(p.member_min_nights[m], p.member_max_nights[m])
+            p.member_external_nights[m] = min(p.member_external_nights[m], p.member_max_nights[m])
+
+    if scenario.leave_requests:
+        for m in p.member_ids:
+            taken = {d for d, _ in p.request_map.get(m, [])}
+            free = [d for d in p.dates if d not in taken]
+            for d in rng.sample(free, min(scenario.leave_requests, len(free))):
+                p.request_map.setdefault(m, []).append((d, ShiftType.day_off))
+
+    return p
+
+
+def simulate_instance(problem: ShiftProblem, *, time_limit: float, num_workers: int = 0) -> SimulationOutcome:
+    """1つの問題を判定する。事前診断で解なしと分かればソルバーを呼ばない。
+
+    判定には解があるかだけが必要なため、各 Step は目的なしで解き、最初の実行可能解で止める。
+    """
+    problems = diagnose_infeasibility(
+        problem.member_ids,
+        problem.member_names,
+        problem.member_capabilities,
+        problem.member_qualifications,
+        problem.member_max_nights,
+        problem.member_off_days,
+        problem.dates,
+        member_external_nights=problem.member_external_nights,
+        part_time_ids=problem.part_time_ids,
+    )
+    if problems:
+        return SimulationOutcome.infeasible_static
+
+    try:
+        _, _, _, _, objectives = _solve_steps(
+            problem,
+            None,
+            ObjectiveMode.weighted,
+            time_limit=time_limit,
+            num_workers=num_workers,
+            diagnose=False,
+            first_solution=True,
+        )
+    except RuntimeError:
+        return SimulationOutcome.infeasible
+    # Step 2 以降は希望休が目的に入る
+    if any(name == "requests" for name, _, _ in objectives):
+        return SimulationOutcome.relaxed
+    return SimulationOutcome.feasible
+
+
+# ワーカープロセスごとの状態
+_worker_time_limit: float = SIMULATION_TIMEOUT_SECONDS
+_worker_num_workers = 0
+
+
+def _init_worker(time_limit: float, num_workers: int) -> None:
+    global _worker_time_limit, _worker_num_workers
+    _worker_time_limit = time_limit
+    _worker_num_workers = num_workers
+
+
+def _simulate_in_worker(problem: ShiftProblem) -> SimulationOutcome:
+    return simulate_instance(problem, time_limit=_worker_time_limit, num_workers=_worker_num_workers)
+
+
+def run_simulation(
+    base: ShiftProblem,
+    scenarios: list[Scenario],
+    *,
+    instances: int = 20,
+    seed: int = 0,
+    time_limit: float = SIMULATION_TIMEOUT_SECONDS,
+    max_processes: int | None = None,
+) -> list[ScenarioSummary]:
+    """シナリオごとに instances 個の問題を作り、プロセスプールで解いて結果を集計する。"""
+    tasks: list[tuple[int, ShiftProblem]] = []
+    for i, scenario in enumerate(scenarios):
+        for k in range(instances):
+            rng = random.Random(f"{seed}-{i}-{k}")
+            tasks.append((i, perturb(base, scenario, rng)))
+
+    cpu_count = os.cpu_count() or 1
+    processes = max(1, min(len(tasks), max_processes or cpu_count))
+    num_workers = max(1, cpu_count // processes)
+
+    summaries = [ScenarioSummary(s, dict.fromkeys(SimulationOutcome, 0)) for s in scenarios]
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(time_limit, num_workers)
+    ) as executor:
+        outcomes = executor.map(_simulate_in_worker, [problem for _, problem in tasks])
+        for (i, _), outcome in zip(tasks, outcomes, strict=True):
+            summaries[i].counts[outcome] += 1
+    return summaries
+
+
+def _format_summaries(summaries: list[ScenarioSummary]) -> str:
+    lines = [f"{'シナリオ':<48} {'件数':>4} {'解あり':>6} {'緩和':>6} {'解なし':>6} {'(事前診断)':>10}"]
+    for s in summaries:
+        lines.append(
+            f"{s.scenario.label():<48} {s.instances:>4} "
+            f"{s.rate(SimulationOutcome.feasible):>6.0%} "
+            f"{s.rate(SimulationOutcome.relaxed):>6.0%} "
+            f"{s.rate(SimulationOutcome.infeasible, SimulationOutcome.infeasible_static):>6.0%} "
+            f"{s.rate(SimulationOutcome.infeasible_static):>10.0%}"
+        )
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="メンバー構成を変えたシフト生成のシミュレーション")
+    parser.add_argument("year_month", help="基にする年月（例: 2025-04）")
+    parser.add_argument("--remove-members", type=int, nargs="+", default=[0])
+    parser.add_argument("--add-night-midwives", type=int, nargs="+", default=[0])
+    parser.add_argument("--leave-requests", type=int, nargs="+", default=[0])
+    parser.add_argument("--max-nights-delta", type=int, nargs="+", default=[0])
+    parser.add_argument("--instances", type=int, default=20, help="シナリオあたりの問題数")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--time-limit", type=float, default=SIMULATION_TIMEOUT_SECONDS, help="1 Step あたりの秒数")
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    from db.session import SessionLocal
+    from solver.generator import build_problem
+
+    with SessionLocal() as db:
+        base = build_problem(db, args.year_month)
+
+    scenarios = [
+        Scenario(remove_members=r, add_night_midwives=a, leave_requests=lr, max_nights_delta=mn)
+        for r, a, lr, mn in itertools.product(
+            args.remove_members, args.add_night_midwives, args.leave_requests, args.max_nights_delta
+        )
+    ]
+    summaries = run_simulation(
+        base,
+        scenarios,
+        instances=args.instances,
+        seed=args.seed,
+        time_limit=args.time_limit,
+        max_processes=args.processes,
+    )
+    print(_format_summaries(summaries))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""メンバー × 月の集計（勤務日数・夜勤回数・日祝出勤・希望休の充足など）。
+
+集計は DB 側の1回のグループ化クエリで行い、結果を member_monthly_stats に保存する。
+年間の表示や過去の偏りの分析、生成時の過去の回数（均等化のオフセット）は、割当を走査せずにこのテーブルを月で引くだけで済む。
+
+    python -m solver.stats            # 全スケジュールを集計し直す
+    python -m solver.stats 2025-04    # 指定した月だけ
+"""
+
+import argparse
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+
+from sqlalchemy import ColumnElement, and_, case, func, or_
+from sqlalchemy.orm import Query, Session
+
+from entity.enums import RequestType, ShiftType
+from entity.member import Member
+from entity.member_monthly_stat import MemberMonthlyStat
+from entity.schedule import Schedule
+from entity.shift_assignment import ShiftAssignment
+from entity.shift_request import ShiftRequest
+from solver.config import NIGHT_SHIFT_TYPES, OFF_DAY_TYPES, get_holiday_dates, get_month_dates
+
+# member_monthly_stats に保存する集計値（member_stats の列名と同じ）
+STAT_COLUMNS = (
+    "working_days",
+    "day_off_count",
+    "paid_leave_count",
+    "night_shift_count",
+    "external_night_count",
+    "early_shift_count",
+    "holiday_work_count",
+    "request_total",
+    "request_fulfilled",
+)
+
+
+def _count_if(condition: ColumnElement[bool]) -> ColumnElement[int]:
+    return func.sum(case((condition, 1), else_=0))
+
+
+def leave_requests_filter(year_month: str) -> ColumnElement[bool]:
+    """集計の対象にする希望（公休・有給の希望のみ）。"""
+    return and_(
+        ShiftRequest.year_month == year_month,
+        ShiftRequest.request_type.in_([RequestType.day_off, RequestType.paid_leave]),
+    )
+
+
+def member_stats(
+    db: Session,
+    schedule_id: int,
+    year_month: str,
+    member_ids: Iterable[int] | None = None,
+) -> Query:
+    """メンバーごとの集計値をメンバーの並び順で返すクエリ。
+
+    割当と希望をそれぞれ条件付き集計でメンバーごとにまとめ、メンバーに外部結合する。
+    行はメンバーの属性（id・name・employment_type・min_night_shifts、メンバーに設定した他院夜勤回数の
+    configured_external_nights）と STAT_COLUMNS（external_night_count は割り当てた他院夜勤の数）。
+    有給も勤務日に数える。日祝出勤は is_holiday_work と同じく、日曜・祝日の公休・有給以外のシフトを数える。
+    """
+    working = ShiftAssignment.shift_type != ShiftType.day_off
+    holiday_dates = get_holiday_dates(get_month_dates(year_month))
+    assignment_counts = (
+        db.query(
+            ShiftAssignment.member_id.label("member_id"),
+            _count_if(working).label("working_days"),
+            _count_if(ShiftAssignment.shift_type == ShiftType.day_off).label("day_off_count"),
+            _count_if(ShiftAssignment.shift_type == ShiftType.paid_leave).label("paid_leave_count"),
+            _count_if(ShiftAssignment.shift_type.in_(NIGHT_SHIFT_TYPES)).label("night_shift_count"),
+            _count_if(ShiftAssignment.shift_type == ShiftType.external_night).label("external_night_count"),
+            _count_if(ShiftAssignment.is_early.is_(True)).label("early_shift_count"),
+            _count_if(
+                and_(ShiftAssignment.shift_type.not_in(OFF_DAY_TYPES), ShiftAssignment.date.in_(holiday_dates))
+            ).label("holiday_work_count"),
+        )
+        .filter(ShiftAssignment.schedule_id == schedule_id)
+        .group_by(ShiftAssignment.member_id)
+        .subquery()
+    )
+    # 希望休は公休、有給の希望は有給が入っていれば叶ったとみなす
+    fulfilled = or_(
+        and_(ShiftRequest.request_type == RequestType.day_off, ShiftAssignment.shift_type == ShiftType.day_off),
+        and_(ShiftRequest.request_type == RequestType.paid_leave, ShiftAssignment.shift_type == ShiftType.paid_leave),
+    )
+    request_counts = (
+        db.query(
+            ShiftRequest.member_id.label("member_id"),
+            func.count(ShiftRequest.id).label("request_total"),
+            _count_if(fulfilled).label("request_fulfilled"),
+        )
+        .outerjoin(
+            ShiftAssignment,
+            and_(
+                ShiftAssignment.schedule_id == schedule_id,
+                ShiftAssignment.member_id == ShiftRequest.member_id,
+                ShiftAssignment.date == ShiftRequest.date,
+            ),
+        )
+        .filter(leave_requests_filter(year_month))
+        .group_by(ShiftRequest.member_id)
+        .subquery()
+    )
+    counts = {**assignment_counts.c, **request_counts.c}
+    query = (
+        db.query(
+            Member.id,
+            Member.name,
+            Member.employment_type,
+            Member.min_night_shifts,
+            Member.external_night_count.label("configured_external_nights"),
+            *(func.coalesce(counts[name], 0).label(name) for name in STAT_COLUMNS),
+        )
+        .outerjoin(assignment_counts, assignment_counts.c.member_id == Member.id)
+        .outerjoin(request_counts, request_counts.c.member_id == Member.id)
+        .order_by(Member.position, Member.id)
+    )
+    if member_ids is not None:
+        query = query.filter(Member.id.in_(list(member_ids)))
+    return query
+
+
+@dataclass
+class MemberHistory:
+    """期間内のメンバーごとの通算回数。集計行のないメンバーは含まない。"""
+
+    nights: dict[int, int] = field(default_factory=dict)
+    holidays: dict[int, int] = field(default_factory=dict)
+    earlies: dict[int, int] = field(default_factory=dict)
+
+
+def load_member_history(db: Session, start_month: str, end_month: str) -> MemberHistory:
+    """start_month〜end_month の集計行をメンバーごとに合計する。"""
+    history = MemberHistory()
+    if start_month > end_month:
+        return history
+    rows = (
+        db.query(
+            MemberMonthlyStat.member_id,
+            func.sum(MemberMonthlyStat.night_shift_count),
+            func.sum(MemberMonthlyStat.holiday_work_count),
+            func.sum(MemberMonthlyStat.early_shift_count),
+        )
+        .filter(MemberMonthlyStat.year_month >= start_month, MemberMonthlyStat.year_month <= end_month)
+        .group_by(MemberMonthlyStat.member_id)
+    )
+    for member_id, nights, holidays, earlies in rows:
+        history.nights[member_id] = int(nights or 0)
+        history.holidays[member_id] = int(holidays or 0)
+        history.earlies[member_id] = int(earlies or 0)
+    return history
+
+
+def refresh_member_stats(db: Session, schedule: Schedule, member_ids: Iterable[int] | None = None) -> None:
+    """スケジュールの月の集計を member_monthly_stats に書き直す（コミットは呼び出し側）。
+
+    member_ids を指定すると、そのメンバーの行だけを書き直す。割当も希望もないメンバーの行は作らない。
+    """
+    db.flush()
+    target = None if member_ids is None else set(member_ids)
+    stale = db.query(MemberMonthlyStat).filter(MemberMonthlyStat.year_month == schedule.year_month)
+    if target is not None:
+        stale = stale.filter(MemberMonthlyStat.member_id.in_(target))
+    stale.delete(synchronize_session=False)
+
+    for row in member_stats(db, schedule.id, schedule.year_month, target):
+        values = {name: int(getattr(row, name)) for name in STAT_COLUMNS}
+        if not any(values.values()):
+            continue
+        db.add(MemberMonthlyStat(member_id=row.id, schedule_id=schedule.id, year_month=schedule.year_month, **values))
+    db.flush()
+
+
+def backfill_member_stats(db: Session, year_months: Iterable[str] | None = None) -> int:
+    """スケジュールごとに集計し直してコミットする。集計したスケジュール数を返す。"""
+    query = db.query(Schedule).order_by(Schedule.year_month)
+    if year_months is not None:
+        query = query.filter(Schedule.year_month.in_(list(year_months)))
+    schedules = query.all()
+    for schedule in schedules:
+        refresh_member_stats(db, schedule)
+        db.commit()
+    return len(schedules)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="メンバー × 月の集計を割当から作り直す")
+    parser.add_argument("year_months", nargs="*", help="対象の年月（省略時は全スケジュール）")
+    args = parser.parse_args(argv)
+
+    from db.session import SessionLocal
+
+    with SessionLocal() as db:
+        count = backfill_member_stats(db, args.year_months or None)
+    print(f"{count} 件のスケジュールを集計しました")
+
+
+if __name__ == "__main__":
+    main()
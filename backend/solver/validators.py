@@ -1,167 +1,457 @@
 """手動シフト編集時のルール違反チェック."""
 
 import datetime as dt
+import threading
+from collections import Counter
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
 
+import numpy as np
 from sqlalchemy.orm import Session
 
-from entity.enums import Qualification, ShiftType
+from entity.enums import CapabilityType, Qualification, ShiftType
 from entity.member import Member
+from entity.schedule import Schedule
 from entity.shift_assignment import ShiftAssignment
+from solver.boundary import LOOKBACK_DAYS, BoundaryState, load_boundary_state
+from solver.config import (
+    DAY_SHIFT_TYPES,
+    OFF_DAY_TYPES,
+    STAFFING_REQUIREMENTS,
+    WARD_SHIFT_TYPES,
+    DayType,
+    get_day_type,
+    get_month_dates,
+)
+from solver.coverage import staffing_bounds
+from solver.matrix import SHIFT_CODE_OF, SHIFT_CODES, UNASSIGNED, ScheduleMatrix, shift_mask
+
+if TYPE_CHECKING:
+    from solver.generator import ShiftProblem
 
 NIGHT_SHIFT_TYPES = {ShiftType.night_leader, ShiftType.night}
 ALL_NIGHT_TYPES = NIGHT_SHIFT_TYPES | {ShiftType.external_night}
 MAX_CONSECUTIVE_WORK_DAYS = 5
+ROOKIE_WARD_MIN_STAFF = 5
+
+
+class AssignmentValidationState:
+    """1スケジュール分の手動編集の警告に必要な集計値.
+
+    メンバーごとの院内夜勤回数と日付ごとの夜勤メンバーを保持し、割当の変更ごとに差分で更新する.
+    1回の警告判定は変更したマスの前後と回数だけを見るため、割当数によらない.
+    """
+
+    def __init__(
+        self,
+        version: int,
+        dates: list[dt.date],
+        cells: dict[tuple[int, dt.date], ShiftType],
+        midwife_ids: set[int],
+        boundary: BoundaryState,
+    ) -> None:
+        self.version = version
+        self.dates = dates
+        self.date_index = {d: i for i, d in enumerate(dates)}
+        self.midwife_ids = midwife_ids
+        self.prev_night_ids = boundary.night_member_ids
+        self.prev_work_runs = boundary.work_runs
+        self.cells: dict[tuple[int, dt.date], ShiftType] = {}
+        self.night_counts: Counter[int] = Counter()
+        self.night_members: dict[dt.date, set[int]] = {d: set() for d in dates}
+        for (m, d), s in cells.items():
+            self.apply(m, d, s)
+
+    @classmethod
+    def load(cls, db: Session, schedule_id: int, version: int) -> AssignmentValidationState:
+        (year_month,) = db.query(Schedule.year_month).filter(Schedule.id == schedule_id).one()
+        dates = get_month_dates(year_month)
+        rows = (
+            db.query(ShiftAssignment.member_id, ShiftAssignment.date, ShiftAssignment.shift_type)
+            .filter(ShiftAssignment.schedule_id == schedule_id)
+            .all()
+        )
+        midwife_ids = {m for (m,) in db.query(Member.id).filter(Member.qualification == Qualification.midwife)}
+        return cls(
+            version,
+            dates,
+            {(m, d): s for m, d, s in rows},
+            midwife_ids,
+            load_boundary_state(db, dates[0]),
+        )
+
+    def apply(self, member_id: int, date: dt.date, shift_type: ShiftType | None) -> None:
+        """1マスの変更を反映する（None は割当の削除）."""
+        if date not in self.date_index:
+            return
+        cell = (member_id, date)
+        old = self.cells.pop(cell, None)
+        if old in NIGHT_SHIFT_TYPES:
+            self.night_counts[member_id] -= 1
+            self.night_members[date].discard(member_id)
+        if shift_type is None:
+            return
+        self.cells[cell] = shift_type
+        if shift_type in NIGHT_SHIFT_TYPES:
+            self.night_counts[member_id] += 1
+            self.night_members[date].add(member_id)
+
+    def _is_work(self, member_id: int, i: int) -> bool:
+        s = self.cells.get((member_id, self.dates[i]))
+        return s is not None and s not in OFF_DAY_TYPES
+
+    def _work_run(self, member_id: int, date: dt.date) -> int:
+        """date を含む連続勤務日数（月初から続く場合は前月からの連続勤務を足す）."""
+        i = self.date_index[date]
+        start = i
+        while start > 0 and self._is_work(member_id, start - 1):
+            start -= 1
+        end = i
+        while end + 1 < len(self.dates) and self._is_work(member_id, end + 1):
+            end += 1
+        run = end - start + 1
+        if start == 0:
+            run += self.prev_work_runs.get(member_id, 0)
+        return run
+
+    def warnings(self, member: Member, date: dt.date) -> list[str]:
+        """member×date 周辺の制約違反（H6/H8/H9/H10/H16）の警告メッセージを返す."""
+        if date not in self.date_index:
+            return []
+        if member.qualification == Qualification.midwife:
+            self.midwife_ids.add(member.id)
+        else:
+            self.midwife_ids.discard(member.id)
+
+        warnings: list[str] = []
+        today = self.cells.get((member.id, date))
+        prev = self.cells.get((member.id, date - dt.timedelta(days=1)))
+        following = self.cells.get((member.id, date + dt.timedelta(days=1)))
+
+        # H6: 夜勤翌日は休み（前月最終日の夜勤を含む）
+        prev_night = prev in ALL_NIGHT_TYPES or (self.date_index[date] == 0 and member.id in self.prev_night_ids)
+        if prev_night and today is not None and today not in OFF_DAY_TYPES:
+            warnings.append(f"{member.name} は前日に夜勤のため、本日は公休が必要です")
+        if today in ALL_NIGHT_TYPES and following is not None and following not in OFF_DAY_TYPES:
+            warnings.append(f"{member.name} は本日夜勤のため、翌日は公休が必要です")
+
+        # H8: 夜勤に助産師必須
+        if today in NIGHT_SHIFT_TYPES and not self.night_members[date] & self.midwife_ids:
+            warnings.append(f"{date:%m/%d} の夜勤に助産師が配置されていません")
+
+        # H9: 連続勤務5日上限
+        if today is not None and today not in OFF_DAY_TYPES:
+            consecutive = self._work_run(member.id, date)
+            if consecutive > MAX_CONSECUTIVE_WORK_DAYS:
+                warnings.append(
+                    f"{member.name} の連続勤務が {consecutive} 日になっています（上限{MAX_CONSECUTIVE_WORK_DAYS}日）"
+                )
+
+        # H10/H16: 院内夜勤の月間上限・確定回数
+        night_count = self.night_counts[member.id]
+        max_nights: int = member.max_night_shifts - member.external_night_count
+        if night_count > max_nights:
+            warnings.append(f"{member.name} の院内夜勤回数が {night_count} 回になっています（上限{max_nights}回）")
+        min_nights: int = member.min_night_shifts - member.external_night_count
+        if min_nights > 0 and night_count < min_nights:
+            warnings.append(f"{member.name} の院内夜勤回数が {night_count} 回になっています（確定{min_nights}回）")
 
-
-def check_assignment_warnings(
-    db: Session,
-    schedule_id: int,
-    member_id: int,
-    date: dt.date,
-) -> list[str]:
-    """指定メンバー×日付周辺の制約違反を検査し、警告メッセージを返す."""
-    warnings: list[str] = []
-
-    member = db.query(Member).filter(Member.id == member_id).first()
-    if not member:
         return warnings
 
-    assignments = db.query(ShiftAssignment).filter(ShiftAssignment.schedule_id == schedule_id).all()
-
-    warnings.extend(_check_h6_night_rest(assignments, member, date, db))
-    warnings.extend(_check_h8_night_midwife(assignments, member, date))
-    warnings.extend(_check_h9_consecutive_work(assignments, member, date))
-    warnings.extend(_check_h10_night_limit(assignments, member))
-    warnings.extend(_check_h16_night_minimum(assignments, member))
 
-    return warnings
+# スケジュールID → 検証状態。スケジュールの version が一致する間だけ使う
+_states: dict[int, AssignmentValidationState] = {}
+_states_lock = threading.Lock()
 
 
-def _get_shift_type_for(
-    assignments: list[ShiftAssignment],
-    member_id: int,
-    date: dt.date,
-) -> ShiftType | None:
-    """指定メンバー×日付のシフト種別を取得."""
-    for a in assignments:
-        if a.member_id == member_id and a.date == date:
-            return a.shift_type
-    return None
+def _advance_state(
+    schedule_id: int,
+    version: int,
+    changes: Iterable[tuple[int, dt.date, ShiftType | None]],
+) -> AssignmentValidationState | None:
+    """version - 1 の状態に変更を反映して version へ進める. 状態が無いか古ければ捨てて None を返す."""
+    changes = list(changes)
+    # 月末の変更は翌月の前月境界（H6/H9）を変えるため、翌月の状態を捨てる
+    for other_id, other in list(_states.items()):
+        if other_id != schedule_id and any(0 < (other.dates[0] - d).days <= LOOKBACK_DAYS for _, d, _ in changes):
+            del _states[other_id]
+
+    state = _states.get(schedule_id)
+    if state is None or state.version != version - 1:
+        _states.pop(schedule_id, None)
+        return None
+    for member_id, date, shift_type in changes:
+        state.apply(member_id, date, shift_type)
+    state.version = version
+    return state
+
+
+def record_assignment_changes(
+    schedule_id: int,
+    version: int,
+    changes: Iterable[tuple[int, dt.date, ShiftType | None]],
+) -> None:
+    """コミット済みの割当の変更（メンバー, 日付, 変更後のシフト）をメモリ上の検証状態へ反映する."""
+    with _states_lock:
+        _advance_state(schedule_id, version, changes)
 
 
-def _check_h6_night_rest(
-    assignments: list[ShiftAssignment],
+def check_assignment_warnings(
+    db: Session,
+    schedule_id: int,
+    version: int,
     member: Member,
     date: dt.date,
-    db: Session | None = None,
+    changes: Iterable[tuple[int, dt.date, ShiftType | None]] = (),
 ) -> list[str]:
-    """H6: 夜勤翌日は休み."""
-    warnings: list[str] = []
-    today_shift = _get_shift_type_for(assignments, member.id, date)
-    prev_shift = _get_shift_type_for(assignments, member.id, date - dt.timedelta(days=1))
-    next_shift = _get_shift_type_for(assignments, member.id, date + dt.timedelta(days=1))
-
-    # 前日が同一スケジュール内に無い場合、前月スケジュールを確認
-    if prev_shift is None and db is not None:
-        prev_shift = _get_prev_month_shift(db, member.id, date - dt.timedelta(days=1))
-
-    # 前日が夜勤 → 今日は公休であるべき
-    if prev_shift in ALL_NIGHT_TYPES and today_shift is not None and today_shift != ShiftType.day_off:
-        warnings.append(f"{member.name} は前日に夜勤のため、本日は公休が必要です")
-
-    # 今日が夜勤 → 翌日は公休であるべき
-    if today_shift in ALL_NIGHT_TYPES and next_shift is not None and next_shift != ShiftType.day_off:
-        warnings.append(f"{member.name} は本日夜勤のため、翌日は公休が必要です")
-
-    return warnings
+    """コミット済みの変更を検証状態へ反映し、指定メンバー×日付周辺の制約違反の警告を返す.
+
+    状態がキャッシュに無いか version - 1 のものでなければ、DBから読み直す（変更は読み直した割当に含まれる）.
+    """
+    with _states_lock:
+        state = _advance_state(schedule_id, version, changes)
+        if state is None:
+            state = AssignmentValidationState.load(db, schedule_id, version)
+            _states[schedule_id] = state
+        return state.warnings(member, date)
+
+
+def invalidate_validation_state(schedule_id: int | None = None) -> None:
+    """検証状態を捨てる. schedule_id を省略するとすべて捨てる（メンバーの資格変更など）."""
+    with _states_lock:
+        if schedule_id is None:
+            _states.clear()
+        else:
+            _states.pop(schedule_id, None)
+
+
+# ---- スケジュール全体の検証 ----
+
+RULE_LABELS: dict[str, str] = {
+    "H1": "1人1日1シフト",
+    "H2": "各ポジションの必要人数",
+    "H3": "ポジションの能力・資格",
+    "H4": "日勤不可のメンバーは日勤に入らない",
+    "H5": "夜勤不可のメンバーは夜勤に入らない",
+    "H6": "夜勤翌日は必ず休み",
+    "H7": "NGペアは同日の夜勤に同時配置しない",
+    "H8": "夜勤2名のうち最低1名は助産師",
+    "H9": "連続勤務は最大5日",
+    "H10": "夜勤回数の月間上限",
+    "H11": "公休日数の制約",
+    "H12": "希望休・有給は希望どおり",
+    "H13": "新人の病棟5名体制",
+    "H14": "日祝は病棟系のみ稼働",
+    "H15": "平日に早番1名配置",
+    "H16": "夜勤確定回数（最低保証）",
+    "H17": "他院夜勤回数",
+    "H18": "夜勤希望（確定）",
+}
+
+
+@dataclass
+class Violation:
+    code: str
+    message: str
+    member_id: int | None = None
+    date: dt.date | None = None
+
+
+def validate_schedule(
+    p: ShiftProblem,
+    cells: dict[tuple[int, dt.date], ShiftType],
+    early_cells: set[tuple[int, dt.date]] | None = None,
+    boundary: BoundaryState | None = None,
+) -> list[Violation]:
+    """スケジュール全体を メンバー × 日付 の行列にして、全ハード制約を行列演算で検査する."""
+    members = p.member_ids
+    dates = p.dates
+    names = p.member_names
+    matrix = ScheduleMatrix.from_cells(members, dates, cells, early_cells or ())
+    row, col = matrix.member_index, matrix.date_index
+    codes, early = matrix.codes, matrix.early
+
+    assigned = matrix.assigned
+    onehot = matrix.onehot()  # (メンバー, 日付, シフト)
+    counts = onehot.sum(axis=0)  # (日付, シフト)
+    night = onehot[:, :, shift_mask(NIGHT_SHIFT_TYPES)].any(axis=2)
+    night_or_ext = onehot[:, :, shift_mask(ALL_NIGHT_TYPES)].any(axis=2)
+    off = onehot[:, :, shift_mask(OFF_DAY_TYPES)].any(axis=2)
+    day_shift = onehot[:, :, shift_mask(DAY_SHIFT_TYPES)].any(axis=2)
+    ward = onehot[:, :, shift_mask(WARD_SHIFT_TYPES)].any(axis=2)
+    day_types = [get_day_type(d) for d in dates]
+
+    violations: list[Violation] = []
+
+    def per_cell(code: str, mask: np.ndarray, message: Callable[[int, dt.date], str]) -> None:
+        for i, j in zip(*np.nonzero(mask), strict=True):
+            m, d = members[i], dates[j]
+            violations.append(Violation(code, message(m, d), m, d))
+
+    def per_date(code: str, mask: np.ndarray, message: Callable[[dt.date], str]) -> None:
+        for j in np.flatnonzero(mask):
+            violations.append(Violation(code, message(dates[j]), None, dates[j]))
+
+    def per_member(code: str, mask: np.ndarray, message: Callable[[int], str]) -> None:
+        for i in np.flatnonzero(mask):
+            violations.append(Violation(code, message(members[i]), members[i], None))
+
+    # H1: 未割当
+    per_cell("H1", ~assigned, lambda m, d: f"{names[m]} の {d:%m/%d} にシフトがありません")
+
+    # H2: ポジションの必要人数（日祝の外来系は H14 で検査）
+    lower, upper = staffing_bounds(dates, p.pediatric_dates, SHIFT_CODES, len(members))
+    outside_ward = shift_mask(DAY_SHIFT_TYPES - WARD_SHIFT_TYPES)
+    sunday = np.array([t == DayType.sunday_holiday for t in day_types])
+    staffing = (counts < lower) | ((counts > upper) & ~(sunday[:, None] & outside_ward))
+    for j, k in zip(*np.nonzero(staffing), strict=True):
+        s = SHIFT_CODES[k]
+        violations.append(
+            Violation(
+                "H2",
+                f"{dates[j]:%m/%d} の{s.label}が {counts[j, k]} 名です（{lower[j, k]}〜{upper[j, k]}名）",
+                None,
+                dates[j],
+            )
+        )
+
+    # H3/H4/H5: 能力・資格
+    for code, ineligible in _ineligible_masks(p).items():
+        mask = (onehot & ineligible[:, None, :]).any(axis=2)
+        per_cell(code, mask, lambda m, d: f"{names[m]} は {d:%m/%d} のシフトに入れません")
+
+    # H6: 夜勤翌日は休み（前月最終日の夜勤を含む）
+    prev_night = np.array([m in (boundary.night_member_ids if boundary else p.prev_night_member_ids) for m in members])
+    after_night = np.concatenate([prev_night[:, None], night_or_ext[:, :-1]], axis=1)
+    per_cell(
+        "H6", after_night & assigned & ~off, lambda m, d: f"{names[m]} は前日に夜勤のため {d:%m/%d} は休みが必要です"
+    )
 
+    # H7: NGペアの同日夜勤
+    for a, b in p.ng_pairs:
+        if a in row and b in row:
+            per_date(
+                "H7",
+                night[row[a]] & night[row[b]],
+                lambda d, a=a, b=b: f"{d:%m/%d} の夜勤に {names[a]} と {names[b]} が同時に入っています",
+            )
+
+    # H8: 夜勤に助産師
+    midwife = np.array([p.member_qualifications.get(m) == Qualification.midwife for m in members])
+    per_date(
+        "H8",
+        night.any(axis=0) & ~(night & midwife[:, None]).any(axis=0),
+        lambda d: f"{d:%m/%d} の夜勤に助産師が配置されていません",
+    )
 
-def _get_prev_month_shift(
-    db: Session,
-    member_id: int,
-    date: dt.date,
-) -> ShiftType | None:
-    """別スケジュール（前月）から指定日のシフトを取得."""
-    assignment = (
-        db.query(ShiftAssignment).filter(ShiftAssignment.member_id == member_id, ShiftAssignment.date == date).first()
+    # H9: 連続勤務（前月から続く連続勤務を含む）。上限を超えた連続勤務ごとに、超えた最初の日（前月から
+    # すでに超えて続く場合は月初）を1回だけ報告する
+    work = assigned & ~off
+    run = np.array([boundary.work_runs.get(m, 0) if boundary else 0 for m in members])
+    over = np.zeros(codes.shape, dtype=bool)
+    for j in range(len(dates)):
+        next_run = (run + 1) * work[:, j]
+        over[:, j] = (next_run > MAX_CONSECUTIVE_WORK_DAYS) & ((run <= MAX_CONSECUTIVE_WORK_DAYS) | (j == 0))
+        run = next_run
+    per_cell(
+        "H9", over, lambda m, d: f"{names[m]} の連続勤務が {d:%m/%d} で{MAX_CONSECUTIVE_WORK_DAYS}日を超えています"
     )
-    return assignment.shift_type if assignment else None
 
+    # H10/H16/H17: 夜勤・他院夜勤の回数
+    ext_configured = np.array([p.member_external_nights.get(m, 0) for m in members])
+    nights = night.sum(axis=1)
+    max_nights = np.array([p.member_max_nights.get(m, 4) for m in members]) - ext_configured
+    min_nights = np.array([p.member_min_nights.get(m, 0) for m in members]) - ext_configured
+    per_member("H10", nights > max_nights, lambda m: f"{names[m]} の院内夜勤回数が上限を超えています")
+    per_member("H16", nights < min_nights, lambda m: f"{names[m]} の院内夜勤回数が確定回数に足りません")
+    externals = onehot[:, :, SHIFT_CODE_OF[ShiftType.external_night]].sum(axis=1)
+    per_member("H17", externals != ext_configured, lambda m: f"{names[m]} の他院夜勤回数が設定と異なります")
+
+    # H11: 公休日数（常勤は一致、非常勤は以上）
+    offs = onehot[:, :, SHIFT_CODE_OF[ShiftType.day_off]].sum(axis=1)
+    required = np.array([p.member_off_days.get(m, 10) for m in members])
+    part_time = np.array([m in p.part_time_ids for m in members])
+    per_member(
+        "H11",
+        (offs < required) | ((offs > required) & ~part_time),
+        lambda m: f"{names[m]} の公休が {offs[row[m]]} 日です（規定{required[row[m]]}日）",
+    )
 
-def _check_h8_night_midwife(
-    assignments: list[ShiftAssignment],
-    member: Member,
-    date: dt.date,
-) -> list[str]:
-    """H8: 夜勤に助産師必須."""
-    today_shift = _get_shift_type_for(assignments, member.id, date)
-    if today_shift not in NIGHT_SHIFT_TYPES:
-        return []
-
-    night_member_ids = {a.member_id for a in assignments if a.date == date and a.shift_type in NIGHT_SHIFT_TYPES}
-    # 夜勤メンバーに助産師が含まれるか
-    has_midwife = any(
-        a.member.qualification == Qualification.midwife
-        for a in assignments
-        if a.member_id in night_member_ids and a.date == date and a.shift_type in NIGHT_SHIFT_TYPES
+    # H12: 希望休・有給
+    requested = np.full(codes.shape, UNASSIGNED, dtype=np.int8)
+    for m, entries in p.request_map.items():
+        for d, s in entries:
+            if m in row and d in col:
+                requested[row[m], col[d]] = SHIFT_CODE_OF[s]
+    has_request = requested != UNASSIGNED
+    per_cell(
+        "H12", has_request & (codes != requested), lambda m, d: f"{names[m]} の {d:%m/%d} の希望休が叶っていません"
+    )
+    paid_leave = codes == SHIFT_CODE_OF[ShiftType.paid_leave]
+    per_cell(
+        "H12",
+        paid_leave & (requested != SHIFT_CODE_OF[ShiftType.paid_leave]),
+        lambda m, d: f"{names[m]} の {d:%m/%d} は有給の希望がありません",
     )
-    if not has_midwife:
-        warnings_date = date.strftime("%m/%d")
-        return [f"{warnings_date} の夜勤に助産師が配置されていません"]
-    return []
 
+    # H13: 新人が病棟に入る日は病棟系5名
+    rookie = np.array([m in p.rookie_ids for m in members])
+    ward_capable = np.array([CapabilityType.ward_staff in p.member_capabilities.get(m, set()) for m in members])
+    per_date(
+        "H13",
+        (ward & rookie[:, None]).any(axis=0) & ((ward & ward_capable[:, None]).sum(axis=0) < ROOKIE_WARD_MIN_STAFF),
+        lambda d: f"{d:%m/%d} は新人が病棟に入っていますが病棟系が{ROOKIE_WARD_MIN_STAFF}名未満です",
+    )
 
-def _check_h9_consecutive_work(
-    assignments: list[ShiftAssignment],
-    member: Member,
-    date: dt.date,
-) -> list[str]:
-    """H9: 連続勤務5日上限."""
-    work_dates: set[dt.date] = set()
-    for a in assignments:
-        if a.member_id == member.id and a.shift_type != ShiftType.day_off:
-            work_dates.add(a.date)
-
-    # date を含む連続勤務日数を計算
-    consecutive = 1
-    d = date - dt.timedelta(days=1)
-    while d in work_dates:
-        consecutive += 1
-        d -= dt.timedelta(days=1)
-    d = date + dt.timedelta(days=1)
-    while d in work_dates:
-        consecutive += 1
-        d += dt.timedelta(days=1)
-
-    if date not in work_dates:
-        return []
-
-    if consecutive > MAX_CONSECUTIVE_WORK_DAYS:
-        return [f"{member.name} の連続勤務が {consecutive} 日になっています（上限{MAX_CONSECUTIVE_WORK_DAYS}日）"]
-    return []
-
-
-def _check_h10_night_limit(
-    assignments: list[ShiftAssignment],
-    member: Member,
-) -> list[str]:
-    """H10: 院内夜勤月間上限."""
-    night_count = sum(1 for a in assignments if a.member_id == member.id and a.shift_type in NIGHT_SHIFT_TYPES)
-    max_nights: int = member.max_night_shifts - member.external_night_count
-    if night_count > max_nights:
-        return [f"{member.name} の院内夜勤回数が {night_count} 回になっています（上限{max_nights}回）"]
-    return []
+    # H14: 日祝は病棟系のみ
+    per_cell(
+        "H14",
+        onehot[:, :, outside_ward].any(axis=2) & sunday[None, :],
+        lambda m, d: f"{names[m]} は日祝の {d:%m/%d} に病棟系以外のシフトに入っています",
+    )
 
+    # H15: 平日に早番1名（早番は日勤系シフトのみ）
+    weekday = np.array([t == DayType.weekday for t in day_types])
+    early_capable = np.array([CapabilityType.early_shift in p.member_capabilities.get(m, set()) for m in members])
+    if early_capable.any():
+        per_date(
+            "H15",
+            weekday & (early.sum(axis=0) != 1),
+            lambda d: f"{d:%m/%d} の早番が1名ではありません",
+        )
+    per_cell(
+        "H15",
+        early & (~day_shift | ~weekday[None, :] | ~early_capable[:, None]),
+        lambda m, d: f"{names[m]} の {d:%m/%d} の早番は配置できません",
+    )
 
-def _check_h16_night_minimum(
-    assignments: list[ShiftAssignment],
-    member: Member,
-) -> list[str]:
-    """H16: 夜勤確定回数（他院夜勤を含む）."""
-    min_nights: int = member.min_night_shifts - member.external_night_count
-    if min_nights <= 0:
-        return []
-    night_count = sum(1 for a in assignments if a.member_id == member.id and a.shift_type in NIGHT_SHIFT_TYPES)
-    if night_count < min_nights:
-        return [f"{member.name} の院内夜勤回数が {night_count} 回になっています（確定{min_nights}回）"]
-    return []
+    # H18: 夜勤希望
+    night_requested = np.zeros(codes.shape, dtype=bool)
+    for m, req_dates in p.night_shift_request_map.items():
+        for d in req_dates:
+            if m in row and d in col:
+                night_requested[row[m], col[d]] = True
+    per_cell("H18", night_requested & ~night, lambda m, d: f"{names[m]} の {d:%m/%d} の夜勤希望が叶っていません")
+
+    return violations
+
+
+def _ineligible_masks(p: ShiftProblem) -> dict[str, np.ndarray]:
+    """メンバー × シフト の入れない組み合わせを、違反の番号ごとに返す."""
+    requirements = {r.shift_type: r for r in STAFFING_REQUIREMENTS}
+    masks = {code: np.zeros((len(p.member_ids), len(SHIFT_CODES)), dtype=bool) for code in ("H3", "H4", "H5")}
+    for i, m in enumerate(p.member_ids):
+        caps = p.member_capabilities.get(m, set())
+        for k, s in enumerate(SHIFT_CODES):
+            req = requirements.get(s)
+            if s in DAY_SHIFT_TYPES and CapabilityType.day_shift not in caps:
+                masks["H4"][i, k] = True
+            elif s in ALL_NIGHT_TYPES and CapabilityType.night_shift not in caps:
+                masks["H5"][i, k] = True
+            elif req and (
+                any(c not in caps for c in req.required_capabilities)
+                or (req.required_qualification and p.member_qualifications.get(m) != req.required_qualification)
+            ):
+                masks["H3"][i, k] = True
+    return masks
@@ -19,6 +19,10 @@ from entity.member_capability import MemberCapability  # noqa: E402
 from entity.schedule import Schedule  # noqa: E402
 from entity.shift_assignment import ShiftAssignment  # noqa: E402
 from main import app  # noqa: E402
+from pdf.cache import schedule_pdfs  # noqa: E402
+from solver.coverage import invalidate_coverage  # noqa: E402
+from solver.feasibility import invalidate_feasibility_index  # noqa: E402
+from solver.validators import invalidate_validation_state  # noqa: E402
 
 
 @pytest.fixture()
@@ -98,6 +102,7 @@ def create_schedule(db_session: Session) -> Callable[..., Schedule]:
                     member_id=a["member_id"],
                     date=a["date"],
                     shift_type=a["shift_type"],
+                    is_early=a.get("is_early", False),
                 )
             )
         db_session.commit()
@@ -112,3 +117,13 @@ def sample_members(create_member: Callable[..., Member]) -> list[Member]:
     m1 = create_member(name="山田花子", qualification=Qualification.nurse)
     m2 = create_member(name="鈴木一郎", qualification=Qualification.midwife)
     return [m1, m2]
+
+
+@pytest.fixture(autouse=True)
+def _clear_validation_states() -> Generator[None]:
+    # テストごとにDBを作り直すため、スケジュールIDが同じでも別物になる
+    yield
+    invalidate_validation_state()
+    invalidate_coverage()
+    invalidate_feasibility_index()
+    schedule_pdfs.clear()
@@ -2,15 +2,20 @@ import datetime
 
 import pytest
 
+from entity.enums import ShiftType
 from solver.config import (
     DAY_SHIFT_TYPES,
     NIGHT_SHIFT_TYPES,
     STAFFING_REQUIREMENTS,
     WARD_SHIFT_TYPES,
     DayType,
+    add_months,
     get_base_off_days,
     get_day_type,
+    get_holiday_dates,
     get_month_dates,
+    get_month_range,
+    is_holiday_work,
 )
 
 
@@ -37,6 +42,23 @@ class TestGetDayType:
         assert get_day_type(datetime.date(2026, 5, 6)) == DayType.weekday
 
 
+class TestHolidayWork:
+    def test_holiday_dates(self) -> None:
+        dates = get_month_dates("2025-01")
+        holidays = get_holiday_dates(dates)
+        # 元日・成人の日（13日）と日曜
+        assert holidays == [datetime.date(2025, 1, d) for d in (1, 5, 12, 13, 19, 26)]
+
+    def test_counts_working_shifts_on_sundays_and_holidays(self) -> None:
+        assert is_holiday_work(datetime.date(2025, 1, 12), ShiftType.ward)  # 日曜
+        assert is_holiday_work(datetime.date(2025, 1, 13), ShiftType.night)  # 成人の日
+        assert not is_holiday_work(datetime.date(2025, 1, 11), ShiftType.ward)  # 土曜
+
+    def test_leave_is_not_holiday_work(self) -> None:
+        assert not is_holiday_work(datetime.date(2025, 1, 12), ShiftType.day_off)
+        assert not is_holiday_work(datetime.date(2025, 1, 12), ShiftType.paid_leave)
+
+
 class TestGetMonthDates:
     def test_january_31_days(self) -> None:
         dates = get_month_dates("2025-01")
@@ -58,6 +80,25 @@ class TestGetMonthDates:
         assert len(dates) == 30
 
 
+class TestGetMonthRange:
+    def test_single_month(self) -> None:
+        assert get_month_range("2025-04", "2025-04") == ["2025-04"]
+
+    def test_across_year(self) -> None:
+        assert get_month_range("2025-11", "2026-02") == ["2025-11", "2025-12", "2026-01", "2026-02"]
+
+
+class TestAddMonths:
+    def test_forward_and_back(self) -> None:
+        assert add_months("2025-04", 1) == "2025-05"
+        assert add_months("2025-04", -3) == "2025-01"
+
+    def test_across_year(self) -> None:
+        assert add_months("2025-11", 3) == "2026-02"
+        assert add_months("2026-01", -1) == "2025-12"
+        assert add_months("2026-01", -13) == "2024-12"
+
+
 class TestGetBaseOffDays:
     @pytest.mark.parametrize(
         ("days_in_month", "expected"),
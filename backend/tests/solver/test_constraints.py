@@ -21,8 +21,10 @@ from solver.constraints import (
     add_off_day_count,
     add_one_shift_per_day,
     add_paid_leave_only_requested,
+    add_prev_consecutive_work,
     add_prev_month_night_rest,
     add_rookie_ward_constraint,
+    add_shift_count_bounds,
     add_shift_request_hard,
     add_shift_request_soft,
     add_sunday_holiday_ward_only,
@@ -170,6 +172,66 @@ class TestH9MaxConsecutiveWork:
         assert_infeasible(model)
 
 
+# ---------------------------------------------------------------------------
+# H9 補助: 期間をまたぐ連続勤務
+# ---------------------------------------------------------------------------
+class TestH9PrevConsecutiveWork:
+    def test_run_of_four_requires_off_within_two_days(self, week_dates: list[datetime.date]) -> None:
+        """直前まで4日連続勤務 → 先頭2日を勤務にすると6連勤で UNSAT"""
+        model, x = make_model_and_vars([1], week_dates)
+        add_one_shift_per_day(model, x, [1], week_dates)
+        add_prev_consecutive_work(model, x, [1], week_dates, {1: 4})
+        for d in week_dates[:2]:
+            model.add(x[1][str(d)][ShiftType.ward] == 1)
+        assert_infeasible(model)
+
+    def test_run_of_four_allows_one_more_day(self, week_dates: list[datetime.date]) -> None:
+        model, x = make_model_and_vars([1], week_dates)
+        add_one_shift_per_day(model, x, [1], week_dates)
+        add_prev_consecutive_work(model, x, [1], week_dates, {1: 4})
+        model.add(x[1][str(week_dates[0])][ShiftType.ward] == 1)
+        solver = assert_feasible(model)
+        assert (
+            solver.value(x[1][str(week_dates[1])][ShiftType.day_off])
+            + solver.value(x[1][str(week_dates[1])][ShiftType.paid_leave])
+            == 1
+        )
+
+    def test_run_of_five_forces_first_day_off(self, two_day_dates: list[datetime.date]) -> None:
+        model, x = make_model_and_vars([1], two_day_dates)
+        add_one_shift_per_day(model, x, [1], two_day_dates)
+        add_prev_consecutive_work(model, x, [1], two_day_dates, {1: 5})
+        model.add(x[1][str(two_day_dates[0])][ShiftType.ward] == 1)
+        assert_infeasible(model)
+
+
+# ---------------------------------------------------------------------------
+# H11/H17 期間分割用: 回数の範囲制約
+# ---------------------------------------------------------------------------
+class TestShiftCountBounds:
+    def test_lower_bound(self, week_dates: list[datetime.date]) -> None:
+        model, x = make_model_and_vars([1], week_dates)
+        add_one_shift_per_day(model, x, [1], week_dates)
+        add_shift_count_bounds(model, x, [1], week_dates, {ShiftType.day_off}, {1: 3})
+        solver = assert_feasible(model)
+        assert sum(solver.value(x[1][str(d)][ShiftType.day_off]) for d in week_dates) >= 3
+
+    def test_upper_bound_infeasible(self, week_dates: list[datetime.date]) -> None:
+        model, x = make_model_and_vars([1], week_dates)
+        add_one_shift_per_day(model, x, [1], week_dates)
+        add_shift_count_bounds(model, x, [1], week_dates, {ShiftType.day_off}, {}, {1: 1})
+        for d in week_dates[:2]:
+            model.add(x[1][str(d)][ShiftType.day_off] == 1)
+        assert_infeasible(model)
+
+    def test_negative_upper_is_zero(self, two_day_dates: list[datetime.date]) -> None:
+        model, x = make_model_and_vars([1], two_day_dates)
+        add_one_shift_per_day(model, x, [1], two_day_dates)
+        add_shift_count_bounds(model, x, [1], two_day_dates, {ShiftType.external_night}, {}, {1: -1})
+        model.add(x[1][str(two_day_dates[0])][ShiftType.external_night] == 1)
+        assert_infeasible(model)
+
+
 # ---------------------------------------------------------------------------
 # H10: 夜勤回数上限
 # ---------------------------------------------------------------------------
@@ -396,6 +458,18 @@ class TestS2S3Equalization:
         solver = assert_feasible(model)
         assert solver.value(diff) >= 0
 
+    def test_night_equalization_with_offsets(self, two_day_dates: list[datetime.date]) -> None:
+        """既存の夜勤回数が多いメンバーには新たな夜勤を入れない方が差が小さい"""
+        model, x = make_model_and_vars([1, 2], two_day_dates)
+        add_one_shift_per_day(model, x, [1, 2], two_day_dates)
+        ds = str(two_day_dates[0])
+        model.add(x[1][ds][ShiftType.night] + x[2][ds][ShiftType.night] == 1)
+        diff = add_night_equalization(model, x, [1, 2], two_day_dates, offsets={1: 3, 2: 0})
+        model.minimize(diff)
+        solver = assert_feasible(model)
+        assert solver.value(x[2][ds][ShiftType.night]) == 1
+        assert solver.value(diff) == 1
+
     def test_holiday_equalization_no_holidays(self, two_day_dates: list[datetime.date]) -> None:
         """All weekdays → diff is 0"""
         model, x = make_model_and_vars([1, 2], two_day_dates)
@@ -414,6 +488,19 @@ class TestS2S3Equalization:
         solver = assert_feasible(model)
         assert solver.value(diff) >= 0
 
+    def test_holiday_equalization_with_offsets(self) -> None:
+        """過去の日祝出勤が多いメンバーは日曜に休ませる方が差が小さい"""
+        dates = [datetime.date(2025, 1, 11), datetime.date(2025, 1, 12)]  # Sat, Sun
+        model, x = make_model_and_vars([1, 2], dates)
+        add_one_shift_per_day(model, x, [1, 2], dates)
+        sunday = str(dates[1])
+        model.add(x[1][sunday][ShiftType.day_off] + x[2][sunday][ShiftType.day_off] == 1)
+        diff = add_holiday_equalization(model, x, [1, 2], dates, offsets={1: 2})
+        model.minimize(diff)
+        solver = assert_feasible(model)
+        assert solver.value(x[1][sunday][ShiftType.day_off]) == 1
+        assert solver.value(diff) == 1
+
 
 # ---------------------------------------------------------------------------
 # H6: 他院夜勤翌日休み
@@ -779,6 +866,23 @@ class TestS4EarlyEqualization:
         # 5日で2人 → 差は最大1
         assert solver.value(diff) <= 1
 
+    def test_offsets_shift_early_to_member_with_fewer(self) -> None:
+        """過去の早番が多いメンバーには今月の早番を寄せない"""
+        dates = [datetime.date(2025, 1, 6) + datetime.timedelta(days=i) for i in range(4)]
+        model, x = make_model_and_vars([1, 2], dates)
+        add_one_shift_per_day(model, x, [1, 2], dates)
+        caps = {1: {CapabilityType.early_shift}, 2: {CapabilityType.early_shift}}
+        early = add_early_shift_constraint(model, x, [1, 2], dates, caps)
+        assert early is not None
+        diff = add_early_equalization(model, early, dates, offsets={1: 4})
+        for m in [1, 2]:
+            for d in dates:
+                model.add(x[m][str(d)][ShiftType.ward] == 1)
+        model.minimize(diff)
+        solver = assert_feasible(model)
+        assert sum(solver.value(early[2][str(d)]) for d in dates) == 4
+        assert solver.value(diff) == 0
+
 
 # ---------------------------------------------------------------------------
 # S5: 日勤希望ソフト制約
@@ -0,0 +1,163 @@
+import datetime
+
+from entity.enums import CapabilityType, Qualification, ShiftType
+from solver.feasibility import FeasibilityIndex
+from solver.generator import ShiftProblem
+
+MON = datetime.date(2025, 1, 6)
+DATES = [MON + datetime.timedelta(days=i) for i in range(7)]
+NIGHT_CAPS = {
+    CapabilityType.day_shift,
+    CapabilityType.night_shift,
+    CapabilityType.night_leader,
+    CapabilityType.ward_staff,
+}
+
+
+def _day(i: int) -> datetime.date:
+    return DATES[i]
+
+
+def _problem(**overrides: object) -> ShiftProblem:
+    """1週間（2025-01-06〜12）・6名の問題。1〜4は助産師、5・6は看護師。"""
+    member_ids = list(range(1, 7))
+    values: dict[str, object] = {
+        "year_month": "2025-01",
+        "dates": DATES,
+        "member_ids": member_ids,
+        "member_names": {m: f"M{m}" for m in member_ids},
+        "member_capabilities": {m: set(NIGHT_CAPS) for m in member_ids},
+        "member_qualifications": {m: Qualification.midwife if m <= 4 else Qualification.nurse for m in member_ids},
+        "member_max_nights": dict.fromkeys(member_ids, 4),
+        "member_min_nights": dict.fromkeys(member_ids, 0),
+        "member_external_nights": dict.fromkeys(member_ids, 0),
+        "member_off_days": dict.fromkeys(member_ids, 2),
+        "ng_pairs": [],
+        "request_map": {},
+        "day_shift_request_map": {},
+        "night_shift_request_map": {},
+        "pediatric_dates": set(),
+        "prev_night_member_ids": set(),
+        "rookie_ids": [],
+        "part_time_ids": set(),
+    }
+    values.update(overrides)
+    return ShiftProblem(**values)  # type: ignore[arg-type]
+
+
+def _cells() -> dict[tuple[int, datetime.date], ShiftType]:
+    """各メンバー 病棟→…の単純なパターン。水曜の夜勤は 1（夜L）と 5（夜勤）。"""
+    cells = {(m, d): ShiftType.ward_free for m in range(1, 7) for d in DATES}
+    for m in range(1, 7):
+        cells[(m, _day(5))] = ShiftType.day_off
+        cells[(m, _day(6))] = ShiftType.day_off
+    cells[(1, _day(2))] = ShiftType.night_leader
+    cells[(1, _day(3))] = ShiftType.day_off
+    cells[(1, _day(5))] = ShiftType.ward_free
+    cells[(5, _day(2))] = ShiftType.night
+    cells[(5, _day(3))] = ShiftType.day_off
+    cells[(5, _day(5))] = ShiftType.ward_free
+    return cells
+
+
+class TestMemberRules:
+    def test_night_then_off(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        assert "H6" in index.violations(_day(3), {1: ShiftType.ward_free})
+        assert "H6" in index.violations(_day(1), {2: ShiftType.night})
+
+    def test_consecutive_work(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        # 2 は月〜金の5連勤。土曜を勤務にすると6連勤
+        assert "H9" in index.violations(_day(5), {2: ShiftType.ward_free})
+
+    def test_consecutive_work_carries_previous_month(self) -> None:
+        from solver.boundary import BoundaryState
+
+        cells = _cells()
+        cells[(2, _day(1))] = ShiftType.day_off
+        index = FeasibilityIndex(_problem(), cells, boundary=BoundaryState(work_runs={2: 5}))
+        assert "H9" not in index.violations(_day(0), {2: ShiftType.ward_free})
+        cells[(2, _day(0))] = ShiftType.day_off
+        index = FeasibilityIndex(_problem(), cells, boundary=BoundaryState(work_runs={2: 5}))
+        assert "H9" in index.violations(_day(0), {2: ShiftType.ward_free})
+
+    def test_night_limit_and_eligibility(self) -> None:
+        p = _problem(member_max_nights={**dict.fromkeys(range(1, 7), 4), 1: 1})
+        p.member_capabilities[6] = {CapabilityType.day_shift, CapabilityType.ward_staff}
+        index = FeasibilityIndex(p, _cells())
+        assert "H10" in index.violations(_day(0), {1: ShiftType.night})
+        assert "H5" in index.violations(_day(0), {6: ShiftType.night})
+
+    def test_off_day_count(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        assert "H11" in index.violations(_day(6), {3: ShiftType.ward_free})
+
+    def test_requests(self) -> None:
+        p = _problem(request_map={3: [(_day(6), ShiftType.day_off)]})
+        index = FeasibilityIndex(p, _cells())
+        codes = index.violations(_day(6), {3: ShiftType.paid_leave})
+        assert {"H12"} <= codes
+
+
+class TestDateRules:
+    def test_ng_pair(self) -> None:
+        cells = _cells()
+        cells[(5, _day(2))] = ShiftType.ward_free
+        index = FeasibilityIndex(_problem(ng_pairs=[(1, 2)]), cells)
+        assert "H7" in index.violations(_day(2), {2: ShiftType.night})
+        assert "H7" not in index.violations(_day(2), {3: ShiftType.night})
+
+    def test_night_midwife(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        # 夜Lの助産師 1 を看護師 6 と入れ替えると夜勤が看護師だけになる
+        assert "H8" in index.violations(_day(2), {1: ShiftType.ward_free, 6: ShiftType.night_leader})
+        assert "H8" not in index.violations(_day(2), {1: ShiftType.ward_free, 2: ShiftType.night_leader})
+
+    def test_staffing(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        # 夜勤は1名まで
+        assert "H2" in index.violations(_day(2), {2: ShiftType.night})
+        # 不足しているポジションへの追加は悪化ではない
+        assert "H2" not in index.violations(_day(0), {2: ShiftType.ward_leader})
+
+
+class TestSuggest:
+    def test_night_cell(self) -> None:
+        index = FeasibilityIndex(_problem(), _cells())
+        s = index.suggest(5, _day(2))
+
+        # 夜勤を外すと夜勤が不足し、ほかのメンバーを足すと夜勤が2名を超える
+        assert s.shifts == []
+        assert s.members == []
+        # 夜L 1 とは入れ替えられる。ほかのメンバーは翌日が勤務のため H6
+        assert s.swaps == [1]
+
+    def test_swap_requires_capability(self) -> None:
+        cells = _cells()
+        cells[(2, _day(0))] = ShiftType.ward_leader
+        p = _problem()
+        for m in (2, 3):
+            p.member_capabilities[m].add(CapabilityType.ward_leader)
+        index = FeasibilityIndex(p, cells)
+
+        s = index.suggest(2, _day(0))
+        assert s.swaps == [3]
+        # 病棟Lを空けると H2
+        assert ShiftType.ward not in s.shifts
+        # 病棟に移れるのは病棟L 2 以外
+        assert index.suggest(3, _day(0), ShiftType.ward).members == [1, 4, 5, 6]
+
+    def test_apply_matches_rebuild(self) -> None:
+        cells = _cells()
+        index = FeasibilityIndex(_problem(), cells)
+        index.apply(2, _day(0), ShiftType.night)
+        index.apply(2, _day(1), ShiftType.day_off)
+
+        cells[(2, _day(0))] = ShiftType.night
+        cells[(2, _day(1))] = ShiftType.day_off
+        rebuilt = FeasibilityIndex(_problem(), cells)
+        assert index.night_counts == rebuilt.night_counts
+        assert index.off_counts == rebuilt.off_counts
+        assert index.staff == rebuilt.staff
+        assert index.night_members == rebuilt.night_members
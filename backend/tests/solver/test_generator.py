@@ -1,12 +1,27 @@
 import datetime
+from collections.abc import Callable
 from types import SimpleNamespace
+from typing import Any
 from unittest.mock import patch
 
 import pytest
+from ortools.sat.python import cp_model
+from sqlalchemy.orm import Session
 
-from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from entity.enums import CapabilityType, EmploymentType, ObjectiveMode, Qualification, RequestType, ShiftType
+from entity.member import Member
+from entity.shift_request import ShiftRequest
+from solver.boundary import BoundaryState, load_boundary_state
 from solver.config import get_base_off_days
-from solver.generator import generate_shift
+from solver.generator import (
+    _load_data_batch,
+    _solve_objectives,
+    add_history,
+    build_problem,
+    generate_shift,
+    solve_problem,
+    solve_problem_alternatives,
+)
 
 
 def _make_member(
@@ -196,3 +211,216 @@ class TestGenerateShiftIntegration:
         with patch("solver.generator._load_data", return_value=load_return):
             with pytest.raises(RuntimeError):
                 generate_shift(None, "2025-01")  # type: ignore[arg-type]  # type: ignore[arg-type]
+
+
+class TestBatchGeneration:
+    def test_load_data_batch_splits_by_month(
+        self,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m1 = create_member(name="A", capabilities=[CapabilityType.day_shift, CapabilityType.night_shift])
+        m2 = create_member(name="B", capabilities=[CapabilityType.day_shift])
+        create_member(name="能力なし")
+        create_schedule(
+            year_month="2024-12",
+            assignments=[{"member_id": m1.id, "date": datetime.date(2024, 12, 31), "shift_type": ShiftType.night}],
+        )
+        db_session.add_all(
+            [
+                ShiftRequest(member_id=m1.id, year_month="2025-01", date=datetime.date(2025, 1, 10)),
+                ShiftRequest(
+                    member_id=m2.id,
+                    year_month="2025-02",
+                    date=datetime.date(2025, 2, 3),
+                    request_type=RequestType.paid_leave,
+                ),
+            ]
+        )
+        db_session.commit()
+
+        loaded = _load_data_batch(db_session, ["2025-01", "2025-02"])
+
+        jan, feb = loaded["2025-01"], loaded["2025-02"]
+        assert [m.id for m in jan[0]] == [m1.id, m2.id]
+        assert jan[7] == {m1.id: [(datetime.date(2025, 1, 10), ShiftType.day_off)]}
+        assert feb[7] == {m2.id: [(datetime.date(2025, 2, 3), ShiftType.paid_leave)]}
+        assert jan[11] == {m1.id}
+        assert feb[11] == set()
+
+    def test_load_boundary_state(
+        self,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m1 = create_member(name="A")
+        m2 = create_member(name="B")
+        first = datetime.date(2025, 2, 1)
+        assignments = [
+            {"member_id": m1.id, "date": first - datetime.timedelta(days=i), "shift_type": ShiftType.ward}
+            for i in range(1, 5)
+        ]
+        assignments.append(
+            {"member_id": m1.id, "date": first - datetime.timedelta(days=5), "shift_type": ShiftType.day_off}
+        )
+        assignments.append(
+            {"member_id": m2.id, "date": first - datetime.timedelta(days=1), "shift_type": ShiftType.night}
+        )
+        create_schedule(year_month="2025-01", assignments=assignments)
+
+        state = load_boundary_state(db_session, first)
+
+        assert state.work_runs == {m1.id: 4, m2.id: 1}
+        assert state.night_member_ids == {m2.id}
+
+    def test_solve_problem_carries_boundary(self) -> None:
+        members = [_make_member(id=i, max_night_shifts=5) for i in range(1, 16)]
+        load_return: tuple = (
+            members,
+            {m.id: _full_caps() for m in members},
+            {m.id: Qualification.midwife for m in members},
+            {m.id: 5 for m in members},
+            {m.id: 0 for m in members},
+            {m.id: 0 for m in members},
+            [],
+            {},
+            {},
+            {},
+            set(),
+            set(),
+        )
+        with patch("solver.generator._load_data", return_value=load_return):
+            problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+        boundary = BoundaryState(night_member_ids={1}, work_runs={2: 5})
+
+        assignments, _ = solve_problem(problem, boundary)
+
+        first_day = {a["member_id"]: a["shift_type"] for a in assignments if a["date"] == "2025-01-01"}
+        assert first_day[1] == ShiftType.day_off
+        assert first_day[2] == ShiftType.day_off
+
+    def test_add_history_counts_holiday_work_like_equalization(self) -> None:
+        members = [_make_member(id=i) for i in (1, 2)]
+        load_return: tuple = (
+            members,
+            {m.id: _full_caps() for m in members},
+            {m.id: Qualification.midwife for m in members},
+            {m.id: 5 for m in members},
+            {m.id: 0 for m in members},
+            {m.id: 0 for m in members},
+            [],
+            {},
+            {},
+            {},
+            set(),
+            set(),
+        )
+        with patch("solver.generator._load_data", return_value=load_return):
+            problem = build_problem(None, "2025-02")  # type: ignore[arg-type]
+
+        add_history(
+            problem,
+            [
+                {"member_id": 1, "date": "2025-01-11", "shift_type": ShiftType.ward},  # 土曜
+                {"member_id": 1, "date": "2025-01-12", "shift_type": ShiftType.ward},  # 日曜
+                {"member_id": 1, "date": "2025-01-13", "shift_type": ShiftType.night},  # 成人の日
+                {"member_id": 1, "date": "2025-01-19", "shift_type": ShiftType.paid_leave},  # 日曜の有給
+                {"member_id": 2, "date": "2025-01-26", "shift_type": ShiftType.day_off},
+            ],
+        )
+
+        assert problem.holiday_history.get(1, 0) == 2
+        assert problem.holiday_history.get(2, 0) == 0
+        assert problem.night_history.get(1, 0) == 1
+
+
+class TestObjectiveMode:
+    def _model(self) -> tuple[cp_model.CpModel, cp_model.IntVar, cp_model.IntVar]:
+        model = cp_model.CpModel()
+        a = model.new_int_var(0, 10, "a")
+        b = model.new_int_var(0, 10, "b")
+        model.add(a + b >= 10)
+        return model, a, b
+
+    def test_weighted_trades_off_by_weight(self) -> None:
+        model, a, b = self._model()
+        solver, status = _solve_objectives(model, [("a", a, 1), ("b", b, 100)], ObjectiveMode.weighted)
+        assert status == cp_model.OPTIMAL
+        assert (solver.value(a), solver.value(b)) == (10, 0)
+
+    def test_lexicographic_respects_priority(self) -> None:
+        model, a, b = self._model()
+        solver, status = _solve_objectives(model, [("a", a, 1), ("b", b, 100)], ObjectiveMode.lexicographic)
+        assert status == cp_model.OPTIMAL
+        assert (solver.value(a), solver.value(b)) == (0, 10)
+
+    def test_lexicographic_skips_constant_objective(self) -> None:
+        model, a, b = self._model()
+        solver, status = _solve_objectives(model, [("empty", -sum([]), 2), ("b", b, 1)], ObjectiveMode.lexicographic)
+        assert status == cp_model.OPTIMAL
+        assert solver.value(b) == 0
+
+    def test_lexicographic_infeasible(self) -> None:
+        model, a, b = self._model()
+        model.add(a + b <= 5)
+        _, status = _solve_objectives(model, [("a", a, 1)], ObjectiveMode.lexicographic)
+        assert status == cp_model.INFEASIBLE
+
+    def test_generate_shift_lexicographic(self) -> None:
+        members = [_make_member(id=i, max_night_shifts=5) for i in range(1, 16)]
+        load_return: tuple = (
+            members,
+            {m.id: _full_caps() for m in members},
+            {m.id: Qualification.midwife for m in members},
+            {m.id: 5 for m in members},
+            {m.id: 0 for m in members},
+            {m.id: 0 for m in members},
+            [],
+            {1: [(datetime.date(2025, 1, 10), ShiftType.day_off)]},
+            {},
+            {},
+            set(),
+            set(),
+        )
+        with (
+            patch("solver.generator._load_data", return_value=load_return),
+            patch("solver.generator.LEXICOGRAPHIC_STAGE_TIMEOUT_SECONDS", 3),
+        ):
+            assignments, unfulfilled = generate_shift(None, "2025-01", mode=ObjectiveMode.lexicographic)  # type: ignore[arg-type]
+        assert unfulfilled == []
+        assert any(
+            a["member_id"] == 1 and a["date"] == "2025-01-10" and a["shift_type"] == ShiftType.day_off
+            for a in assignments
+        )
+
+
+class TestAlternatives:
+    def test_alternatives_differ(self) -> None:
+        members = [_make_member(id=i, max_night_shifts=5) for i in range(1, 16)]
+        load_return: tuple = (
+            members,
+            {m.id: _full_caps() for m in members},
+            {m.id: Qualification.midwife for m in members},
+            {m.id: 5 for m in members},
+            {m.id: 0 for m in members},
+            {m.id: 0 for m in members},
+            [],
+            {},
+            {},
+            {},
+            set(),
+            set(),
+        )
+        with patch("solver.generator._load_data", return_value=load_return):
+            problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+
+        results = solve_problem_alternatives(problem, 3, min_diff_cells=20)
+
+        assert len(results) == 3
+        cells = [{(a["member_id"], a["date"]): a["shift_type"] for a in assignments} for assignments, _ in results]
+        for i in range(1, 3):
+            assert len(cells[i]) == len(cells[0])
+            diff = sum(1 for key, st in cells[i].items() if cells[i - 1][key] != st)
+            assert diff >= 20
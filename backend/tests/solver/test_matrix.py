@@ -0,0 +1,58 @@
+import datetime
+from collections.abc import Callable
+from typing import Any
+
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.member import Member
+from solver.config import NIGHT_SHIFT_TYPES, get_month_dates
+from solver.matrix import UNASSIGNED, ScheduleMatrix
+
+JAN = get_month_dates("2025-01")
+
+
+class TestScheduleMatrix:
+    def test_from_cells(self) -> None:
+        matrix = ScheduleMatrix.from_cells(
+            [1, 2],
+            JAN,
+            {
+                (1, JAN[0]): ShiftType.night,
+                (1, JAN[1]): ShiftType.day_off,
+                (2, JAN[0]): ShiftType.ward,
+                (3, JAN[0]): ShiftType.ward,  # 対象外のメンバーは無視
+            },
+            {(2, JAN[0])},
+        )
+        assert matrix.codes.shape == (2, 31)
+        assert matrix.get(1, JAN[0]) == ShiftType.night
+        assert matrix.get(2, JAN[1]) is None
+        assert matrix.count(NIGHT_SHIFT_TYPES).tolist() == [1, 0]
+        assert matrix.assigned.sum() == 3
+        assert matrix.early[matrix.member_index[2], 0]
+
+        matrix.set(2, JAN[0], None)
+        assert matrix.codes[1, 0] == UNASSIGNED
+        assert not matrix.early.any()
+
+    def test_load(
+        self,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m1 = create_member(name="A")
+        m2 = create_member(name="B")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m1.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+                {"member_id": m2.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
+                {"member_id": m2.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.day_off},
+            ],
+        )
+        matrix = ScheduleMatrix.load(db_session, sched.id, [m2.id, m1.id], JAN)
+        assert matrix.member_ids == [m2.id, m1.id]
+        assert matrix.get(m1.id, datetime.date(2025, 1, 6)) == ShiftType.ward
+        assert matrix.count({ShiftType.day_off}).tolist() == [1, 0]
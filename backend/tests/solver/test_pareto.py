@@ -0,0 +1,130 @@
+import dataclasses
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from solver.generator import ObjectiveWeights, ShiftProblem, build_problem
+from solver.pareto import ParetoPoint, compute_pareto_front, non_dominated, solve_weighted
+
+
+def _full_caps() -> set[CapabilityType]:
+    return {
+        CapabilityType.day_shift,
+        CapabilityType.night_shift,
+        CapabilityType.night_leader,
+        CapabilityType.outpatient_leader,
+        CapabilityType.ward_leader,
+        CapabilityType.ward_staff,
+        CapabilityType.beauty,
+        CapabilityType.mw_outpatient,
+    }
+
+
+def _week_problem() -> ShiftProblem:
+    """16名・1週間の小さな問題。"""
+    members = [
+        SimpleNamespace(
+            id=i,
+            name=f"M{i}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=5,
+            min_night_shifts=0,
+            external_night_count=0,
+            night_shift_deduction_balance=0,
+        )
+        for i in range(1, 17)
+    ]
+    load_return: tuple = (
+        members,
+        {m.id: _full_caps() for m in members},
+        {m.id: Qualification.midwife for m in members},
+        {m.id: 5 for m in members},
+        {m.id: 0 for m in members},
+        {m.id: 0 for m in members},
+        [],
+        {1: [(datetime.date(2025, 1, 8), ShiftType.day_off)]},
+        {2: [datetime.date(2025, 1, 7)]},
+        {},
+        set(),
+        set(),
+    )
+    with patch("solver.generator._load_data", return_value=load_return):
+        problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+    return dataclasses.replace(
+        problem,
+        dates=problem.dates[5:12],
+        member_off_days=dict.fromkeys(problem.member_ids, 2),
+    )
+
+
+def _point(unfulfilled: int, night: int, holiday: int, early: int = 0, day_shift_unfulfilled: int = 0) -> ParetoPoint:
+    return ParetoPoint(
+        weights=ObjectiveWeights(),
+        night_diff=night,
+        holiday_diff=holiday,
+        early_diff=early,
+        fulfilled_requests=5 - unfulfilled,
+        request_total=5,
+        fulfilled_day_shift_requests=3 - day_shift_unfulfilled,
+        day_shift_request_total=3,
+        assignments=[],
+        unfulfilled=[],
+    )
+
+
+class TestNonDominated:
+    def test_removes_dominated(self) -> None:
+        a = _point(0, 1, 3)
+        b = _point(0, 2, 1)
+        c = _point(0, 2, 3)  # a に支配される
+        assert non_dominated([a, b, c]) == [a, b]
+
+    def test_removes_duplicates(self) -> None:
+        a = _point(1, 1, 1)
+        b = _point(1, 1, 1)
+        assert non_dominated([a, b]) == [a]
+
+    def test_fewer_unfulfilled_is_not_dominated(self) -> None:
+        a = _point(0, 3, 3)
+        b = _point(1, 0, 0)
+        assert non_dominated([a, b]) == [a, b]
+
+    def test_day_shift_requests_are_compared(self) -> None:
+        a = _point(0, 1, 1, day_shift_unfulfilled=0)
+        b = _point(0, 1, 1, day_shift_unfulfilled=1)  # a に支配される
+        c = _point(0, 0, 1, day_shift_unfulfilled=2)
+        assert non_dominated([a, b, c]) == [a, c]
+
+
+class TestSolveWeighted:
+    def test_component_values(self) -> None:
+        problem = _week_problem()
+        point, solution = solve_weighted(problem, ObjectiveWeights())
+
+        assert point.request_total == 1
+        assert point.fulfilled_requests == 1
+        assert point.day_shift_request_total == 1
+        assert point.night_diff >= 0
+        assert point.holiday_diff >= 0
+        assert len(point.assignments) == len(problem.member_ids) * len(problem.dates)
+        assert solution
+
+    def test_hint_from_other_weights(self) -> None:
+        problem = _week_problem()
+        _, solution = solve_weighted(problem, ObjectiveWeights())
+        point, _ = solve_weighted(problem, ObjectiveWeights(night_diff=30), hint=solution)
+        assert point.fulfilled_requests == 1
+
+
+class TestComputeParetoFront:
+    def test_process_pool(self) -> None:
+        problem = _week_problem()
+        grid = [ObjectiveWeights(night_diff=1, holiday_diff=30), ObjectiveWeights(night_diff=30, holiday_diff=1)]
+
+        front = compute_pareto_front(problem, grid, max_processes=2)
+
+        assert 1 <= len(front) <= 2
+        assert all(p.weights in grid for p in front)
+        assert non_dominated(front) == front
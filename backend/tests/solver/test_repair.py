@@ -0,0 +1,145 @@
+import dataclasses
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from solver.config import NIGHT_SHIFT_TYPES
+from solver.generator import ShiftProblem, build_problem, solve_problem
+from solver.repair import repair_neighbourhood, solve_repair
+
+MON = datetime.date(2025, 1, 6)
+
+
+def _full_caps(member_id: int) -> set[CapabilityType]:
+    caps = {
+        CapabilityType.day_shift,
+        CapabilityType.night_shift,
+        CapabilityType.night_leader,
+        CapabilityType.outpatient_leader,
+        CapabilityType.ward_leader,
+        CapabilityType.ward_staff,
+        CapabilityType.beauty,
+        CapabilityType.mw_outpatient,
+    }
+    if member_id <= 4:
+        caps.add(CapabilityType.early_shift)
+    return caps
+
+
+def _week_problem() -> ShiftProblem:
+    """16名・1週間（2025-01-06〜12）の小さな問題。"""
+    members = [
+        SimpleNamespace(
+            id=i,
+            name=f"M{i}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=4,
+            min_night_shifts=0,
+            external_night_count=0,
+            night_shift_deduction_balance=0,
+        )
+        for i in range(1, 17)
+    ]
+    load_return: tuple = (
+        members,
+        {m.id: _full_caps(m.id) for m in members},
+        {m.id: Qualification.midwife for m in members},
+        {m.id: 4 for m in members},
+        {m.id: 0 for m in members},
+        {m.id: 0 for m in members},
+        [],
+        {1: [(datetime.date(2025, 1, 9), ShiftType.day_off)]},
+        {},
+        {},
+        set(),
+        set(),
+    )
+    with patch("solver.generator._load_data", return_value=load_return):
+        problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+    return dataclasses.replace(
+        problem,
+        dates=problem.dates[5:12],
+        member_off_days=dict.fromkeys(problem.member_ids, 2),
+    )
+
+
+@pytest.fixture(scope="module")
+def week() -> tuple[ShiftProblem, dict[tuple[int, datetime.date], tuple[ShiftType, bool]]]:
+    p = _week_problem()
+    assignments, _ = solve_problem(p)
+    current = {
+        (a["member_id"], datetime.date.fromisoformat(a["date"])): (a["shift_type"], a["is_early"]) for a in assignments
+    }
+    return p, current
+
+
+class TestRepairNeighbourhood:
+    def test_dates_and_members(self) -> None:
+        p = _week_problem()
+        free = repair_neighbourhood(p, [MON + datetime.timedelta(days=3)], [5], 1)
+
+        assert {d for m, d in free if m == 1} == {MON + datetime.timedelta(days=i) for i in (2, 3, 4)}
+        assert {d for m, d in free if m == 5} == set(p.dates)
+
+
+class TestSolveRepair:
+    def test_absence_changes_only_neighbourhood(self, week: tuple) -> None:
+        p, current = week
+        target = MON + datetime.timedelta(days=3)
+        member = next(m for m in p.member_ids if current[(m, target)][0] in NIGHT_SHIFT_TYPES)
+        fixed = {(member, target): ShiftType.paid_leave}
+
+        result = solve_repair(p, current, fixed, radius_days=1)
+
+        changed = {(c["member_id"], c["date"]) for c in result.changes}
+        assert (member, target) in changed
+        free = repair_neighbourhood(p, [target], [member], result.radius_days)
+        assert changed <= free
+        # 夜勤の欠員はほかのメンバーで埋まる
+        after = dict(current)
+        after.update({(c["member_id"], c["date"]): (c["shift_type"], c["is_early"]) for c in result.changes})
+        assert sum(1 for m in p.member_ids if after[(m, target)][0] in NIGHT_SHIFT_TYPES) == 2
+        assert all(
+            after[(m, target + datetime.timedelta(days=1))][0] == ShiftType.day_off
+            for m in p.member_ids
+            if after[(m, target)][0] in NIGHT_SHIFT_TYPES
+        )
+
+    def test_valid_schedule_is_unchanged(self, week: tuple) -> None:
+        p, current = week
+        result = solve_repair(p, current, {}, affected_dates=[MON + datetime.timedelta(days=2)])
+        assert result.changes == []
+
+    def test_unassigned_cells_outside_neighbourhood_stay_empty(self, week: tuple) -> None:
+        p, current = week
+        empty = next((m, d) for (m, d), (s, _) in current.items() if d == p.dates[0] and s == ShiftType.day_off)
+        current = {cell: value for cell, value in current.items() if cell != empty}
+
+        result = solve_repair(p, current, {}, affected_dates=[p.dates[-1]], radius_days=1)
+        assert empty not in {(c["member_id"], c["date"]) for c in result.changes}
+        assert result.changes == []
+
+    def test_fulfilled_request_is_kept(self, week: tuple) -> None:
+        p, current = week
+        requested = (1, datetime.date(2025, 1, 9))
+        assert current[requested][0] == ShiftType.day_off
+
+        result = solve_repair(p, current, {}, affected_member_ids=[1], affected_dates=[requested[1]])
+        assert requested not in {(c["member_id"], c["date"]) for c in result.changes}
+
+    def test_requires_target(self, week: tuple) -> None:
+        p, current = week
+        with pytest.raises(ValueError):
+            solve_repair(p, current, {})
+
+    def test_infeasible_raises_after_widening(self, week: tuple) -> None:
+        p, current = week
+        target = MON + datetime.timedelta(days=3)
+        fixed = {(m, target): ShiftType.paid_leave for m in p.member_ids}
+
+        with pytest.raises(RuntimeError, match="修復できませんでした"):
+            solve_repair(p, current, fixed)
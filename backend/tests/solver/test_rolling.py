@@ -0,0 +1,161 @@
+import datetime
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from solver.boundary import BoundaryState
+from solver.config import EXTERNAL_NIGHT_TYPES, NIGHT_SHIFT_TYPES, OFF_DAY_TYPES, get_base_off_days
+from solver.constraints import add_early_equalization, add_holiday_equalization
+from solver.generator import ShiftProblem, build_problem
+from solver.rolling import solve_rolling
+
+
+def _full_caps() -> set[CapabilityType]:
+    return {
+        CapabilityType.day_shift,
+        CapabilityType.night_shift,
+        CapabilityType.night_leader,
+        CapabilityType.outpatient_leader,
+        CapabilityType.ward_leader,
+        CapabilityType.ward_staff,
+        CapabilityType.beauty,
+        CapabilityType.mw_outpatient,
+    }
+
+
+def _load_data_stub(_db: object, _year_month: str) -> tuple:
+    members = [
+        SimpleNamespace(
+            id=i,
+            name=f"M{i}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=5,
+            min_night_shifts=0,
+            external_night_count=0,
+            night_shift_deduction_balance=0,
+        )
+        for i in range(1, 17)
+    ]
+    return (
+        members,
+        {m.id: _full_caps() for m in members},
+        {m.id: m.qualification for m in members},
+        {m.id: 5 for m in members},
+        {m.id: 0 for m in members},
+        {m.id: 0 for m in members},
+        [],
+        {},
+        {},
+        {},
+        set(),
+        set(),
+    )
+
+
+def _problems(year_months: list[str]) -> list[ShiftProblem]:
+    with patch("solver.generator._load_data", side_effect=_load_data_stub):
+        return [build_problem(None, ym) for ym in year_months]  # type: ignore[arg-type]
+
+
+class TestBoundaryState:
+    def test_advance_tracks_runs_and_counts(self) -> None:
+        state = BoundaryState()
+        state.advance(
+            [
+                {"member_id": 1, "date": "2025-01-30", "shift_type": ShiftType.ward},
+                {"member_id": 2, "date": "2025-01-30", "shift_type": ShiftType.day_off},
+                {"member_id": 1, "date": "2025-01-31", "shift_type": ShiftType.night},
+                {"member_id": 2, "date": "2025-01-31", "shift_type": ShiftType.ward},
+            ]
+        )
+        assert state.work_runs == {1: 2, 2: 1}
+        assert state.night_member_ids == {1}
+        assert state.month_nights["2025-01"] == {1: 1}
+        assert state.month_off_days["2025-01"] == {2: 1}
+        assert state.total_nights == {1: 1}
+
+    def test_advance_tracks_holiday_and_early_totals(self) -> None:
+        state = BoundaryState(total_holidays={1: 2})
+        state.advance(
+            [
+                # 2025-01-05 は日曜
+                {"member_id": 1, "date": "2025-01-05", "shift_type": ShiftType.ward},
+                {"member_id": 2, "date": "2025-01-05", "shift_type": ShiftType.day_off},
+                {"member_id": 1, "date": "2025-01-06", "shift_type": ShiftType.day_off},
+                {"member_id": 2, "date": "2025-01-06", "shift_type": ShiftType.ward, "is_early": True},
+            ]
+        )
+        assert state.total_holidays == {1: 3}
+        assert state.total_earlies == {2: 1}
+
+
+class TestSolveRolling:
+    def test_rejects_invalid_commit_days(self) -> None:
+        with pytest.raises(ValueError):
+            solve_rolling(_problems(["2025-01"]), window_days=7, commit_days=8)
+
+    def test_rejects_non_consecutive_months(self) -> None:
+        with pytest.raises(ValueError):
+            solve_rolling(_problems(["2025-01", "2025-03"]))
+
+    def test_two_months_keep_rules_across_windows(self) -> None:
+        problems = _problems(["2025-01", "2025-02"])
+        results, state = solve_rolling(problems, window_days=10, commit_days=7, window_timeout=3)
+
+        assert set(results) == {"2025-01", "2025-02"}
+        grid: dict[int, dict[datetime.date, ShiftType]] = {}
+        for ym, (assignments, unfulfilled) in results.items():
+            assert unfulfilled == []
+            for a in assignments:
+                assert str(a["date"]).startswith(ym)
+                grid.setdefault(int(a["member_id"]), {})[datetime.date.fromisoformat(str(a["date"]))] = a["shift_type"]
+
+        all_dates = [d for p in problems for d in p.dates]
+        for m, shifts in grid.items():
+            assert len(shifts) == len(all_dates)
+            run = 0
+            for i, d in enumerate(all_dates):
+                run = 0 if shifts[d] in OFF_DAY_TYPES else run + 1
+                assert run <= 5, f"member {m} works more than 5 days in a row at {d}"
+                if i > 0 and shifts[all_dates[i - 1]] in NIGHT_SHIFT_TYPES | EXTERNAL_NIGHT_TYPES:
+                    assert shifts[d] in OFF_DAY_TYPES
+            for p in problems:
+                offs = sum(1 for d in p.dates if shifts[d] == ShiftType.day_off)
+                nights = sum(1 for d in p.dates if shifts[d] in NIGHT_SHIFT_TYPES)
+                assert offs == get_base_off_days(len(p.dates))
+                assert nights <= 5
+        assert sum(state.total_nights.values()) == 2 * len(all_dates)
+        earlies = sum(1 for assignments, _ in results.values() for a in assignments if a["is_early"])
+        assert sum(state.total_earlies.values()) == earlies
+
+    def test_windows_use_carried_totals_as_offsets(self) -> None:
+        problems = _problems(["2025-01"])
+        for m in (1, 2, 3):
+            problems[0].member_capabilities[m].add(CapabilityType.early_shift)
+        boundary = BoundaryState(total_holidays={1: 3}, total_earlies={2: 4})
+        holiday_offsets: list[dict[int, int]] = []
+        early_offsets: list[dict[int, int]] = []
+
+        def holiday_spy(*args: Any, offsets: dict[int, int]) -> Any:
+            holiday_offsets.append(dict(offsets))
+            return add_holiday_equalization(*args, offsets=offsets)
+
+        def early_spy(*args: Any, offsets: dict[int, int]) -> Any:
+            early_offsets.append(dict(offsets))
+            return add_early_equalization(*args, offsets=offsets)
+
+        with (
+            patch("solver.rolling.add_holiday_equalization", side_effect=holiday_spy),
+            patch("solver.rolling.add_early_equalization", side_effect=early_spy),
+        ):
+            solve_rolling(problems, window_days=10, commit_days=7, window_timeout=3, boundary=boundary)
+
+        assert holiday_offsets[0] == {1: 3}
+        assert early_offsets[0] == {2: 4}
+        # 後のウィンドウには、前のウィンドウで確定した回数を加えた通算が渡る
+        assert sum(holiday_offsets[-1].values()) > 3
+        assert sum(early_offsets[-1].values()) > 4
@@ -0,0 +1,125 @@
+import dataclasses
+import random
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from solver.generator import ShiftProblem, _solve_steps, build_problem
+from solver.simulation import Scenario, SimulationOutcome, perturb, run_simulation, simulate_instance
+
+
+def _full_caps() -> set[CapabilityType]:
+    return {
+        CapabilityType.day_shift,
+        CapabilityType.night_shift,
+        CapabilityType.night_leader,
+        CapabilityType.outpatient_leader,
+        CapabilityType.ward_leader,
+        CapabilityType.ward_staff,
+        CapabilityType.beauty,
+        CapabilityType.mw_outpatient,
+    }
+
+
+def _week_problem(member_count: int = 16) -> ShiftProblem:
+    """1週間の小さな問題。"""
+    members = [
+        SimpleNamespace(
+            id=i,
+            name=f"M{i}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=4,
+            min_night_shifts=0,
+            external_night_count=0,
+            night_shift_deduction_balance=0,
+        )
+        for i in range(1, member_count + 1)
+    ]
+    load_return: tuple = (
+        members,
+        {m.id: _full_caps() for m in members},
+        {m.id: Qualification.midwife for m in members},
+        {m.id: 4 for m in members},
+        {m.id: 0 for m in members},
+        {m.id: 0 for m in members},
+        [(1, 2)],
+        {},
+        {},
+        {},
+        set(),
+        set(),
+    )
+    with patch("solver.generator._load_data", return_value=load_return):
+        problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+    return dataclasses.replace(
+        problem,
+        dates=problem.dates[5:12],
+        member_off_days=dict.fromkeys(problem.member_ids, 2),
+    )
+
+
+class TestPerturb:
+    def test_remove_members(self) -> None:
+        base = _week_problem()
+        p = perturb(base, Scenario(remove_members=3), random.Random(0))
+        assert len(p.member_ids) == 13
+        assert all(a in p.member_ids and b in p.member_ids for a, b in p.ng_pairs)
+        assert len(base.member_ids) == 16
+
+    def test_add_night_midwives(self) -> None:
+        base = _week_problem()
+        p = perturb(base, Scenario(add_night_midwives=2), random.Random(0))
+        added = p.member_ids[-2:]
+        assert added == [17, 18]
+        assert all(CapabilityType.night_shift in p.member_capabilities[m] for m in added)
+        assert all(p.member_off_days[m] == 2 for m in added)
+
+    def test_leave_requests(self) -> None:
+        base = _week_problem()
+        p = perturb(base, Scenario(leave_requests=2), random.Random(0))
+        assert all(len(p.request_map[m]) == 2 for m in p.member_ids)
+        assert all(st == ShiftType.day_off for entries in p.request_map.values() for _, st in entries)
+        assert base.request_map == {}
+
+    def test_max_nights_delta_clamped(self) -> None:
+        base = _week_problem()
+        p = perturb(base, Scenario(max_nights_delta=5), random.Random(0))
+        assert set(p.member_max_nights.values()) == {6}
+        p = perturb(base, Scenario(max_nights_delta=-5), random.Random(0))
+        assert set(p.member_max_nights.values()) == {1}
+
+    def test_add_without_template(self) -> None:
+        base = _week_problem()
+        base = dataclasses.replace(base, member_qualifications=dict.fromkeys(base.member_ids, Qualification.nurse))
+        with pytest.raises(ValueError):
+            perturb(base, Scenario(add_night_midwives=1), random.Random(0))
+
+
+class TestSimulateInstance:
+    def test_static_diagnostics_skip_solver(self) -> None:
+        problem = _week_problem(member_count=3)
+        with patch("solver.simulation._solve_steps") as solve:
+            outcome = simulate_instance(problem, time_limit=1)
+        assert outcome == SimulationOutcome.infeasible_static
+        solve.assert_not_called()
+
+    def test_feasible(self) -> None:
+        assert simulate_instance(_week_problem(), time_limit=5) == SimulationOutcome.feasible
+
+    def test_probe_stops_at_first_solution(self) -> None:
+        with patch("solver.simulation._solve_steps", wraps=_solve_steps) as solve:
+            assert simulate_instance(_week_problem(), time_limit=5) == SimulationOutcome.feasible
+        assert solve.call_args.kwargs["first_solution"] is True
+
+
+class TestRunSimulation:
+    def test_summaries_per_scenario(self) -> None:
+        scenarios = [Scenario(), Scenario(remove_members=13)]
+        summaries = run_simulation(_week_problem(), scenarios, instances=2, time_limit=5, max_processes=2)
+
+        assert [s.scenario for s in summaries] == scenarios
+        assert summaries[0].counts[SimulationOutcome.feasible] == 2
+        assert summaries[1].rate(SimulationOutcome.infeasible_static) == 1.0
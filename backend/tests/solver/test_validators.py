@@ -0,0 +1,210 @@
+import dataclasses
+import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from entity.enums import CapabilityType, EmploymentType, Qualification, ShiftType
+from solver.boundary import BoundaryState
+from solver.config import NIGHT_SHIFT_TYPES
+from solver.generator import ShiftProblem, build_problem, solve_problem
+from solver.validators import AssignmentValidationState, validate_schedule
+
+type Cells = dict[tuple[int, datetime.date], ShiftType]
+
+MON = datetime.date(2025, 1, 6)
+
+
+def _caps(member_id: int) -> set[CapabilityType]:
+    caps = {
+        CapabilityType.day_shift,
+        CapabilityType.night_shift,
+        CapabilityType.night_leader,
+        CapabilityType.outpatient_leader,
+        CapabilityType.ward_leader,
+        CapabilityType.ward_staff,
+        CapabilityType.beauty,
+        CapabilityType.mw_outpatient,
+    }
+    if member_id <= 4:
+        caps.add(CapabilityType.early_shift)
+    return caps
+
+
+def _week_problem() -> ShiftProblem:
+    """16名・1週間（2025-01-06〜12）の小さな問題。"""
+    members = [
+        SimpleNamespace(
+            id=i,
+            name=f"M{i}",
+            qualification=Qualification.midwife,
+            employment_type=EmploymentType.full_time,
+            max_night_shifts=4,
+            min_night_shifts=0,
+            external_night_count=0,
+            night_shift_deduction_balance=0,
+        )
+        for i in range(1, 17)
+    ]
+    load_return: tuple = (
+        members,
+        {m.id: _caps(m.id) for m in members},
+        {m.id: Qualification.midwife for m in members},
+        {m.id: 4 for m in members},
+        {m.id: 0 for m in members},
+        {m.id: 0 for m in members},
+        [(1, 2)],
+        {1: [(datetime.date(2025, 1, 9), ShiftType.day_off)]},
+        {},
+        {},
+        set(),
+        set(),
+    )
+    with patch("solver.generator._load_data", return_value=load_return):
+        problem = build_problem(None, "2025-01")  # type: ignore[arg-type]
+    return dataclasses.replace(
+        problem,
+        dates=problem.dates[5:12],
+        member_off_days=dict.fromkeys(problem.member_ids, 2),
+    )
+
+
+@pytest.fixture(scope="module")
+def week() -> tuple[ShiftProblem, Cells, set[tuple[int, datetime.date]]]:
+    p = _week_problem()
+    assignments, _ = solve_problem(p)
+    cells = {(a["member_id"], datetime.date.fromisoformat(a["date"])): a["shift_type"] for a in assignments}
+    early = {(a["member_id"], datetime.date.fromisoformat(a["date"])) for a in assignments if a["is_early"]}
+    return p, cells, early
+
+
+def _codes(p: ShiftProblem, cells: Cells, early: set[tuple[int, datetime.date]], **kwargs: object) -> set[str]:
+    return {v.code for v in validate_schedule(p, cells, early, **kwargs)}  # type: ignore[arg-type]
+
+
+class TestValidateSchedule:
+    def test_solver_output_has_no_violations(self, week: tuple) -> None:
+        p, cells, early = week
+        assert validate_schedule(p, cells, early) == []
+
+    def test_unassigned_cell(self, week: tuple) -> None:
+        p, cells, early = week
+        cells = dict(cells)
+        del cells[(3, MON)]
+        violations = validate_schedule(p, cells, early - {(3, MON)})
+        assert [(v.code, v.member_id, v.date) for v in violations if v.code == "H1"] == [("H1", 3, MON)]
+
+    def test_night_rest_and_staffing(self, week: tuple) -> None:
+        p, cells, early = week
+        cells = dict(cells)
+        night_member = next(m for m in p.member_ids if cells[(m, MON)] in NIGHT_SHIFT_TYPES)
+        cells[(night_member, MON + datetime.timedelta(days=1))] = ShiftType.ward_free
+        codes = _codes(p, cells, early)
+        assert "H6" in codes
+        assert "H11" in codes
+
+    def test_extra_night(self, week: tuple) -> None:
+        p, cells, early = week
+        cells = dict(cells)
+        m = next(m for m in p.member_ids if cells[(m, MON)] == ShiftType.day_off)
+        cells[(m, MON)] = ShiftType.night
+        assert {"H2", "H11"} <= _codes(p, cells, early)
+
+    def test_ng_pair_and_midwife(self, week: tuple) -> None:
+        p, cells, early = week
+        cells = dict(cells)
+        for m in (1, 2):
+            cells[(m, MON)] = ShiftType.night
+        assert "H7" in _codes(p, cells, early)
+
+        nurse = dataclasses.replace(p, member_qualifications=dict.fromkeys(p.member_ids, Qualification.nurse))
+        assert "H8" in _codes(nurse, dict(week[1]), early)
+
+    def test_request_and_early(self, week: tuple) -> None:
+        p, cells, early = week
+        cells = dict(cells)
+        cells[(1, datetime.date(2025, 1, 9))] = ShiftType.paid_leave
+        early_member, early_date = next(iter(early))
+        cells[(early_member, early_date)] = ShiftType.day_off
+        codes = _codes(p, cells, early)
+        assert "H12" in codes
+        assert "H15" in codes
+
+    def test_consecutive_work_from_previous_month(self, week: tuple) -> None:
+        p, cells, early = week
+        m = next(m for m in p.member_ids if cells[(m, MON)] not in (ShiftType.day_off, ShiftType.paid_leave))
+        violations = validate_schedule(p, cells, early, BoundaryState(work_runs={m: 5}))
+        assert ("H9", m, MON) in {(v.code, v.member_id, v.date) for v in violations}
+
+    def test_run_already_over_limit_at_month_start(self, week: tuple) -> None:
+        p, cells, early = week
+        m = next(m for m in p.member_ids if cells[(m, MON)] not in (ShiftType.day_off, ShiftType.paid_leave))
+        violations = validate_schedule(p, cells, early, BoundaryState(work_runs={m: 6}))
+        # 前月から6日続いた連続勤務が月初で7日になる。続く限り報告は1回だけ
+        assert [v.date for v in violations if v.code == "H9" and v.member_id == m] == [MON]
+
+
+def _member(member_id: int, qualification: Qualification = Qualification.nurse, **kwargs: int) -> SimpleNamespace:
+    return SimpleNamespace(
+        id=member_id,
+        name=f"M{member_id}",
+        qualification=qualification,
+        max_night_shifts=kwargs.get("max_night_shifts", 4),
+        min_night_shifts=kwargs.get("min_night_shifts", 0),
+        external_night_count=0,
+    )
+
+
+class TestAssignmentValidationState:
+    DATES = [datetime.date(2025, 1, 1) + datetime.timedelta(days=i) for i in range(31)]
+
+    def _state(self, cells: Cells, boundary: BoundaryState | None = None) -> AssignmentValidationState:
+        return AssignmentValidationState(1, self.DATES, cells, {2}, boundary or BoundaryState())
+
+    def test_night_rest_and_midwife(self) -> None:
+        d = datetime.date(2025, 1, 10)
+        state = self._state({(1, d): ShiftType.night, (1, d + datetime.timedelta(days=1)): ShiftType.ward})
+        warnings = state.warnings(_member(1), d)  # type: ignore[arg-type]
+        assert "M1 は本日夜勤のため、翌日は公休が必要です" in warnings
+        assert "01/10 の夜勤に助産師が配置されていません" in warnings
+
+        state.apply(2, d, ShiftType.night_leader)
+        state.apply(1, d + datetime.timedelta(days=1), ShiftType.paid_leave)
+        assert state.warnings(_member(1), d) == []  # type: ignore[arg-type]
+
+    def test_previous_month_boundary(self) -> None:
+        first = self.DATES[0]
+        state = self._state(
+            {(1, first): ShiftType.ward, (3, first): ShiftType.ward},
+            BoundaryState(night_member_ids={1}, work_runs={3: 5}),
+        )
+        assert state.warnings(_member(1), first) == ["M1 は前日に夜勤のため、本日は公休が必要です"]  # type: ignore[arg-type]
+        assert state.warnings(_member(3), first) == [  # type: ignore[arg-type]
+            "M3 の連続勤務が 6 日になっています（上限5日）"
+        ]
+
+    def test_night_counts_follow_deltas(self) -> None:
+        state = self._state({(1, self.DATES[i]): ShiftType.night for i in (0, 3, 6)})
+        member = _member(1, max_night_shifts=2, min_night_shifts=3)
+        assert "M1 の院内夜勤回数が 3 回になっています（上限2回）" in state.warnings(member, self.DATES[6])  # type: ignore[arg-type]
+
+        state.apply(1, self.DATES[6], ShiftType.day_off)
+        state.apply(1, self.DATES[3], None)
+        warnings = state.warnings(member, self.DATES[0])  # type: ignore[arg-type]
+        assert "M1 の院内夜勤回数が 1 回になっています（確定3回）" in warnings
+        assert state.night_members[self.DATES[3]] == set()
+
+    def test_apply_matches_rebuild(self) -> None:
+        cells: Cells = {(m, d): ShiftType.ward for m in (1, 2) for d in self.DATES[:8]}
+        state = self._state(cells)
+        state.apply(1, self.DATES[2], ShiftType.night)
+        state.apply(2, self.DATES[2], None)
+        cells[(1, self.DATES[2])] = ShiftType.night
+        del cells[(2, self.DATES[2])]
+        rebuilt = self._state(cells)
+        assert state.cells == rebuilt.cells
+        assert state.night_counts == rebuilt.night_counts
+        assert state.night_members == rebuilt.night_members
+        for m in (1, 2):
+            assert state.warnings(_member(m), self.DATES[5]) == rebuilt.warnings(_member(m), self.DATES[5])  # type: ignore[arg-type]
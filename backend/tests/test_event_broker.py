@@ -0,0 +1,37 @@
+import asyncio
+import threading
+
+from events.broker import SUBSCRIBER_QUEUE_SIZE, InProcessBroker
+
+
+class TestInProcessBroker:
+    def test_delivers_messages_from_other_threads(self) -> None:
+        broker = InProcessBroker()
+
+        async def scenario() -> list[dict[str, object]]:
+            sub = broker.subscribe("schedule:1")
+            other = broker.subscribe("schedule:2")
+            thread = threading.Thread(
+                target=lambda: [broker.publish("schedule:1", {"n": n}) for n in range(3)],
+            )
+            thread.start()
+            thread.join()
+            received = [await asyncio.wait_for(sub.get(), 1) for _ in range(3)]
+            sub.close()
+            other.close()
+            return received
+
+        assert asyncio.run(scenario()) == [{"n": 0}, {"n": 1}, {"n": 2}]
+        assert broker.subscriber_count("schedule:1") == 0
+
+    def test_overflow_asks_subscriber_to_resync(self) -> None:
+        broker = InProcessBroker()
+
+        async def scenario() -> dict[str, object]:
+            sub = broker.subscribe("schedule:1")
+            for n in range(SUBSCRIBER_QUEUE_SIZE + 1):
+                broker.publish("schedule:1", {"n": n})
+            await asyncio.sleep(0)
+            return await asyncio.wait_for(sub.get(), 1)
+
+        assert asyncio.run(scenario()) == {"event": "resync"}
@@ -0,0 +1,69 @@
+import datetime
+import io
+import zipfile
+
+from entity.enums import ShiftType
+from export.schedule import _ical_line, matrix_grid_rows, matrix_long_rows, stream_csv, stream_xlsx
+from export.stream import stream_zip
+from solver.matrix import ScheduleMatrix
+
+
+class TestStreamZip:
+    def test_stream_zip(self) -> None:
+        files = [("a.pdf", b"%PDF-a"), ("山田.pdf", b"%PDF-b")]
+        chunks = list(stream_zip(files))
+        assert len(chunks) == len(files) + 1
+        with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+            assert archive.namelist() == ["a.pdf", "山田.pdf"]
+            assert archive.read("山田.pdf") == b"%PDF-b"
+
+
+class TestStreamCsv:
+    def test_writes_in_batches(self) -> None:
+        rows = ([str(k), k] for k in range(2500))
+        chunks = list(stream_csv(["名前", "番号"], rows))
+        assert len(chunks) == 4  # ヘッダー + 1000行ごと + 残り
+        text = b"".join(chunks).decode("utf-8-sig")
+        assert text.startswith("名前,番号\r\n0,0\r\n")
+        assert text.count("\r\n") == 2501
+
+
+class TestIcalLine:
+    def test_folds_long_lines_on_character_boundaries(self) -> None:
+        line = "SUMMARY:" + "夜勤" * 30
+        folded = _ical_line(line)
+        parts = folded.rstrip(b"\r\n").split(b"\r\n ")
+        assert len(parts) > 1
+        assert all(len(p) <= 75 for p in parts)
+        assert b"".join(parts).decode() == line
+
+
+class TestStreamXlsx:
+    def test_writes_sheets(self) -> None:
+        sheets = [("表", ["氏名", "1日"], iter([["山田 <A&B>", "病棟"]])), ("一覧", ["番号"], iter([[1], [2]]))]
+        data = b"".join(stream_xlsx(sheets))
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            assert archive.testzip() is None
+            assert "[Content_Types].xml" in archive.namelist()
+            sheet1 = archive.read("xl/worksheets/sheet1.xml").decode()
+            assert "山田 &lt;A&amp;B&gt;" in sheet1
+            assert sheet1.count("<row>") == 2
+            assert archive.read("xl/worksheets/sheet2.xml").decode().count("<v>") == 2
+            assert 'name="一覧"' in archive.read("xl/workbook.xml").decode()
+
+
+class TestMatrixRows:
+    def test_rows_from_matrix(self) -> None:
+        dates = [datetime.date(2025, 1, 1), datetime.date(2025, 1, 2)]
+        matrix = ScheduleMatrix.from_cells(
+            [1, 2],
+            dates,
+            {(1, dates[1]): ShiftType.night, (2, dates[0]): ShiftType.ward},
+            early_cells=[(2, dates[0])],
+        )
+        names = {1: "山田", 2: "佐藤"}
+        assert list(matrix_grid_rows(matrix, names)) == [["山田", "", "夜勤"], ["佐藤", "★病棟", ""]]
+        assert [(r[0], r[3], r[4], r[6]) for r in matrix_long_rows(matrix, names)] == [
+            ("2025-01-01", "佐藤", "ward", 1),
+            ("2025-01-02", "山田", "night", 0),
+        ]
@@ -21,6 +21,19 @@ class TestGetMembers:
         assert data[0]["name"] == "田中太郎"
         assert data[1]["name"] == "鈴木花子"
 
+    def test_large_response_is_gzipped(self, client: TestClient, create_member: Callable[..., Member]) -> None:
+        create_member(name="田中太郎")
+        small = client.get("/members/", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in small.headers
+
+        for k in range(20):
+            create_member(name=f"メンバー{k}")
+        resp = client.get("/members/", headers={"Accept-Encoding": "gzip"})
+        assert resp.headers["content-encoding"] == "gzip"
+        assert resp.headers["content-type"] == "application/json"
+        assert len(resp.json()) == 21
+        assert client.get("/members/", headers={"Accept-Encoding": "identity"}).headers.get("content-encoding") is None
+
 
 class TestCreateMember:
     def test_create_member_minimal(self, client: TestClient) -> None:
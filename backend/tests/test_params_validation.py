@@ -3,6 +3,7 @@ from pydantic import ValidationError
 
 from entity.enums import CapabilityType, EmploymentType, Qualification
 from params.member import MemberCreateParams, MemberUpdateParams
+from params.schedule import ScheduleBatchGenerateParams
 
 
 class TestMemberCreateParams:
@@ -59,3 +60,21 @@ class TestMemberUpdateParams:
     def test_member_update_night_shift_validation(self) -> None:
         with pytest.raises(ValidationError):
             MemberUpdateParams(max_night_shifts=0)
+
+
+class TestScheduleBatchGenerateParams:
+    def test_valid_range_across_year(self) -> None:
+        p = ScheduleBatchGenerateParams(start_month="2025-11", end_month="2026-02")
+        assert p.rolling is False
+
+    def test_start_after_end(self) -> None:
+        with pytest.raises(ValidationError):
+            ScheduleBatchGenerateParams(start_month="2025-03", end_month="2025-01")
+
+    def test_too_many_months(self) -> None:
+        with pytest.raises(ValidationError):
+            ScheduleBatchGenerateParams(start_month="2025-01", end_month="2026-01")
+
+    def test_invalid_format(self) -> None:
+        with pytest.raises(ValidationError):
+            ScheduleBatchGenerateParams(start_month="2025-1", end_month="2025-02")
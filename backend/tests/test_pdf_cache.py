@@ -0,0 +1,81 @@
+import threading
+import time
+
+import pytest
+
+from pdf.cache import PdfCache
+
+
+class TestPdfCache:
+    def test_renders_once_per_key(self) -> None:
+        cache = PdfCache()
+        calls: list[str] = []
+
+        def render() -> bytes:
+            calls.append("render")
+            return b"pdf"
+
+        assert cache.get_or_render((1, 1), render) == b"pdf"
+        assert cache.get_or_render((1, 1), render) == b"pdf"
+        assert cache.get_or_render((1, 2), render) == b"pdf"
+        assert len(calls) == 2
+
+    def test_concurrent_requests_share_one_render(self) -> None:
+        cache = PdfCache()
+        calls: list[int] = []
+        start = threading.Barrier(4)
+
+        def render() -> bytes:
+            calls.append(1)
+            time.sleep(0.05)
+            return b"pdf"
+
+        results: list[bytes] = []
+
+        def request() -> None:
+            start.wait()
+            results.append(cache.get_or_render("key", render))
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert results == [b"pdf"] * 4
+        assert len(calls) == 1
+
+    def test_failed_render_is_not_cached(self) -> None:
+        cache = PdfCache()
+
+        def fail() -> bytes:
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            cache.get_or_render("key", fail)
+        assert cache.get_or_render("key", lambda: b"pdf") == b"pdf"
+
+    def test_evicts_least_recently_used_by_size(self) -> None:
+        cache = PdfCache(max_bytes=10)
+        cache.get_or_render("a", lambda: b"aaaa")
+        cache.get_or_render("b", lambda: b"bbbb")
+        cache.get("a")
+        cache.get_or_render("c", lambda: b"cccc")
+        assert cache.get("a") == b"aaaa"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"cccc"
+        # 上限より大きいものは保持しない
+        cache.get_or_render("big", lambda: b"x" * 11)
+        assert cache.get("big") is None
+
+    def test_invalidate_drops_only_that_schedule(self) -> None:
+        cache = PdfCache(max_bytes=10)
+        cache.get_or_render((1, 1, "d", "shifts"), lambda: b"aaaa")
+        cache.get_or_render((1, 1, "d", "members"), lambda: b"bbbb")
+        cache.get_or_render((2, 1, "d", "shifts"), lambda: b"cc")
+        cache.invalidate(1)
+        assert cache.get((1, 1, "d", "shifts")) is None
+        assert cache.get((1, 1, "d", "members")) is None
+        assert cache.get((2, 1, "d", "shifts")) == b"cc"
+        # 捨てた分の容量は再び使える
+        cache.get_or_render("new", lambda: b"xxxxxxxx")
+        assert cache.get((2, 1, "d", "shifts")) == b"cc"
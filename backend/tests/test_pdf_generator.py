@@ -1,40 +1,101 @@
 import datetime
+import re
+from unittest.mock import patch
 
 from entity.enums import ShiftType
-from pdf.generator import generate_schedule_pdf
+from pdf.generator import generate_member_roster_pdf, generate_schedule_pdf
+from pdf.member_grid import (
+    MEMBER_GRID_CANVAS_MIN_CELLS,
+    generate_member_grid_pdf,
+    grid_geometry,
+    render_member_grid_canvas,
+    render_member_grid_platypus,
+)
+from pdf.roster import ROSTER_PARALLEL_MIN_MEMBERS, render_member_rosters
+from solver.config import get_month_dates
+from solver.matrix import SHIFT_CODES, ScheduleMatrix
+
+
+def _matrix(year_month: str, cells: dict[tuple[int, datetime.date], ShiftType]) -> ScheduleMatrix:
+    member_ids = sorted({m for m, _ in cells})
+    return ScheduleMatrix.from_cells(member_ids, get_month_dates(year_month), cells)
 
 
 class TestGenerateSchedulePdf:
     def test_generates_valid_pdf(self) -> None:
-        assignments: list[dict[str, object]] = [
-            {"member_name": "田中太郎", "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
-            {"member_name": "鈴木花子", "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
-        ]
-        buf = generate_schedule_pdf("2025-01", assignments)
+        matrix = _matrix(
+            "2025-01",
+            {(1, datetime.date(2025, 1, 6)): ShiftType.ward, (2, datetime.date(2025, 1, 6)): ShiftType.night},
+        )
+        buf = generate_schedule_pdf("2025-01", matrix, {1: "田中太郎", 2: "鈴木花子"})
         data = buf.read()
         assert data[:5] == b"%PDF-"
         assert len(data) > 100
 
     def test_empty_assignments(self) -> None:
-        buf = generate_schedule_pdf("2025-01", [])
+        buf = generate_schedule_pdf("2025-01", _matrix("2025-01", {}), {})
         data = buf.read()
         assert data[:5] == b"%PDF-"
 
     def test_all_shift_types(self) -> None:
-        assignments: list[dict[str, object]] = [
-            {"member_name": f"メンバー{i}", "date": datetime.date(2025, 1, 6), "shift_type": st}
-            for i, st in enumerate(ShiftType)
-            if st != ShiftType.day_off
-        ]
-        buf = generate_schedule_pdf("2025-01", assignments)
+        matrix = _matrix(
+            "2025-01",
+            {(i, datetime.date(2025, 1, 6)): st for i, st in enumerate(ShiftType) if st != ShiftType.day_off},
+        )
+        buf = generate_schedule_pdf("2025-01", matrix, {i: f"メンバー{i}" for i in range(len(ShiftType))})
         data = buf.read()
         assert data[:5] == b"%PDF-"
 
     def test_february_28_days(self) -> None:
-        assignments: list[dict[str, object]] = [
-            {"member_name": "田中", "date": datetime.date(2025, 2, 1), "shift_type": ShiftType.ward},
-            {"member_name": "田中", "date": datetime.date(2025, 2, 28), "shift_type": ShiftType.night},
-        ]
-        buf = generate_schedule_pdf("2025-02", assignments)
+        matrix = _matrix(
+            "2025-02",
+            {(1, datetime.date(2025, 2, 1)): ShiftType.ward, (1, datetime.date(2025, 2, 28)): ShiftType.night},
+        )
+        assert len(matrix.dates) == 28
+        buf = generate_schedule_pdf("2025-02", matrix, {1: "田中"})
         data = buf.read()
         assert data[:5] == b"%PDF-"
+
+
+class TestMemberRosters:
+    def test_generates_roster_pdf(self) -> None:
+        dates = get_month_dates("2025-01")
+        shifts: list[ShiftType | None] = [None] * len(dates)
+        shifts[0], shifts[5] = ShiftType.night, ShiftType.paid_leave
+        early = [j == 1 for j in range(len(dates))]
+        data = generate_member_roster_pdf("2025-01", "田中太郎", dates, shifts, early)
+        assert data[:5] == b"%PDF-"
+
+    def test_render_in_process_pool(self) -> None:
+        cells = {(i, datetime.date(2025, 1, 6)): ShiftType.ward for i in range(1, ROSTER_PARALLEL_MIN_MEMBERS + 2)}
+        matrix = _matrix("2025-01", cells)
+        names = {m: f"メンバー{m}" for m in matrix.member_ids}
+        rendered = list(render_member_rosters("2025-01", matrix, names, max_processes=2))
+        assert [m for m, _ in rendered] == matrix.member_ids
+        assert all(pdf[:5] == b"%PDF-" for _, pdf in rendered)
+
+
+class TestMemberGrid:
+    def _large_matrix(self, member_count: int) -> ScheduleMatrix:
+        dates = get_month_dates("2025-01")
+        cells = {(m, d): SHIFT_CODES[(m + d.day) % len(SHIFT_CODES)] for m in range(1, member_count + 1) for d in dates}
+        return ScheduleMatrix.from_cells(list(range(1, member_count + 1)), dates, cells, [(1, dates[0])])
+
+    def test_renderers_paginate(self) -> None:
+        matrix = self._large_matrix(100)
+        names = {m: f"メンバー{m}" for m in matrix.member_ids}
+        pages = -(-100 // grid_geometry(31).rows_per_page)
+        for render in (render_member_grid_canvas, render_member_grid_platypus):
+            data = render("2025-01", matrix, names)
+            assert data[:5] == b"%PDF-"
+            assert len(re.findall(rb"/Type /Page\b", data)) == pages
+
+    def test_picks_renderer_by_size(self) -> None:
+        small = _matrix("2025-01", {(1, datetime.date(2025, 1, 6)): ShiftType.ward})
+        large = self._large_matrix(-(-MEMBER_GRID_CANVAS_MIN_CELLS // 31))
+        with (
+            patch("pdf.member_grid.render_member_grid_canvas", return_value=b"canvas"),
+            patch("pdf.member_grid.render_member_grid_platypus", return_value=b"platypus"),
+        ):
+            assert generate_member_grid_pdf("2025-01", small, {1: "田中"}) == b"platypus"
+            assert generate_member_grid_pdf("2025-01", large, {}) == b"canvas"
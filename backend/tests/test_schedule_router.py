@@ -1,14 +1,23 @@
+import csv
 import datetime
+import io
+import threading
+import zipfile
 from collections.abc import Callable
+from concurrent.futures import wait
 from typing import Any
 from unittest.mock import patch
 
+import pytest
+from fastapi import WebSocketDisconnect
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 
-from entity.enums import ShiftType
+from entity.enums import ArtifactKind, CapabilityType, ObjectiveMode, RequestType, ShiftType
 from entity.member import Member
+from entity.schedule import Schedule
 from entity.shift_request import ShiftRequest
+from publish.pipeline import wait_for_publication
 
 
 class TestGetSchedule:
@@ -37,6 +46,36 @@ class TestGetSchedule:
         assert data["year_month"] == "2025-01"
         assert len(data["assignments"]) == 2
 
+    def test_get_schedule_compact(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="テスト看護師")
+        other = create_member(name="割当なし")
+        create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward, "is_early": True},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.day_off},
+            ],
+        )
+        resp = client.get("/schedules/", params={"year_month": "2025-01", "format": "compact"})
+        assert resp.status_code == 200
+        data = resp.json()
+        assert "assignments" not in data
+        assert data["members"] == [{"id": m.id, "name": "テスト看護師"}, {"id": other.id, "name": "割当なし"}]
+        assert len(data["dates"]) == 31
+        row = data["shifts"][0]
+        assert [data["shift_types"][row[5]], data["shift_types"][row[6]]] == ["ward", "day_off"]
+        assert row.count(-1) == 29
+        assert data["early"][0][5] == 1 and sum(data["early"][0]) == 1
+        assert set(data["shifts"][1]) == {-1}
+
+        assert client.get("/schedules/", params={"year_month": "2025-02", "format": "compact"}).json() is None
+        assert client.get("/schedules/", params={"year_month": "2025-01", "format": "xml"}).status_code == 422
+
 
 class TestUpdateAssignment:
     def test_update_assignment(
@@ -95,6 +134,77 @@ class TestUpdateAssignment:
         assert resp.status_code == 404
 
 
+class TestAssignmentWarnings:
+    def test_warnings_follow_edits(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="警告テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.ward}],
+        )
+        resp = client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "night", "member_id": m.id},
+        )
+        assert resp.status_code == 201
+        assert resp.json()["warnings"] == [
+            "警告テスト は本日夜勤のため、翌日は公休が必要です",
+            "01/06 の夜勤に助産師が配置されていません",
+        ]
+        night_id = resp.json()["assignment"]["id"]
+
+        # 2回目以降はメモリ上の状態を差分で更新する（割当を読み直さない）
+        with patch("solver.validators.AssignmentValidationState.load") as load:
+            resp = client.put(
+                f"/schedules/{sched.id}/assignments/{night_id}",
+                json={"shift_type": "ward_free", "member_id": m.id},
+            )
+        load.assert_not_called()
+        assert resp.json()["warnings"] == []
+
+    def test_edits_bump_version(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member()
+        sched = create_schedule(year_month="2025-01")
+        resp = client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "day_off", "member_id": m.id},
+        )
+        assignment_id = resp.json()["assignment"]["id"]
+        client.patch(f"/schedules/{sched.id}/assignments/{assignment_id}/paid-leave")
+        client.delete(f"/schedules/{sched.id}/assignments/{assignment_id}")
+        db_session.refresh(sched)
+        assert sched.version == 4
+
+    def test_concurrent_bumps_do_not_reuse_versions(
+        self, db_session: Session, create_schedule: Callable[..., Any]
+    ) -> None:
+        from routers.schedule import _bump_version
+
+        sched = create_schedule(year_month="2025-01")
+        other = Session(bind=db_session.get_bind())
+        try:
+            # 両方が version 1 を読んだあとで書き換える
+            stale = other.get(Schedule, sched.id)
+            assert stale is not None and stale.version == sched.version == 1
+            assert _bump_version(db_session, sched) == 2
+            assert _bump_version(other, stale) == 3
+            other.commit()
+        finally:
+            other.close()
+        db_session.refresh(sched)
+        assert sched.version == 3
+
+
 class TestCreateAssignment:
     def test_create_assignment(
         self,
@@ -273,6 +383,12 @@ class TestGenerateSchedule:
         assert len(data["schedule"]["assignments"]) == 2
         assert data["unfulfilled_requests"] == []
 
+    def test_generate_schedule_objective_mode(self, client: TestClient) -> None:
+        with patch("solver.generator.generate_shift", return_value=([], [])) as mocked:
+            resp = client.post("/schedules/generate", json={"year_month": "2025-01", "objective_mode": "lexicographic"})
+        assert resp.status_code == 200
+        assert mocked.call_args.kwargs["mode"] == ObjectiveMode.lexicographic
+
     def test_generate_schedule_solver_error(self, client: TestClient) -> None:
         with patch("solver.generator.generate_shift", side_effect=RuntimeError("制約充足不能")):
             resp = client.post("/schedules/generate", json={"year_month": "2025-01"})
@@ -280,6 +396,444 @@ class TestGenerateSchedule:
         assert "制約充足不能" in resp.json()["detail"]
 
 
+class TestGenerateScheduleBatch:
+    def test_generate_batch_mocked(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="一括生成テスト")
+        create_schedule(
+            year_month="2025-02",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 2, 3), "shift_type": ShiftType.night}],
+        )
+        mock_results = {
+            "2025-01": (
+                [{"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward}],
+                [{"member_id": m.id, "member_name": m.name, "date": "2025-01-10"}],
+            ),
+            "2025-02": (
+                [
+                    {"member_id": m.id, "date": datetime.date(2025, 2, 3), "shift_type": ShiftType.ward},
+                    {"member_id": m.id, "date": datetime.date(2025, 2, 4), "shift_type": ShiftType.day_off},
+                ],
+                [],
+            ),
+        }
+
+        with patch("solver.generator.generate_shift_batch", return_value=mock_results) as mocked:
+            resp = client.post("/schedules/generate-batch", json={"start_month": "2025-01", "end_month": "2025-02"})
+
+        assert resp.status_code == 200
+        assert mocked.call_args.args[1] == ["2025-01", "2025-02"]
+        results = resp.json()["results"]
+        assert [r["schedule"]["year_month"] for r in results] == ["2025-01", "2025-02"]
+        assert len(results[0]["unfulfilled_requests"]) == 1
+        assert {a["shift_type"] for a in results[1]["schedule"]["assignments"]} == {"ward", "day_off"}
+
+    def test_generate_batch_error_keeps_existing(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="一括生成テスト")
+        create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward}],
+        )
+        with patch("solver.generator.generate_shift_batch", side_effect=RuntimeError("2025-02: 制約充足不能")):
+            resp = client.post("/schedules/generate-batch", json={"start_month": "2025-01", "end_month": "2025-02"})
+        assert resp.status_code == 422
+        assert "2025-02" in resp.json()["detail"]
+
+        resp = client.get("/schedules/", params={"year_month": "2025-01"})
+        assert len(resp.json()["assignments"]) == 1
+
+    def test_generate_batch_invalid_range(self, client: TestClient) -> None:
+        resp = client.post("/schedules/generate-batch", json={"start_month": "2025-03", "end_month": "2025-01"})
+        assert resp.status_code == 422
+
+    def test_generate_batch_rolling_rejects_lexicographic(self, client: TestClient) -> None:
+        with patch("solver.generator.generate_shift_batch") as mocked:
+            resp = client.post(
+                "/schedules/generate-batch",
+                json={
+                    "start_month": "2025-01",
+                    "end_month": "2025-02",
+                    "rolling": True,
+                    "objective_mode": ObjectiveMode.lexicographic.value,
+                },
+            )
+        assert resp.status_code == 400
+        mocked.assert_not_called()
+
+
+class TestScheduleProposals:
+    def _alternatives(self, member: Member) -> list[tuple[list[dict[str, object]], list[dict[str, object]]]]:
+        return [
+            (
+                [
+                    {"member_id": member.id, "member_name": member.name, "date": "2025-01-06", "shift_type": st},
+                    {
+                        "member_id": member.id,
+                        "member_name": member.name,
+                        "date": "2025-01-07",
+                        "shift_type": ShiftType.day_off,
+                    },
+                ],
+                unfulfilled,
+            )
+            for st, unfulfilled in [
+                (ShiftType.ward, []),
+                (ShiftType.night, [{"member_id": member.id, "member_name": member.name, "date": "2025-01-10"}]),
+            ]
+        ]
+
+    def test_generate_and_list_proposals(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+    ) -> None:
+        m = create_member(name="案テスト")
+        with patch("solver.generator.generate_shift_alternatives", return_value=self._alternatives(m)) as mocked:
+            resp = client.post("/schedules/proposals", json={"year_month": "2025-01", "count": 2})
+        assert resp.status_code == 200
+        assert mocked.call_args.args[1:] == ("2025-01", 2)
+        data = resp.json()
+        assert [p["rank"] for p in data] == [1, 2]
+        assert [p["diff_from_first"] for p in data] == [0, 1]
+        assert len(data[1]["unfulfilled_requests"]) == 1
+
+        resp = client.get("/schedules/proposals", params={"year_month": "2025-01"})
+        assert [p["id"] for p in resp.json()] == [p["id"] for p in data]
+
+    def test_regenerate_replaces_proposals(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+    ) -> None:
+        m = create_member(name="案テスト")
+        with patch("solver.generator.generate_shift_alternatives", return_value=self._alternatives(m)):
+            client.post("/schedules/proposals", json={"year_month": "2025-01", "count": 2})
+            client.post("/schedules/proposals", json={"year_month": "2025-01", "count": 2})
+        resp = client.get("/schedules/proposals", params={"year_month": "2025-01"})
+        assert len(resp.json()) == 2
+
+    def test_commit_proposal(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="案テスト")
+        create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 1, 20), "shift_type": ShiftType.ward}],
+        )
+        with patch("solver.generator.generate_shift_alternatives", return_value=self._alternatives(m)):
+            proposals = client.post("/schedules/proposals", json={"year_month": "2025-01", "count": 2}).json()
+
+        resp = client.post(f"/schedules/proposals/{proposals[1]['id']}/commit")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert {(a["date"], a["shift_type"]) for a in data["schedule"]["assignments"]} == {
+            ("2025-01-06", "night"),
+            ("2025-01-07", "day_off"),
+        }
+        assert len(data["unfulfilled_requests"]) == 1
+
+    def test_commit_proposal_not_found(self, client: TestClient) -> None:
+        resp = client.post("/schedules/proposals/9999/commit")
+        assert resp.status_code == 404
+
+    def test_pareto_stores_front_as_proposals(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+    ) -> None:
+        from solver.generator import ObjectiveWeights
+        from solver.pareto import ParetoPoint
+
+        m = create_member(name="案テスト")
+        front = [
+            ParetoPoint(
+                weights=ObjectiveWeights(night_diff=night, holiday_diff=holiday),
+                night_diff=nd,
+                holiday_diff=hd,
+                early_diff=0,
+                fulfilled_requests=0,
+                request_total=len(unfulfilled),
+                fulfilled_day_shift_requests=0,
+                day_shift_request_total=0,
+                assignments=assignments,
+                unfulfilled=unfulfilled,
+            )
+            for (night, holiday, nd, hd), (assignments, unfulfilled) in zip(
+                [(2, 15, 2, 0), (30, 1, 0, 2)], self._alternatives(m), strict=True
+            )
+        ]
+
+        with (
+            patch("solver.generator.build_problem"),
+            patch("solver.pareto.compute_pareto_front", return_value=front) as mocked,
+        ):
+            resp = client.post(
+                "/schedules/pareto",
+                json={"year_month": "2025-01", "weights": [{"night_diff": 2, "holiday_diff": 15}, {"night_diff": 30}]},
+            )
+
+        assert resp.status_code == 200
+        grid = mocked.call_args.args[1]
+        assert [(w.night_diff, w.holiday_diff, w.requests) for w in grid] == [(2, 15, 100), (30, 5, 100)]
+        data = resp.json()
+        assert [(p["night_diff"], p["holiday_diff"]) for p in data] == [(2, 0), (0, 2)]
+        assert data[1]["weights"]["night_diff"] == 30
+
+        proposals = client.get("/schedules/proposals", params={"year_month": "2025-01"}).json()
+        assert [p["id"] for p in proposals] == [p["proposal_id"] for p in data]
+
+    def test_generate_proposals_solver_error(self, client: TestClient) -> None:
+        with patch("solver.generator.generate_shift_alternatives", side_effect=RuntimeError("制約充足不能")):
+            resp = client.post("/schedules/proposals", json={"year_month": "2025-01"})
+        assert resp.status_code == 422
+
+
+class TestValidateSchedule:
+    def test_validate(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="検証テスト", capabilities=[CapabilityType.day_shift, CapabilityType.ward_staff])
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
+            ],
+        )
+
+        resp = client.get(f"/schedules/{sched.id}/validate")
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["year_month"] == "2025-01"
+        codes = {v["code"] for v in data["violations"]}
+        # 夜勤能力なし・未割当の日・人数不足・公休不足
+        assert {"H1", "H2", "H5", "H11"} <= codes
+        h5 = next(v for v in data["violations"] if v["code"] == "H5")
+        assert (h5["member_id"], h5["date"]) == (m.id, "2025-01-06")
+        assert h5["label"] == "夜勤不可のメンバーは夜勤に入らない"
+
+    def test_validate_not_found(self, client: TestClient) -> None:
+        resp = client.get("/schedules/9999/validate")
+        assert resp.status_code == 404
+
+
+class TestAssignmentSuggestions:
+    def test_suggestions(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        caps = [CapabilityType.day_shift, CapabilityType.ward_staff]
+        m1 = create_member(name="候補1", capabilities=caps)
+        m2 = create_member(name="候補2", capabilities=caps)
+        create_member(name="能力なし")
+        monday = datetime.date(2025, 1, 6)
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m1.id, "date": monday, "shift_type": ShiftType.ward},
+                {"member_id": m2.id, "date": monday, "shift_type": ShiftType.ward_free},
+            ],
+        )
+
+        resp = client.get(
+            f"/schedules/{sched.id}/suggestions",
+            params={"member_id": m2.id, "date": "2025-01-06", "shift_type": "ward"},
+        )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["shift_type"] == "ward_free"
+        # 外来系は能力がなく、病棟Lは ward_leader 能力が必要
+        assert "ward" in data["shifts"]
+        assert "outpatient_leader" not in data["shifts"]
+        assert data["swaps"] == [{"member_id": m1.id, "member_name": "候補1", "shift_type": "ward"}]
+
+    def test_index_is_reused_and_follows_edits(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        from solver.feasibility import FeasibilityIndex
+
+        caps = [CapabilityType.day_shift, CapabilityType.ward_staff]
+        m1 = create_member(name="候補1", capabilities=caps)
+        m2 = create_member(name="候補2", capabilities=caps)
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m1.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward}],
+        )
+        params = {"member_id": m2.id, "date": "2025-01-06"}
+
+        with patch.object(FeasibilityIndex, "load", wraps=FeasibilityIndex.load) as load:
+            assert client.get(f"/schedules/{sched.id}/suggestions", params=params).json()["shift_type"] is None
+            created = client.post(
+                f"/schedules/{sched.id}/assignments",
+                json={"date": "2025-01-06", "shift_type": "ward_free", "member_id": m2.id},
+            )
+            # 1マスの編集は差分で反映し、読み直さない
+            data = client.get(f"/schedules/{sched.id}/suggestions", params=params).json()
+            assert data["shift_type"] == "ward_free"
+            assert [s["member_id"] for s in data["swaps"]] == [m1.id]
+            assert load.call_count == 1
+
+            client.patch(f"/schedules/{sched.id}/assignments/{created.json()['assignment']['id']}/early")
+            client.get(f"/schedules/{sched.id}/suggestions", params=params)
+            assert load.call_count == 1
+
+            # 生成の入力（希望休）が変わると読み直す
+            client.put(
+                "/shift-requests/",
+                json={"member_id": m2.id, "year_month": "2025-01", "entries": [{"date": "2025-01-07"}]},
+            )
+            client.get(f"/schedules/{sched.id}/suggestions", params=params)
+            assert load.call_count == 2
+
+    def test_suggestions_date_outside_month(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="範囲外", capabilities=[CapabilityType.day_shift])
+        sched = create_schedule(year_month="2025-01")
+        resp = client.get(f"/schedules/{sched.id}/suggestions", params={"member_id": m.id, "date": "2025-02-01"})
+        assert resp.status_code == 400
+
+    def test_suggestions_not_found(self, client: TestClient, create_schedule: Callable[..., Any]) -> None:
+        resp = client.get("/schedules/9999/suggestions", params={"member_id": 1, "date": "2025-01-06"})
+        assert resp.status_code == 404
+        sched = create_schedule(year_month="2025-01")
+        resp = client.get(f"/schedules/{sched.id}/suggestions", params={"member_id": 9999, "date": "2025-01-06"})
+        assert resp.status_code == 404
+
+
+class TestRepairSchedule:
+    def _result(self, member: Member) -> Any:
+        from solver.repair import RepairResult
+
+        return RepairResult(
+            changes=[
+                {
+                    "member_id": member.id,
+                    "member_name": member.name,
+                    "date": datetime.date(2025, 1, 7),
+                    "before": ShiftType.night,
+                    "shift_type": ShiftType.paid_leave,
+                    "is_early": False,
+                },
+                {
+                    "member_id": member.id,
+                    "date": datetime.date(2025, 1, 9),
+                    "member_name": member.name,
+                    "before": None,
+                    "shift_type": ShiftType.ward,
+                    "is_early": True,
+                },
+            ],
+            radius_days=2,
+        )
+
+    def test_repair_applies_only_changes(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="修復テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.night},
+            ],
+        )
+
+        with patch("solver.repair.solve_repair", return_value=self._result(m)) as mocked:
+            resp = client.post(
+                f"/schedules/{sched.id}/repair",
+                json={"fixed": [{"member_id": m.id, "date": "2025-01-07", "shift_type": "paid_leave"}]},
+            )
+
+        assert resp.status_code == 200
+        data = resp.json()
+        assert data["applied"] is True
+        assert [(c["date"], c["before"], c["shift_type"]) for c in data["changes"]] == [
+            ("2025-01-07", "night", "paid_leave"),
+            ("2025-01-09", None, "ward"),
+        ]
+        current, fixed = mocked.call_args.args[1:3]
+        assert current[(m.id, datetime.date(2025, 1, 7))] == (ShiftType.night, False)
+        assert fixed == {(m.id, datetime.date(2025, 1, 7)): ShiftType.paid_leave}
+
+        cells = {
+            a["date"]: (a["shift_type"], a["is_early"])
+            for a in client.get("/schedules/", params={"year_month": "2025-01"}).json()["assignments"]
+        }
+        assert cells == {
+            "2025-01-06": ("ward", False),
+            "2025-01-07": ("paid_leave", False),
+            "2025-01-09": ("ward", True),
+        }
+
+    def test_repair_dry_run(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="修復プレビュー")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.night}],
+        )
+
+        with patch("solver.repair.solve_repair", return_value=self._result(m)):
+            resp = client.post(f"/schedules/{sched.id}/repair", json={"dates": ["2025-01-07"], "dry_run": True})
+
+        assert resp.status_code == 200
+        assert resp.json()["applied"] is False
+        assignments = client.get("/schedules/", params={"year_month": "2025-01"}).json()["assignments"]
+        assert [a["shift_type"] for a in assignments] == ["night"]
+
+    def test_repair_date_outside_month(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        create_member(name="範囲外")
+        sched = create_schedule(year_month="2025-01")
+        resp = client.post(f"/schedules/{sched.id}/repair", json={"dates": ["2025-02-01"]})
+        assert resp.status_code == 422
+
+    def test_repair_requires_target(self, client: TestClient, create_schedule: Callable[..., Any]) -> None:
+        sched = create_schedule(year_month="2025-01")
+        resp = client.post(f"/schedules/{sched.id}/repair", json={})
+        assert resp.status_code == 422
+
+    def test_repair_not_found(self, client: TestClient) -> None:
+        resp = client.post("/schedules/9999/repair", json={"dates": ["2025-01-07"]})
+        assert resp.status_code == 404
+
+
 class TestGetSummary:
     def test_get_summary(
         self,
@@ -332,22 +886,737 @@ class TestGetSummary:
         assert summary["request_total"] == 2
         assert summary["request_fulfilled"] == 1
 
+    def test_get_summary_all_counts(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="集計テスト")
+        other = create_member(name="割当なし")
+        db_session.add(
+            ShiftRequest(
+                member_id=m.id,
+                year_month="2025-01",
+                date=datetime.date(2025, 1, 10),
+                request_type=RequestType.paid_leave,
+            )
+        )
+        db_session.add(
+            ShiftRequest(
+                member_id=m.id,
+                year_month="2025-01",
+                date=datetime.date(2025, 1, 11),
+                request_type=RequestType.night_shift_request,
+            )
+        )
+        db_session.commit()
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night_leader},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 8), "shift_type": ShiftType.external_night},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 10), "shift_type": ShiftType.paid_leave},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 13), "shift_type": ShiftType.ward},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 19), "shift_type": ShiftType.paid_leave},
+            ],
+        )
+        sched.assignments[3].is_early = True
+        db_session.commit()
+
+        resp = client.get(f"/schedules/{sched.id}/summary")
+        members = {s["member_id"]: s for s in resp.json()["members"]}
+        summary = members[m.id]
+        assert summary["working_days"] == 5  # 有給も勤務日に数える
+        assert summary["night_shift_count"] == 1
+        assert summary["external_night_count"] == 1
+        assert summary["paid_leave_count"] == 2
+        assert summary["early_shift_count"] == 1
+        assert summary["holiday_work_count"] == 1  # 成人の日（13日）の病棟。日曜の有給は数えない
+        assert summary["request_total"] == 1  # 夜勤希望は数えない
+        assert summary["request_fulfilled"] == 1
+        assert summary["request_dates"] == ["2025-01-10"]
+        assert members[other.id]["working_days"] == 0
+        assert members[other.id]["request_dates"] == []
 
-class TestGetPdf:
-    def test_get_pdf(
+    def test_night_shortfall_uses_configured_external_nights(
         self,
         client: TestClient,
+        db_session: Session,
         create_member: Callable[..., Member],
         create_schedule: Callable[..., Any],
     ) -> None:
-        m = create_member(name="PDF テスト")
+        m = create_member(name="他院夜勤テスト")
+        m.min_night_shifts = 3
+        m.external_night_count = 2
+        db_session.commit()
         sched = create_schedule(
             year_month="2025-01",
             assignments=[
-                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+                {"member_id": m.id, "date": datetime.date(2025, 1, 8), "shift_type": ShiftType.external_night},
             ],
         )
-        resp = client.get(f"/schedules/{sched.id}/pdf")
-        assert resp.status_code == 200
+
+        (summary,) = client.get(f"/schedules/{sched.id}/summary").json()["members"]
+        # 設定した他院夜勤回数（2）を差し引く。割り当てた他院夜勤（1）ではない
+        assert summary["night_shift_shortfall"] == 1
+        assert summary["external_night_count"] == 1
+
+
+class TestGetCoverage:
+    def test_coverage(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="充足テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+            ],
+        )
+
+        data = client.get(f"/schedules/{sched.id}/coverage").json()
+        assert len(data["dates"]) == 31
+        ward = data["shift_types"].index("ward")
+        mw_outpatient = data["shift_types"].index("mw_outpatient")
+        monday = data["dates"].index("2025-01-06")
+        assert data["assigned"][monday][ward] == 1
+        assert (data["min_staff"][monday][ward], data["max_staff"][monday][ward]) == (1, 2)
+        assert data["min_staff"][monday + 1][mw_outpatient] == 1
+
+        # 小児科医の勤務日は外来（助産師）2名
+        client.put("/pediatric-doctor-schedules/", json={"year_month": "2025-01", "dates": ["2025-01-07"]})
+        data = client.get(f"/schedules/{sched.id}/coverage").json()
+        assert data["min_staff"][monday + 1][mw_outpatient] == 2
+
+        # 割当の変更は version で反映される
+        resp = client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "delivery", "member_id": create_member(name="追加").id},
+        )
+        assert resp.status_code == 201
+        updated = client.get(f"/schedules/{sched.id}/coverage").json()
+        assert updated["version"] == data["version"] + 1
+        assert updated["assigned"][monday][data["shift_types"].index("delivery")] == 1
+
+    def test_coverage_not_found(self, client: TestClient) -> None:
+        resp = client.get("/schedules/9999/coverage")
+        assert resp.status_code == 404
+
+
+class TestGetPdf:
+    def test_get_pdf(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="PDF テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+            ],
+        )
+        resp = client.get(f"/schedules/{sched.id}/pdf")
+        assert resp.status_code == 200
         assert resp.headers["content-type"] == "application/pdf"
         assert resp.content[:5] == b"%PDF-"
+
+    def test_get_member_grid_pdf(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="PDF テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward}],
+        )
+        shifts = client.get(f"/schedules/{sched.id}/pdf")
+        members = client.get(f"/schedules/{sched.id}/pdf", params={"layout": "members"})
+        assert members.status_code == 200
+        assert members.content[:5] == b"%PDF-"
+        assert members.content != shifts.content
+        assert members.headers["etag"] != shifts.headers["etag"]
+        assert "shift_members_2025-01.pdf" in members.headers["content-disposition"]
+        assert client.get(f"/schedules/{sched.id}/pdf", params={"layout": "dates"}).status_code == 422
+
+    def test_get_pdf_cached_with_etag(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="PDF キャッシュ")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+            ],
+        )
+        from pdf import generator
+
+        with patch.object(generator, "generate_schedule_pdf", wraps=generator.generate_schedule_pdf) as render:
+            first = client.get(f"/schedules/{sched.id}/pdf")
+            second = client.get(f"/schedules/{sched.id}/pdf")
+            assert render.call_count == 1
+        assert second.content == first.content
+        etag = first.headers["etag"]
+
+        resp = client.get(f"/schedules/{sched.id}/pdf", headers={"If-None-Match": etag})
+        assert resp.status_code == 304
+        assert resp.content == b""
+
+        # 割当を変えると別の ETag になる
+        client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-07", "shift_type": "ward", "member_id": m.id},
+        )
+        resp = client.get(f"/schedules/{sched.id}/pdf", headers={"If-None-Match": etag})
+        assert resp.status_code == 200
+        assert resp.headers["etag"] != etag
+
+    def test_delete_schedule_drops_cached_pdf(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        from pdf.cache import schedule_pdfs
+
+        m = create_member(name="PDF 削除")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+            ],
+        )
+        assert client.get(f"/schedules/{sched.id}/pdf").status_code == 200
+        assert any(key[0] == sched.id for key in schedule_pdfs._entries)
+
+        assert client.delete(f"/schedules/{sched.id}").status_code == 204
+        assert not any(key[0] == sched.id for key in schedule_pdfs._entries)
+
+
+class TestScheduleChanges:
+    def test_returns_changes_since_version(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        a = create_member(name="山田")
+        b = create_member(name="佐藤")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": b.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.day_off},
+                {"member_id": a.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward},
+            ],
+        )
+        full = client.get("/schedules/", params={"year_month": "2025-01"}).json()
+        since = full["version"]
+        ids = {x["member_id"]: x["id"] for x in full["assignments"]}
+        ward_id, off_id = ids[a.id], ids[b.id]
+
+        unchanged = client.get(f"/schedules/{sched.id}/changes", params={"since": since}).json()
+        assert unchanged["resync"] is False
+        assert unchanged["upserted"] == [] and unchanged["deleted"] == []
+
+        # 公休のマスにシフトを入れると公休は削除され、新しい割当ができる
+        created = client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "night", "member_id": b.id},
+        ).json()["assignment"]
+        client.patch(f"/schedules/{sched.id}/assignments/{ward_id}/early")
+        client.patch(f"/schedules/{sched.id}/assignments/{ward_id}/early")
+
+        data = client.get(f"/schedules/{sched.id}/changes", params={"since": since}).json()
+        assert data["version"] == since + 3
+        assert data["resync"] is False
+        assert [(x["id"], x["is_early"]) for x in data["upserted"]] == [(ward_id, False), (created["id"], False)]
+        assert data["deleted"] == [off_id]
+
+        # 途中の version からは、その後の変更だけ
+        client.delete(f"/schedules/{sched.id}/assignments/{created['id']}")
+        data = client.get(f"/schedules/{sched.id}/changes", params={"since": since + 3}).json()
+        assert data["upserted"] == []
+        assert data["deleted"] == [created["id"]]
+
+    def test_resync_after_bulk_replace(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        from routers.schedule import _replace_assignments
+
+        m = create_member()
+        sched = create_schedule(year_month="2025-01")
+        client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "ward", "member_id": m.id},
+        )
+        _replace_assignments(
+            db_session,
+            "2025-01",
+            [{"member_id": m.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.night}],
+        )
+        db_session.commit()
+        db_session.refresh(sched)
+
+        assert client.get(f"/schedules/{sched.id}/changes", params={"since": 1}).json()["resync"] is True
+        latest = client.get(f"/schedules/{sched.id}/changes", params={"since": sched.version}).json()
+        assert latest["resync"] is False
+        assert client.get(f"/schedules/{sched.id}/changes", params={"since": sched.version + 1}).json()["resync"]
+        assert client.get("/schedules/9999/changes", params={"since": 1}).status_code == 404
+
+
+class TestScheduleEvents:
+    def test_broadcasts_assignment_changes(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        a = create_member(name="山田")
+        b = create_member(name="佐藤")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": b.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.day_off}],
+        )
+        off_id = client.get("/schedules/", params={"year_month": "2025-01"}).json()["assignments"][0]["id"]
+
+        with client.websocket_connect(f"/schedules/{sched.id}/ws") as ws:
+            subscribed = ws.receive_json()
+            assert subscribed == {"event": "subscribed", "schedule_id": sched.id, "version": sched.version}
+            since = subscribed["version"]
+
+            created = client.post(
+                f"/schedules/{sched.id}/assignments",
+                json={"date": "2025-01-06", "shift_type": "ward", "member_id": b.id},
+            ).json()["assignment"]
+            # 公休を置き換えたので、削除の後に作成が届く
+            deleted = ws.receive_json()
+            assert deleted == {
+                "event": "assignment.deleted",
+                "schedule_id": sched.id,
+                "version": since + 1,
+                "assignment_id": off_id,
+            }
+            event = ws.receive_json()
+            assert event["event"] == "assignment.created"
+            assert event["assignment"] == created
+
+            client.put(
+                f"/schedules/{sched.id}/assignments/{created['id']}",
+                json={"shift_type": "night", "member_id": a.id},
+            )
+            event = ws.receive_json()
+            assert (event["event"], event["version"]) == ("assignment.updated", since + 2)
+            assert (event["assignment"]["member_name"], event["assignment"]["shift_type"]) == ("山田", "night")
+
+            client.delete(f"/schedules/{sched.id}/assignments/{created['id']}")
+            event = ws.receive_json()
+            assert (event["event"], event["assignment_id"]) == ("assignment.deleted", created["id"])
+
+    def test_broadcasts_generation_progress(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="一括生成テスト")
+        sched = create_schedule(year_month="2025-01")
+        month = [{"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward}]
+        results = {"2025-01": (month, []), "2025-02": ([], [])}
+
+        def generate(*_: Any, on_progress: Callable[[str], None], **__: Any) -> dict[str, Any]:
+            for ym in results:
+                on_progress(ym)
+            return results
+
+        with client.websocket_connect(f"/schedules/{sched.id}/ws") as ws:
+            ws.receive_json()
+            with patch("solver.generator.generate_shift_batch", side_effect=generate):
+                resp = client.post("/schedules/generate-batch", json={"start_month": "2025-01", "end_month": "2025-02"})
+            assert resp.status_code == 200
+            events = [ws.receive_json() for _ in range(4)]
+
+        assert [e["event"] for e in events] == [
+            "generation.started",
+            "generation.progress",
+            "generation.progress",
+            "generation.finished",
+        ]
+        assert [(e["year_month"], e["done"], e["total"]) for e in events[1:3]] == [("2025-01", 1, 2), ("2025-02", 2, 2)]
+        assert events[3]["version"] == resp.json()["results"][0]["schedule"]["version"]
+
+    def test_unknown_schedule_is_rejected(self, client: TestClient) -> None:
+        with pytest.raises(WebSocketDisconnect) as exc, client.websocket_connect("/schedules/9999/ws") as ws:
+            ws.receive_json()
+        assert exc.value.code == 1008
+
+
+class TestExportSchedule:
+    def _schedule(
+        self, create_member: Callable[..., Member], create_schedule: Callable[..., Any]
+    ) -> tuple[Any, Member]:
+        a = create_member(name="山田")
+        b = create_member(name="佐藤")
+        create_member(name="割当なし")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": a.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
+                {"member_id": a.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.day_off},
+                {"member_id": b.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.ward, "is_early": True},
+            ],
+        )
+        return sched, a
+
+    def test_csv_grid_and_long(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, _ = self._schedule(create_member, create_schedule)
+
+        grid = client.get(f"/schedules/{sched.id}/export/csv")
+        assert grid.status_code == 200
+        assert grid.headers["content-type"].startswith("text/csv")
+        rows = list(csv.reader(io.StringIO(grid.content.decode("utf-8-sig"))))
+        assert rows[0][:2] == ["氏名", "1(水)"] and len(rows[0]) == 32
+        assert [r[0] for r in rows[1:]] == ["山田", "佐藤", "割当なし"]
+        assert rows[1][6:8] == ["夜勤", "公休"]
+        assert rows[2][6] == "★病棟"
+        assert set(rows[3][1:]) == {""}
+
+        long = client.get(f"/schedules/{sched.id}/export/csv", params={"layout": "long"})
+        rows = list(csv.reader(io.StringIO(long.content.decode("utf-8-sig"))))
+        assert rows[0][0] == "日付"
+        assert [(r[0], r[3], r[4], r[6]) for r in rows[1:]] == [
+            ("2025-01-06", "山田", "night", "0"),
+            ("2025-01-06", "佐藤", "ward", "1"),
+            ("2025-01-07", "山田", "day_off", "0"),
+        ]
+
+    def test_xlsx(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, _ = self._schedule(create_member, create_schedule)
+        resp = client.get(f"/schedules/{sched.id}/export/xlsx")
+        assert resp.status_code == 200
+        with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+            assert archive.testzip() is None
+            assert archive.read("xl/worksheets/sheet1.xml").decode().count("<row>") == 4
+            assert archive.read("xl/worksheets/sheet2.xml").decode().count("<row>") == 4
+
+    def test_member_ical(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, member = self._schedule(create_member, create_schedule)
+        resp = client.get(f"/schedules/{sched.id}/export/ical", params={"member_id": member.id})
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/calendar")
+        body = resp.text
+        assert body.startswith("BEGIN:VCALENDAR\r\n") and body.endswith("END:VCALENDAR\r\n")
+        # 公休は予定にしない
+        assert body.count("BEGIN:VEVENT") == 1
+        assert "DTSTART;VALUE=DATE:20250106" in body
+
+    def test_published_exports_are_served_from_artifacts(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, member = self._schedule(create_member, create_schedule)
+        live = {
+            layout: client.get(f"/schedules/{sched.id}/export/csv", params={"layout": layout})
+            for layout in ["grid", "long"]
+        }
+        live_xlsx = client.get(f"/schedules/{sched.id}/export/xlsx")
+
+        client.post(f"/schedules/{sched.id}/publish")
+        wait_for_publication(sched.id, timeout=30)
+        from export import schedule as export
+
+        with (
+            patch.object(export, "grid_rows") as grid_rows,
+            patch.object(export, "long_rows") as long_rows,
+            patch.object(export, "member_ical") as member_ical,
+        ):
+            for layout, resp in live.items():
+                published = client.get(f"/schedules/{sched.id}/export/csv", params={"layout": layout})
+                assert published.content == resp.content
+                # 生成しながら返したものは圧縮されて弱い ETag になる
+                assert published.headers["etag"].removeprefix("W/") == resp.headers["etag"].removeprefix("W/")
+            xlsx = client.get(f"/schedules/{sched.id}/export/xlsx")
+            ical = client.get(f"/schedules/{sched.id}/export/ical", params={"member_id": member.id})
+            grid_rows.assert_not_called()
+            long_rows.assert_not_called()
+            member_ical.assert_not_called()
+        with (
+            zipfile.ZipFile(io.BytesIO(xlsx.content)) as stored,
+            zipfile.ZipFile(io.BytesIO(live_xlsx.content)) as current,
+        ):
+            assert all(stored.read(name) == current.read(name) for name in current.namelist())
+        assert ical.text.count("BEGIN:VEVENT") == 1
+        assert (
+            client.get(
+                f"/schedules/{sched.id}/export/xlsx", headers={"If-None-Match": xlsx.headers["etag"]}
+            ).status_code
+            == 304
+        )
+
+        # 公開後に編集すると今の内容を生成して返す
+        client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-08", "shift_type": "ward", "member_id": member.id},
+        )
+        edited = client.get(f"/schedules/{sched.id}/export/csv", params={"layout": "long"})
+        assert edited.headers["etag"] != live["long"].headers["etag"]
+        assert edited.content.count(b"\r\n") == live["long"].content.count(b"\r\n") + 1
+
+    def test_etag_differs_by_format(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, member = self._schedule(create_member, create_schedule)
+        identity = {"Accept-Encoding": "identity"}
+        paths = [
+            ("export/csv", {"layout": "grid"}),
+            ("export/csv", {"layout": "long"}),
+            ("export/xlsx", {}),
+            ("export/ical", {"member_id": member.id}),
+            ("pdf", {"layout": "shifts"}),
+            ("pdf", {"layout": "members"}),
+            ("rosters", {}),
+        ]
+        etags = [
+            client.get(f"/schedules/{sched.id}/{path}", params=params, headers=identity).headers["etag"]
+            for path, params in paths
+        ]
+        assert len(set(etags)) == len(paths)
+        # 別の形式の ETag では 304 にならない
+        resp = client.get(f"/schedules/{sched.id}/export/xlsx", headers={**identity, "If-None-Match": etags[0]})
+        assert resp.status_code == 200
+
+    def test_only_text_is_gzipped(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, _ = self._schedule(create_member, create_schedule)
+        gzip = {"Accept-Encoding": "gzip"}
+
+        csv_resp = client.get(f"/schedules/{sched.id}/export/csv", headers=gzip)
+        plain = client.get(f"/schedules/{sched.id}/export/csv", headers={"Accept-Encoding": "identity"})
+        assert csv_resp.headers["content-encoding"] == "gzip"
+        assert csv_resp.content == plain.content
+        # 圧縮したレスポンスの ETag は弱い ETag にする。If-None-Match にはどちらを送ってもよい
+        assert "content-encoding" not in plain.headers
+        assert csv_resp.headers["etag"] == "W/" + plain.headers["etag"]
+        for etag in [csv_resp.headers["etag"], plain.headers["etag"]]:
+            resp = client.get(f"/schedules/{sched.id}/export/csv", headers={**gzip, "If-None-Match": etag})
+            assert resp.status_code == 304
+        # 圧縮済みの形式はもう一度圧縮しない
+        for path in ["export/xlsx", "pdf", "rosters"]:
+            resp = client.get(f"/schedules/{sched.id}/{path}", headers=gzip)
+            assert resp.status_code == 200
+            assert "content-encoding" not in resp.headers
+
+    def test_not_found(self, client: TestClient, create_schedule: Callable[..., Any]) -> None:
+        sched = create_schedule()
+        assert client.get("/schedules/9999/export/csv").status_code == 404
+        assert client.get("/schedules/9999/export/xlsx").status_code == 404
+        assert client.get(f"/schedules/{sched.id}/export/ical", params={"member_id": 9999}).status_code == 404
+        assert client.get(f"/schedules/{sched.id}/export/csv", params={"layout": "wide"}).status_code == 422
+
+
+class TestPublishSchedule:
+    def test_publish_renders_artifacts(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="公開テスト")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
+            ],
+        )
+
+        resp = client.post(f"/schedules/{sched.id}/publish")
+        assert resp.status_code == 202
+        assert resp.json()["status"] == "published"
+        wait_for_publication(sched.id, timeout=30)
+
+        data = client.get(f"/schedules/{sched.id}/artifacts").json()
+        assert data["published_version"] == 1
+        assert data["rendering"] is False
+        assert {a["kind"] for a in data["artifacts"]} == {
+            "ward_pdf",
+            "member_roster",
+            "summary",
+            "csv_grid",
+            "csv_long",
+            "xlsx",
+            "ical",
+        }
+        roster = client.get(f"/schedules/{sched.id}/artifacts/member_roster", params={"member_id": m.id})
+        assert roster.content[:5] == b"%PDF-"
+
+        pdf = client.get(f"/schedules/{sched.id}/artifacts/ward_pdf")
+        assert pdf.headers["content-type"] == "application/pdf"
+        assert pdf.content[:5] == b"%PDF-"
+        assert (
+            client.get(
+                f"/schedules/{sched.id}/artifacts/ward_pdf", headers={"If-None-Match": pdf.headers["etag"]}
+            ).status_code
+            == 304
+        )
+        summary = client.get(f"/schedules/{sched.id}/artifacts/summary").json()
+        assert summary == client.get(f"/schedules/{sched.id}/summary").json()
+
+        # 公開した version の間は保存済みのPDFをそのまま返す
+        from pdf import generator
+
+        with patch.object(generator, "generate_schedule_pdf") as render:
+            live = client.get(f"/schedules/{sched.id}/pdf")
+            render.assert_not_called()
+        assert live.content == pdf.content
+        assert live.headers["etag"] == pdf.headers["etag"]
+
+    def test_artifacts_keep_published_version(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member()
+        sched = create_schedule(year_month="2025-01")
+        client.post(f"/schedules/{sched.id}/publish")
+        wait_for_publication(sched.id, timeout=30)
+        published = client.get(f"/schedules/{sched.id}/artifacts/ward_pdf")
+
+        client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "ward", "member_id": m.id},
+        )
+        assert client.get(f"/schedules/{sched.id}/artifacts/ward_pdf").content == published.content
+        assert client.get(f"/schedules/{sched.id}/pdf").headers["etag"] != published.headers["etag"]
+
+    def test_republish_discards_stale_rendering(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        from publish import pipeline
+
+        m = create_member(name="旧")
+        sched = create_schedule(year_month="2025-01")
+        gate = threading.Event()
+
+        def render(snapshot: pipeline.ScheduleSnapshot) -> list[pipeline.RenderedArtifact]:
+            name = snapshot.member_names[m.id]
+            if name == "旧":
+                gate.wait(timeout=10)
+            return [pipeline.RenderedArtifact(ArtifactKind.summary, "application/json", name.encode())]
+
+        with patch.object(pipeline, "ARTIFACT_RENDERERS", [render]):
+            client.post(f"/schedules/{sched.id}/publish")
+            _, stale = pipeline._jobs[sched.id]
+            # 同じ version のまま名前だけ変えて再公開し、古い生成が後から終わるようにする
+            client.put(f"/members/{m.id}", json={"name": "新"})
+            client.post(f"/schedules/{sched.id}/publish")
+            wait_for_publication(sched.id, timeout=30)
+            gate.set()
+            wait(stale, timeout=30)
+
+        assert client.get(f"/schedules/{sched.id}/artifacts/summary").content == "新".encode()
+
+    def test_member_rosters_zip(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        a = create_member(name="山田")
+        create_member(name="佐藤")
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[{"member_id": a.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night}],
+        )
+
+        resp = client.get(f"/schedules/{sched.id}/rosters")
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/zip"
+        assert "rosters_2025-01.zip" in resp.headers["content-disposition"]
+        with zipfile.ZipFile(io.BytesIO(resp.content)) as archive:
+            assert archive.testzip() is None
+            assert archive.namelist() == ["001_山田.pdf", "002_佐藤.pdf"]
+            assert all(archive.read(name)[:5] == b"%PDF-" for name in archive.namelist())
+
+        client.post(f"/schedules/{sched.id}/publish")
+        wait_for_publication(sched.id, timeout=30)
+        from pdf import generator
+
+        with patch.object(generator, "generate_member_roster_pdf") as render:
+            published = client.get(f"/schedules/{sched.id}/rosters")
+            render.assert_not_called()
+        with zipfile.ZipFile(io.BytesIO(published.content)) as archive:
+            assert len(archive.namelist()) == 2
+
+        assert client.get("/schedules/9999/rosters").status_code == 404
+
+    def test_member_rosters_not_modified(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="山田")
+        sched = create_schedule(year_month="2025-01")
+        etag = client.get(f"/schedules/{sched.id}/rosters").headers["etag"]
+
+        from pdf import generator
+
+        with patch.object(generator, "generate_member_roster_pdf") as render:
+            resp = client.get(f"/schedules/{sched.id}/rosters", headers={"If-None-Match": etag})
+            render.assert_not_called()
+        assert resp.status_code == 304
+        assert resp.headers["etag"] == etag
+
+        client.post(
+            f"/schedules/{sched.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "ward", "member_id": m.id},
+        )
+        assert client.get(f"/schedules/{sched.id}/rosters", headers={"If-None-Match": etag}).status_code == 200
+
+    def test_artifact_not_found(self, client: TestClient, create_schedule: Callable[..., Any]) -> None:
+        sched = create_schedule()
+        assert client.get(f"/schedules/{sched.id}/artifacts/ward_pdf").status_code == 404
+        assert client.post("/schedules/9999/publish").status_code == 404
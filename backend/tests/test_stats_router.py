@@ -0,0 +1,144 @@
+import datetime
+from collections.abc import Callable
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from entity.enums import ShiftType
+from entity.member import Member
+from solver.stats import backfill_member_stats, load_member_history
+
+
+class TestYearStats:
+    def test_rollup_follows_edits(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member(name="年間テスト")
+        jan = create_schedule(year_month="2025-01")
+        feb = create_schedule(year_month="2025-02")
+        client.post(
+            f"/schedules/{jan.id}/assignments",
+            json={"date": "2025-01-06", "shift_type": "night", "member_id": m.id},
+        )
+        resp = client.post(
+            f"/schedules/{feb.id}/assignments",
+            json={"date": "2025-02-02", "shift_type": "ward", "member_id": m.id},  # 日曜
+        )
+        assert resp.status_code == 201
+
+        year = client.get("/stats/year", params={"year": 2025})
+        assert year.status_code == 200
+        (member,) = year.json()["members"]
+        assert [s["year_month"] for s in member["months"]] == ["2025-01", "2025-02"]
+        assert member["total"]["night_shift_count"] == 1
+        assert member["total"]["holiday_work_count"] == 1
+        assert member["total"]["working_days"] == 2
+
+        client.delete(f"/schedules/{feb.id}/assignments/{resp.json()['assignment']['id']}")
+        (member,) = client.get("/stats/year", params={"year": 2025}).json()["members"]
+        assert [s["year_month"] for s in member["months"]] == ["2025-01"]
+
+    def test_backfill(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member()
+        m.external_night_count = 2
+        db_session.commit()
+        create_schedule(
+            year_month="2025-03",
+            assignments=[
+                {"member_id": m.id, "date": datetime.date(2025, 3, 3), "shift_type": ShiftType.night},
+                {"member_id": m.id, "date": datetime.date(2025, 3, 4), "shift_type": ShiftType.day_off},
+                {"member_id": m.id, "date": datetime.date(2025, 3, 6), "shift_type": ShiftType.external_night},
+            ],
+        )
+        assert client.get("/stats/year", params={"year": 2025}).json()["members"] == []
+
+        assert backfill_member_stats(db_session) == 1
+        (member,) = client.get("/stats/year", params={"year": 2025}).json()["members"]
+        assert member["months"][0]["night_shift_count"] == 1
+        assert member["months"][0]["day_off_count"] == 1
+        # 割り当てた他院夜勤の数（メンバーに設定した回数ではない）
+        assert member["months"][0]["external_night_count"] == 1
+
+
+class TestStatsAnalytics:
+    def test_totals_and_spread(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        a = create_member(name="A")
+        b = create_member(name="B")
+        for ym, nights in (("2025-01", (2, 0)), ("2025-02", (1, 1))):
+            year, month = map(int, ym.split("-"))
+            create_schedule(
+                year_month=ym,
+                assignments=[
+                    {
+                        "member_id": member.id,
+                        "date": datetime.date(year, month, 3 + 2 * k),
+                        "shift_type": ShiftType.night,
+                    }
+                    for member, count in zip((a, b), nights, strict=True)
+                    for k in range(count)
+                ]
+                + [{"member_id": b.id, "date": datetime.date(year, month, 20), "shift_type": ShiftType.ward}],
+            )
+        backfill_member_stats(db_session)
+
+        resp = client.get("/stats/analytics", params={"start_month": "2025-01", "end_month": "2025-02"})
+        assert resp.status_code == 200
+        data = resp.json()
+        totals = {m["member_name"]: m for m in data["members"]}
+        assert totals["A"]["night_shift_count"] == 3
+        assert totals["A"]["months"] == 2
+        assert totals["B"]["night_shift_count"] == 1
+        night = next(s for s in data["spreads"] if s["metric"] == "night_shift_count")
+        assert (night["min"], night["max"], night["mean"]) == (1, 3, 2.0)
+
+        resp = client.get("/stats/analytics", params={"start_month": "2025-02", "end_month": "2025-02"})
+        assert {m["member_name"]: m["night_shift_count"] for m in resp.json()["members"]} == {"A": 1, "B": 1}
+
+    def test_invalid_range(self, client: TestClient) -> None:
+        resp = client.get("/stats/analytics", params={"start_month": "2025-03", "end_month": "2025-01"})
+        assert resp.status_code == 400
+
+
+class TestMemberHistory:
+    def test_sums_months_in_window(
+        self,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        m = create_member()
+        for ym, day in (("2024-12", 3), ("2025-01", 6), ("2025-02", 3)):
+            year, month = map(int, ym.split("-"))
+            create_schedule(
+                year_month=ym,
+                assignments=[
+                    {"member_id": m.id, "date": datetime.date(year, month, day), "shift_type": ShiftType.night}
+                ],
+            )
+        create_schedule(
+            year_month="2025-03",
+            assignments=[{"member_id": m.id, "date": datetime.date(2025, 3, 2), "shift_type": ShiftType.ward}],
+        )
+        backfill_member_stats(db_session)
+
+        history = load_member_history(db_session, "2025-01", "2025-03")
+        assert history.nights == {m.id: 2}
+        assert history.holidays == {m.id: 1}  # 2025-03-02 は日曜
+        assert history.earlies == {m.id: 0}
+        assert load_member_history(db_session, "2025-04", "2025-03").nights == {}
@@ -0,0 +1,124 @@
+import datetime
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from entity.enums import CapabilityType, ShiftType
+from entity.member import Member
+
+
+@contextmanager
+def _count_queries(db: Session) -> Iterator[list[str]]:
+    statements: list[str] = []
+
+    def record(*args: Any) -> None:
+        statements.append(args[2])
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+class TestMonthWorkspace:
+    def _month(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+        member_count: int = 2,
+    ) -> tuple[Any, list[Member]]:
+        members = [
+            create_member(name=f"メンバー{k}", capabilities=[CapabilityType.ward_leader]) for k in range(member_count)
+        ]
+        a, b = members[:2]
+        sched = create_schedule(
+            year_month="2025-01",
+            assignments=[
+                {"member_id": a.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.night},
+                {"member_id": b.id, "date": datetime.date(2025, 1, 6), "shift_type": ShiftType.day_off},
+                {"member_id": a.id, "date": datetime.date(2025, 1, 7), "shift_type": ShiftType.ward, "is_early": True},
+            ],
+        )
+        client.put(
+            "/shift-requests/",
+            json={"member_id": b.id, "year_month": "2025-01", "entries": [{"date": "2025-01-06"}]},
+        )
+        client.put("/pediatric-doctor-schedules/", json={"year_month": "2025-01", "dates": ["2025-01-08"]})
+        return sched, members
+
+    def test_matches_individual_endpoints(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        sched, (a, b) = self._month(client, create_member, create_schedule)
+
+        resp = client.get("/workspace/2025-01")
+        assert resp.status_code == 200
+        data = resp.json()
+        assert len(data["dates"]) == 31
+        assert data["members"] == client.get("/members/").json()
+        assert [(r["member_id"], r["date"], r["request_type"]) for r in data["shift_requests"]] == [
+            (b.id, "2025-01-06", "day_off")
+        ]
+        assert data["pediatric_dates"] == ["2025-01-08"]
+
+        full = client.get("/schedules/", params={"year_month": "2025-01"}).json()
+        assert data["schedule"]["id"] == sched.id
+        assert data["schedule"]["version"] == full["version"]
+        assert sorted(
+            (x["id"], x["member_id"], x["date"], x["shift_type"], x["is_early"])
+            for x in data["schedule"]["assignments"]
+        ) == sorted((x["id"], x["member_id"], x["date"], x["shift_type"], x["is_early"]) for x in full["assignments"])
+
+        assert data["summary"] == client.get(f"/schedules/{sched.id}/summary").json()
+
+    def test_selected_sections_only(
+        self,
+        client: TestClient,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        self._month(client, create_member, create_schedule)
+
+        data = client.get("/workspace/2025-01", params={"sections": ["pediatric_dates"]}).json()
+        assert len(data["members"]) == 2
+        assert data["pediatric_dates"] == ["2025-01-08"]
+        assert data["shift_requests"] is None
+        assert data["schedule"] is None
+        assert data["summary"] is None
+
+        assert client.get("/workspace/2025-01", params={"sections": ["unknown"]}).status_code == 422
+
+    def test_month_without_schedule(self, client: TestClient, create_member: Callable[..., Member]) -> None:
+        create_member()
+        data = client.get("/workspace/2025-02").json()
+        assert len(data["dates"]) == 28
+        assert data["shift_requests"] == []
+        assert data["pediatric_dates"] == []
+        assert data["schedule"] is None
+        assert data["summary"] is None
+
+    def test_invalid_year_month(self, client: TestClient) -> None:
+        assert client.get("/workspace/2025-13").status_code == 422
+        assert client.get("/workspace/202501").status_code == 422
+
+    def test_query_count_does_not_grow_with_members(
+        self,
+        client: TestClient,
+        db_session: Session,
+        create_member: Callable[..., Member],
+        create_schedule: Callable[..., Any],
+    ) -> None:
+        self._month(client, create_member, create_schedule, member_count=20)
+        with _count_queries(db_session) as statements:
+            assert client.get("/workspace/2025-01").status_code == 200
+        assert len(statements) == 7